@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark filename search in the project file index.
+
+Usage:
+    python benchmarks/bench_file_index.py [/path/to/large/repo] [--files 500000] [--runs 20]
+
+Without a root, a synthetic tree of --files paths is indexed (nested
+source-like directories and names). Each query is run in every search
+mode and the median and worst latency are reported against the 10 ms
+target for a 500k-file project.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from claude_code_api.services.file_index import ProjectFileIndex, SEARCH_MODES  # noqa: E402
+
+TARGET_MS = 10.0
+
+WORDS = [
+    "src", "lib", "app", "core", "utils", "components", "services", "api", "models", "tests",
+    "user", "profile", "session", "config", "index", "router", "handler", "client", "server",
+    "cache", "store", "widget", "format", "parser", "auth", "billing", "search", "upload",
+]
+EXTENSIONS = [".py", ".ts", ".tsx", ".js", ".md", ".json", ".css", ".go"]
+
+QUERIES = ["user", "prof", "upr", "srvcfg", "components/user", "usrprfl", "zzzz", "aaaaaaaaz"]
+
+
+def synthetic_paths(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    paths = set()
+    while len(paths) < count:
+        depth = rng.randint(1, 6)
+        dirs = [rng.choice(WORDS) + (str(rng.randint(0, 40)) if rng.random() < 0.3 else "") for _ in range(depth)]
+        name = "_".join(rng.sample(WORDS, rng.randint(1, 3))) + str(rng.randint(0, 999)) + rng.choice(EXTENSIONS)
+        paths.add("/".join(dirs + [name]))
+    return list(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", nargs="?")
+    parser.add_argument("--files", type=int, default=500_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--query", action="append", help="Query to time (repeatable)")
+    args = parser.parse_args()
+
+    if args.root:
+        index = ProjectFileIndex(os.path.realpath(args.root))
+        index.build()
+        print(f"{len(index)} files under {index.root} (built in {index.build_ms:.0f} ms)")
+    else:
+        index = ProjectFileIndex("/synthetic")
+        start = time.perf_counter()
+        index._set_base(synthetic_paths(args.files))
+        print(f"{len(index)} synthetic files (indexed in {(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    print(f"{'query':18s} {'mode':10s} {'median ms':>10s} {'max ms':>9s} {'hits':>5s}")
+    for query in args.query or QUERIES:
+        for mode in SEARCH_MODES:
+            samples = []
+            hits = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                hits = index.search(query, mode=mode, limit=50)
+                samples.append((time.perf_counter() - start) * 1000)
+            median = statistics.median(samples)
+            flag = "" if median <= TARGET_MS else "  over target"
+            print(f"{query:18s} {mode:10s} {median:10.2f} {max(samples):9.2f} {len(hits):5d}{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark git status with and without the repo handle pool.
+
+Usage:
+    python benchmarks/bench_git_status.py /path/to/repo [--calls 1000] [--threads 4]
+
+Without the pool every call opens a new Repo (git dir discovery plus
+fresh cat-file helpers) and closes it again; with the pool the handle
+stays open between calls. Calls are spread over a thread pool the way
+the API's blocking executor runs them.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from claude_code_api.services.git_operations import GitOperationsService  # noqa: E402
+from claude_code_api.services.repo_pool import RepoPool  # noqa: E402
+
+
+def run(service, repo, calls, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: service.get_status(repo), range(calls)))
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("repo")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    repo = os.path.realpath(args.repo)
+    print(f"{args.calls} status calls on {repo} ({args.threads} threads)")
+
+    unpooled_ms = run(GitOperationsService(pool=None), repo, args.calls, args.threads)
+    print(f"fresh Repo per call: {unpooled_ms:9.1f} ms  ({unpooled_ms / args.calls:.2f} ms/call)")
+
+    pool = RepoPool()
+    pooled_ms = run(GitOperationsService(pool=pool), repo, args.calls, args.threads)
+    print(f"repo pool          : {pooled_ms:9.1f} ms  ({pooled_ms / args.calls:.2f} ms/call, "
+          f"{unpooled_ms / pooled_ms:.1f}x)")
+    print(f"pool stats         : {pool.get_stats()}")
+    pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark /v1/files/grep's engine against a pure-Python baseline.
+
+Usage:
+    python benchmarks/bench_grep.py /path/to/large/repo "pattern" [--regex] [--runs 3]
+
+The baseline is what a straightforward implementation would do: walk the
+tree, read each file, split into lines and test each line. Both sides
+search the same gitignore-filtered file list so only the search itself
+is compared.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from claude_code_api.services.content_search import ContentSearchService  # noqa: E402
+from claude_code_api.services.file_index import ProjectFileIndex  # noqa: E402
+
+
+def baseline(root, paths, pattern, regex, ignore_case, max_per_file):
+    """Sequential read + per-line match."""
+    flags = re.IGNORECASE if ignore_case else 0
+    compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+    matches = 0
+    for rel in paths:
+        try:
+            with open(os.path.join(root, rel), "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        if b"\0" in data[:8192]:
+            continue
+        per_file = 0
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            if compiled.search(line):
+                matches += 1
+                per_file += 1
+                if per_file >= max_per_file:
+                    break
+    return matches
+
+
+async def engine(service, root, paths, pattern, regex, ignore_case, max_per_file):
+    matches = 0
+    async for record in service.grep(
+        root, paths, pattern, regex=regex, ignore_case=ignore_case,
+        max_per_file=max_per_file, max_results=10**9,
+    ):
+        if record["type"] == "match":
+            matches += 1
+    return matches
+
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root")
+    parser.add_argument("pattern")
+    parser.add_argument("--regex", action="store_true")
+    parser.add_argument("--ignore-case", action="store_true")
+    parser.add_argument("--max-per-file", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    root = os.path.realpath(args.root)
+    index = ProjectFileIndex(root)
+    index.build()
+    paths = index.all_paths()
+    print(f"{len(paths)} files under {root} (index built in {index.build_ms:.0f} ms)")
+
+    base_matches, base_ms = timed(
+        lambda: baseline(root, paths, args.pattern, args.regex, args.ignore_case, args.max_per_file),
+        args.runs,
+    )
+    print(f"pure python      : {base_ms:9.1f} ms  {base_matches} matches")
+
+    for use_processes in (False, True):
+        service = ContentSearchService(max_workers=args.workers, use_processes=use_processes)
+        loop = asyncio.new_event_loop()
+        run = lambda: loop.run_until_complete(engine(
+            service, root, paths, args.pattern, args.regex, args.ignore_case, args.max_per_file
+        ))
+        run()  # Warm up the pool (process start-up is not part of a query)
+        matches, ms = timed(run, args.runs)
+        label = "engine/processes" if use_processes else "engine/threads"
+        print(f"{label:17s}: {ms:9.1f} ms  {matches} matches  ({base_ms / ms:.1f}x)")
+        service.shutdown()
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 """Admin endpoints for system management."""
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, status, Depends
-from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 import structlog
 
 from claude_code_api.core.database import DatabaseManager, AsyncSessionLocal
+from claude_code_api.core.loop_monitor import loop_monitor
+from claude_code_api.core.profiler import profiler, Profile, ProfilerBusyError
 from claude_code_api.services.cache_service import cache_service
 from claude_code_api.services.rate_limiter_advanced import SlidingWindowRateLimiter
 from claude_code_api.middleware.rate_limit import rate_limiter
+from claude_code_api.services.quota_service import quota_manager
+from claude_code_api.services.search_index import search_index
 from sqlalchemy import text
 
 logger = structlog.get_logger()
@@ -25,6 +30,12 @@ class AdminStats(BaseModel):
     rate_limit_clients: int
 
 
+class QuotaBudgetRequest(BaseModel):
+    """Per-client quota budget override."""
+    tokens_per_minute: Optional[int] = Field(None, ge=0, description="Token budget per minute (0 = unlimited)")
+    usd_per_day: Optional[float] = Field(None, ge=0, description="Cost budget per UTC day (0 = unlimited)")
+
+
 @router.get("/admin/stats")
 async def get_admin_stats() -> AdminStats:
     """Get comprehensive admin statistics."""
@@ -76,6 +87,114 @@ async def get_rate_limit_stats() -> dict:
     return rate_limiter.get_stats()
 
 
+@router.get("/admin/quota/stats")
+async def get_quota_stats() -> dict:
+    """Get token/cost quota statistics."""
+    return quota_manager.get_stats()
+
+
+@router.get("/admin/quota/{client_id}")
+async def get_client_quota(client_id: str) -> dict:
+    """Get quota budget and usage for specific client."""
+    return quota_manager.get_status(client_id)
+
+
+@router.put("/admin/quota/{client_id}")
+async def set_client_quota(client_id: str, request: QuotaBudgetRequest) -> dict:
+    """Override quota budget for specific client."""
+    budget = quota_manager.set_budget(
+        client_id,
+        tokens_per_minute=request.tokens_per_minute,
+        usd_per_day=request.usd_per_day
+    )
+    return {"success": True, "client_id": client_id, "budget": budget.to_dict()}
+
+
+@router.post("/admin/quota/reset/{client_id}")
+async def reset_client_quota(client_id: str) -> dict:
+    """Reset quota usage for specific client."""
+    quota_manager.reset(client_id)
+    logger.info("Quota reset", client_id=client_id)
+    return {"success": True, "message": f"Quota reset for {client_id}"}
+
+
+@router.get("/admin/event-loop/blocking")
+async def get_blocking_calls(limit: int = Query(20, ge=1, le=200, description="Call sites to return")):
+    """
+    Call sites that held the event loop past the blocking threshold.
+
+    Sites are ranked by stack samples taken while the loop was blocked
+    (blocked_ms = samples x sample interval), each with its most frequent
+    stacks, innermost frame first. Needs debug mode or
+    loop_monitor_sample_stacks.
+    """
+    if loop_monitor.sampler is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Stack sampling is off; enable debug or loop_monitor_sample_stacks"
+        )
+    return {"lag": loop_monitor.get_stats(), **loop_monitor.sampler.report(limit)}
+
+
+@router.post("/admin/event-loop/blocking/reset")
+async def reset_blocking_calls():
+    """Forget collected blocking-call samples."""
+    if loop_monitor.sampler is not None:
+        loop_monitor.sampler.reset()
+    return {"success": True, "message": "Blocking-call samples cleared"}
+
+
+def _profile_response(profile: Profile, format: str, limit: int, **extra):
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return {**profile.top(limit), **extra}
+
+
+@router.get("/admin/profile")
+async def profile_process(
+    seconds: float = Query(5.0, gt=0, description="How long to sample (capped at profiler_max_seconds)"),
+    hz: Optional[float] = Query(None, gt=0, le=1000, description="Samples per second (default profiler_default_hz)"),
+    format: str = Query("top", pattern="^(top|collapsed)$", description="top: hot functions; collapsed: flamegraph input"),
+    limit: int = Query(30, ge=1, le=500, description="Functions in the top table"),
+    include_idle: bool = Query(False, description="Keep samples of threads that are only waiting"),
+):
+    """
+    Sample every thread's stack for a few seconds.
+
+    `format=collapsed` returns one `thread;outer;...;inner count` line per
+    stack, for flamegraph.pl or speedscope. The default is a table of the
+    functions with the most self samples.
+    """
+    try:
+        profile = await profiler.profile(seconds, hz=hz, include_idle=include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _profile_response(profile, format, limit)
+
+
+@router.get("/admin/profile/trace/{request_id}")
+async def profile_request(
+    request_id: str,
+    timeout: float = Query(30.0, gt=0, description="How long to wait for the request to arrive and finish"),
+    hz: Optional[float] = Query(None, gt=0, le=1000, description="Samples per second (default profiler_default_hz)"),
+    format: str = Query("top", pattern="^(top|collapsed)$", description="top: hot functions; collapsed: flamegraph input"),
+    limit: int = Query(30, ge=1, le=500, description="Functions in the top table"),
+):
+    """
+    Profile the next request sent with `X-Request-ID: <request_id>`.
+
+    Only that request's work is sampled: the event loop while one of its
+    tasks runs, and executor threads while they run its blocking calls.
+    Responds once the request's response has been sent, or after timeout
+    with `completed: false`.
+    """
+    try:
+        profile, completed = await profiler.trace(request_id, timeout, hz=hz)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _profile_response(profile, format, limit, request_id=request_id, completed=completed)
+
+
 @router.post("/admin/database/vacuum")
 async def vacuum_database() -> dict:
     """Vacuum SQLite database to optimize."""
@@ -129,6 +248,8 @@ async def cleanup_inactive_sessions(hours: int = 168) -> dict:
         await db_session.commit()
         
         deleted_count = result.rowcount
+        # Deletions are not seen by the incremental session reload
+        search_index.invalidate("session")
         logger.info("Inactive sessions cleaned up", count=deleted_count, cutoff_hours=hours)
         
         return {"success": True, "deleted": deleted_count, "cutoff_hours": hours}
@@ -1,11 +1,18 @@
 """Agents Management API - CRUD for ~/.claude/agents/"""
 
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 import structlog
 
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.catalog import agent_catalog
+from claude_code_api.services.search_index import search_index
+
 logger = structlog.get_logger()
 router = APIRouter()
 
@@ -29,48 +36,91 @@ class AgentResponse(BaseModel):
 
 def get_agents_directory() -> Path:
     """Get agents directory path."""
-    agents_dir = Path.home() / ".claude" / "agents"
+    agents_dir = agent_catalog.directory
     agents_dir.mkdir(parents=True, exist_ok=True)
     return agents_dir
 
 
+def _response(entry: Dict[str, Any]) -> AgentResponse:
+    return AgentResponse(
+        name=entry["name"],
+        path=entry["path"],
+        description=entry["description"],
+        subagent_type=str(entry["metadata"].get("subagent_type", "general-purpose")),
+        size=entry["size"],
+    )
+
+
+def _search_document(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Search index document for an agent."""
+    return {
+        "id": "agent:" + entry["name"],
+        "type": "agent",
+        "title": entry["name"],
+        "description": entry["description"],
+        "body": entry["body"],
+        "path": entry["path"],
+        "metadata": entry["metadata"],
+    }
+
+
+async def _load_agents(since: Optional[datetime]) -> List[Dict[str, Any]]:
+    entries, _ = await agent_catalog.entries()
+    return [_search_document(entry) for entry in entries]
+
+
+search_index.register_source(
+    "agent", _load_agents, refresh_seconds=settings.catalog_revalidate_seconds
+)
+
+
+def _write_agent(agent_dir: Path, content: str) -> Path:
+    """Create agent directory and write AGENT.md (blocking)."""
+    agent_dir.mkdir(exist_ok=True)
+    agent_file = agent_dir / "AGENT.md"
+    agent_file.write_text(content)
+    return agent_file
+
+
+def _remove_agent(agent_dir: Path) -> bool:
+    """Delete AGENT.md and the directory if empty (blocking)."""
+    if not agent_dir.exists():
+        return False
+
+    # Delete AGENT.md file
+    agent_file = agent_dir / "AGENT.md"
+    if agent_file.exists():
+        agent_file.unlink()
+
+    # Remove directory if empty
+    try:
+        agent_dir.rmdir()
+    except OSError:
+        # Directory not empty, that's OK
+        pass
+
+    return True
+
+
 @router.get("/agents")
-async def list_agents() -> List[AgentResponse]:
-    """List all available agents from ~/.claude/agents/"""
+async def list_agents(request: Request) -> List[AgentResponse]:
+    """
+    List all available agents from ~/.claude/agents/
+
+    Served from the in-memory catalog. The ETag changes whenever any
+    agent is added, edited or removed; send it back in If-None-Match to
+    get 304 Not Modified instead of the listing.
+    """
     try:
-        agents_dir = get_agents_directory()
-        agents = []
-        
-        for agent_dir in agents_dir.iterdir():
-            if agent_dir.is_dir():
-                agent_file = agent_dir / "AGENT.md"
-                if agent_file.exists():
-                    content = agent_file.read_text()
-                    
-                    # Extract metadata from front matter
-                    description = ""
-                    subagent_type = "general-purpose"
-                    
-                    if content.startswith("---"):
-                        parts = content.split("---", 2)
-                        if len(parts) >= 3:
-                            front_matter = parts[1]
-                            for line in front_matter.split("\n"):
-                                if line.startswith("description:"):
-                                    description = line.split("description:", 1)[1].strip()
-                                elif line.startswith("subagent_type:"):
-                                    subagent_type = line.split("subagent_type:", 1)[1].strip()
-                    
-                    agents.append(AgentResponse(
-                        name=agent_dir.name,
-                        path=str(agent_file),
-                        description=description,
-                        subagent_type=subagent_type,
-                        size=agent_file.stat().st_size,
-                    ))
-        
-        logger.info("Agents listed", count=len(agents))
-        return agents
+        entries, etag = await agent_catalog.entries()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        logger.info("Agents listed", count=len(entries))
+        return JSONResponse(
+            content=[_response(entry).model_dump() for entry in entries],
+            headers={"ETag": etag},
+        )
         
     except Exception as e:
         logger.error("Failed to list agents", error=str(e))
@@ -87,14 +137,14 @@ async def get_agent(name: str) -> dict:
         agents_dir = get_agents_directory()
         agent_file = agents_dir / name / "AGENT.md"
         
-        if not agent_file.exists():
+        try:
+            content = await blocking_executor.run("file", agent_file.read_text)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Agent '{name}' not found"
             )
         
-        content = agent_file.read_text()
-        
         logger.info("Agent retrieved", name=name, size=len(content))
         
         return {
@@ -120,9 +170,6 @@ async def create_agent(request: CreateAgentRequest) -> AgentResponse:
     try:
         agents_dir = get_agents_directory()
         agent_dir = agents_dir / request.name
-        agent_dir.mkdir(exist_ok=True)
-        
-        agent_file = agent_dir / "AGENT.md"
         
         # Create agent content with front matter
         full_content = f"""---
@@ -134,17 +181,22 @@ subagent_type: {request.subagent_type}
 {request.content}
 """
         
-        agent_file.write_text(full_content)
+        agent_file = await blocking_executor.run("file", _write_agent, agent_dir, full_content)
         
         logger.info("Agent created", name=request.name, size=len(full_content))
         
-        return AgentResponse(
+        created = AgentResponse(
             name=request.name,
             path=str(agent_file),
             description=request.description,
             subagent_type=request.subagent_type,
             size=len(full_content),
         )
+        agent_catalog.invalidate()
+        entry = await agent_catalog.get(request.name)
+        if entry is not None:
+            await search_index.upsert(_search_document(entry))
+        return created
         
     except Exception as e:
         logger.error("Failed to create agent", name=request.name, error=str(e))
@@ -161,24 +213,15 @@ async def delete_agent(name: str) -> dict:
         agents_dir = get_agents_directory()
         agent_dir = agents_dir / name
         
-        if not agent_dir.exists():
+        removed = await blocking_executor.run("file", _remove_agent, agent_dir)
+        if not removed:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Agent '{name}' not found"
             )
         
-        # Delete AGENT.md file
-        agent_file = agent_dir / "AGENT.md"
-        if agent_file.exists():
-            agent_file.unlink()
-        
-        # Remove directory if empty
-        try:
-            agent_dir.rmdir()
-        except OSError:
-            # Directory not empty, that's OK
-            pass
-        
+        agent_catalog.invalidate()
+        await search_index.remove("agent:" + name)
         logger.info("Agent deleted", name=name)
         
         return {"success": True, "message": f"Agent '{name}' deleted"}
@@ -5,27 +5,33 @@ from pydantic import BaseModel, Field
 import structlog
 
 from claude_code_api.services.backup_service import BackupService
+from claude_code_api.services.blob_store import blob_store
 from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 backup_service = BackupService(
     db_path=settings.database_url.replace("sqlite:///", "./"),
-    backup_dir="./backups"
+    backup_dir="./backups",
+    blob_store=blob_store,
 )
 
 
 class CreateBackupRequest(BaseModel):
     """Create backup request."""
-    compress: bool = Field(True, description="Compress backup with gzip")
+    compress: bool = Field(True, description="Compress backup with gzip (full copies only)")
+    dedup: bool = Field(True, description="Store changed chunks only, in the blob store")
 
 
 @router.post("/backup/create")
 async def create_backup(request: CreateBackupRequest):
     """Create database backup."""
     try:
-        backup_path = backup_service.create_backup(compress=request.compress)
+        backup_path = await blocking_executor.run(
+            "file", backup_service.create_backup, compress=request.compress, dedup=request.dedup
+        )
         return {"success": True, "backup_path": backup_path}
     except Exception as e:
         logger.error("Backup creation failed", error=str(e))
@@ -38,14 +44,14 @@ async def create_backup(request: CreateBackupRequest):
 @router.get("/backup/list")
 async def list_backups():
     """List all database backups."""
-    return backup_service.list_backups()
+    return await blocking_executor.run("file", backup_service.list_backups)
 
 
 @router.post("/backup/restore/{backup_filename}")
 async def restore_backup(backup_filename: str):
     """Restore database from backup."""
     try:
-        backup_service.restore_backup(backup_filename)
+        await blocking_executor.run("file", backup_service.restore_backup, backup_filename)
         return {"success": True, "restored_from": backup_filename}
     except FileNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -60,5 +66,5 @@ async def restore_backup(backup_filename: str):
 @router.post("/backup/cleanup")
 async def cleanup_backups(keep: int = 10):
     """Remove old backups."""
-    removed = backup_service.cleanup_old_backups(keep_count=keep)
+    removed = await blocking_executor.run("file", backup_service.cleanup_old_backups, keep_count=keep)
     return {"success": True, "removed": removed}
@@ -1,25 +1,34 @@
 """Batch operations API for efficient multi-operation requests."""
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, status
+import json
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import structlog
-import asyncio
 
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.batch_engine import BatchNode, BatchValidationError, batch_engine, validate_dag
 from claude_code_api.services.file_operations import FileOperationsService
 from claude_code_api.services.git_operations import GitOperationsService
+from claude_code_api.services.git_runner import git_runner
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Operations that change state; once started they run to the end
+MUTATING_OPERATIONS = {"file_write", "git_commit"}
+
 file_service = FileOperationsService(allowed_paths=["/Users", "/tmp", "/var"])
 git_service = GitOperationsService()
 
 
 class BatchOperation(BaseModel):
     """Single batch operation."""
+    id: Optional[str] = Field(None, description="Operation id for depends_on (default: its index)")
     operation: str = Field(..., description="Operation type: file_read, file_write, git_status, etc.")
     params: Dict[str, Any] = Field(..., description="Operation parameters")
+    depends_on: List[str] = Field(default_factory=list, description="Ids that must succeed first")
 
 
 class BatchRequest(BaseModel):
@@ -33,7 +42,10 @@ class BatchOperationResult(BaseModel):
     operation: str
     success: bool
     data: Any = None
-    error: str = None
+    error: Optional[str] = None
+    id: Optional[str] = None
+    status: str = "ok"  # ok, failed, skipped or cancelled
+    ms: float = 0.0
 
 
 class BatchResponse(BaseModel):
@@ -45,7 +57,10 @@ class BatchResponse(BaseModel):
 
 
 @router.post("/batch")
-async def execute_batch_operations(request: BatchRequest) -> BatchResponse:
+async def execute_batch_operations(
+    request: BatchRequest,
+    stream: bool = Query(False, description="Stream results as NDJSON as operations finish"),
+):
     """
     Execute multiple operations in a single request.
     
@@ -55,60 +70,110 @@ async def execute_batch_operations(request: BatchRequest) -> BatchResponse:
     - file_list: List files in directory
     - git_status: Get git status
     - git_log: Get commit log
+    - git_commit: Create a commit
+    
+    Operations run concurrently (up to batch_max_concurrent at a time).
+    An operation with `depends_on` starts once those operations have
+    succeeded, and is skipped if one of them fails; give writes that must
+    happen in order an explicit edge. With fail_fast, the first failure
+    cancels running reads and skips operations not started yet; a
+    file_write or git_commit already running is allowed to finish (its
+    worker thread cannot be stopped) and is reported as it ended.
+
+    Git operations on the same repository share its pooled repo handle and
+    take the repository lock (reads together, writes exclusively).
+
+    Results are in request order; with stream=true each result is sent as
+    an NDJSON line ({"type": "result", ...}) as soon as it finishes,
+    followed by {"type": "summary", "total", "successful", "failed"}.
     
     Example:
     {
       "operations": [
-        {"operation": "file_read", "params": {"path": "/tmp/file1.txt"}},
+        {"id": "write", "operation": "file_write", "params": {"path": "/tmp/a.txt", "content": "x"}},
+        {"operation": "file_read", "params": {"path": "/tmp/a.txt"}, "depends_on": ["write"]},
         {"operation": "git_status", "params": {"project_path": "/path/to/repo"}}
       ],
       "fail_fast": false
     }
     """
-    results = []
-    
-    for op in request.operations:
-        try:
-            result = await execute_single_operation(op)
-            results.append(BatchOperationResult(
-                operation=op.operation,
-                success=True,
-                data=result
-            ))
-        except Exception as e:
-            logger.error("Batch operation failed", operation=op.operation, error=str(e))
-            results.append(BatchOperationResult(
-                operation=op.operation,
-                success=False,
-                error=str(e)
-            ))
-            
-            if request.fail_fast:
-                break
-    
-    successful = sum(1 for r in results if r.success)
-    failed = len(results) - successful
+    nodes = [
+        BatchNode(
+            id=op.id if op.id is not None else str(index),
+            index=index,
+            operation=op.operation,
+            params=op.params,
+            depends_on=op.depends_on,
+        )
+        for index, op in enumerate(request.operations)
+    ]
+    try:
+        nodes = validate_dag(nodes)
+    except BatchValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    results = batch_engine.run(
+        nodes,
+        execute_single_operation,
+        fail_fast=request.fail_fast,
+        cancellable=lambda node: node.operation not in MUTATING_OPERATIONS,
+    )
+
+    if stream:
+        async def ndjson():
+            successful = total = 0
+            try:
+                async for record in results:
+                    total += 1
+                    successful += record["success"]
+                    yield json.dumps({"type": "result", **record}, separators=(",", ":"), default=str) + "\n"
+                yield json.dumps({
+                    "type": "summary", "total": total, "successful": successful, "failed": total - successful,
+                }, separators=(",", ":")) + "\n"
+            except Exception as e:
+                logger.error("Batch stream error", error=str(e))
+                yield json.dumps({"type": "error", "error": str(e)}, separators=(",", ":")) + "\n"
+            finally:
+                await results.aclose()
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    records = sorted([record async for record in results], key=lambda r: r["index"])
+    successful = sum(1 for r in records if r["success"])
     
     return BatchResponse(
-        results=results,
-        total=len(results),
+        results=[
+            BatchOperationResult(
+                operation=r["operation"],
+                success=r["success"],
+                data=r["data"],
+                error=r["error"],
+                id=r["id"],
+                status=r["status"],
+                ms=r["ms"],
+            )
+            for r in records
+        ],
+        total=len(records),
         successful=successful,
-        failed=failed
+        failed=len(records) - successful
     )
 
 
-async def execute_single_operation(operation: BatchOperation) -> Any:
+async def execute_single_operation(operation: BatchNode) -> Any:
     """Execute a single batch operation."""
     op_type = operation.operation
     params = operation.params
     
     # File operations
     if op_type == "file_read":
-        content = file_service.read_file(params["path"])
+        content = await blocking_executor.run("file", file_service.read_file, params["path"])
         return {"content": content, "path": params["path"]}
     
     elif op_type == "file_write":
-        file_info = file_service.write_file(
+        file_info = await blocking_executor.run(
+            "file",
+            file_service.write_file,
             params["path"],
             params["content"],
             create_dirs=params.get("create_dirs", False)
@@ -116,7 +181,9 @@ async def execute_single_operation(operation: BatchOperation) -> Any:
         return {"path": file_info.path, "size": file_info.size}
     
     elif op_type == "file_list":
-        files = file_service.list_files(
+        files = await blocking_executor.run(
+            "file",
+            file_service.list_files,
             params["path"],
             pattern=params.get("pattern", "*"),
             include_hidden=params.get("hidden", False)
@@ -125,20 +192,26 @@ async def execute_single_operation(operation: BatchOperation) -> Any:
     
     # Git operations
     elif op_type == "git_status":
-        return git_service.get_status(params["project_path"])
+        return await git_service.get_status_async(params["project_path"])
     
     elif op_type == "git_log":
-        return git_service.get_log(
-            params["project_path"],
-            max_count=params.get("max", 10)
-        )
+        async with git_runner.locked(params["project_path"]):
+            return await blocking_executor.run(
+                "git",
+                git_service.get_log,
+                params["project_path"],
+                max_count=params.get("max", 10)
+            )
     
     elif op_type == "git_commit":
-        return git_service.create_commit(
-            params["project_path"],
-            params["message"],
-            files=params.get("files")
-        )
+        async with git_runner.locked(params["project_path"], write=True):
+            return await blocking_executor.run(
+                "git",
+                git_service.create_commit,
+                params["project_path"],
+                params["message"],
+                files=params.get("files")
+            )
     
     else:
         raise ValueError(f"Unknown operation: {op_type}")
@@ -1,12 +1,14 @@
 """Chat completions API endpoint - OpenAI compatible."""
 
+import time
 import uuid
 import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import APIRouter, Request, HTTPException, status
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import ValidationError
+from starlette.background import BackgroundTask
 import structlog
 
 from claude_code_api.models.openai import (
@@ -21,8 +23,11 @@ from claude_code_api.models.claude import validate_claude_model, get_model_info
 from claude_code_api.core.claude_manager import create_project_directory
 from claude_code_api.core.session_manager import SessionManager, ConversationManager
 from claude_code_api.utils.streaming import create_sse_response, create_non_streaming_response
-from claude_code_api.utils.parser import ClaudeOutputParser, estimate_tokens
+from claude_code_api.utils.parser import ClaudeOutputParser, estimate_tokens, extract_result_usage
 from claude_code_api.services.slash_commands import SlashCommandService
+from claude_code_api.services.quota_service import quota_manager, QuotaExceededError, estimate_cost
+from claude_code_api.utils.metrics import metrics
+from claude_code_api.core.log_pipeline import lazy, preview
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -36,6 +41,7 @@ async def create_chat_completion(
     req: Request
 ) -> Any:
     """Create a chat completion, compatible with OpenAI API."""
+    started = time.perf_counter()
     
     # Log raw request for debugging
     try:
@@ -46,7 +52,7 @@ async def create_chat_completion(
             content_type=content_type,
             body_size=len(raw_body),
             user_agent=req.headers.get("user-agent", "unknown"),
-            raw_body=raw_body.decode()[:1000] if raw_body else "empty"
+            raw_body=lazy(preview, raw_body, 1000) if raw_body else "empty"
         )
         
         # Parse JSON manually to see validation errors
@@ -98,6 +104,8 @@ async def create_chat_completion(
         session_id=request.session_id
     )
     
+    quota_reservation = None
+
     try:
         # Validate model
         claude_model = validate_claude_model(request.model)
@@ -215,6 +223,30 @@ async def create_chat_completion(
                 system_prompt=system_prompt
             )
         
+        # Admit against the caller's token/cost budget before spawning Claude
+        if quota_manager.enabled:
+            estimated_tokens, estimated_cost = quota_manager.estimate(
+                prompt=user_prompt,
+                model=claude_model,
+                system_prompt=system_prompt,
+                max_tokens=request.max_tokens
+            )
+            try:
+                quota_reservation = quota_manager.reserve(client_id, estimated_tokens, estimated_cost)
+            except QuotaExceededError as e:
+                metrics.increment("rate_limit_rejections", reason=f"quota_{e.dimension}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail={
+                        "error": {
+                            "message": str(e),
+                            "type": "rate_limit_error",
+                            "code": f"quota_{e.dimension}_exceeded"
+                        }
+                    },
+                    headers=e.headers
+                )
+
         # Start Claude Code process
         try:
             claude_process = await claude_manager.create_session(
@@ -231,6 +263,8 @@ async def create_chat_completion(
                 session_id=session_id,
                 error=str(e)
             )
+            if quota_reservation:
+                quota_manager.release(quota_reservation)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail={
@@ -253,11 +287,55 @@ async def create_chat_completion(
             tokens_used=estimate_tokens(user_prompt)
         )
         
+        async def record_result_usage(result_message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            """Charge session and quota with the usage from Claude's result event."""
+            usage = extract_result_usage(result_message)
+            if usage is None:
+                return None
+
+            if usage["cost_usd"] is None:
+                usage["cost_usd"] = estimate_cost(
+                    claude_model, usage["input_tokens"], usage["output_tokens"]
+                )
+
+            await session_manager.update_session(
+                session_id=claude_session_id,
+                tokens_used=usage["total_tokens"],
+                cost=usage["cost_usd"]
+            )
+            if quota_reservation:
+                quota_manager.settle(quota_reservation, usage["total_tokens"], usage["cost_usd"])
+
+            return usage
+
         # Handle streaming vs non-streaming
         if request.stream:
+            async def stream_with_settlement():
+                first_chunk = True
+                try:
+                    async for chunk in create_sse_response(
+                        claude_session_id, claude_model, claude_process,
+                        on_result=record_result_usage
+                    ):
+                        if first_chunk:
+                            first_chunk = False
+                            metrics.record_time(
+                                "sse_time_to_first_byte_ms", (time.perf_counter() - started) * 1000, model=claude_model
+                            )
+                        yield chunk
+                finally:
+                    # Stream ended without a result event: charge the estimate
+                    if quota_reservation:
+                        quota_manager.settle_estimate(quota_reservation)
+
+            # Settles a stream whose body never started (client gone first);
+            # repeat settlements are ignored
+            settlement = BackgroundTask(quota_manager.settle_estimate, quota_reservation) if quota_reservation else None
+
             # Return streaming response
             return StreamingResponse(
-                create_sse_response(claude_session_id, claude_model, claude_process),
+                stream_with_settlement(),
+                background=settlement,
                 media_type="text/plain",
                 headers={
                     "Cache-Control": "no-cache",
@@ -279,7 +357,7 @@ async def create_chat_completion(
                     has_assistant_content=bool(isinstance(claude_message, dict) and 
                                              claude_message.get("type") == "assistant" and 
                                              claude_message.get("message", {}).get("content")),
-                    message_preview=str(claude_message)[:200] if claude_message else "None"
+                    message_preview=lazy(preview, claude_message, 200) if claude_message else "None"
                 )
                 
                 messages.append(claude_message)
@@ -300,13 +378,28 @@ async def create_chat_completion(
                 message_types=[msg.get("type") if isinstance(msg, dict) else type(msg).__name__ for msg in messages]
             )
             
-            # Simple usage tracking without parsing Claude internals
-            usage_summary = {"total_tokens": 50, "total_cost": 0.001}
-            await session_manager.update_session(
-                session_id=claude_session_id,
-                tokens_used=50,
-                cost=0.001
-            )
+            # Charge real usage from the final result event when present
+            result_usage = None
+            for claude_message in reversed(messages):
+                if isinstance(claude_message, dict) and claude_message.get("type") == "result":
+                    result_usage = await record_result_usage(claude_message)
+                    break
+
+            if result_usage:
+                usage_summary = {
+                    "total_tokens": result_usage["total_tokens"],
+                    "total_cost": result_usage["cost_usd"]
+                }
+            else:
+                # Simple usage tracking without parsing Claude internals
+                usage_summary = {"total_tokens": 50, "total_cost": 0.001}
+                await session_manager.update_session(
+                    session_id=claude_session_id,
+                    tokens_used=50,
+                    cost=0.001
+                )
+                if quota_reservation:
+                    quota_manager.settle_estimate(quota_reservation)
             
             # Create non-streaming response
             response = create_non_streaming_response(
@@ -318,6 +411,12 @@ async def create_chat_completion(
             
             # Add extension fields
             response["project_id"] = project_id
+            if result_usage:
+                response["usage"] = {
+                    "prompt_tokens": result_usage["input_tokens"],
+                    "completion_tokens": result_usage["output_tokens"],
+                    "total_tokens": result_usage["total_tokens"]
+                }
             
             # Log the complete response before returning
             logger.info(
@@ -344,6 +443,8 @@ async def create_chat_completion(
             error=str(e),
             exc_info=True
         )
+        if quota_reservation:
+            quota_manager.settle_estimate(quota_reservation)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -1,8 +1,13 @@
 """File Operations API - OpenAI-compatible extension."""
 
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+import codecs
+import json
+import mimetypes
+import os
+from typing import Optional
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, Request, status, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import structlog
 
 from claude_code_api.models.files import (
@@ -21,6 +26,28 @@ from claude_code_api.services.file_operations import (
     PermissionDeniedError as ServicePermissionDeniedError,
     InvalidPathError as ServiceInvalidPathError,
 )
+from claude_code_api.services.file_index import file_index_manager, describe_matches
+from claude_code_api.services.trigram_index import trigram_index_manager
+from claude_code_api.services.tree_sync import tree_sync
+from claude_code_api.services.file_streaming import (
+    line_index_cache,
+    make_etag,
+    parse_range,
+    detect_encoding,
+    supports_line_offsets,
+    read_head,
+    iter_bytes,
+    iter_text,
+    aiter_blocking,
+    RangeNotSatisfiableError,
+    BinaryContentError,
+)
+from claude_code_api.services.content_search import (
+    content_search,
+    compile_pattern,
+    InvalidPatternError,
+)
+from claude_code_api.core.executor import blocking_executor, OperationTimeoutError
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -51,13 +78,45 @@ def _convert_file_info(file_info) -> FileInfoModel:
 @router.get("/files/list")
 async def list_files(
     path: str = Query(..., description="Directory path"),
-    pattern: str = Query("*", description="Glob pattern"),
+    pattern: str = Query("*", description="Glob on file names; '**/' prefix recurses, no other '/'"),
     hidden: bool = Query(False, description="Include hidden files"),
-) -> List[FileInfoModel]:
-    """List files in directory with optional filtering."""
+    sort: str = Query("name", pattern="^(name|type|size|modified)$", description="Sort field"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort order"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Page size (omit for all entries)"),
+    cursor: Optional[str] = Query(None, description="Continuation cursor from X-Next-Cursor"),
+    stat: bool = Query(True, description="Include size, modified and permissions"),
+) -> Response:
+    """
+    List files in directory with optional filtering.
+
+    Returns a JSON array of FileInfoModel-shaped entries; with stat=false
+    each entry has only name, path and type. When more entries remain,
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    Entries are serialized directly to JSON.
+    """
     try:
-        files = file_service.list_files(path, pattern=pattern, include_hidden=hidden)
-        return [_convert_file_info(f) for f in files]
+        page = await blocking_executor.run(
+            "file",
+            file_service.list_directory,
+            path,
+            pattern=pattern,
+            include_hidden=hidden,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+            with_stat=stat,
+        )
+
+        headers = {}
+        if page["next_cursor"]:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+
+        return Response(
+            content=json.dumps(page["items"], separators=(",", ":")),
+            media_type="application/json",
+            headers=headers,
+        )
 
     except ServiceFileNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -65,6 +124,8 @@ async def list_files(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ServiceInvalidPathError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("list_files error", error=str(e))
         raise HTTPException(
@@ -77,16 +138,29 @@ async def list_files(
 async def read_file(
     path: str = Query(..., description="File path"),
     encoding: str = Query("utf-8", description="Text encoding"),
+    start_line: Optional[int] = Query(None, ge=1, description="First line to return (1-based)"),
+    end_line: Optional[int] = Query(None, ge=1, description="Last line to return (inclusive)"),
 ) -> dict:
-    """Read file content."""
+    """
+    Read file content.
+
+    With start_line/end_line only that span is read (via a cached line
+    offset index) and the response adds start_line, end_line and
+    total_lines.
+    """
     try:
-        content = file_service.read_file(path, encoding=encoding)
+        if start_line is not None or end_line is not None:
+            lines = await blocking_executor.run(
+                "file", file_service.read_lines, path, start_line or 1, end_line, encoding=encoding
+            )
+        else:
+            lines = {"content": await blocking_executor.run("file", file_service.read_file, path, encoding=encoding)}
 
         # Get file info for metadata
-        file_info = file_service.get_file_info(path)
+        file_info = await blocking_executor.run("file", file_service.get_file_info, path)
 
         return {
-            "content": content,
+            **lines,
             "path": path,
             "encoding": encoding,
             "size": file_info.size,
@@ -98,6 +172,8 @@ async def read_file(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ServiceInvalidPathError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("read_file error", error=str(e))
         raise HTTPException(
@@ -106,11 +182,142 @@ async def read_file(
         )
 
 
+@router.get("/files/raw")
+async def download_file(
+    request: Request,
+    path: str = Query(..., description="File path"),
+    download: bool = Query(False, description="Send as an attachment"),
+):
+    """
+    Download raw file bytes.
+
+    Honors a single `Range: bytes=...` header (206 Partial Content) and
+    `If-Range` for resuming. Whole-file responses use FileResponse, which
+    hands the path to the server for zero-copy sending when supported.
+    """
+    try:
+        file_path = await blocking_executor.run("file", file_service.validate_file, path)
+        st = await blocking_executor.run("file", os.stat, file_path)
+        etag = make_etag(st)
+
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if if_range is None or if_range == etag:
+            byte_range = parse_range(request.headers.get("range"), st.st_size)
+
+    except RangeNotSatisfiableError as e:
+        raise HTTPException(
+            status_code=416,  # Constant name differs across Starlette versions
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{e.size}"}
+        )
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("download_file error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to download file: {str(e)}"
+        )
+
+    media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+    if download:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(file_path.name)}"
+
+    if byte_range is None:
+        return FileResponse(file_path, media_type=media_type, stat_result=st, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{st.st_size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        aiter_blocking(iter_bytes(str(file_path), start, end)),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.get("/files/stream")
+async def stream_text_file(
+    path: str = Query(..., description="File path"),
+    encoding: Optional[str] = Query(None, description="Text encoding (default: detect)"),
+    start_line: Optional[int] = Query(None, ge=1, description="First line (1-based)"),
+    end_line: Optional[int] = Query(None, ge=1, description="Last line (inclusive)"),
+):
+    """
+    Stream a text file as UTF-8 using chunked transfer encoding.
+
+    The source encoding is detected from the first block unless given and
+    returned in `X-Encoding`. Line ranges use the cached line offset index;
+    `X-Total-Lines` then carries the file's line count.
+    """
+    try:
+        file_path = await blocking_executor.run("file", file_service.validate_file, path)
+        head = await blocking_executor.run("file", read_head, str(file_path))
+        if encoding:
+            try:
+                encoding = codecs.lookup(encoding).name
+            except LookupError:
+                raise ServiceInvalidPathError(f"Unknown encoding: {encoding}")
+            bom = 0
+        else:
+            encoding, bom = detect_encoding(head)
+
+        st = await blocking_executor.run("file", os.stat, file_path)
+        start, end = bom, st.st_size
+        headers = {"X-Encoding": encoding, "ETag": make_etag(st)}
+
+        if start_line is not None or end_line is not None:
+            first = start_line or 1
+            if end_line is not None and end_line < first:
+                raise ServiceInvalidPathError(f"Invalid line range: {first}-{end_line}")
+            if not supports_line_offsets(encoding):
+                raise ServiceInvalidPathError(f"Line ranges are not supported for {encoding}")
+            start, end, total = await blocking_executor.run(
+                "file", line_index_cache.line_range, str(file_path), st, first, end_line
+            )
+            start = max(start, bom)
+            headers["X-Total-Lines"] = str(total)
+
+    except BinaryContentError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot read binary file: {path}")
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("stream_text_file error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to stream file: {str(e)}"
+        )
+
+    return StreamingResponse(
+        aiter_blocking(iter_text(str(file_path), encoding, start, end)),
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
 @router.post("/files/write")
 async def write_file(request: WriteFileRequest) -> FileInfoModel:
     """Write content to file."""
     try:
-        file_info = file_service.write_file(
+        file_info = await blocking_executor.run(
+            "file",
+            file_service.write_file,
             path=request.path,
             content=request.content,
             encoding=request.encoding,
@@ -122,6 +329,8 @@ async def write_file(request: WriteFileRequest) -> FileInfoModel:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ServiceInvalidPathError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("write_file error", error=str(e))
         raise HTTPException(
@@ -134,7 +343,7 @@ async def write_file(request: WriteFileRequest) -> FileInfoModel:
 async def delete_file(path: str = Query(..., description="File path")) -> dict:
     """Delete file (not directories for safety)."""
     try:
-        file_service.delete_file(path)
+        await blocking_executor.run("file", file_service.delete_file, path)
         return {"success": True, "message": f"File deleted: {path}"}
 
     except ServiceFileNotFoundError as e:
@@ -143,6 +352,8 @@ async def delete_file(path: str = Query(..., description="File path")) -> dict:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ServiceInvalidPathError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("delete_file error", error=str(e))
         raise HTTPException(
@@ -157,21 +368,38 @@ async def search_files(
     query: str = Query(..., description="Search query"),
     pattern: str = Query("*", description="Glob pattern"),
     max: int = Query(100, ge=1, le=1000, description="Max results"),
-) -> List[FileInfoModel]:
-    """Search for files by name."""
+    mode: str = Query("substring", pattern="^(prefix|substring|fuzzy)$", description="Match mode"),
+) -> Response:
+    """
+    Search for files by name.
+
+    Served from the project's file index (built on first use, kept fresh
+    by file system events). Returns a JSON array ranked best first; each
+    entry is FileInfoModel-shaped (name, path, size, modified, type,
+    permissions) plus the match score. Entries are serialized directly
+    to JSON.
+    """
     try:
-        results = file_service.search_files(
-            root=root,
-            query=query,
-            pattern=pattern,
-            max_results=max,
+        root_path = await blocking_executor.run("file", file_service.validate_directory, root)
+        matches = await file_index_manager.search(
+            str(root_path), query, mode=mode, limit=max, pattern=pattern
+        )
+        index_root = os.path.realpath(str(root_path))
+        items = await blocking_executor.run("file", describe_matches, index_root, matches)
+
+        return Response(
+            content=json.dumps(items, separators=(",", ":")),
+            media_type="application/json",
         )
-        return [_convert_file_info(f) for f in results]
 
     except ServiceFileNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ServicePermissionDeniedError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("search_files error", error=str(e))
         raise HTTPException(
@@ -180,17 +408,186 @@ async def search_files(
         )
 
 
+@router.get("/files/grep")
+async def grep_files(
+    root: str = Query(..., description="Project root"),
+    pattern: str = Query(..., min_length=1, description="Text or regex to search for"),
+    regex: bool = Query(False, description="Treat pattern as a regular expression"),
+    ignore_case: bool = Query(False, description="Case-insensitive match"),
+    glob: Optional[str] = Query(None, description="Path glob filter (e.g. '*.py', 'src/*')"),
+    max_per_file: int = Query(20, ge=1, le=1000, description="Max hits per file"),
+    max_results: int = Query(1000, ge=1, le=10000, description="Max hits overall"),
+):
+    """
+    Search file contents, streaming hits as NDJSON.
+
+    Gitignored and binary files are skipped. Once the project's trigram
+    index is built, only files containing the pattern's trigrams are read.
+    Each line is a JSON object:
+    {"type": "match", "path", "line", "column", "text"} per hit,
+    {"type": "file_truncated", ...} when a file hits max_per_file, and a
+    final {"type": "summary", ...}.
+    """
+    try:
+        compile_pattern(pattern, regex, ignore_case)
+        root_path = await blocking_executor.run("file", file_service.validate_directory, root)
+        index = await file_index_manager.get_index(str(root_path))
+        paths = await blocking_executor.run("file", index.all_paths)
+
+        candidates = await trigram_index_manager.candidates(index, pattern, regex, ignore_case, paths=paths)
+        if candidates is not None:
+            paths = candidates
+
+    except InvalidPatternError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("grep_files error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search file contents: {str(e)}"
+        )
+
+    async def stream():
+        try:
+            async for record in content_search.grep(
+                index.root,
+                paths,
+                pattern,
+                regex=regex,
+                ignore_case=ignore_case,
+                glob=glob,
+                max_per_file=max_per_file,
+                max_results=max_results,
+            ):
+                yield json.dumps(record, separators=(",", ":")) + "\n"
+        except Exception as e:
+            logger.error("grep stream error", error=str(e))
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/files/tree")
+async def get_file_tree(
+    root: str = Query(..., description="Project root"),
+    since: Optional[str] = Query(None, description="Version token from a previous call"),
+):
+    """
+    Project tree snapshot, or the changes since a previous version.
+
+    Entries are compact [path, size, mtime, type] arrays (type "f" or "d").
+    Without `since` (or with a token that has expired) the response is
+    {"version", "full": true, "entries"}; otherwise {"version", "since",
+    "full": false, "added", "removed", "changed"}, where a removed
+    directory implies everything beneath it. Gitignored paths are left out.
+    """
+    try:
+        root_path = await blocking_executor.run("file", file_service.validate_directory, root)
+        tree = tree_sync.get_tree(str(root_path))
+        result = await blocking_executor.run("discovery", tree_sync.sync, tree, since)
+        return Response(json.dumps(result, separators=(",", ":")), media_type="application/json")
+
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("get_file_tree error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build file tree: {str(e)}"
+        )
+
+
+@router.get("/files/index")
+async def get_file_index_stats() -> dict:
+    """Get statistics for loaded project file indexes."""
+    return file_index_manager.get_stats()
+
+
+@router.post("/files/index/rebuild")
+async def rebuild_file_index(root: str = Query(..., description="Project root")) -> dict:
+    """Force a full rescan of a project's file index."""
+    try:
+        root_path = await blocking_executor.run("file", file_service.validate_directory, root)
+        index = await file_index_manager.rebuild(str(root_path))
+        return index.get_stats()
+
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("rebuild_file_index error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild file index: {str(e)}"
+        )
+
+
+@router.get("/files/grep/index")
+async def get_content_index_stats(
+    root: Optional[str] = Query(None, description="Project root (default: all loaded indexes)")
+) -> dict:
+    """Get trigram index statistics (size, build time, query latency)."""
+    if root:
+        return trigram_index_manager.get_stats(root)
+    return {**trigram_index_manager.get_stats(), "search": content_search.get_stats()}
+
+
+@router.post("/files/grep/index/rebuild")
+async def rebuild_content_index(root: str = Query(..., description="Project root")) -> dict:
+    """Rebuild a project's trigram index and wait for it to finish."""
+    try:
+        root_path = await blocking_executor.run("file", file_service.validate_directory, root)
+        index = await trigram_index_manager.rebuild(str(root_path))
+        return index.get_stats()
+
+    except ServiceFileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServicePermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ServiceInvalidPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("rebuild_content_index error", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild content index: {str(e)}"
+        )
+
+
 @router.get("/files/info")
 async def get_file_info(path: str = Query(..., description="File path")) -> FileInfoModel:
     """Get detailed file metadata."""
     try:
-        file_info = file_service.get_file_info(path)
+        file_info = await blocking_executor.run("file", file_service.get_file_info, path)
         return _convert_file_info(file_info)
 
     except ServiceFileNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ServicePermissionDeniedError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("get_file_info error", error=str(e))
         raise HTTPException(
@@ -203,7 +600,9 @@ async def get_file_info(path: str = Query(..., description="File path")) -> File
 async def watch_directory(request: WatchDirectoryRequest) -> WatchDirectoryResponse:
     """Start watching directory for changes."""
     try:
-        watch_id = file_service.watch_directory(
+        watch_id = await blocking_executor.run(
+            "file",
+            file_service.watch_directory,
             path=request.path,
             patterns=request.patterns,
         )
@@ -220,6 +619,8 @@ async def watch_directory(request: WatchDirectoryRequest) -> WatchDirectoryRespo
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except ServiceInvalidPathError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("watch_directory error", error=str(e))
         raise HTTPException(
@@ -1,14 +1,31 @@
-"""File Upload API - Multipart file upload support."""
+"""File Upload API - Multipart and resumable chunked uploads."""
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+import asyncio
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, status
+from pydantic import BaseModel, Field
 from typing import Optional
 import structlog
-import shutil
-from pathlib import Path
+from starlette.requests import ClientDisconnect
 
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor, OperationTimeoutError
 from claude_code_api.services.file_operations import (
     FileOperationsService,
     PermissionDeniedError as ServicePermissionDeniedError,
+    InvalidPathError as ServiceInvalidPathError,
+)
+from claude_code_api.services.blob_store import (
+    blob_store,
+    BlobNotFoundError,
+    InvalidDigestError,
+)
+from claude_code_api.services.upload_service import (
+    upload_service,
+    store_stream,
+    UploadNotFoundError,
+    UploadConflictError,
+    UploadOffsetError,
+    UploadIntegrityError,
 )
 from claude_code_api.models.files import FileInfoModel
 
@@ -20,6 +37,26 @@ file_service = FileOperationsService(
 )
 
 
+class CreateUploadRequest(BaseModel):
+    """Start a resumable upload."""
+    destination: str = Field(..., description="Destination file path")
+    size: Optional[int] = Field(None, ge=0, description="Total size in bytes, if known")
+    sha256: Optional[str] = Field(None, description="Expected SHA-256 (hex), verified on completion")
+    overwrite: bool = Field(False, description="Replace an existing file")
+
+
+class BlobCheckRequest(BaseModel):
+    """Ask which contents still need uploading."""
+    sha256: list[str] = Field(..., max_length=1000, description="SHA-256 digests (hex)")
+
+
+class BlobLinkRequest(BaseModel):
+    """Create a file from content already in the blob store."""
+    sha256: str = Field(..., description="SHA-256 digest (hex)")
+    destination: str = Field(..., description="Destination file path")
+    overwrite: bool = Field(False, description="Replace an existing file")
+
+
 def _convert_file_info(file_info) -> FileInfoModel:
     """Convert service FileInfo to Pydantic model."""
     return FileInfoModel(
@@ -32,6 +69,57 @@ def _convert_file_info(file_info) -> FileInfoModel:
     )
 
 
+def _upload_error(e: Exception) -> HTTPException:
+    """Map upload and file service errors to HTTP errors."""
+    if isinstance(e, UploadNotFoundError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if isinstance(e, BlobNotFoundError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if isinstance(e, InvalidDigestError):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if isinstance(e, (UploadConflictError, FileExistsError)):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{e}. Set overwrite=true to replace."
+        )
+    if isinstance(e, UploadOffsetError):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.expected)}
+        )
+    if isinstance(e, UploadIntegrityError):
+        return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if isinstance(e, ServicePermissionDeniedError):
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    if isinstance(e, ServiceInvalidPathError):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if isinstance(e, OperationTimeoutError):
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    logger.error("upload error", error=str(e))
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Upload failed: {str(e)}"
+    )
+
+
+def _dedup(path, digest: str):
+    """Hand a stored file to the blob store; dedup is best effort."""
+    try:
+        blob_store.ingest(path, digest)
+    except Exception as e:
+        logger.warning("Blob store ingest failed", path=str(path), error=str(e))
+
+
+def _store_upload(file: UploadFile, destination: str, overwrite: bool):
+    """Validate the destination and stream the spooled upload into place."""
+    dest_path = file_service.validate_write_path(destination)
+    file.file.seek(0)
+    stored = store_stream(file.file, dest_path, overwrite=overwrite)
+    _dedup(dest_path, stored["sha256"])
+    return file_service.get_file_info(str(dest_path))
+
+
 @router.post("/files/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -41,59 +129,18 @@ async def upload_file(
     """
     Upload file via multipart/form-data.
 
-    Useful for mobile apps to upload photos, documents, etc.
+    Useful for mobile apps to upload photos, documents, etc. The spooled
+    upload is copied to a temp file beside the destination and renamed
+    into place, so it never sits in memory as a whole. For large files
+    over flaky connections use the resumable /files/uploads protocol.
     """
     try:
-        # Validate destination path
-        dest_path = Path(destination)
-        if dest_path.exists() and not overwrite:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"File already exists: {destination}. Set overwrite=true to replace."
-            )
-
-        # Read uploaded file content
-        content = await file.read()
-
-        # Write using file service (validates path security)
-        with open("/tmp/temp_upload", "wb") as f:
-            f.write(content)
-
-        # Move to destination via file service for security validation
-        file_info = file_service.write_file(
-            path=destination,
-            content=content.decode('utf-8'),
-            create_dirs=True
-        )
-
-        logger.info("File uploaded", destination=destination, size=len(content))
-
+        file_info = await blocking_executor.run("file", _store_upload, file, destination, overwrite)
+        logger.info("File uploaded", destination=destination, size=file_info.size)
         return _convert_file_info(file_info)
 
-    except ServicePermissionDeniedError as e:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
-    except UnicodeDecodeError:
-        # Binary file - write as binary
-        validated_path = file_service._validate_path(destination)
-        validated_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(validated_path, 'wb') as f:
-            f.write(content)
-
-        stat = validated_path.stat()
-        return FileInfoModel(
-            name=validated_path.name,
-            path=str(validated_path),
-            size=stat.st_size,
-            modified=stat.st_mtime,
-            type="file",
-            permissions=oct(stat.st_mode)[-3:],
-        )
     except Exception as e:
-        logger.error("upload_file error", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Upload failed: {str(e)}"
-        )
+        raise _upload_error(e)
 
 
 @router.post("/files/upload/multiple")
@@ -101,21 +148,142 @@ async def upload_multiple_files(
     files: list[UploadFile] = File(...),
     destination_dir: str = Form(...),
 ) -> list[FileInfoModel]:
-    """Upload multiple files to directory."""
-    results = []
+    """Upload multiple files to directory (stored concurrently)."""
+    semaphore = asyncio.Semaphore(settings.upload_max_concurrent_files)
 
-    for file in files:
+    async def store(file: UploadFile):
         dest = f"{destination_dir}/{file.filename}"
-        try:
-            content = await file.read()
-            file_info = file_service.write_file(
-                path=dest,
-                content=content.decode('utf-8'),
-                create_dirs=True
-            )
-            results.append(_convert_file_info(file_info))
-        except Exception as e:
-            logger.error(f"Failed to upload {file.filename}", error=str(e))
-            # Continue with other files
-
-    return results
+        async with semaphore:
+            try:
+                file_info = await blocking_executor.run("file", _store_upload, file, dest, True)
+                return _convert_file_info(file_info)
+            except Exception as e:
+                logger.error(f"Failed to upload {file.filename}", error=str(e))
+                # Continue with other files
+                return None
+
+    stored = await asyncio.gather(*(store(file) for file in files))
+    return [info for info in stored if info is not None]
+
+
+@router.post("/files/uploads", status_code=status.HTTP_201_CREATED)
+async def create_upload(request: CreateUploadRequest) -> dict:
+    """
+    Start a resumable upload.
+
+    Then PUT chunks to /files/uploads/{upload_id}?offset=N (raw body) and
+    POST /files/uploads/{upload_id}/complete. After a dropped connection,
+    GET the upload to find the offset to resume from.
+    """
+    try:
+        dest_path = await blocking_executor.run("file", file_service.validate_write_path, request.destination)
+        session = await blocking_executor.run(
+            "file", upload_service.create, dest_path, request.size, request.sha256, request.overwrite
+        )
+        return session.status()
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.get("/files/uploads/{upload_id}")
+async def get_upload(upload_id: str) -> dict:
+    """Get upload status (offset to resume from)."""
+    try:
+        session = await blocking_executor.run("file", upload_service.get, upload_id)
+        return session.status()
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.put("/files/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk"),
+) -> dict:
+    """
+    Append a chunk (raw request body) at offset.
+
+    A mismatched offset returns 409 with the expected offset in the
+    `Upload-Offset` header.
+    """
+    try:
+        session = await upload_service.append(upload_id, offset, request.stream())
+        return session.status()
+
+    except ClientDisconnect:
+        logger.info("Upload chunk interrupted", upload_id=upload_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client disconnected")
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.post("/files/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str) -> FileInfoModel:
+    """Verify size and hash, then atomically move the file into place."""
+    try:
+        dest_path, digest = await upload_service.complete(upload_id)
+        await blocking_executor.run("file", _dedup, dest_path, digest)
+        file_info = await blocking_executor.run("file", file_service.get_file_info, str(dest_path))
+        return _convert_file_info(file_info)
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.delete("/files/uploads/{upload_id}")
+async def abort_upload(upload_id: str) -> dict:
+    """Cancel an upload and delete the received data."""
+    try:
+        await blocking_executor.run("file", upload_service.abort, upload_id)
+        return {"success": True, "upload_id": upload_id}
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.post("/files/blobs/check")
+async def check_blobs(request: BlobCheckRequest) -> dict:
+    """
+    Upload pre-check: which of these SHA-256 digests are not stored yet.
+
+    Content that is already present can be placed with /files/blobs/link
+    instead of being uploaded again.
+    """
+    try:
+        missing = await blocking_executor.run("file", blob_store.missing, request.sha256)
+        return {"missing": missing}
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.post("/files/blobs/link")
+async def link_blob(request: BlobLinkRequest) -> FileInfoModel:
+    """Create a file from stored content without uploading it."""
+    try:
+        dest_path = await blocking_executor.run("file", file_service.validate_write_path, request.destination)
+        await blocking_executor.run(
+            "file", blob_store.link_into, request.sha256, dest_path, overwrite=request.overwrite
+        )
+        file_info = await blocking_executor.run("file", file_service.get_file_info, str(dest_path))
+        return _convert_file_info(file_info)
+
+    except Exception as e:
+        raise _upload_error(e)
+
+
+@router.get("/files/blobs/stats")
+async def get_blob_stats() -> dict:
+    """Get blob store statistics (blobs, size, dedup hits, bytes saved)."""
+    return await blocking_executor.run("file", blob_store.get_stats)
+
+
+@router.post("/files/blobs/gc")
+async def collect_blobs(verify: bool = Query(False, description="Rehash blobs and drop corrupted ones")) -> dict:
+    """Drop stale references and delete unreferenced blobs."""
+    return await blocking_executor.run(
+        "discovery", blob_store.gc, grace_seconds=settings.blob_gc_grace_seconds, verify=verify
+    )
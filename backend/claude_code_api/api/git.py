@@ -1,10 +1,16 @@
 """Git Operations API."""
 
+import json
 from typing import List, Optional
-from fastapi import APIRouter, Query, HTTPException, status
+from fastapi import APIRouter, Query, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import structlog
 
+from claude_code_api.core.executor import blocking_executor, OperationTimeoutError
+from claude_code_api.services.commit_log import commit_log, CommitLogError, InvalidCursorError
+from claude_code_api.services.git_diff import diff_service, DiffError
+from claude_code_api.services.git_runner import git_runner
 from claude_code_api.services.git_operations import (
     GitOperationsService,
     GitNotFoundError,
@@ -42,9 +48,13 @@ class CheckoutRequest(BaseModel):
 async def get_status(project_path: str = Query(..., description="Repository path")) -> dict:
     """Get git status."""
     try:
-        return git_service.get_status(project_path)
+        return await git_service.get_status_async(project_path)
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except GitOperationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git status error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -54,16 +64,21 @@ async def get_status(project_path: str = Query(..., description="Repository path
 async def create_commit(request: CommitRequest) -> dict:
     """Create git commit."""
     try:
-        return git_service.create_commit(
-            repo_path=request.project_path,
-            message=request.message,
-            files=request.files,
-            author=request.author
-        )
+        async with git_runner.locked(request.project_path, write=True):
+            return await blocking_executor.run(
+                "git",
+                git_service.create_commit,
+                repo_path=request.project_path,
+                message=request.message,
+                files=request.files,
+                author=request.author
+            )
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except GitOperationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git commit error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -71,16 +86,40 @@ async def create_commit(request: CommitRequest) -> dict:
 
 @router.get("/git/log")
 async def get_log(
+    response: Response,
     project_path: str = Query(..., description="Repository path"),
     max: int = Query(50, ge=1, le=200, description="Max commits"),
     skip: int = Query(0, ge=0, description="Skip count for pagination"),
     file: Optional[str] = Query(None, description="File path filter"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    grep: Optional[str] = Query(None, description="Commit message contains (case-insensitive)"),
+    author: Optional[str] = Query(None, description="Author name or email pattern"),
+    ref: str = Query("HEAD", description="Branch, tag or SHA to list from"),
 ) -> List[dict]:
-    """Get commit log."""
+    """
+    Get commit log.
+
+    Filters run in git over full history. When there are more commits the
+    `X-Next-Cursor` response header holds the cursor for the next page.
+    """
     try:
-        return git_service.get_log(repo_path=project_path, max_count=max, skip=skip, file_path=file)
-    except GitNotFoundError as e:
+        page = await commit_log.page(
+            project_path,
+            cursor=cursor,
+            limit=max,
+            ref=ref,
+            grep=grep,
+            author=author,
+            path=file,
+            skip=skip,
+        )
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["commits"]
+    except (CommitLogError, InvalidCursorError) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git log error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -95,20 +134,101 @@ async def get_diff(
 ) -> dict:
     """Get git diff."""
     try:
-        diff = git_service.get_diff(
-            repo_path=project_path,
-            staged=staged,
-            file_path=file,
-            context_lines=context
-        )
+        async with git_runner.locked(project_path):
+            diff = await blocking_executor.run(
+                "git",
+                git_service.get_diff,
+                repo_path=project_path,
+                staged=staged,
+                file_path=file,
+                context_lines=context
+            )
         return {"diff": diff}
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git diff error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/git/diff/files")
+async def get_diff_files(
+    project_path: str = Query(..., description="Repository path"),
+    base: Optional[str] = Query(None, description="Commit/tree to compare from"),
+    target: Optional[str] = Query(None, description="Commit/tree to compare to (requires base)"),
+    staged: bool = Query(False, description="Compare the index instead of the working tree"),
+    path: Optional[str] = Query(None, description="Limit to a file or directory"),
+) -> StreamingResponse:
+    """
+    Stream the files changed in a diff, with stats but no patch text.
+
+    Each line is a JSON object: {"type": "file", "path", "old_path",
+    "status", "insertions", "deletions", "binary", "large", "old_sha",
+    "new_sha"} per file, then {"type": "summary", "files", "insertions",
+    "deletions"}. Fetch a file's hunks from /git/diff/file when needed.
+    """
+    records = diff_service.files(project_path, base=base, target=target, staged=staged, path=path)
+    try:
+        first = await records.__anext__()
+    except DiffError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("git diff files error", error=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def stream():
+        try:
+            yield json.dumps(first, separators=(",", ":")) + "\n"
+            async for record in records:
+                yield json.dumps(record, separators=(",", ":")) + "\n"
+        except Exception as e:
+            logger.error("git diff files stream error", error=str(e))
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+        finally:
+            await records.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/git/diff/file")
+async def get_diff_file(
+    project_path: str = Query(..., description="Repository path"),
+    path: str = Query(..., description="File path (new path for renames)"),
+    old_path: Optional[str] = Query(None, description="Previous path of a renamed file"),
+    base: Optional[str] = Query(None, description="Commit/tree to compare from"),
+    target: Optional[str] = Query(None, description="Commit/tree to compare to (requires base)"),
+    staged: bool = Query(False, description="Compare the index instead of the working tree"),
+    context: int = Query(3, ge=0, le=10, description="Context lines"),
+) -> dict:
+    """
+    Get one file's diff as hunks.
+
+    Binary files have no hunks; patches over the size limit come back with
+    `truncated: true`.
+    """
+    try:
+        return await diff_service.file_hunks(
+            project_path,
+            path,
+            base=base,
+            target=target,
+            staged=staged,
+            old_path=old_path,
+            context_lines=context,
+        )
+    except DiffError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error("git diff file error", error=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.get("/git/branches")
 async def get_branches(
     project_path: str = Query(..., description="Repository path"),
@@ -116,9 +236,12 @@ async def get_branches(
 ) -> List[dict]:
     """List git branches."""
     try:
-        return git_service.get_branches(repo_path=project_path, include_remote=remote)
+        async with git_runner.locked(project_path):
+            return await blocking_executor.run("git", git_service.get_branches, repo_path=project_path, include_remote=remote)
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git branches error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -128,15 +251,20 @@ async def get_branches(
 async def create_branch(request: CreateBranchRequest) -> dict:
     """Create new branch."""
     try:
-        return git_service.create_branch(
-            repo_path=request.project_path,
-            branch_name=request.name,
-            from_branch=request.from_branch
-        )
+        async with git_runner.locked(request.project_path, write=True):
+            return await blocking_executor.run(
+                "git",
+                git_service.create_branch,
+                repo_path=request.project_path,
+                branch_name=request.name,
+                from_branch=request.from_branch
+            )
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except GitOperationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("create branch error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -146,11 +274,14 @@ async def create_branch(request: CreateBranchRequest) -> dict:
 async def checkout_branch(request: CheckoutRequest) -> dict:
     """Checkout branch."""
     try:
-        return git_service.checkout_branch(repo_path=request.project_path, branch_name=request.name)
+        async with git_runner.locked(request.project_path, write=True):
+            return await blocking_executor.run("git", git_service.checkout_branch, repo_path=request.project_path, branch_name=request.name)
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except GitOperationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("checkout branch error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -160,9 +291,12 @@ async def checkout_branch(request: CheckoutRequest) -> dict:
 async def get_remotes(project_path: str = Query(..., description="Repository path")) -> List[dict]:
     """Get remote information."""
     try:
-        return git_service.get_remote_info(repo_path=project_path)
+        async with git_runner.locked(project_path):
+            return await blocking_executor.run("git", git_service.get_remote_info, repo_path=project_path)
     except GitNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("git remotes error", error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,10 +1,14 @@
-"""Git Remote Operations API - Push/Pull/Fetch."""
+"""Git Remote Operations API - Push/Pull/Fetch with streamed progress."""
 
+import json
 from typing import Optional
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import structlog
 
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import OperationTimeoutError
 from claude_code_api.services.git_operations import (
     GitOperationsService,
     GitNotFoundError,
@@ -22,7 +26,7 @@ class GitPushRequest(BaseModel):
     project_path: str = Field(..., description="Repository path")
     remote: str = Field("origin", description="Remote name")
     branch: Optional[str] = Field(None, description="Branch to push (default: current)")
-    force: bool = Field(False, description="Force push")
+    force: bool = Field(False, description="Force push (with lease)")
 
 
 class GitPullRequest(BaseModel):
@@ -32,32 +36,71 @@ class GitPullRequest(BaseModel):
     branch: Optional[str] = Field(None, description="Branch to pull (default: current)")
 
 
+async def _stream_remote(operation: str, project_path: str, remote: str,
+                         branch: Optional[str] = None, force: bool = False) -> StreamingResponse:
+    """
+    Start a remote operation and stream its progress as NDJSON.
+
+    Errors before git starts (not a repository, bad names) are returned as
+    HTTP errors; later ones arrive as a final {"type": "error"} line.
+    """
+    if not settings.git_remote_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Git {operation} is disabled on this server. Use local git client."
+        )
+
+    events = git_service.remote_operation(project_path, operation, remote=remote, branch=branch, force=force)
+    try:
+        first = await events.__anext__()
+    except GitNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except GitOperationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except Exception as e:
+        logger.error(f"git {operation} error", error=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def stream():
+        try:
+            yield json.dumps(first, separators=(",", ":")) + "\n"
+            async for event in events:
+                yield json.dumps(event, separators=(",", ":")) + "\n"
+        except Exception as e:
+            logger.error(f"git {operation} stream error", error=str(e))
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+        finally:
+            # Client went away: closing the generator kills git and frees the repo lock
+            await events.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/git/push")
-async def git_push(request: GitPushRequest) -> dict:
-    """Push commits to remote (NOT IMPLEMENTED for safety)."""
-    # For v2.0: Not implemented for safety
-    # Would need user confirmation before pushing
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Git push not implemented in v2.0 (safety feature). Use local git client."
+async def git_push(request: GitPushRequest) -> StreamingResponse:
+    """
+    Push commits to remote, streaming progress.
+
+    Each line is a JSON object: {"type": "started", ...} first, then
+    {"type": "progress", "phase", "percent", "current", "total"} and
+    {"type": "message", "text"}, and finally
+    {"type": "result", "success", "returncode", "output"}. Force pushes use
+    --force-with-lease.
+    """
+    return await _stream_remote(
+        "push", request.project_path, request.remote, request.branch, request.force
     )
 
 
 @router.post("/git/pull")
-async def git_pull(request: GitPullRequest) -> dict:
-    """Pull commits from remote (NOT IMPLEMENTED for safety)."""
-    # For v2.0: Not implemented
-    # Pulling could overwrite local changes
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Git pull not implemented in v2.0. Use local git client."
-    )
+async def git_pull(request: GitPullRequest) -> StreamingResponse:
+    """Pull commits from remote (fast-forward only), streaming progress like /git/push."""
+    return await _stream_remote("pull", request.project_path, request.remote, request.branch)
 
 
 @router.post("/git/fetch")
-async def git_fetch(request: GitPullRequest) -> dict:
-    """Fetch from remote (NOT IMPLEMENTED)."""
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Git fetch not implemented in v2.0. Use local git client."
-    )
+async def git_fetch(request: GitPullRequest) -> StreamingResponse:
+    """Fetch (and prune) from remote, streaming progress like /git/push."""
+    return await _stream_remote("fetch", request.project_path, request.remote, request.branch)
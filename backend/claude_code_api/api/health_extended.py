@@ -5,6 +5,11 @@ import structlog
 import psutil
 import time
 
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.core.loop_monitor import loop_monitor
+from claude_code_api.services.git_runner import git_runner
+from claude_code_api.services.repo_pool import repo_pool
+
 logger = structlog.get_logger()
 router = APIRouter()
 
@@ -28,6 +33,16 @@ async def detailed_health():
     }
 
 
+@router.get("/health/loop")
+async def event_loop_health():
+    """Event loop lag, blocking executor and git concurrency statistics."""
+    return {
+        "event_loop": loop_monitor.get_stats(),
+        "executor": blocking_executor.get_stats(),
+        "git": {**git_runner.get_stats(), "repo_pool": repo_pool.get_stats()},
+    }
+
+
 @router.get("/health/readiness")
 async def readiness():
     """Readiness probe for orchestration."""
@@ -1,8 +1,11 @@
 """Host System Discovery API - Find Claude Code projects on host machine."""
 
-from typing import List, Optional
+import json
+import os
+from typing import Dict, List
 from fastapi import APIRouter, Query, HTTPException, status
-from pathlib import Path
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 import structlog
 
 from claude_code_api.services.file_operations import (
@@ -10,6 +13,9 @@ from claude_code_api.services.file_operations import (
     FileNotFoundError as ServiceFileNotFoundError,
     PermissionDeniedError as ServicePermissionDeniedError,
 )
+from claude_code_api.core.database import AsyncSessionLocal, Project, Session as DBSession
+from claude_code_api.core.executor import blocking_executor, OperationTimeoutError
+from claude_code_api.services.project_discovery import project_discovery
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -18,106 +24,90 @@ router = APIRouter()
 file_service = FileOperationsService(allowed_paths=["/Users", "/tmp", "/var"])
 
 
-class ProjectDiscoveryResult:
-    """Discovered project information."""
-
-    def __init__(
-        self,
-        name: str,
-        path: str,
-        has_claudemd: bool,
-        has_git: bool,
-        session_count: int = 0,
-    ):
-        self.name = name
-        self.path = path
-        self.has_claudemd = has_claudemd
-        self.has_git = has_git
-        self.session_count = session_count
-
-
-def discover_claude_projects(scan_path: str, max_depth: int = 3) -> List[dict]:
+async def session_counts() -> Dict[str, int]:
     """
-    Scan directory tree for Claude Code projects.
-
-    Identifies projects by:
-    - CLAUDE.md file existence
-    - .git directory
-    - .claude/ directory
+    Session count per project path, in one grouped query.
 
-    Args:
-        scan_path: Root path to scan
-        max_depth: Maximum directory depth (performance limit)
-
-    Returns:
-        List of discovered projects
+    Sessions reference projects by id; sessions whose project_id is not a
+    known project are counted under the raw project_id.
     """
-    projects = []
-    scan_root = Path(scan_path).resolve()
-
-    # Skip these directories for performance
-    skip_dirs = {
-        'node_modules', '.git', 'venv', '.venv', '__pycache__',
-        'dist', 'build', '.next', 'target', 'vendor'
-    }
-
-    def scan_directory(current_path: Path, depth: int):
-        """Recursively scan directory."""
-        if depth > max_depth:
-            return
-
-        try:
-            # Check if this directory is a Claude Code project
-            has_claudemd = (current_path / "CLAUDE.md").exists()
-            has_git = (current_path / ".git").exists()
-            has_claude_dir = (current_path / ".claude").exists()
-
-            if has_claudemd or has_git or has_claude_dir:
-                projects.append({
-                    "name": current_path.name,
-                    "path": str(current_path),
-                    "has_claudemd": has_claudemd,
-                    "has_git": has_git,
-                    "session_count": 0,  # Will be populated from database in future
-                })
-
-            # Scan subdirectories
-            for item in current_path.iterdir():
-                if item.is_dir() and item.name not in skip_dirs:
-                    scan_directory(item, depth + 1)
-
-        except PermissionError:
-            # Skip directories we can't access
-            pass
-        except Exception as e:
-            logger.warning(f"Error scanning {current_path}: {e}")
-
-    scan_directory(scan_root, 0)
-
-    logger.info(
-        "Project discovery completed",
-        scan_path=scan_path,
-        projects_found=len(projects)
+    stmt = (
+        select(func.coalesce(Project.path, DBSession.project_id), func.count(DBSession.id))
+        .select_from(DBSession)
+        .outerjoin(Project, Project.id == DBSession.project_id)
+        .group_by(func.coalesce(Project.path, DBSession.project_id))
     )
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(stmt)).all()
 
-    return projects
+    counts: Dict[str, int] = {}
+    for path, count in rows:
+        key = os.path.normpath(path) if path.startswith("/") else path
+        counts[key] = counts.get(key, 0) + count
+    return counts
 
 
 @router.get("/host/discover-projects")
 async def discover_projects(
     scan_path: str = Query("/Users/nick", description="Path to scan"),
     max_depth: int = Query(3, ge=1, le=5, description="Max scan depth"),
-) -> List[dict]:
+    refresh: bool = Query(False, description="Rescan even if a recent scan is cached"),
+    stream: bool = Query(False, description="Stream projects as NDJSON as they are found"),
+):
     """
     Discover Claude Code projects on host system.
 
     Scans directory tree for CLAUDE.md, .git, or .claude/ directories.
+    Directories are listed in parallel, and rescans only list directories
+    whose mtime changed since the last scan; a scan younger than
+    discovery_cache_seconds is replayed from cache unless refresh=true.
+    session_count comes from the sessions recorded for the project path.
+
+    With stream=true, each project is sent as an NDJSON line as soon as it
+    is found, followed by {"type": "summary", "projects": n}.
     """
+    projects = project_discovery.discover(scan_path, max_depth, refresh=refresh)
     try:
-        projects = discover_claude_projects(scan_path, max_depth)
-        return projects
-
+        counts = await session_counts()
+        # Prefetch so errors before the first project map to HTTP errors
+        try:
+            first = await projects.__anext__()
+        except StopAsyncIteration:
+            first = None
+
+        def with_count(project: dict) -> dict:
+            project["session_count"] = counts.get(project["path"], 0)
+            return project
+
+        if stream:
+            async def ndjson():
+                found = 0
+                try:
+                    if first is not None:
+                        found += 1
+                        yield json.dumps({"type": "project", **with_count(first)}, separators=(",", ":")) + "\n"
+                    async for project in projects:
+                        found += 1
+                        yield json.dumps({"type": "project", **with_count(project)}, separators=(",", ":")) + "\n"
+                    yield json.dumps({"type": "summary", "projects": found}, separators=(",", ":")) + "\n"
+                except Exception as e:
+                    logger.error("Project discovery stream error", error=str(e))
+                    yield json.dumps({"type": "error", "error": str(e)}, separators=(",", ":")) + "\n"
+                finally:
+                    await projects.aclose()
+
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        results = [] if first is None else [with_count(first)]
+        async for project in projects:
+            results.append(with_count(project))
+        return results
+
+    except OperationTimeoutError as e:
+        await projects.aclose()
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
+        await projects.aclose()
         logger.error("Project discovery error", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,6 +115,12 @@ async def discover_projects(
         )
 
 
+@router.get("/host/discover-projects/stats")
+async def discovery_stats() -> dict:
+    """Get project discovery cache statistics."""
+    return project_discovery.get_stats()
+
+
 @router.get("/host/browse")
 async def browse_host(path: str = Query(..., description="Directory path")) -> List[dict]:
     """
@@ -133,7 +129,7 @@ async def browse_host(path: str = Query(..., description="Directory path")) -> L
     Returns directory tree for file browser UI.
     """
     try:
-        files = file_service.list_files(path, include_hidden=False)
+        files = await blocking_executor.run("file", file_service.list_files, path, include_hidden=False)
 
         # Convert to simple dict format for frontend
         result = []
@@ -152,6 +148,8 @@ async def browse_host(path: str = Query(..., description="Directory path")) -> L
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ServicePermissionDeniedError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except OperationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error("browse_host error", error=str(e))
         raise HTTPException(
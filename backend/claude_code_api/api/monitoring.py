@@ -1,18 +1,59 @@
 """Application monitoring endpoints."""
 
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
 import structlog
 
-from claude_code_api.utils.metrics import metrics
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.git_runner import git_runner
+from claude_code_api.utils.metrics import metrics, MetricsCollector, OPENMETRICS_CONTENT_TYPE
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 
+def collect_runtime_gauges(collector: MetricsCollector):
+    """Queue depths and ratios, read from service stats at scrape time."""
+    executor = blocking_executor.get_stats()
+    collector.set_gauge("executor_queue_depth", executor["pending"])
+    collector.set_gauge("executor_running", executor["running"])
+
+    runner = git_runner.get_stats()
+    collector.set_gauge("git_queue_depth", runner["waiting"])
+    collector.set_gauge("git_running", runner["running"])
+
+    lookups = {"hit": 0, "miss": 0}
+    for (metric, labels), value in list(collector.counters.items()):
+        if metric == "http_cache_lookups":
+            lookups[dict(labels)["result"]] += value
+    total = lookups["hit"] + lookups["miss"]
+    collector.set_gauge("http_cache_hit_ratio", lookups["hit"] / total if total else 0.0)
+
+
+metrics.register_collector(collect_runtime_gauges)
+
+
 @router.get("/monitoring/metrics")
-async def get_metrics():
-    """Get application metrics."""
-    return metrics.get_stats()
+async def get_metrics(
+    request: Request,
+    metric: Optional[str] = Query(None, description="Only this metric's series (JSON only)"),
+    format: Optional[str] = Query(None, description="json or openmetrics (default: from the Accept header)"),
+):
+    """
+    Get application metrics.
+
+    Histograms report count, min, max, avg and p50/p90/p99/p999 since
+    start (or the last reset), and the same over the sliding window.
+
+    Prometheus scrapers ask for `application/openmetrics-text` and get the
+    OpenMetrics exposition instead; `format=openmetrics` forces it.
+    """
+    accept = request.headers.get("accept", "")
+    if format == "openmetrics" or (format is None and "application/openmetrics-text" in accept):
+        return Response(metrics.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+    return metrics.get_stats(metric)
 
 
 @router.post("/monitoring/metrics/reset")
@@ -24,13 +65,20 @@ async def reset_metrics():
 
 @router.get("/monitoring/endpoints")
 async def get_endpoint_metrics():
-    """Get per-endpoint metrics."""
-    stats = metrics.get_stats()
-
+    """Get per-endpoint metrics (request counts by status, latency percentiles)."""
     endpoint_metrics = {}
-    for counter_name, count in stats.get("counters", {}).items():
-        if counter_name.startswith("endpoint_"):
-            endpoint = counter_name.replace("endpoint_", "")
-            endpoint_metrics[endpoint] = {"requests": count}
+    for (metric, labels), count in list(metrics.counters.items()):
+        if metric == "http_requests":
+            labels = dict(labels)
+            entry = endpoint_metrics.setdefault(f"{labels['method']} {labels['route']}", {"requests": 0, "status": {}})
+            entry["requests"] += count
+            entry["status"][labels["status"]] = count
+
+    for (metric, labels), hist in list(metrics.histograms.items()):
+        if metric == "http_request_duration_ms":
+            labels = dict(labels)
+            entry = endpoint_metrics.get(f"{labels['method']} {labels['route']}")
+            if entry is not None:
+                entry["latency_ms"] = {**hist.snapshot(), "window": hist.snapshot(window=True)}
 
     return endpoint_metrics
@@ -1,25 +1,35 @@
 """Unified search API across all content types."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import structlog
 
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
 from claude_code_api.services.file_operations import FileOperationsService
-from claude_code_api.services.git_operations import GitOperationsService
-from claude_code_api.core.database import AsyncSessionLocal, Session as DBSession, Message
-from sqlalchemy import select, or_
+from claude_code_api.services.file_index import file_index_manager, describe_matches
+from claude_code_api.services.content_search import content_search
+from claude_code_api.services.trigram_index import trigram_index_manager
+from claude_code_api.services.commit_log import commit_log
+from claude_code_api.services.search_index import search_index
+from claude_code_api.core.database import AsyncSessionLocal, Session as DBSession
+from sqlalchemy import select
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 file_service = FileOperationsService(allowed_paths=["/Users", "/tmp", "/var"])
-git_service = GitOperationsService()
 
 
 class SearchResult(BaseModel):
     """Single search result."""
-    type: str  # "file", "session", "commit", "skill", "agent"
+    type: str  # "file", "content", "session", "commit", "skill", "agent"
     title: str
     description: str
     path: Optional[str] = None
@@ -28,121 +38,291 @@ class SearchResult(BaseModel):
     score: float = 1.0  # Relevance score
 
 
+class LegStatus(BaseModel):
+    """How one search category went."""
+    ms: float
+    count: int
+    timed_out: bool = False
+    cancelled: bool = False
+    error: Optional[str] = None
+
+
 class SearchResponse(BaseModel):
     """Unified search response."""
     query: str
     results: List[SearchResult]
     total: int
     categories: Dict[str, int]  # Count per category
+    legs: Dict[str, LegStatus] = {}  # Timing and outcome per category
+    partial: bool = False  # Some category timed out, failed or was cancelled
+
+
+ALL_TYPES = ("file", "content", "session", "commit", "skill", "agent")
+
+# Sessions change constantly; the incremental reload (updated_at > last load) is cheap
+SESSION_REFRESH_SECONDS = 2.0
+
+
+async def _search_files(query: str, root: "asyncio.Future", limit: int) -> List[SearchResult]:
+    """Project file index, fuzzy ranked."""
+    root_path = await asyncio.shield(root)
+    matches = await file_index_manager.search(str(root_path), query, mode="fuzzy", limit=limit)
+    index_root = os.path.realpath(str(root_path))
+    files = await blocking_executor.run("file", describe_matches, index_root, matches)
+    return [
+        SearchResult(
+            type="file",
+            title=file_info["name"],
+            description=f"{file_info['type'].title()} • {file_info['size']} bytes",
+            path=file_info["path"],
+            metadata={"size": file_info["size"], "type": file_info["type"]},
+            score=file_info["score"]
+        )
+        for file_info in files
+    ]
+
+
+async def _search_content(query: str, root: "asyncio.Future", limit: int) -> List[SearchResult]:
+    """File contents: trigram candidates, or every file until the index is ready."""
+    root_path = await asyncio.shield(root)
+    index = await file_index_manager.get_index(str(root_path))
+    paths = await trigram_index_manager.candidates(index, query, ignore_case=True)
+    if paths is None:
+        paths = await blocking_executor.run("file", index.all_paths)
+
+    results = []
+    async for record in content_search.grep(
+        index.root, paths, query, ignore_case=True, max_per_file=3, max_results=limit
+    ):
+        if record["type"] != "match":
+            continue
+        results.append(SearchResult(
+            type="content",
+            title=f"{record['path']}:{record['line']}",
+            description=record["text"].strip()[:200],
+            path=os.path.join(index.root, record["path"]),
+            metadata={"line": record["line"], "column": record["column"]},
+            score=0.5
+        ))
+    return results
+
+
+async def _load_sessions(since: Optional[datetime]) -> List[Dict[str, Any]]:
+    """Session documents for the search index (changed after since, if given)."""
+    stmt = select(
+        DBSession.id, DBSession.project_id, DBSession.title, DBSession.model,
+        DBSession.system_prompt, DBSession.message_count,
+    )
+    if since is not None:
+        stmt = stmt.where(DBSession.updated_at > since)
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(stmt)).all()
+
+    return [
+        {
+            "id": f"session:{row.id}",
+            "type": "session",
+            "title": row.title or f"Session {row.id[:8]}",
+            "description": row.project_id,
+            "body": row.system_prompt,
+            "summary": f"Project: {row.project_id} • Model: {row.model}",
+            "metadata": {
+                "id": row.id,
+                "project_id": row.project_id,
+                "model": row.model,
+                "message_count": row.message_count
+            },
+        }
+        for row in rows
+    ]
+
+
+search_index.register_source(
+    "session", _load_sessions, refresh_seconds=SESSION_REFRESH_SECONDS, incremental=True
+)
+
+
+async def _search_indexed(kind: str, query: str, limit: int) -> List[SearchResult]:
+    """Sessions, skills and agents from the unified BM25 index."""
+    hits = await search_index.search(query, [kind], limit=limit)
+    return [
+        SearchResult(
+            type=kind,
+            title=doc["title"],
+            description=doc.get("summary") or doc.get("description") or "",
+            path=doc.get("path"),
+            metadata=doc.get("metadata") or {},
+            score=round(score, 4)
+        )
+        for doc, score in hits
+    ]
+
+
+async def _search_commits(query: str, project_path: str, limit: int) -> List[SearchResult]:
+    """Commit messages via git --grep over full history."""
+    commits = await commit_log.search(project_path, query, limit=limit)
+    return [
+        SearchResult(
+            type="commit",
+            title=commit["message"][:100],
+            description=f"{commit['author']} • {commit['short_sha']}",
+            metadata={
+                "sha": commit["sha"],
+                "author": commit["author"],
+                "timestamp": commit["timestamp"]
+            },
+            score=_calculate_commit_score(query, commit["message"])
+        )
+        for commit in commits
+    ]
+
+
+def _start_legs(query: str, filter_types: set, max_results: int,
+                project_path: Optional[str]) -> Dict[str, "asyncio.Task"]:
+    """
+    Start one task per requested category that can run.
+
+    Each leg may return up to max_results; results count against the
+    total, so once max_results are in, _run_legs cancels the slower legs.
+    """
+    per_leg = max_results
+    legs: Dict[str, asyncio.Task] = {}
+
+    root = None
+    if project_path and filter_types & {"file", "content"}:
+        # Validated once, shared by the file and content legs
+        root = asyncio.ensure_future(
+            blocking_executor.run("file", file_service.validate_directory, project_path)
+        )
+        # Both legs may be cancelled before awaiting it; don't warn about its error then
+        root.add_done_callback(lambda f: f.cancelled() or f.exception())
+    if "file" in filter_types and root is not None:
+        legs["file"] = asyncio.ensure_future(_search_files(query, root, per_leg))
+    if "content" in filter_types and root is not None:
+        legs["content"] = asyncio.ensure_future(_search_content(query, root, per_leg))
+    for kind in ("session", "skill", "agent"):
+        if kind in filter_types:
+            legs[kind] = asyncio.ensure_future(_search_indexed(kind, query, per_leg))
+    if "commit" in filter_types and project_path:
+        legs["commit"] = asyncio.ensure_future(_search_commits(query, project_path, per_leg))
+    return legs
+
+
+async def _run_legs(
+    legs: Dict[str, "asyncio.Task"], deadline_ms: int, max_results: int
+) -> AsyncIterator[Tuple[str, List[SearchResult], LegStatus]]:
+    """
+    Yield (category, results, status) as legs finish.
+
+    Legs still running at the deadline are cancelled and reported as timed
+    out; once max_results results are in, the remaining legs are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + deadline_ms / 1000
+    names = {task: name for name, task in legs.items()}
+    pending = set(legs.values())
+    collected = 0
+
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            done = set()
+            if remaining > 0 and collected < max_results:
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Deadline or max_results reached: cancel what's left
+                timed_out = collected < max_results
+                for task in pending:
+                    task.cancel()
+                for task in pending:
+                    yield names[task], [], LegStatus(
+                        ms=round((loop.time() - start) * 1000, 1), count=0,
+                        timed_out=timed_out, cancelled=not timed_out,
+                    )
+                pending = set()
+                break
+
+            for task in done:
+                ms = round((loop.time() - start) * 1000, 1)
+                try:
+                    results = task.result()
+                except Exception as e:
+                    logger.warning("Search leg failed", category=names[task], error=str(e))
+                    yield names[task], [], LegStatus(ms=ms, count=0, error=str(e))
+                    continue
+                collected += len(results)
+                yield names[task], results, LegStatus(ms=ms, count=len(results))
+    finally:
+        # Client went away mid-stream
+        for task in pending:
+            task.cancel()
 
 
 @router.get("/search")
 async def unified_search(
     query: str = Query(..., description="Search query", min_length=2),
-    types: Optional[List[str]] = Query(None, description="Filter by types: file, session, commit, skill, agent"),
+    types: Optional[List[str]] = Query(None, description="Filter by types: file, content, session, commit, skill, agent"),
     max_results: int = Query(50, ge=1, le=200, description="Maximum results"),
-    project_path: Optional[str] = Query(None, description="Limit to project")
-) -> SearchResponse:
+    project_path: Optional[str] = Query(None, description="Limit to project"),
+    deadline_ms: int = Query(settings.search_deadline_ms, ge=50, le=30000, description="Time budget for all categories"),
+    stream: bool = Query(False, description="Stream categories as NDJSON as they finish"),
+):
     """
     Unified search across all content types.
     
     Searches:
     - Files (by name)
-    - Sessions (by project_id or title)
+    - File contents (literal text, narrowed by the trigram index)
+    - Sessions, skills and agents (BM25-ranked unified index: title,
+      description and body, with prefix and typo-tolerant matching)
     - Git commits (by message)
-    - Skills (by name or description)
-    - Agents (by name or description)
+
+    Categories are searched concurrently under a shared deadline; ones that
+    miss it are cancelled and flagged in `legs`, and the rest are returned
+    (`partial: true`). With stream=true each category is sent as an NDJSON
+    line ({"type": "category", "category", "results", "status"}) as soon
+    as it finishes, followed by {"type": "summary", ...}.
     
     Returns ranked results with relevance scores.
     """
-    all_results = []
-    filter_types = set(types) if types else {"file", "session", "commit", "skill", "agent"}
-    
-    # Search files
-    if "file" in filter_types and project_path:
-        try:
-            files = file_service.search_files(
-                root=project_path,
-                query=query,
-                max_results=max_results // 5  # Allocate 1/5 of results to each category
-            )
-            for file_info in files:
-                all_results.append(SearchResult(
-                    type="file",
-                    title=file_info.name,
-                    description=f"{file_info.type.title()} • {file_info.size} bytes",
-                    path=file_info.path,
-                    metadata={"size": file_info.size, "type": file_info.type},
-                    score=_calculate_file_score(query, file_info.name)
-                ))
-        except Exception as e:
-            logger.warning("File search failed", error=str(e))
-    
-    # Search sessions
-    if "session" in filter_types:
-        try:
-            async with AsyncSessionLocal() as session:
-                # Search by project_id or title
-                stmt = select(DBSession).where(
-                    or_(
-                        DBSession.project_id.contains(query),
-                        DBSession.title.contains(query) if DBSession.title else False
-                    )
-                ).limit(max_results // 5)
-                
-                result = await session.execute(stmt)
-                sessions = result.scalars().all()
-                
-                for sess in sessions:
-                    all_results.append(SearchResult(
-                        type="session",
-                        title=sess.title or f"Session {sess.id[:8]}",
-                        description=f"Project: {sess.project_id} • Model: {sess.model}",
-                        metadata={
-                            "id": sess.id,
-                            "project_id": sess.project_id,
-                            "model": sess.model,
-                            "message_count": sess.message_count
-                        },
-                        score=_calculate_session_score(query, sess)
-                    ))
-        except Exception as e:
-            logger.warning("Session search failed", error=str(e))
-    
-    # Search git commits
-    if "commit" in filter_types and project_path:
-        try:
-            commits = git_service.get_log(project_path, max_count=20)
-            matching_commits = [
-                c for c in commits
-                if query.lower() in c["message"].lower()
-            ][:max_results // 5]
-            
-            for commit in matching_commits:
-                all_results.append(SearchResult(
-                    type="commit",
-                    title=commit["message"][:100],
-                    description=f"{commit['author']} • {commit['short_sha']}",
-                    metadata={
-                        "sha": commit["sha"],
-                        "author": commit["author"],
-                        "timestamp": commit["timestamp"]
-                    },
-                    score=_calculate_commit_score(query, commit["message"])
-                ))
-        except Exception as e:
-            logger.warning("Commit search failed", error=str(e))
-    
-    # Search skills
-    if "skill" in filter_types:
-        # Would search ~/.claude/skills/ - placeholder for now
-        pass
-    
-    # Search agents
-    if "agent" in filter_types:
-        # Would search ~/.claude/agents/ - placeholder for now
-        pass
-    
+    filter_types = set(types) if types else set(ALL_TYPES)
+    legs = _start_legs(query, filter_types, max_results, project_path)
+    events = _run_legs(legs, deadline_ms, max_results)
+
+    if stream:
+        async def ndjson():
+            statuses: Dict[str, LegStatus] = {}
+            total = 0
+            try:
+                async for category, results, leg in events:
+                    statuses[category] = leg
+                    total += len(results)
+                    yield json.dumps({
+                        "type": "category",
+                        "category": category,
+                        "results": [r.model_dump() for r in sorted(results, key=lambda r: r.score, reverse=True)],
+                        "status": leg.model_dump(),
+                    }, separators=(",", ":")) + "\n"
+            finally:
+                await events.aclose()
+            yield json.dumps({
+                "type": "summary",
+                "query": query,
+                "total": total,
+                "legs": {name: leg.model_dump() for name, leg in statuses.items()},
+                "partial": _is_partial(statuses),
+            }, separators=(",", ":")) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    all_results: List[SearchResult] = []
+    statuses: Dict[str, LegStatus] = {}
+    async for category, results, leg in events:
+        statuses[category] = leg
+        all_results.extend(results)
+
     # Sort by relevance score
     all_results.sort(key=lambda r: r.score, reverse=True)
     
@@ -158,52 +338,36 @@ async def unified_search(
         "Search completed",
         query=query,
         total_results=len(all_results),
-        categories=categories
+        categories=categories,
+        legs={name: leg.ms for name, leg in statuses.items()}
     )
     
     return SearchResponse(
         query=query,
         results=all_results,
         total=len(all_results),
-        categories=categories
+        categories=categories,
+        legs=statuses,
+        partial=_is_partial(statuses)
     )
 
 
-def _calculate_file_score(query: str, filename: str) -> float:
-    """Calculate relevance score for file."""
-    query_lower = query.lower()
-    filename_lower = filename.lower()
-    
-    # Exact match
-    if query_lower == filename_lower:
-        return 1.0
-    
-    # Starts with query
-    if filename_lower.startswith(query_lower):
-        return 0.9
-    
-    # Contains query
-    if query_lower in filename_lower:
-        return 0.7
-    
-    # Fuzzy match (simple)
-    matching_chars = sum(1 for c in query_lower if c in filename_lower)
-    return matching_chars / len(query_lower) * 0.5
+@router.get("/search/index")
+async def get_search_index_stats() -> dict:
+    """Get statistics for the unified session/skill/agent search index."""
+    return search_index.get_stats()
 
 
-def _calculate_session_score(query: str, session: DBSession) -> float:
-    """Calculate relevance score for session."""
-    query_lower = query.lower()
-    
-    # Match in project_id
-    if query_lower in session.project_id.lower():
-        return 0.8
-    
-    # Match in title
-    if session.title and query_lower in session.title.lower():
-        return 0.9
-    
-    return 0.3
+@router.post("/search/index/rebuild")
+async def rebuild_search_index() -> dict:
+    """Reload every source of the unified search index now."""
+    for kind in ("session", "skill", "agent"):
+        await search_index.refresh(kind, force=True)
+    return search_index.get_stats()
+
+
+def _is_partial(statuses: Dict[str, LegStatus]) -> bool:
+    return any(leg.timed_out or leg.cancelled or leg.error for leg in statuses.values())
 
 
 def _calculate_commit_score(query: str, message: str) -> float:
@@ -1,11 +1,18 @@
 """Skills Management API - CRUD for ~/.claude/skills/"""
 
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 import structlog
 
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.catalog import skill_catalog
+from claude_code_api.services.search_index import search_index
+
 logger = structlog.get_logger()
 router = APIRouter()
 
@@ -27,43 +34,90 @@ class SkillResponse(BaseModel):
 
 def get_skills_directory() -> Path:
     """Get skills directory path."""
-    skills_dir = Path.home() / ".claude" / "skills"
+    skills_dir = skill_catalog.directory
     skills_dir.mkdir(parents=True, exist_ok=True)
     return skills_dir
 
 
+def _response(entry: Dict[str, Any]) -> SkillResponse:
+    return SkillResponse(
+        name=entry["name"],
+        path=entry["path"],
+        description=entry["description"],
+        size=entry["size"],
+    )
+
+
+def _search_document(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Search index document for a skill."""
+    return {
+        "id": "skill:" + entry["name"],
+        "type": "skill",
+        "title": entry["name"],
+        "description": entry["description"],
+        "body": entry["body"],
+        "path": entry["path"],
+        "metadata": entry["metadata"],
+    }
+
+
+async def _load_skills(since: Optional[datetime]) -> List[Dict[str, Any]]:
+    entries, _ = await skill_catalog.entries()
+    return [_search_document(entry) for entry in entries]
+
+
+search_index.register_source(
+    "skill", _load_skills, refresh_seconds=settings.catalog_revalidate_seconds
+)
+
+
+def _write_skill(skill_dir: Path, content: str) -> Path:
+    """Create skill directory and write SKILL.md (blocking)."""
+    skill_dir.mkdir(exist_ok=True)
+    skill_file = skill_dir / "SKILL.md"
+    skill_file.write_text(content)
+    return skill_file
+
+
+def _remove_skill(skill_dir: Path) -> bool:
+    """Delete SKILL.md and the directory if empty (blocking)."""
+    if not skill_dir.exists():
+        return False
+
+    # Delete SKILL.md file
+    skill_file = skill_dir / "SKILL.md"
+    if skill_file.exists():
+        skill_file.unlink()
+
+    # Remove directory if empty
+    try:
+        skill_dir.rmdir()
+    except OSError:
+        # Directory not empty, that's OK
+        pass
+
+    return True
+
+
 @router.get("/skills")
-async def list_skills() -> List[SkillResponse]:
-    """List all available skills from ~/.claude/skills/"""
+async def list_skills(request: Request) -> List[SkillResponse]:
+    """
+    List all available skills from ~/.claude/skills/
+
+    Served from the in-memory catalog. The ETag changes whenever any
+    skill is added, edited or removed; send it back in If-None-Match to
+    get 304 Not Modified instead of the listing.
+    """
     try:
-        skills_dir = get_skills_directory()
-        skills = []
-        
-        for skill_dir in skills_dir.iterdir():
-            if skill_dir.is_dir():
-                skill_file = skill_dir / "SKILL.md"
-                if skill_file.exists():
-                    content = skill_file.read_text()
-                    
-                    # Extract description from front matter
-                    description = ""
-                    if content.startswith("---"):
-                        parts = content.split("---", 2)
-                        if len(parts) >= 3:
-                            front_matter = parts[1]
-                            for line in front_matter.split("\n"):
-                                if line.startswith("description:"):
-                                    description = line.split("description:", 1)[1].strip()
-                    
-                    skills.append(SkillResponse(
-                        name=skill_dir.name,
-                        path=str(skill_file),
-                        description=description,
-                        size=skill_file.stat().st_size,
-                    ))
-        
-        logger.info("Skills listed", count=len(skills))
-        return skills
+        entries, etag = await skill_catalog.entries()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        logger.info("Skills listed", count=len(entries))
+        return JSONResponse(
+            content=[_response(entry).model_dump() for entry in entries],
+            headers={"ETag": etag},
+        )
         
     except Exception as e:
         logger.error("Failed to list skills", error=str(e))
@@ -80,14 +134,14 @@ async def get_skill(name: str) -> dict:
         skills_dir = get_skills_directory()
         skill_file = skills_dir / name / "SKILL.md"
         
-        if not skill_file.exists():
+        try:
+            content = await blocking_executor.run("file", skill_file.read_text)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Skill '{name}' not found"
             )
         
-        content = skill_file.read_text()
-        
         logger.info("Skill retrieved", name=name, size=len(content))
         
         return {
@@ -113,9 +167,6 @@ async def create_skill(request: CreateSkillRequest) -> SkillResponse:
     try:
         skills_dir = get_skills_directory()
         skill_dir = skills_dir / request.name
-        skill_dir.mkdir(exist_ok=True)
-        
-        skill_file = skill_dir / "SKILL.md"
         
         # Create skill content with front matter
         full_content = f"""---
@@ -126,16 +177,21 @@ description: {request.description}
 {request.content}
 """
         
-        skill_file.write_text(full_content)
+        skill_file = await blocking_executor.run("file", _write_skill, skill_dir, full_content)
         
         logger.info("Skill created", name=request.name, size=len(full_content))
         
-        return SkillResponse(
+        created = SkillResponse(
             name=request.name,
             path=str(skill_file),
             description=request.description,
             size=len(full_content),
         )
+        skill_catalog.invalidate()
+        entry = await skill_catalog.get(request.name)
+        if entry is not None:
+            await search_index.upsert(_search_document(entry))
+        return created
         
     except Exception as e:
         logger.error("Failed to create skill", name=request.name, error=str(e))
@@ -152,24 +208,15 @@ async def delete_skill(name: str) -> dict:
         skills_dir = get_skills_directory()
         skill_dir = skills_dir / name
         
-        if not skill_dir.exists():
+        removed = await blocking_executor.run("file", _remove_skill, skill_dir)
+        if not removed:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Skill '{name}' not found"
             )
         
-        # Delete SKILL.md file
-        skill_file = skill_dir / "SKILL.md"
-        if skill_file.exists():
-            skill_file.unlink()
-        
-        # Remove directory if empty
-        try:
-            skill_dir.rmdir()
-        except OSError:
-            # Directory not empty, that's OK
-            pass
-        
+        skill_catalog.invalidate()
+        await search_index.remove("skill:" + name)
         logger.info("Skill deleted", name=name)
         
         return {"success": True, "message": f"Skill '{name}' deleted"}
@@ -5,12 +5,14 @@ import json
 import os
 import subprocess
 import tempfile
+import time
 import uuid
 from pathlib import Path
 from typing import Optional, Dict, List, AsyncGenerator, Any
 import structlog
 
 from .config import settings
+from claude_code_api.utils.metrics import metrics
 
 logger = structlog.get_logger()
 
@@ -65,15 +67,23 @@ class ClaudeProcess:
             logger.info(f"Command: {' '.join(cmd)}")
             
             # Claude CLI runs to completion, so we run it and capture all output
+            model_label = model or settings.default_model
+            started = time.perf_counter()
             self.process = await asyncio.create_subprocess_exec(
                 *cmd,
                 cwd=src_dir,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
+            spawned = time.perf_counter()
+            metrics.record_time("claude_spawn_duration_ms", (spawned - started) * 1000, model=model_label)
             
             # Wait for process to complete and capture all output
             stdout, stderr = await self.process.communicate()
+            metrics.record_time("claude_run_duration_ms", (time.perf_counter() - spawned) * 1000, model=model_label)
+            metrics.increment(
+                "claude_processes", model=model_label, outcome="ok" if self.process.returncode == 0 else "error"
+            )
             
             logger.info(
                 "Claude process completed",
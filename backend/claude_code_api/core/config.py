@@ -2,7 +2,7 @@
 
 import os
 import shutil
-from typing import List, Union
+from typing import Dict, List, Union
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
@@ -95,6 +95,17 @@ class Settings(BaseSettings):
     # Logging Configuration
     log_level: str = "INFO"
     log_format: str = "json"
+    # Events are rendered and written by a background thread fed by a bounded queue
+    log_async: bool = True
+    log_queue_size: int = 10000
+    # Fraction of info/debug events kept, by event name (warnings and errors are always kept)
+    log_sample_rates: Dict[str, float] = Field(default={
+        "Request started": 0.1,
+        "Raw request received": 0.1,
+        "JSON parsed successfully": 0.1,
+        "Pydantic validation successful": 0.1,
+        "Received Claude message": 0.1,
+    })
     
     # CORS Configuration
     allowed_origins: List[str] = Field(default=["*"])
@@ -110,11 +121,93 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_requests_per_minute: int = 100
     rate_limit_burst: int = 10
-    
+
+    # Usage Quotas (per API key, 0 = unlimited)
+    quota_enabled: bool = False
+    quota_tokens_per_minute: int = 200000
+    quota_usd_per_day: float = 25.0
+    quota_estimated_output_tokens: int = 1024
+    quota_reservation_ttl_seconds: int = 3600  # Unsettled reservations are charged their estimate after this
+
     # Streaming Configuration
     streaming_chunk_size: int = 1024
     streaming_timeout_seconds: int = 300
-    
+
+    # Blocking I/O Executor (file, git and discovery services)
+    executor_max_workers: int = 16
+    executor_file_timeout_seconds: float = 30.0
+    executor_git_timeout_seconds: float = 60.0
+    executor_discovery_timeout_seconds: float = 120.0
+    executor_index_timeout_seconds: float = 1800.0
+
+    # Event Loop Monitoring
+    loop_monitor_interval_ms: float = 100.0
+    loop_monitor_stall_threshold_ms: float = 100.0
+    # Sample the loop thread's stack while it is blocked (always on in debug mode)
+    loop_monitor_sample_stacks: bool = False
+    loop_monitor_blocking_threshold_ms: float = 50.0
+    loop_monitor_sample_interval_ms: float = 10.0
+
+    # Sampling Profiler (/v1/admin/profile)
+    profiler_max_seconds: float = 60.0
+    profiler_default_hz: float = 100.0
+
+    # Metrics (latency histograms keep lifetime counts plus a sliding window)
+    metrics_window_seconds: float = 60.0
+    metrics_window_slots: int = 6
+
+    # Indexing (file index snapshots and other on-disk indexes)
+    index_dir: str = "./indexes"
+    file_index_max_projects: int = 8
+    file_index_rescan_seconds: int = 300
+    file_index_persist: bool = True
+
+    # Content Search (grep)
+    grep_max_workers: int = 0  # 0 = CPU count
+    grep_use_processes: bool = True
+    grep_max_file_size_mb: int = 5
+    trigram_index_max_projects: int = 4
+
+    # Unified Search (/v1/search)
+    search_deadline_ms: int = 2000  # Shared time budget for all categories
+    search_index_refresh_seconds: float = 30.0  # Skill/agent rescans for the BM25 index
+    search_index_persist: bool = True
+
+    # Batch API (/v1/batch)
+    batch_max_concurrent: int = 8  # Operations of one batch running at once
+
+    # Skills and Agents Catalog (~/.claude/skills, ~/.claude/agents)
+    catalog_revalidate_seconds: float = 2.0  # Stat-check interval when file watching is unavailable
+
+    # Host Project Discovery (/v1/host/discover-projects)
+    discovery_parallelism: int = 8  # Directories listed at once
+    discovery_cache_seconds: float = 30.0  # Replay a scan this recent without touching the disk
+    discovery_persist: bool = True  # Keep directory mtimes under index_dir/discovery
+
+    # Git (open Repo handles kept by the repo pool)
+    git_repo_pool_size: int = 16
+    git_status_untracked_cache: bool = True
+    git_status_fsmonitor: bool = False  # Builtin fsmonitor daemon (macOS/Windows)
+    git_max_concurrent: int = 8  # Async git subprocesses running at once
+    git_remote_enabled: bool = True  # Allow fetch/pull/push from the API
+    git_remote_timeout_seconds: float = 600.0
+    git_log_cache_size: int = 20000  # Parsed commits kept in memory (by SHA)
+    git_commit_graph_auto: bool = True  # Write commit-graph files in the background
+    git_commit_graph_max_age_seconds: float = 3600.0
+    git_diff_cache_size: int = 256  # Commit-to-commit diffs (file lists and hunks)
+    git_diff_max_file_kb: int = 512  # Per-file patch size before hunks are truncated
+    git_diff_large_lines: int = 2000  # Changed lines that flag a file as large
+
+    # Uploads (resumable sessions; temp files live next to their destination)
+    upload_state_dir: str = "./uploads"
+    upload_expiry_hours: int = 24
+    upload_max_concurrent_files: int = 4
+
+    # Blob Store (content-addressed dedup for uploads and backups)
+    blob_store_dir: str = "./blobs"
+    blob_link_mode: str = "auto"  # auto (reflink, else copy), reflink, copy, or hardlink (read-only stores)
+    blob_gc_grace_seconds: int = 3600
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
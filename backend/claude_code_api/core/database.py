@@ -1,10 +1,11 @@
 """Database models and connection management."""
 
+import time
 from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, Boolean, Float,
-    ForeignKey, create_engine, MetaData
+    ForeignKey, create_engine, MetaData, event
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
@@ -12,6 +13,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 import structlog
 
 from .config import settings
+from claude_code_api.utils.metrics import metrics
 
 logger = structlog.get_logger()
 
@@ -27,6 +29,24 @@ AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+# Transaction latency (begin to commit/rollback; read-only sessions end in a rollback)
+@event.listens_for(engine.sync_engine, "begin")
+def _on_begin(conn):
+    conn.info["txn_started"] = time.perf_counter()
+
+
+def _on_end(outcome: str):
+    def handler(conn):
+        started = conn.info.pop("txn_started", None)
+        if started is not None:
+            metrics.record_time("db_transaction_duration_ms", (time.perf_counter() - started) * 1000, outcome=outcome)
+    return handler
+
+
+event.listen(engine.sync_engine, "commit", _on_end("commit"))
+event.listen(engine.sync_engine, "rollback", _on_end("rollback"))
+
 Base = declarative_base()
 
 
@@ -0,0 +1,163 @@
+"""Bounded thread pool for blocking filesystem and git work."""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import structlog
+
+from .config import settings
+from .profiler import request_id_var, thread_requests
+
+logger = structlog.get_logger()
+
+
+class OperationTimeoutError(Exception):
+    """Blocking operation did not finish within its timeout."""
+    pass
+
+
+class BlockingExecutor:
+    """
+    Runs synchronous service calls off the event loop.
+
+    Calls are grouped into categories ("file", "git", "discovery", "index"),
+    each with its own default timeout. A timed-out call keeps its worker
+    thread until it returns, so the pool size also bounds how much runaway
+    work can pile up.
+    """
+
+    def __init__(self, max_workers: int, timeouts: Dict[str, float]):
+        self.max_workers = max_workers
+        self.timeouts = timeouts
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Counters (updated from worker threads under _lock)
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_time_ms: Dict[str, float] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="blocking-io"
+            )
+        return self._executor
+
+    async def run(
+        self,
+        category: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run ``func(*args, **kwargs)`` in the pool and await its result.
+
+        Raises:
+            OperationTimeoutError: If the call exceeds its timeout
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.timeouts.get(category)
+        queued = [True]
+
+        def dequeue():
+            # Once per call: when a worker picks it up, or when it ends
+            # (timed out or cancelled) without ever starting
+            with self._lock:
+                if queued[0]:
+                    queued[0] = False
+                    self.pending -= 1
+
+        call = functools.partial(self._invoke, dequeue, category, func, *args, **kwargs)
+        ctx = contextvars.copy_context()
+
+        with self._lock:
+            self.pending += 1
+        future = loop.run_in_executor(self._get_executor(), ctx.run, call)
+        future.add_done_callback(lambda _: dequeue())
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            logger.warning(
+                "Blocking operation timed out",
+                category=category,
+                operation=getattr(func, "__name__", str(func)),
+                timeout=timeout
+            )
+            raise OperationTimeoutError(
+                f"{category} operation '{getattr(func, '__name__', 'call')}' timed out after {timeout}s"
+            )
+
+    def _invoke(
+        self, dequeue: Callable[[], None], category: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Worker-side wrapper that keeps queue/run counters."""
+        dequeue()
+        with self._lock:
+            self.running += 1
+        start = time.perf_counter()
+        succeeded = False
+        # Lets the profiler attribute this thread's samples to the calling request
+        request_id = request_id_var.get()
+        if request_id is not None:
+            thread_requests[threading.get_ident()] = request_id
+        try:
+            result = func(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            if request_id is not None:
+                thread_requests.pop(threading.get_ident(), None)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.running -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self.total_time_ms[category] = self.total_time_ms.get(category, 0.0) + elapsed_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        return {
+            "max_workers": self.max_workers,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "timeouts": dict(self.timeouts),
+            "total_time_ms": {k: round(v, 2) for k, v in self.total_time_ms.items()},
+        }
+
+    def shutdown(self):
+        """Stop accepting work and release worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Blocking executor shut down")
+
+
+# Global executor for file, git and discovery services
+blocking_executor = BlockingExecutor(
+    max_workers=settings.executor_max_workers,
+    timeouts={
+        "file": settings.executor_file_timeout_seconds,
+        "git": settings.executor_git_timeout_seconds,
+        "discovery": settings.executor_discovery_timeout_seconds,
+        "index": settings.executor_index_timeout_seconds,
+    },
+)
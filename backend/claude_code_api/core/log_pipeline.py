@@ -0,0 +1,205 @@
+"""
+Structured logging pipeline.
+
+structlog's processor chain runs on the thread that logs, usually the
+event loop. This pipeline keeps only the cheap steps there:
+- Sampling: info/debug events listed in log_sample_rates are kept with
+  that probability (kept events carry `sample_rate`); warnings and errors
+  are always kept
+- The timestamp is captured as a float, exceptions and stacks are
+  captured as usual (they must be read on the logging thread)
+- The event dict is handed to a bounded queue; if the queue is full the
+  event is dropped and counted instead of blocking the caller
+
+A background writer thread resolves `lazy(...)` fields, renders JSON and
+passes the line to the stdlib logger the event came from, so handlers
+configured by uvicorn or the deployment keep working. Until the writer is
+started (and when log_async is off) events are rendered synchronously.
+
+Values are rendered after the call returns; log immutable values, or wrap
+anything that may change (or is expensive to format) in `lazy`.
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+import structlog
+
+from .config import settings
+from claude_code_api.utils.metrics import metrics, MetricsCollector
+
+# Levels that are never sampled out
+ALWAYS_KEPT = {"warning", "warn", "error", "exception", "critical", "fatal"}
+
+_STOP = object()
+
+
+class Lazy:
+    """A field computed when the event is rendered (on the writer thread)."""
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable[..., Any], *args: Any):
+        self.func = func
+        self.args = args
+
+    def __call__(self) -> Any:
+        return self.func(*self.args)
+
+
+def lazy(func: Callable[..., Any], *args: Any) -> Lazy:
+    """Defer `func(*args)` until the log line is rendered."""
+    return Lazy(func, *args)
+
+
+def preview(value: Any, limit: int = 200) -> str:
+    """First `limit` characters of str(value)."""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value[:limit * 4]).decode("utf-8", "replace")[:limit]
+    return str(value)[:limit]
+
+
+def _resolve(value: Any) -> Any:
+    if isinstance(value, Lazy):
+        try:
+            value = value()
+        except Exception as e:
+            return f"<lazy field failed: {e}>"
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+class LogPipeline:
+    """Sampling processor, queue hand-off and background JSON writer."""
+
+    def __init__(self, queue_size: int = 10000, sample_rates: Optional[Dict[str, float]] = None):
+        self.sample_rates = dict(sample_rates or {})
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # Processors (run on the logging thread)
+
+    def sample(self, logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if method_name in ALWAYS_KEPT:
+            return event_dict
+        event = event_dict.get("event")
+        rate = self.sample_rates.get(event) if isinstance(event, str) else None
+        if rate is None or rate >= 1.0:
+            return event_dict
+        if rate <= 0.0 or random.random() >= rate:
+            self.sampled_out[event] += 1
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+    @staticmethod
+    def add_timestamp(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        event_dict["timestamp"] = time.time()
+        return event_dict
+
+    def enqueue(self, logger, method_name: str, event_dict: Dict[str, Any]) -> str:
+        """Last processor: hand the event to the writer (or render it here if none runs)."""
+        if not self.running:
+            return self.render(event_dict)
+        try:
+            self._queue.put_nowait((getattr(logger, "name", None), event_dict))
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+        raise structlog.DropEvent
+
+    # Writer side
+
+    @staticmethod
+    def render(event_dict: Dict[str, Any]) -> str:
+        rendered = {key: _resolve(value) for key, value in event_dict.items()}
+        timestamp = rendered.get("timestamp")
+        if isinstance(timestamp, float):
+            rendered["timestamp"] = (
+                datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+            )
+        return json.dumps(rendered, default=str)
+
+    def _write(self, name: Optional[str], event_dict: Dict[str, Any]):
+        level = logging.getLevelName(str(event_dict.get("level", "info")).upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+        logging.getLogger(name).log(level, self.render(event_dict))
+        self.written += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            try:
+                self._write(*item)
+            except Exception as e:  # never let one bad event stop the writer
+                logging.getLogger(__name__).error("Failed to write log event: %s", e)
+
+    def start(self):
+        """Start the writer thread (events logged before are rendered synchronously)."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush queued events and stop the writer."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": dict(self.sampled_out),
+        }
+
+    def processors(self) -> list:
+        """The structlog processor chain using this pipeline."""
+        return [
+            structlog.stdlib.filter_by_level,
+            self.sample,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            self.add_timestamp,
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            self.enqueue,
+        ]
+
+
+def collect_log_metrics(collector: MetricsCollector):
+    collector.set_gauge("log_queue_depth", log_pipeline._queue.qsize())
+    collector.set_counter("log_events_dropped", log_pipeline.dropped, reason="queue_full")
+    collector.set_counter("log_events_dropped", sum(log_pipeline.sampled_out.values()), reason="sampled")
+
+
+# Global logging pipeline
+log_pipeline = LogPipeline(queue_size=settings.log_queue_size, sample_rates=settings.log_sample_rates)
+metrics.register_collector(collect_log_metrics)
@@ -0,0 +1,270 @@
+"""
+Event loop scheduling lag monitor.
+
+- A task sleeps for a fixed interval and records how late it wakes up in
+  a latency histogram (exported as `event_loop_lag_ms`)
+- With stack sampling on (debug mode, or loop_monitor_sample_stacks), a
+  watchdog thread notices when the loop has not woken the task for longer
+  than the blocking threshold, and samples the loop thread's stack with
+  sys._current_frames until it moves again. Samples are aggregated by
+  call site, so the code that held the loop shows up by file and line.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+
+from .config import settings
+from claude_code_api.utils.metrics import metrics, Histogram
+
+logger = structlog.get_logger()
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Frame = Tuple[str, int, str]  # (filename, line, function)
+
+# Frames kept per sampled stack, and distinct stacks kept
+MAX_STACK_DEPTH = 40
+MAX_STACKS = 500
+
+
+def _format_frame(frame: Frame) -> str:
+    filename, line, function = frame
+    if filename.startswith(PACKAGE_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(PACKAGE_DIR))
+    return f"{filename}:{line} in {function}"
+
+
+def call_site(stack: Tuple[Frame, ...]) -> Frame:
+    """Innermost frame in this package, or the innermost frame at all."""
+    for frame in stack:
+        if frame[0].startswith(PACKAGE_DIR):
+            return frame
+    return stack[0]
+
+
+class BlockingCallSampler:
+    """Samples the loop thread's stack while the loop is blocked (watchdog thread)."""
+
+    def __init__(self, threshold_ms: float, sample_interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.sample_interval = sample_interval_ms / 1000
+        self.stacks: Counter = Counter()  # stack (innermost first) -> samples
+        self.episodes: Counter = Counter()  # call site -> blocked episodes
+        self.dropped = 0
+        self._loop_thread: Optional[int] = None
+        self._deadline = 0.0  # monotonic time the loop is expected to wake by
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, loop_thread: int):
+        if self.running:
+            return
+        self._loop_thread = loop_thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-blocking-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def expect_wakeup(self, at: float):
+        """Called on the loop each tick with the next expected wake-up time."""
+        self._deadline = at
+
+    def _sample(self) -> Optional[Tuple[Frame, ...]]:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack: List[Frame] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+            frame = frame.f_back
+        return tuple(stack) or None
+
+    def _run(self):
+        blocked_since: Optional[float] = None
+        while not self._stop.wait(self.sample_interval):
+            deadline = self._deadline
+            if not deadline or time.monotonic() - deadline < self.threshold:
+                blocked_since = None
+                continue
+            stack = self._sample()
+            if stack is None:
+                continue
+            with self._lock:
+                if stack in self.stacks or len(self.stacks) < MAX_STACKS:
+                    self.stacks[stack] += 1
+                else:
+                    self.dropped += 1
+                if blocked_since != deadline:
+                    # First sample of this blocked stretch
+                    blocked_since = deadline
+                    self.episodes[call_site(stack)] += 1
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """Call sites by samples, each with its most frequent stacks."""
+        with self._lock:
+            stacks = list(self.stacks.items())
+            episodes = dict(self.episodes)
+            dropped = self.dropped
+
+        sites: Dict[Frame, Dict[str, Any]] = {}
+        for stack, samples in stacks:
+            site = call_site(stack)
+            entry = sites.setdefault(site, {"samples": 0, "stacks": []})
+            entry["samples"] += samples
+            entry["stacks"].append((samples, stack))
+
+        interval_ms = self.sample_interval * 1000
+        ranked = sorted(sites.items(), key=lambda item: item[1]["samples"], reverse=True)[:limit]
+        return {
+            "sampling": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "sample_interval_ms": interval_ms,
+            "total_samples": sum(samples for _, samples in stacks),
+            "dropped_samples": dropped,
+            "sites": [
+                {
+                    "site": _format_frame(site),
+                    "samples": entry["samples"],
+                    "blocked_ms": round(entry["samples"] * interval_ms, 1),
+                    "episodes": episodes.get(site, 0),
+                    "stacks": [
+                        {"samples": samples, "frames": [_format_frame(frame) for frame in stack]}
+                        for samples, stack in sorted(entry["stacks"], key=lambda s: s[0], reverse=True)[:3]
+                    ],
+                }
+                for site, entry in ranked
+            ],
+        }
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.episodes.clear()
+            self.dropped = 0
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a sleeping task.
+
+    Any lag beyond a few milliseconds means a callback held the loop, e.g.
+    a synchronous filesystem walk running inside an async route.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        stall_threshold_ms: float,
+        window_seconds: float = 60.0,
+        metric: Optional[str] = None,
+        sampler: Optional[BlockingCallSampler] = None,
+    ):
+        self.interval = interval_seconds
+        self.stall_threshold_ms = stall_threshold_ms
+        self.histogram = Histogram(window_seconds=window_seconds)
+        self.metric = metric
+        self.sampler = sampler
+        self.task: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+        self.last_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.stalls = 0
+
+    def start(self):
+        """Start monitor task on the running loop."""
+        if self.task is None or self.task.done():
+            self.started_at = time.time()
+            self.task = asyncio.create_task(self._run())
+            if self.sampler is not None:
+                self.sampler.start(threading.get_ident())
+            logger.info(
+                "Event loop lag monitor started",
+                interval_ms=self.interval * 1000,
+                stack_sampling=self.sampler is not None,
+            )
+
+    async def stop(self):
+        """Stop monitor task."""
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.task and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                expected = loop.time() + self.interval
+                if self.sampler is not None:
+                    self.sampler.expect_wakeup(time.monotonic() + self.interval)
+                await asyncio.sleep(self.interval)
+                self.record(max(0.0, (loop.time() - expected) * 1000))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in loop lag monitor", error=str(e))
+
+    def record(self, lag_ms: float):
+        """Record a single lag sample."""
+        self.histogram.record(lag_ms)
+        if self.metric:
+            metrics.record_time(self.metric, lag_ms)
+        self.last_ms = lag_ms
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+        if lag_ms >= self.stall_threshold_ms:
+            self.stalls += 1
+            logger.warning("Event loop stalled", lag_ms=round(lag_ms, 1))
+
+    def get_stats(self) -> Dict:
+        """Get lag statistics over the recent window."""
+        window = self.histogram.snapshot(window=True)
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "interval_ms": self.interval * 1000,
+            "samples": window["count"],
+            "current_ms": round(self.last_ms, 2),
+            "avg_ms": round(window["avg"], 2),
+            "p50_ms": round(window["p50"], 2),
+            "p90_ms": round(window["p90"], 2),
+            "p99_ms": round(window["p99"], 2),
+            "p999_ms": round(window["p999"], 2),
+            "window_max_ms": round(window["max"], 2),
+            "window_seconds": self.histogram.window_seconds,
+            "max_ms": round(self.max_lag_ms, 2),
+            "stall_threshold_ms": self.stall_threshold_ms,
+            "stalls": self.stalls,
+            "stack_sampling": self.sampler is not None and self.sampler.running,
+        }
+
+
+# Global loop monitor
+loop_monitor = EventLoopLagMonitor(
+    interval_seconds=settings.loop_monitor_interval_ms / 1000,
+    stall_threshold_ms=settings.loop_monitor_stall_threshold_ms,
+    window_seconds=settings.metrics_window_seconds,
+    metric="event_loop_lag_ms",
+    sampler=BlockingCallSampler(
+        threshold_ms=settings.loop_monitor_blocking_threshold_ms,
+        sample_interval_ms=settings.loop_monitor_sample_interval_ms,
+    ) if settings.debug or settings.loop_monitor_sample_stacks else None,
+)
@@ -0,0 +1,318 @@
+"""
+Statistical sampling profiler.
+
+Pure Python (sys._current_frames from a sampler thread), so it needs no
+external tools and can run on a production instance:
+- A profile samples every thread for a number of seconds and is returned
+  as collapsed stacks (flamegraph.pl / speedscope input) or as a table of
+  the hottest functions
+- A request trace samples only work done for one request: loop-thread
+  samples count while a task spawned for that request is running, worker
+  samples while the blocking executor runs a call made from it. Requests
+  are matched by X-Request-ID (see logging_middleware)
+- Threads parked in the selector, in a queue or waiting on a condition are
+  idle and left out unless asked for
+
+Only one profile or trace runs at a time.
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+# Request id of the current request (set by logging_middleware)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Worker thread id -> request id of the executor call it is running
+thread_requests: Dict[int, str] = {}
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAX_STACK_DEPTH = 64
+
+# Innermost frames of threads that are waiting, not working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("core.py", "_connection_worker_thread"),  # aiosqlite polls its request queue
+}
+
+Frame = Tuple[str, int, str]  # (filename, first line, function)
+
+
+class ProfilerBusyError(Exception):
+    """Another profile or trace is already running."""
+    pass
+
+
+def _label(frame: Frame) -> str:
+    filename, line, function = frame
+    if filename.startswith(PACKAGE_ROOT):
+        filename = os.path.relpath(filename, PACKAGE_ROOT)
+    return f"{function} ({filename}:{line})"
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    """Stack innermost first, one entry per function."""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name)))
+        frame = frame.f_back
+    return tuple(stack)
+
+
+def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+    filename, _, function = stack[0]
+    return (os.path.basename(filename), function.rsplit(".", 1)[-1]) in IDLE_FRAMES
+
+
+class Profile:
+    """Aggregated samples: (thread name, stack) -> count."""
+
+    def __init__(self, hz: float):
+        self.hz = hz
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self.started = time.monotonic()
+        self.duration = 0.0
+
+    def add(self, thread: str, stack: Tuple[Frame, ...]):
+        self.samples[(thread, stack)] += 1
+
+    def collapsed(self) -> str:
+        """One `thread;outer;...;inner count` line per distinct stack."""
+        lines = Counter()
+        for (thread, stack), count in self.samples.items():
+            lines[";".join([thread] + [_label(frame) for frame in reversed(stack)])] += count
+        return "".join(f"{line} {count}\n" for line, count in sorted(lines.items()))
+
+    def top(self, limit: int = 30) -> Dict[str, Any]:
+        """Hottest functions by self samples, with inclusive samples."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        threads: Counter = Counter()
+        for (thread, stack), count in self.samples.items():
+            threads[thread] += count
+            own[stack[0]] += count
+            for frame in set(stack):
+                total[frame] += count
+        samples = sum(threads.values())
+
+        def pct(n: int) -> float:
+            return round(100.0 * n / samples, 1) if samples else 0.0
+
+        return {
+            "duration_seconds": round(self.duration, 3),
+            "hz": self.hz,
+            "ticks": self.ticks,
+            "samples": samples,
+            "threads": dict(threads.most_common()),
+            "functions": [
+                {
+                    "function": _label(frame),
+                    "self": count,
+                    "self_pct": pct(count),
+                    "total": total[frame],
+                    "total_pct": pct(total[frame]),
+                }
+                for frame, count in own.most_common(limit)
+            ],
+        }
+
+
+class _Trace:
+    """An armed per-request trace."""
+
+    def __init__(self, request_id: str, profile: Profile, include_idle: bool):
+        self.request_id = request_id
+        self.profile = profile
+        self.include_idle = include_idle
+        self.started = asyncio.Event()
+        self.done = asyncio.Event()
+        self.stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+class SamplingProfiler:
+    """Runs one whole-process profile or one request trace at a time."""
+
+    def __init__(self, max_seconds: float = 60.0, default_hz: float = 100.0):
+        self.max_seconds = max_seconds
+        self.default_hz = default_hz
+        self._busy = False
+        self._trace: Optional[_Trace] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        # Tasks created for the traced request
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+        self.profiles = 0
+        self.traces = 0
+
+    def _acquire(self):
+        if self._busy:
+            raise ProfilerBusyError("A profile is already running")
+        self._busy = True
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def _sample(self, profile: Profile, stop: threading.Event, include_idle: bool,
+                request_id: Optional[str] = None):
+        """Sampler thread body."""
+        interval = 1.0 / profile.hz
+        own = threading.get_ident()
+        while not stop.wait(interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            profile.ticks += 1
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                if request_id is not None and not self._works_for(ident, request_id):
+                    continue
+                stack = _stack(frame)
+                if not stack or (not include_idle and _is_idle(stack)):
+                    continue
+                profile.add(names.get(ident, str(ident)), stack)
+            del frames
+
+    def _works_for(self, ident: int, request_id: str) -> bool:
+        if ident == self._loop_thread:
+            task = asyncio.tasks._current_tasks.get(self._loop)
+            return task is not None and self._tasks.get(task) == request_id
+        return thread_requests.get(ident) == request_id
+
+    def _start_thread(self, profile: Profile, stop: threading.Event, include_idle: bool,
+                      request_id: Optional[str] = None) -> threading.Thread:
+        thread = threading.Thread(
+            target=self._sample, args=(profile, stop, include_idle, request_id),
+            name="sampling-profiler", daemon=True,
+        )
+        thread.start()
+        return thread
+
+    async def profile(self, seconds: float, hz: Optional[float] = None, include_idle: bool = False) -> Profile:
+        """
+        Sample all threads for `seconds`.
+
+        Raises:
+            ProfilerBusyError: Another profile or trace is running
+        """
+        self._acquire()
+        try:
+            self.profiles += 1
+            profile = Profile(hz or self.default_hz)
+            stop = threading.Event()
+            thread = self._start_thread(profile, stop, include_idle)
+            try:
+                await asyncio.sleep(min(seconds, self.max_seconds))
+            finally:
+                stop.set()
+                await asyncio.get_running_loop().run_in_executor(None, thread.join)
+            profile.duration = time.monotonic() - profile.started
+            return profile
+        finally:
+            self._busy = False
+
+    async def trace(self, request_id: str, timeout: float, hz: Optional[float] = None,
+                    include_idle: bool = False) -> Tuple[Profile, bool]:
+        """
+        Wait for the request with this id and profile only its work.
+
+        Returns:
+            (profile, completed); completed is False if the request did not
+            arrive or finish within timeout
+
+        Raises:
+            ProfilerBusyError: Another profile or trace is running
+        """
+        self._acquire()
+        trace = _Trace(request_id, Profile(hz or self.default_hz), include_idle)
+        self._install_task_factory()
+        self._trace = trace
+        try:
+            self.traces += 1
+            try:
+                await asyncio.wait_for(trace.done.wait(), min(timeout, self.max_seconds))
+                completed = True
+            except asyncio.TimeoutError:
+                completed = False
+            return trace.profile, completed
+        finally:
+            self._trace = None
+            trace.stop.set()
+            if trace.thread is not None:
+                await asyncio.get_running_loop().run_in_executor(None, trace.thread.join)
+            if trace.started.is_set():
+                trace.profile.duration = time.monotonic() - trace.profile.started
+            self._busy = False
+
+    def _install_task_factory(self):
+        loop = self._loop
+        if loop.get_task_factory() is not None:
+            return
+
+        def task_factory(loop, coro, **kwargs):
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+            trace = self._trace
+            if trace is not None:
+                context = kwargs.get("context")
+                request_id = context.get(request_id_var) if context is not None else request_id_var.get()
+                if request_id == trace.request_id:
+                    self._tasks[task] = request_id
+            return task
+
+        loop.set_task_factory(task_factory)
+
+    def begin_request(self, request_id: str) -> Optional[_Trace]:
+        """Called by the request middleware; starts sampling if this request is traced."""
+        trace = self._trace
+        if trace is None or trace.request_id != request_id or trace.started.is_set():
+            return None
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks[task] = request_id
+        trace.profile.started = time.monotonic()
+        trace.started.set()
+        trace.thread = self._start_thread(trace.profile, trace.stop, trace.include_idle, request_id)
+        return trace
+
+    def end_request(self, trace: _Trace):
+        trace.stop.set()
+        trace.done.set()
+
+    async def end_after(self, trace: _Trace, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Wrap a response body so the trace ends when it is fully sent."""
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self.end_request(trace)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "busy": self._busy,
+            "tracing": self._trace.request_id if self._trace else None,
+            "profiles": self.profiles,
+            "traces": self.traces,
+            "max_seconds": self.max_seconds,
+            "default_hz": self.default_hz,
+        }
+
+
+# Global profiler
+profiler = SamplingProfiler(max_seconds=settings.profiler_max_seconds, default_hz=settings.profiler_default_hz)
@@ -19,6 +19,17 @@ from claude_code_api.core.config import settings
 from claude_code_api.core.database import create_tables, close_database
 from claude_code_api.core.session_manager import SessionManager
 from claude_code_api.core.claude_manager import ClaudeManager
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.core.loop_monitor import loop_monitor
+from claude_code_api.core.log_pipeline import log_pipeline
+from claude_code_api.services.file_index import file_index_manager
+from claude_code_api.services.trigram_index import trigram_index_manager
+from claude_code_api.services.tree_sync import tree_sync
+from claude_code_api.services.repo_pool import repo_pool
+from claude_code_api.services.commit_log import commit_log
+from claude_code_api.services.search_index import search_index
+from claude_code_api.services.file_watcher import file_watcher
+from claude_code_api.services.content_search import content_search
 from claude_code_api.api.chat import router as chat_router
 from claude_code_api.api.models import router as models_router
 from claude_code_api.api.projects import router as projects_router
@@ -38,25 +49,18 @@ from claude_code_api.api.batch import router as batch_router
 from claude_code_api.api.search import router as search_router
 from claude_code_api.api.webhooks import router as webhooks_router
 from claude_code_api.api.health_extended import router as health_extended_router
+from claude_code_api.api.monitoring import router as monitoring_router
 from claude_code_api.core.auth import auth_middleware
 from claude_code_api.middleware.rate_limit import rate_limit_middleware
+from claude_code_api.middleware.quota_middleware import quota_middleware
 from claude_code_api.middleware.cache_middleware import cache_middleware
 from claude_code_api.middleware.logging_middleware import logging_middleware
 
 
 # Configure structured logging
 structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
-    ],
+    # Sampling and rendering happen in the log pipeline (core/log_pipeline.py)
+    processors=log_pipeline.processors(),
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
     wrapper_class=structlog.stdlib.BoundLogger,
@@ -69,6 +73,9 @@ logger = structlog.get_logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
+    # Render and write log events off the event loop
+    if settings.log_async:
+        log_pipeline.start()
     logger.info("Starting Claude Code API Gateway", version="1.0.0")
     
     # Initialize database
@@ -79,6 +86,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     app.state.session_manager = SessionManager()
     app.state.claude_manager = ClaudeManager()
     logger.info("Managers initialized")
+
+    # Watch for callbacks that block the event loop
+    loop_monitor.start()
     
     # Verify Claude Code availability
     try:
@@ -96,8 +106,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Cleanup
     logger.info("Shutting down Claude Code API Gateway")
     await app.state.session_manager.cleanup_all()
+    await loop_monitor.stop()
+    await trigram_index_manager.shutdown()
+    tree_sync.shutdown()
+    await commit_log.shutdown()
+    await search_index.shutdown()
+    repo_pool.close_all()
+    await file_index_manager.shutdown()
+    await file_watcher.stop_all()
+    content_search.shutdown()
+    blocking_executor.shutdown()
     await close_database()
     logger.info("Shutdown complete")
+    log_pipeline.stop()
 
 
 app = FastAPI(
@@ -122,6 +143,7 @@ app.add_middleware(
 app.middleware("http")(auth_middleware)
 app.middleware("http")(logging_middleware)
 app.middleware("http")(rate_limit_middleware)
+app.middleware("http")(quota_middleware)
 app.middleware("http")(cache_middleware)
 
 
@@ -209,6 +231,7 @@ app.include_router(batch_router, prefix="/v1", tags=["batch"])
 app.include_router(search_router, prefix="/v1", tags=["search"])
 app.include_router(webhooks_router, prefix="/v1", tags=["webhooks"])
 app.include_router(health_extended_router, prefix="/v1", tags=["health"])
+app.include_router(monitoring_router, prefix="/v1", tags=["monitoring"])
 
 
 if __name__ == "__main__":
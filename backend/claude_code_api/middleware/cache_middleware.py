@@ -6,6 +6,7 @@ from fastapi.responses import Response, JSONResponse
 import structlog
 
 from claude_code_api.services.cache_service import cache_service
+from claude_code_api.utils.metrics import metrics
 
 logger = structlog.get_logger()
 
@@ -73,6 +74,7 @@ async def cache_middleware(request: Request, call_next):
     # Check cache
     cached_response = cache_service.get(namespace_str, cache_key)
     
+    metrics.increment("http_cache_lookups", namespace=namespace_str, result="hit" if cached_response else "miss")
     if cached_response:
         logger.debug(
             "Cache hit",
@@ -1,21 +1,55 @@
 """Request/response logging middleware."""
 
+import re
 import time
 import uuid
 from fastapi import Request
 import structlog
 
+from claude_code_api.core.profiler import profiler, request_id_var
+from claude_code_api.utils.metrics import metrics
+
 logger = structlog.get_logger()
 
+# Client-supplied X-Request-ID values that are kept as the request id
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def route_label(request: Request) -> str:
+    """Route template (`/v1/files/{path}`), so labels stay bounded."""
+    route = request.scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # The matched route may not carry its router prefix; recover it from the URL
+    try:
+        rendered = path_format.format(**request.path_params)
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = request.url.path
+    return path[:-len(rendered)] + path_format if rendered and path.endswith(rendered) else path_format
+
+
+def record_request(request: Request, status_code: int, duration_ms: float):
+    route = route_label(request)
+    metrics.increment("http_requests", method=request.method, route=route, status=status_code)
+    metrics.record_time("http_request_duration_ms", duration_ms, method=request.method, route=route)
+
 
 async def logging_middleware(request: Request, call_next):
     """
     Log all requests and responses with timing.
 
-    Adds request_id for tracing.
+    Adds request_id for tracing; a well-formed X-Request-ID from the
+    client is kept, so a profiler trace can be armed for it.
     """
-    request_id = str(uuid.uuid4())[:8]
+    request_id = request.headers.get("x-request-id", "")
+    if not REQUEST_ID_RE.match(request_id):
+        request_id = str(uuid.uuid4())[:8]
+    request_id_var.set(request_id)
+    trace = profiler.begin_request(request_id)
     start_time = time.time()
+    started = time.perf_counter()
 
     # Log request
     logger.info(
@@ -32,8 +66,9 @@ async def logging_middleware(request: Request, call_next):
     try:
         response = await call_next(request)
 
-        # Calculate duration
+        # Calculate duration (streaming responses: until headers are sent)
         duration_ms = int((time.time() - start_time) * 1000)
+        record_request(request, response.status_code, (time.perf_counter() - started) * 1000)
 
         # Log response
         logger.info(
@@ -49,10 +84,19 @@ async def logging_middleware(request: Request, call_next):
         response.headers["X-Request-ID"] = request_id
         response.headers["X-Response-Time"] = f"{duration_ms}ms"
 
+        if trace is not None:
+            if hasattr(response, "body_iterator"):
+                response.body_iterator = profiler.end_after(trace, response.body_iterator)
+            else:
+                profiler.end_request(trace)
+
         return response
 
     except Exception as e:
         duration_ms = int((time.time() - start_time) * 1000)
+        record_request(request, 500, (time.perf_counter() - started) * 1000)
+        if trace is not None:
+            profiler.end_request(trace)
 
         logger.error(
             "Request failed",
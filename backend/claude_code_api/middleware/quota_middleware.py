@@ -0,0 +1,28 @@
+"""Quota headers middleware."""
+
+from fastapi import Request
+import structlog
+
+from claude_code_api.services.quota_service import quota_manager
+
+logger = structlog.get_logger()
+
+
+async def quota_middleware(request: Request, call_next):
+    """
+    Attach X-Quota-* headers describing the caller's remaining budget.
+
+    Admission and settlement happen in the routes that consume tokens
+    (chat completions); this only reports the current state.
+    """
+    response = await call_next(request)
+
+    if not quota_manager.enabled:
+        return response
+
+    client_id = getattr(request.state, "client_id", None)
+    if client_id:
+        for header, value in quota_manager.get_headers(client_id).items():
+            response.headers.setdefault(header, value)
+
+    return response
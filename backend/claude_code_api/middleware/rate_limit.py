@@ -1,10 +1,13 @@
 """Rate limiting middleware using sliding window algorithm."""
 
+import time
+
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 import structlog
 
 from claude_code_api.services.rate_limiter_advanced import SlidingWindowRateLimiter
+from claude_code_api.utils.metrics import metrics
 
 logger = structlog.get_logger()
 
@@ -26,6 +29,7 @@ async def rate_limit_middleware(request: Request, call_next):
     is_allowed, remaining = rate_limiter.is_allowed(client_ip)
     
     if not is_allowed:
+        metrics.increment("rate_limit_rejections", reason="rate_limit")
         logger.warning(
             "Rate limit exceeded",
             client_ip=client_ip,
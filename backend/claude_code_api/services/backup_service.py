@@ -2,28 +2,47 @@
 
 import shutil
 import gzip
+import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 import structlog
 
+from claude_code_api.services.blob_store import BlobStore
+
 logger = structlog.get_logger()
 
+# Chunk size for deduplicated backups (a multiple of SQLite's page size,
+# so unchanged pages land in unchanged chunks)
+CHUNK_SIZE = 1024 * 1024
+
+CHUNKED_SUFFIX = ".chunks"
+
 
 class BackupService:
     """Manages database backups."""
 
-    def __init__(self, db_path: str, backup_dir: str = "./backups"):
+    def __init__(self, db_path: str, backup_dir: str = "./backups", blob_store: Optional[BlobStore] = None):
         self.db_path = Path(db_path)
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(exist_ok=True)
+        self.blob_store = blob_store
 
-    def create_backup(self, compress: bool = True) -> str:
-        """Create database backup."""
+    def create_backup(self, compress: bool = True, dedup: bool = False) -> str:
+        """
+        Create database backup.
+
+        With dedup (and a blob store), the database is split into fixed-size
+        chunks stored in the blob store and the backup is a small manifest;
+        chunks that did not change since an earlier backup are not stored
+        again. compress applies only to full-copy backups.
+        """
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         backup_name = f"claude_api_{timestamp}.db"
 
-        if compress:
+        if dedup and self.blob_store is not None:
+            backup_path = self._create_chunked_backup(backup_name + CHUNKED_SUFFIX)
+        elif compress:
             backup_name += ".gz"
             backup_path = self.backup_dir / backup_name
 
@@ -38,6 +57,34 @@ class BackupService:
 
         return str(backup_path)
 
+    def _create_chunked_backup(self, backup_name: str) -> Path:
+        chunks = []
+        size = 0
+        with open(self.db_path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(self.blob_store.put_bytes(chunk))
+                size += len(chunk)
+
+        for i, digest in enumerate(chunks):
+            self.blob_store.add_ref(digest, f"backup:{backup_name}:{i}")
+
+        backup_path = self.backup_dir / backup_name
+        tmp = backup_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"size": size, "chunk_size": CHUNK_SIZE, "chunks": chunks}))
+        tmp.replace(backup_path)
+        return backup_path
+
+    def _restore_chunked_backup(self, backup_path: Path):
+        manifest = json.loads(backup_path.read_text())
+        tmp = self.db_path.with_name(self.db_path.name + ".restore")
+        with open(tmp, "wb") as f_out:
+            for digest in manifest["chunks"]:
+                f_out.write(self.blob_store.read(digest))
+        tmp.replace(self.db_path)
+
     def list_backups(self) -> List[Dict]:
         """List all backups."""
         backups = []
@@ -65,7 +112,11 @@ class BackupService:
         logger.info("Created safety backup of current database", path=current_backup)
 
         try:
-            if backup_filename.endswith('.gz'):
+            if backup_filename.endswith(CHUNKED_SUFFIX):
+                if self.blob_store is None:
+                    raise RuntimeError("Deduplicated backup requires the blob store")
+                self._restore_chunked_backup(backup_path)
+            elif backup_filename.endswith('.gz'):
                 # Decompress
                 with gzip.open(backup_path, 'rb') as f_in:
                     with open(self.db_path, 'wb') as f_out:
@@ -89,6 +140,9 @@ class BackupService:
 
         removed = 0
         for backup in backups[keep_count:]:
+            if backup.name.endswith(CHUNKED_SUFFIX) and self.blob_store is not None:
+                # Chunks are freed by the next blob store GC
+                self.blob_store.release_prefix(f"backup:{backup.name}:")
             backup.unlink()
             removed += 1
 
@@ -0,0 +1,214 @@
+"""
+Batch Engine
+
+Runs a batch of operations as a DAG:
+- Operations without unmet dependencies run concurrently, at most
+  max_concurrent at a time
+- `depends_on` edges hold an operation until everything it depends on
+  has succeeded; if one fails, the dependent is skipped
+- With fail_fast, the first failure cancels running operations and
+  skips the ones not started yet. Operations the caller marks as not
+  cancellable (work already handed to a thread that would carry on
+  anyway) are awaited instead and reported as they actually ended
+- Results are yielded as operations finish, so callers can stream them
+
+The engine knows nothing about what an operation does; callers pass an
+async `execute(node)` callable.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import structlog
+
+from claude_code_api.core.config import settings
+
+logger = structlog.get_logger()
+
+# Result statuses
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+
+class BatchValidationError(Exception):
+    """Duplicate ids, unknown dependencies or a dependency cycle."""
+    pass
+
+
+@dataclass
+class BatchNode:
+    """One operation of a batch."""
+    id: str
+    index: int
+    operation: str
+    params: Dict[str, Any]
+    depends_on: List[str] = field(default_factory=list)
+
+
+def validate_dag(nodes: List[BatchNode]) -> List[BatchNode]:
+    """
+    Check ids and edges.
+
+    Returns:
+        Nodes in a topological order
+
+    Raises:
+        BatchValidationError: Duplicate id, unknown dependency or cycle
+    """
+    by_id: Dict[str, BatchNode] = {}
+    for node in nodes:
+        if node.id in by_id:
+            raise BatchValidationError(f"Duplicate operation id: {node.id}")
+        by_id[node.id] = node
+
+    indegree = {node.id: 0 for node in nodes}
+    dependents: Dict[str, List[str]] = {node.id: [] for node in nodes}
+    for node in nodes:
+        for dep in dict.fromkeys(node.depends_on):
+            if dep not in by_id:
+                raise BatchValidationError(f"Operation {node.id} depends on unknown id: {dep}")
+            if dep == node.id:
+                raise BatchValidationError(f"Operation {node.id} depends on itself")
+            indegree[node.id] += 1
+            dependents[dep].append(node.id)
+
+    ready = [node.id for node in nodes if indegree[node.id] == 0]
+    order = []
+    while ready:
+        node_id = ready.pop(0)
+        order.append(by_id[node_id])
+        for child in dependents[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if len(order) != len(nodes):
+        cyclic = sorted(node_id for node_id, degree in indegree.items() if degree > 0)
+        raise BatchValidationError(f"Dependency cycle between operations: {', '.join(cyclic)}")
+    return order
+
+
+class BatchEngine:
+    """Concurrent DAG scheduler for batch operations."""
+
+    def __init__(self, max_concurrent: int = 8):
+        self.max_concurrent = max_concurrent
+
+        self.batches = 0
+        self.operations = 0
+        self.cancelled = 0
+
+    async def run(
+        self,
+        nodes: List[BatchNode],
+        execute: Callable[[BatchNode], Awaitable[Any]],
+        fail_fast: bool = False,
+        cancellable: Optional[Callable[[BatchNode], bool]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run nodes, yielding one result per node as it settles.
+
+        Args:
+            nodes: Operations (validate with validate_dag first)
+            execute: Runs one node and returns its data, or raises
+            fail_fast: Cancel and skip everything after the first failure
+            cancellable: Whether a running node may be cancelled (default:
+                all); the others are left to finish
+
+        Yields:
+            {"id", "index", "operation", "status", "success", "data",
+            "error", "ms"}; status is ok, failed, skipped or cancelled
+        """
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        # Request order decides who starts first when more are ready than slots
+        waiting = {node.id: node for node in sorted(nodes, key=lambda n: n.index)}
+        status: Dict[str, str] = {}
+        running: Dict[asyncio.Task, BatchNode] = {}
+        failed = False
+        cancellable = cancellable or (lambda node: True)
+
+        async def timed(node: BatchNode):
+            started = loop.time()
+            data = await execute(node)
+            return data, round((loop.time() - started) * 1000, 1)
+
+        def result(node: BatchNode, state: str, data: Any = None, error: Optional[str] = None, ms: float = 0.0):
+            status[node.id] = state
+            return {
+                "id": node.id,
+                "index": node.index,
+                "operation": node.operation,
+                "status": state,
+                "success": state == OK,
+                "data": data,
+                "error": error,
+                "ms": ms,
+            }
+
+        try:
+            while waiting or running:
+                # Settle nodes whose dependencies are done
+                for node in list(waiting.values()):
+                    states = [status.get(dep) for dep in node.depends_on]
+                    if failed and fail_fast:
+                        del waiting[node.id]
+                        yield result(node, SKIPPED, error="Skipped after an earlier failure (fail_fast)")
+                    elif any(s is not None and s != OK for s in states):
+                        del waiting[node.id]
+                        dep = next(d for d, s in zip(node.depends_on, states) if s is not None and s != OK)
+                        yield result(node, SKIPPED, error=f"Dependency {dep} did not succeed")
+                    elif all(s == OK for s in states) and len(running) < self.max_concurrent:
+                        del waiting[node.id]
+                        running[asyncio.ensure_future(timed(node))] = node
+
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    self.operations += 1
+                    try:
+                        data, ms = task.result()
+                    except asyncio.CancelledError:
+                        yield result(node, CANCELLED, error="Cancelled")
+                        continue
+                    except Exception as e:
+                        logger.error("Batch operation failed", id=node.id, operation=node.operation, error=str(e))
+                        failed = True
+                        yield result(node, FAILED, error=str(e))
+                        continue
+                    yield result(node, OK, data=data, ms=ms)
+
+                if failed and fail_fast:
+                    stoppable = [task for task, node in running.items() if cancellable(node)]
+                    for task in stoppable:
+                        task.cancel()
+                    await asyncio.gather(*stoppable, return_exceptions=True)
+                    for task in stoppable:
+                        # One that finished before the cancel is reported by the next wait
+                        if task.cancelled():
+                            self.cancelled += 1
+                            yield result(running.pop(task), CANCELLED,
+                                         error="Cancelled after an earlier failure (fail_fast)")
+        finally:
+            # Consumer went away mid-stream
+            for task, node in running.items():
+                if cancellable(node):
+                    task.cancel()
+                else:
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "batches": self.batches,
+            "operations": self.operations,
+            "cancelled": self.cancelled,
+        }
+
+
+# Global batch engine
+batch_engine = BatchEngine(max_concurrent=settings.batch_max_concurrent)
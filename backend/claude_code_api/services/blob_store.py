@@ -0,0 +1,458 @@
+"""
+Blob Store
+
+Content-addressed storage keyed by SHA-256 (the hash clients already
+compute for uploads):
+- Objects live in BLOB_STORE_DIR/objects/ab/cd/<digest>
+- References (a project path, a backup chunk, ...) are counted in a small
+  SQLite table; a blob with no references is removed by gc()
+- Blobs are materialized into project paths by reflink (copy-on-write)
+  where the filesystem supports it, otherwise by plain copy
+- Uploads are only deduplicated where that saves something: on a volume
+  where linking would fall back to copying (probed once per device),
+  ingest() leaves the file as written, references a blob it already has
+  and does not copy new content into the store
+
+Hardlinks are only used when link_mode is "hardlink", which is meant for
+stores whose files are never edited in place: a hardlinked file shares an
+inode with its blob and every other copy, so rewriting it in place
+changes them all. In that mode link_into() rehashes a blob before handing
+it out and discards it if it was modified. Path references record the
+size and mtime at link time; gc() drops references whose file changed
+and, with verify=True, rehashes every blob.
+"""
+
+import ctypes
+import errno
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import structlog
+
+from claude_code_api.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = structlog.get_logger()
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+HASH_CHUNK = 1024 * 1024
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+
+class BlobNotFoundError(Exception):
+    """No blob with this digest."""
+    pass
+
+
+class InvalidDigestError(Exception):
+    """Digest is not a SHA-256 hex string."""
+    pass
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, streamed."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Copy-on-write clone of src to a new file dst; False if unsupported."""
+    try:
+        if sys.platform == "darwin":
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        if fcntl is None or not sys.platform.startswith("linux"):
+            return False
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except (OSError, AttributeError):
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+
+
+class BlobStore:
+    """Content-addressed, reference-counted blob storage."""
+
+    def __init__(self, root: str, link_mode: str = "auto"):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"link_mode must be one of {LINK_MODES}")
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.link_mode = link_mode
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # st_dev -> whether blobs can be linked there without copying
+        self._shares_by_dev: Dict[int, bool] = {}
+
+        # Counters
+        self.dedup_hits = 0
+        self.bytes_saved = 0
+        self.links = {"reflink": 0, "hardlink": 0, "copy": 0}
+
+    # Storage layout
+
+    @staticmethod
+    def validate_digest(digest: str) -> str:
+        """
+        Normalize a hex SHA-256 digest.
+
+        Raises:
+            InvalidDigestError: Not 64 hex characters
+        """
+        digest = digest.lower()
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise InvalidDigestError(f"Invalid SHA-256 digest: {digest}")
+        return digest
+
+    def path_for(self, digest: str) -> Path:
+        digest = self.validate_digest(digest)
+        return self.objects / digest[:2] / digest[2:4] / digest
+
+    def has(self, digest: str) -> bool:
+        """Whether a blob is present."""
+        return self.path_for(digest).exists()
+
+    def missing(self, digests: Iterable[str]) -> List[str]:
+        """Digests not in the store (for upload pre-checks)."""
+        return [d.lower() for d in digests if not self.has(d)]
+
+    # References
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.root / "refs.db"), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                " ref TEXT PRIMARY KEY, digest TEXT NOT NULL,"
+                " size INTEGER, mtime_ns INTEGER, created_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS refs_digest ON refs (digest)")
+        return self._db
+
+    def add_ref(self, digest: str, ref: str, st: Optional[os.stat_result] = None):
+        """Point ref at digest (replacing what it pointed at before)."""
+        digest = self.validate_digest(digest)
+        with self._lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?, ?)",
+                (ref, digest, st.st_size if st else None, st.st_mtime_ns if st else None, time.time()),
+            )
+            conn.commit()
+
+    def release(self, ref: str) -> bool:
+        """Drop a reference; the blob goes at the next gc() if unreferenced."""
+        with self._lock:
+            conn = self._conn()
+            cursor = conn.execute("DELETE FROM refs WHERE ref = ?", (ref,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def release_prefix(self, prefix: str) -> int:
+        """Drop every reference starting with prefix (e.g. one backup's chunks)."""
+        with self._lock:
+            conn = self._conn()
+            cursor = conn.execute("DELETE FROM refs WHERE substr(ref, 1, ?) = ?", (len(prefix), prefix))
+            conn.commit()
+            return cursor.rowcount
+
+    def refcount(self, digest: str) -> int:
+        digest = self.validate_digest(digest)
+        with self._lock:
+            row = self._conn().execute("SELECT COUNT(*) FROM refs WHERE digest = ?", (digest,)).fetchone()
+        return row[0]
+
+    # Adding content
+
+    def put_file(self, path: Path, digest: Optional[str] = None) -> str:
+        """
+        Add a file's content to the store (the file itself is left in place).
+
+        Returns:
+            The content digest
+        """
+        digest = self.validate_digest(digest or file_digest(str(path)))
+        blob = self.path_for(digest)
+        if blob.exists():
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            self._materialize(path, tmp)
+            os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        """Add an in-memory chunk; returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.path_for(digest)
+        if blob.exists():
+            self.dedup_hits += 1
+            self.bytes_saved += len(data)
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        """
+        Read a blob.
+
+        Raises:
+            BlobNotFoundError: Unknown digest
+        """
+        try:
+            return self.path_for(digest).read_bytes()
+        except FileNotFoundError:
+            raise BlobNotFoundError(f"Blob not found: {digest}")
+
+    def _materialize(self, src: Path, dst: Path) -> str:
+        """Create dst with src's content; returns the method used."""
+        mode = self.link_mode
+        if mode in ("auto", "reflink") and _reflink(str(src), str(dst)):
+            method = "reflink"
+        elif mode == "hardlink" and self._hardlink(src, dst):
+            method = "hardlink"
+        else:
+            shutil.copyfile(src, dst)
+            method = "copy"
+        self.links[method] += 1
+        return method
+
+    def _discard(self, digest: str):
+        """Remove a blob whose content no longer matches its digest."""
+        logger.warning("Discarding modified blob", digest=digest)
+        with self._lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+            conn.commit()
+        self.path_for(digest).unlink(missing_ok=True)
+
+    @staticmethod
+    def _hardlink(src: Path, dst: Path) -> bool:
+        try:
+            os.link(src, dst)
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            return False
+
+    def _probe(self, directory: Path) -> bool:
+        """Try linking a scratch blob into directory with the configured mode."""
+        self.objects.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex
+        src = self.objects / f".probe.{token}.tmp"
+        dst = directory / f".blob-probe.{token}.tmp"
+        try:
+            src.write_bytes(b"probe")
+            if self.link_mode == "hardlink":
+                return self._hardlink(src, dst)
+            return _reflink(str(src), str(dst))
+        except OSError:
+            return False
+        finally:
+            src.unlink(missing_ok=True)
+            dst.unlink(missing_ok=True)
+
+    def shares(self, directory: Path) -> bool:
+        """Whether blobs can be linked into directory without a full copy."""
+        if self.link_mode == "copy":
+            return False
+        try:
+            dev = directory.stat().st_dev
+        except OSError:
+            return False
+        shared = self._shares_by_dev.get(dev)
+        if shared is None:
+            shared = self._shares_by_dev[dev] = self._probe(directory)
+            logger.info("Blob store link probe", directory=str(directory), link_mode=self.link_mode, shared=shared)
+        return shared
+
+    # Project files
+
+    def link_into(self, digest: str, destination: Path, overwrite: bool = False) -> str:
+        """
+        Materialize a blob at destination and reference it.
+
+        Returns:
+            Method used: "reflink", "hardlink" or "copy"
+
+        Raises:
+            BlobNotFoundError: Unknown digest, or the blob was modified
+                through a hardlink (it is discarded)
+            FileExistsError: Destination exists and overwrite is False
+        """
+        digest = self.validate_digest(digest)
+        blob = self.path_for(digest)
+        if not blob.exists():
+            raise BlobNotFoundError(f"Blob not found: {digest}")
+        if not overwrite and destination.exists():
+            raise FileExistsError(f"File already exists: {destination}")
+        if self.link_mode == "hardlink" and file_digest(str(blob)) != digest:
+            self._discard(digest)
+            raise BlobNotFoundError(f"Blob not found: {digest}")
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destination.parent / f".{destination.name}.{uuid.uuid4().hex}.part"
+        try:
+            method = self._materialize(blob, tmp)
+            os.replace(tmp, destination)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.add_ref(digest, str(destination), destination.stat())
+        return method
+
+    def ingest(self, path: Path, digest: Optional[str] = None) -> bool:
+        """
+        Deduplicate a freshly written file against the store.
+
+        If the content is already stored, the file is replaced by a link to
+        the blob; otherwise the blob is created from it. Where linking would
+        only copy, the file is left as written: known content is just
+        referenced and new content is not stored.
+
+        Returns:
+            True if the content was already present
+        """
+        digest = self.validate_digest(digest or file_digest(str(path)))
+        if not self.shares(path.parent):
+            if not self.has(digest):
+                return False
+            self.add_ref(digest, str(path), path.stat())
+            return True
+        if self.has(digest):
+            size = path.stat().st_size
+            try:
+                method = self.link_into(digest, path, overwrite=True)
+            except BlobNotFoundError:
+                method = None  # Modified blob was discarded; store this copy instead
+            if method is not None:
+                self.dedup_hits += 1
+                if method != "copy":
+                    self.bytes_saved += size
+                return True
+        self.put_file(path, digest)
+        self.add_ref(digest, str(path), path.stat())
+        return False
+
+    # Garbage collection
+
+    def gc(self, grace_seconds: float = 3600, verify: bool = False) -> Dict[str, Any]:
+        """
+        Drop stale path references and remove unreferenced blobs.
+
+        Args:
+            grace_seconds: Keep unreferenced blobs younger than this (an
+                upload may be about to reference them)
+            verify: Rehash every blob and discard corrupted ones
+
+        Returns:
+            Counts of dropped references, removed blobs and freed bytes
+        """
+        dropped = 0
+        with self._lock:
+            conn = self._conn()
+            rows = conn.execute("SELECT ref, size, mtime_ns FROM refs WHERE ref LIKE '/%'").fetchall()
+        for ref, size, mtime_ns in rows:
+            try:
+                st = os.stat(ref)
+                stale = (st.st_size, st.st_mtime_ns) != (size, mtime_ns)
+            except OSError:
+                stale = True
+            if stale and self.release(ref):
+                dropped += 1
+
+        with self._lock:
+            referenced = {row[0] for row in self._conn().execute("SELECT DISTINCT digest FROM refs")}
+
+        removed = 0
+        freed = 0
+        corrupted = 0
+        cutoff = time.time() - grace_seconds
+        if self.objects.exists():
+            for blob in self.objects.glob("*/*/*"):
+                name = blob.name
+                try:
+                    st = blob.stat()
+                except OSError:
+                    continue
+                if name.endswith(".tmp"):
+                    if st.st_mtime < cutoff:
+                        blob.unlink(missing_ok=True)
+                    continue
+                if verify and file_digest(str(blob)) != name:
+                    # Modified through a hardlink; the content is no longer name
+                    corrupted += 1
+                    with self._lock:
+                        conn = self._conn()
+                        conn.execute("DELETE FROM refs WHERE digest = ?", (name,))
+                        conn.commit()
+                    referenced.discard(name)
+                elif name in referenced or st.st_mtime >= cutoff:
+                    continue
+                blob.unlink(missing_ok=True)
+                removed += 1
+                freed += st.st_size
+
+        logger.info("Blob store GC", dropped_refs=dropped, removed=removed, freed_bytes=freed, corrupted=corrupted)
+        return {"dropped_refs": dropped, "removed": removed, "freed_bytes": freed, "corrupted": corrupted}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        blobs = 0
+        size = 0
+        if self.objects.exists():
+            for blob in self.objects.glob("*/*/*"):
+                if blob.name.endswith(".tmp"):
+                    continue
+                blobs += 1
+                size += blob.stat().st_size
+        with self._lock:
+            refs = self._conn().execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        return {
+            "root": str(self.root),
+            "link_mode": self.link_mode,
+            "blobs": blobs,
+            "size_bytes": size,
+            "refs": refs,
+            "dedup_hits": self.dedup_hits,
+            "bytes_saved": self.bytes_saved,
+            "links": dict(self.links),
+            "sharing_devices": {str(dev): shared for dev, shared in self._shares_by_dev.items()},
+        }
+
+
+# Global blob store
+blob_store = BlobStore(root=settings.blob_store_dir, link_mode=settings.blob_link_mode)
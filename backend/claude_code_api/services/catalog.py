@@ -0,0 +1,208 @@
+"""
+Skills and Agents Catalog
+
+In-memory catalog of ~/.claude/skills/<name>/SKILL.md and
+~/.claude/agents/<name>/AGENT.md:
+- Front matter is parsed with YAML (PyYAML, installed with
+  uvicorn[standard]); a plain `key: value` reader is the fallback when it
+  is missing or the block is not valid YAML
+- Entries are cached by (mtime, size); revalidating is one stat per entry
+  and only changed files are read again
+- Revalidation runs when the file watcher reports a change, or, without
+  watchfiles, when the last check is older than the revalidate interval
+- Every listing carries an ETag derived from all entry signatures, so
+  clients can poll with If-None-Match
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.file_watcher import file_watcher
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    yaml = None
+    YAML_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+FRONT_MATTER_RE = re.compile(r"\A---[ \t]*\r?\n(.*?)^---[ \t]*\r?$\n?", re.DOTALL | re.MULTILINE)
+
+# Body text kept per entry for search
+MAX_BODY_CHARS = 64 * 1024
+
+
+def _simple_front_matter(block: str) -> Dict[str, Any]:
+    """`key: value` lines only (fallback parser)."""
+    meta = {}
+    for line in block.splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not key.startswith((" ", "\t", "#", "-")):
+            meta[key.strip()] = value.strip().strip("'\"")
+    return meta
+
+
+def parse_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Split a markdown document into front matter and body.
+
+    Returns:
+        (metadata dict, body); metadata is empty when there is no
+        front matter block
+    """
+    match = FRONT_MATTER_RE.match(text)
+    if not match:
+        return {}, text
+    block, body = match.group(1), text[match.end():]
+
+    meta: Any = None
+    if YAML_AVAILABLE:
+        try:
+            meta = yaml.safe_load(block)
+        except yaml.YAMLError:
+            meta = None
+    if not isinstance(meta, dict):
+        meta = _simple_front_matter(block)
+    # Dates and other YAML types become strings, so entries stay JSON-safe
+    return json.loads(json.dumps({str(k): v for k, v in meta.items()}, default=str)), body
+
+
+def read_entry(name: str, path: str, st: os.stat_result) -> Dict[str, Any]:
+    """Parse one catalog file (blocking)."""
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8", "replace")
+    meta, body = parse_front_matter(text)
+    description = meta.get("description")
+    return {
+        "name": name,
+        "path": path,
+        "description": description if isinstance(description, str) else "",
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "metadata": meta,
+        "body": body.strip()[:MAX_BODY_CHARS],
+    }
+
+
+class Catalog:
+    """Cached entries of one catalog directory (<directory>/<name>/<filename>)."""
+
+    def __init__(self, kind: str, directory: Path, filename: str, revalidate_seconds: float = 2.0,
+                 watch: bool = True):
+        self.kind = kind
+        self.directory = Path(directory)
+        self.filename = filename
+        self.revalidate_seconds = revalidate_seconds
+        self.watch = watch
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._stale = True
+        self._watch_id: Optional[str] = None
+        self.etag = '"0"'
+
+        self.revalidations = 0
+        self.reads = 0
+
+    def revalidate(self) -> bool:
+        """Stat every entry and re-read changed ones (blocking); True if anything changed."""
+        with self._lock:
+            self.revalidations += 1
+            self._stale = False
+            self._checked_at = time.monotonic()
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            entries: Dict[str, Dict[str, Any]] = {}
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if not item.is_dir():
+                        continue
+                    path = os.path.join(item.path, self.filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    cached = self._entries.get(item.name)
+                    if cached is not None and (cached["mtime_ns"], cached["size"]) == (st.st_mtime_ns, st.st_size):
+                        entries[item.name] = cached
+                        continue
+                    try:
+                        entries[item.name] = read_entry(item.name, path, st)
+                        self.reads += 1
+                    except OSError as e:
+                        logger.warning("Failed to read catalog entry", kind=self.kind, path=path, error=str(e))
+
+            changed = entries.keys() != self._entries.keys() or any(
+                entries[name] is not self._entries[name] for name in entries
+            )
+            if changed or self.etag == '"0"':
+                self._entries = entries
+                signature = "\n".join(
+                    f"{name}:{entry['mtime_ns']}:{entry['size']}" for name, entry in sorted(entries.items())
+                )
+                self.etag = '"' + hashlib.sha1(signature.encode()).hexdigest()[:16] + '"'
+            return changed
+
+    def _watch(self):
+        """Revalidate on file system events (needs the event loop)."""
+        if self._watch_id is not None or not self.watch or not file_watcher.available:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        def on_change(changes):
+            self._stale = True
+
+        self._watch_id = file_watcher.start_watch(str(self.directory), on_change=on_change)
+
+    def _needs_revalidate(self) -> bool:
+        if self._stale or self._checked_at is None:
+            return True
+        if self._watch_id is not None:
+            return False
+        return time.monotonic() - self._checked_at >= self.revalidate_seconds
+
+    async def entries(self) -> Tuple[List[Dict[str, Any]], str]:
+        """All entries sorted by name, and the catalog ETag."""
+        self._watch()
+        if self._needs_revalidate():
+            if await blocking_executor.run("file", self.revalidate):
+                logger.debug("Catalog changed", kind=self.kind, entries=len(self._entries))
+        return [self._entries[name] for name in sorted(self._entries)], self.etag
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        await self.entries()
+        return self._entries.get(name)
+
+    def invalidate(self):
+        """Revalidate on next use (after the API wrote or deleted an entry)."""
+        self._stale = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "entries": len(self._entries),
+            "etag": self.etag,
+            "watching": self._watch_id is not None,
+            "revalidations": self.revalidations,
+            "reads": self.reads,
+        }
+
+
+# Global catalogs
+skill_catalog = Catalog(
+    "skill", Path.home() / ".claude" / "skills", "SKILL.md", settings.catalog_revalidate_seconds
+)
+agent_catalog = Catalog(
+    "agent", Path.home() / ".claude" / "agents", "AGENT.md", settings.catalog_revalidate_seconds
+)
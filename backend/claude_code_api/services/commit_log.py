@@ -0,0 +1,275 @@
+"""
+Commit Log
+
+Paginated commit history with filters, on the async git runner.
+
+A page is two cheap steps: `git rev-list` selects the SHAs (with
+--grep/--author/path filters applied by git, over full history), then
+metadata is fetched with one `git log --no-walk` only for SHAs not in
+the LRU. Commits are immutable, so cached entries never go stale and
+need no invalidation.
+
+Cursors pin the commit the listing started from plus a position
+("<sha>:<offset>"), so pages stay stable while new commits land.
+
+Walking full history is fast when the repo has a commit-graph file
+(generation numbers, and Bloom filters for path-limited logs). One is
+written in the background when missing or stale.
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.services.git_runner import GitProcessError, git_runner
+
+logger = structlog.get_logger()
+
+SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+# One record per commit: \x1e then NUL-separated fields, then any --shortstat text
+LOG_FORMAT = "%x1e%H%x00%P%x00%an%x00%ae%x00%ct%x00%B%x00"
+SHORTSTAT_RE = re.compile(r"(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?")
+
+# How often a repo's commit-graph is checked
+GRAPH_CHECK_SECONDS = 60
+
+
+class InvalidCursorError(Exception):
+    """Malformed pagination cursor."""
+    pass
+
+
+class CommitLogError(Exception):
+    """git log failed (bad revision, not a repository...)."""
+    pass
+
+
+def encode_cursor(start: str, offset: int) -> str:
+    return f"{start}:{offset}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into (start SHA, offset)."""
+    sha, _, offset = cursor.partition(":")
+    if not SHA_RE.match(sha) or not offset.isdigit():
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return sha, int(offset)
+
+
+def parse_log(output: bytes) -> List[Dict[str, Any]]:
+    """Parse `git log --format=LOG_FORMAT --shortstat` output."""
+    commits = []
+    for record in output.decode("utf-8", "replace").split("\x1e"):
+        if not record:
+            continue
+        sha, parents, author, email, committed, message, stat = record.split("\x00", 6)
+        stats = SHORTSTAT_RE.search(stat)
+        commits.append({
+            "sha": sha,
+            "short_sha": sha[:7],
+            "message": message.strip(),
+            "author": author,
+            "email": email,
+            "timestamp": datetime.fromtimestamp(int(committed)).isoformat(),
+            "parents": parents.split(),
+            "files_changed": int(stats.group(1)) if stats else 0,
+            "insertions": int(stats.group(2) or 0) if stats else 0,
+            "deletions": int(stats.group(3) or 0) if stats else 0,
+        })
+    return commits
+
+
+class CommitLogService:
+    """Commit pages and search, with an LRU of parsed commits keyed by SHA."""
+
+    def __init__(self, cache_size: int = 20000, commit_graph: bool = True,
+                 commit_graph_max_age: float = 3600.0):
+        self.cache_size = cache_size
+        self.commit_graph = commit_graph
+        self.commit_graph_max_age = commit_graph_max_age
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._graph_checked: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.graph_writes = 0
+
+    async def page(
+        self,
+        repo_path: str,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        ref: str = "HEAD",
+        grep: Optional[str] = None,
+        author: Optional[str] = None,
+        path: Optional[str] = None,
+        regex: bool = False,
+        skip: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of commits, newest first.
+
+        Args:
+            repo_path: Repository path
+            cursor: next_cursor from the previous page (None = first page)
+            limit: Commits per page
+            ref: Branch, tag or SHA to list from (first page only)
+            grep: Match commit messages (case-insensitive)
+            author: Match author name or email
+            path: Only commits touching this path
+            regex: Treat grep as a regular expression (default: literal)
+            skip: Commits to skip on the first page (offset pagination)
+
+        Returns:
+            {"commits": [...], "next_cursor": str or None}
+
+        Raises:
+            InvalidCursorError: Malformed cursor
+            CommitLogError: Unknown ref or not a repository
+            OperationTimeoutError: Timed out
+        """
+        if cursor:
+            start, offset = decode_cursor(cursor)
+        else:
+            if ref.startswith("-"):
+                raise CommitLogError(f"Invalid ref: {ref}")
+            start = await self._resolve(repo_path, ref)
+            if start is None:
+                return {"commits": [], "next_cursor": None}
+            offset = skip
+
+        args = ["rev-list", f"--max-count={limit + 1}", f"--skip={offset}"]
+        if grep:
+            args += [f"--grep={grep}", "--regexp-ignore-case"]
+            if not regex:
+                args.append("--fixed-strings")
+        if author:
+            args.append(f"--author={author}")
+        args.append(start)
+        if path:
+            args += ["--", path]
+
+        try:
+            result = await git_runner.run(repo_path, args)
+        except (FileNotFoundError, NotADirectoryError, GitProcessError) as e:
+            raise CommitLogError(str(e))
+        shas = result.stdout.decode().split()
+
+        next_cursor = encode_cursor(start, offset + limit) if len(shas) > limit else None
+        commits = await self.get_commits(repo_path, shas[:limit])
+        self._maybe_write_commit_graph(repo_path)
+        return {"commits": commits, "next_cursor": next_cursor}
+
+    async def search(self, repo_path: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Commits whose message contains query, over full history."""
+        return (await self.page(repo_path, limit=limit, grep=query))["commits"]
+
+    async def _resolve(self, repo_path: str, ref: str) -> Optional[str]:
+        """SHA of ref, or None for a repository without commits."""
+        try:
+            result = await git_runner.run(
+                repo_path, ["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], check=False
+            )
+        except (FileNotFoundError, NotADirectoryError) as e:
+            raise CommitLogError(str(e))
+        if result.returncode == 0:
+            return result.stdout.decode().strip()
+        if ref == "HEAD":
+            # Unborn branch or not a repository
+            check = await git_runner.run(repo_path, ["rev-parse", "--git-dir"], check=False)
+            if check.returncode == 0:
+                return None
+            raise CommitLogError(f"Not a git repository: {repo_path}")
+        raise CommitLogError(f"Unknown revision: {ref}")
+
+    async def get_commits(self, repo_path: str, shas: List[str]) -> List[Dict[str, Any]]:
+        """Metadata for SHAs (in order), reading only uncached ones from git."""
+        missing = [sha for sha in shas if sha not in self._cache]
+        self.hits += len(shas) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            result = await git_runner.run(
+                repo_path,
+                ["log", "--no-walk=unsorted", f"--format={LOG_FORMAT}", "--shortstat", *missing],
+            )
+            for commit in parse_log(result.stdout):
+                self._cache[commit["sha"]] = commit
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        commits = []
+        for sha in shas:
+            commit = self._cache.get(sha)
+            if commit is not None:
+                self._cache.move_to_end(sha)
+                commits.append(commit)
+        return commits
+
+    # Commit-graph maintenance
+
+    def _maybe_write_commit_graph(self, repo_path: str):
+        if not self.commit_graph:
+            return
+        key = os.path.realpath(repo_path)
+        now = time.monotonic()
+        if now - self._graph_checked.get(key, -GRAPH_CHECK_SECONDS) < GRAPH_CHECK_SECONDS:
+            return
+        self._graph_checked[key] = now
+        task = asyncio.ensure_future(self._write_commit_graph(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write_commit_graph(self, repo_path: str):
+        """Write (or extend) the commit-graph if missing or older than max age."""
+        try:
+            result = await git_runner.run(repo_path, ["rev-parse", "--git-common-dir"])
+            objects = os.path.join(repo_path, result.stdout.decode().strip(), "objects", "info")
+            newest = 0.0
+            for name in ("commit-graph", os.path.join("commit-graphs", "commit-graph-chain")):
+                try:
+                    newest = max(newest, os.stat(os.path.join(objects, name)).st_mtime)
+                except OSError:
+                    pass
+            if newest and time.time() - newest < self.commit_graph_max_age:
+                return
+            # --split appends a layer instead of rewriting; Bloom filters speed up path-limited logs
+            await git_runner.run(
+                repo_path,
+                ["commit-graph", "write", "--reachable", "--split", "--changed-paths"],
+                timeout=settings.executor_index_timeout_seconds,
+            )
+            self.graph_writes += 1
+            logger.info("Commit graph written", repo=repo_path)
+        except Exception as e:
+            logger.warning("Commit graph write failed", repo=repo_path, error=str(e))
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_commits": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "graph_writes": self.graph_writes,
+        }
+
+
+# Global commit log service
+commit_log = CommitLogService(
+    cache_size=settings.git_log_cache_size,
+    commit_graph=settings.git_commit_graph_auto,
+    commit_graph_max_age=settings.git_commit_graph_max_age_seconds,
+)
@@ -0,0 +1,333 @@
+"""
+Content Search (grep)
+
+Parallel search of file contents under a project root:
+- Candidate files come from the project file index (gitignore-aware)
+- Files are memory-mapped; binary files (NUL in the first block) are skipped
+- Literal and regex patterns, optional case-insensitivity
+- Per-file hit cap; hits are yielded batch by batch while the search runs
+
+Batches run in a process pool by default (regex matching holds the GIL,
+so threads do not scale); a thread pool is used when processes are
+disabled or cannot be started.
+"""
+
+import asyncio
+import fnmatch
+import mmap
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+
+logger = structlog.get_logger()
+
+# Bytes inspected for NUL to detect binary files
+BINARY_SNIFF_BYTES = 8192
+
+# Longest line text returned per hit
+MAX_LINE_CHARS = 500
+
+
+class InvalidPatternError(Exception):
+    """Search pattern cannot be compiled."""
+    pass
+
+
+def compile_pattern(pattern: str, regex: bool = False, ignore_case: bool = False) -> "re.Pattern":
+    """
+    Compile a search pattern for matching bytes.
+
+    Raises:
+        InvalidPatternError: Empty or invalid pattern
+    """
+    if not pattern:
+        raise InvalidPatternError("Pattern must not be empty")
+    source = pattern if regex else re.escape(pattern)
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(source.encode("utf-8"), flags)
+    except re.error as e:
+        raise InvalidPatternError(f"Invalid regex: {e}")
+
+
+def search_file(
+    path: str,
+    compiled: "re.Pattern",
+    max_per_file: int,
+    max_file_size: int,
+) -> Tuple[List[Dict[str, Any]], bool, bool]:
+    """
+    Search one file.
+
+    Returns:
+        (hits, searched, truncated): hits as dicts with line/column/text,
+        whether the file was actually scanned, and whether the per-file
+        cap cut results short
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or size > max_file_size:
+                return [], False, False
+            if b"\0" in f.read(BINARY_SNIFF_BYTES):
+                return [], False, False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _scan(data, compiled, max_per_file)
+    except (OSError, ValueError):
+        return [], False, False
+
+
+def _scan(data, compiled: "re.Pattern", max_per_file: int) -> Tuple[List[Dict[str, Any]], bool, bool]:
+    """Collect line hits from a mapped file (one hit per line)."""
+    hits: List[Dict[str, Any]] = []
+    line_no = 1
+    counted_to = 0
+    pos = 0
+    size = len(data)
+
+    while pos <= size:
+        m = compiled.search(data, pos)
+        if m is None:
+            break
+        start = m.start()
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", start)
+        if line_end == -1:
+            line_end = size
+
+        # mmap has no count(); slices are bytes and each byte is counted once
+        line_no += data[counted_to:line_start].count(b"\n")
+        counted_to = line_start
+
+        if len(hits) >= max_per_file:
+            return hits, True, True
+
+        text = data[line_start:min(line_end, line_start + MAX_LINE_CHARS * 4)]
+        hits.append({
+            "line": line_no,
+            "column": start - line_start + 1,
+            "text": text.decode("utf-8", errors="replace")[:MAX_LINE_CHARS].rstrip("\r"),
+        })
+
+        # One hit per line; continue on the next line
+        pos = line_end + 1
+
+    return hits, True, False
+
+
+def search_batch(
+    root: str,
+    rel_paths: List[str],
+    pattern: str,
+    regex: bool,
+    ignore_case: bool,
+    max_per_file: int,
+    max_file_size: int,
+) -> Dict[str, Any]:
+    """
+    Search a batch of files (runs in a worker process or thread).
+
+    Returns:
+        Dict with 'files' (per-file hits), 'searched' and 'skipped' counts
+    """
+    compiled = compile_pattern(pattern, regex, ignore_case)
+    files = []
+    searched = 0
+    skipped = 0
+    for rel in rel_paths:
+        hits, scanned, truncated = search_file(
+            os.path.join(root, rel), compiled, max_per_file, max_file_size
+        )
+        if scanned:
+            searched += 1
+        else:
+            skipped += 1
+        if hits:
+            files.append({"path": rel, "hits": hits, "truncated": truncated})
+    return {"files": files, "searched": searched, "skipped": skipped}
+
+
+class ContentSearchService:
+    """Runs grep-style searches across a worker pool."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        use_processes: bool = True,
+        max_file_size: int = 5 * 1024 * 1024,
+        batch_files: int = 64,
+    ):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.max_file_size = max_file_size
+        self.batch_files = batch_files
+        self._pool: Optional[Executor] = None
+        self._pool_lock = asyncio.Lock()
+        self.searches = 0
+        self.total_ms = 0.0
+
+    async def _get_pool(self) -> Executor:
+        """Create the worker pool on first use, falling back to threads."""
+        if self._pool is not None:
+            return self._pool
+
+        # Concurrent first searches wait for one pool instead of each starting their own
+        async with self._pool_lock:
+            if self._pool is not None:
+                return self._pool
+
+            if self.use_processes:
+                pool = None
+                try:
+                    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(method),
+                    )
+                    # Workers must be able to import this module
+                    await asyncio.wait_for(asyncio.wrap_future(pool.submit(os.getpid)), timeout=60)
+                    self._pool = pool
+                except asyncio.CancelledError:
+                    if pool is not None:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                except Exception as e:
+                    logger.warning("Process pool unavailable, using threads", error=str(e))
+                    if pool is not None:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                    self.use_processes = False
+
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="grep")
+            return self._pool
+
+    async def grep(
+        self,
+        root: str,
+        paths: List[str],
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+        glob: Optional[str] = None,
+        max_per_file: int = 20,
+        max_results: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search files and yield NDJSON-ready records as batches finish.
+
+        Yields one {"type": "match", ...} record per hit, then a final
+        {"type": "summary", ...} record.
+
+        Args:
+            root: Project root (absolute)
+            paths: Candidate file paths relative to root
+            pattern: Literal text or regex
+            regex: Treat pattern as a regular expression
+            ignore_case: Case-insensitive matching
+            glob: Optional glob on the relative path (e.g. '*.py', 'src/**')
+            max_per_file: Maximum hits per file
+            max_results: Stop after this many hits overall
+
+        Raises:
+            InvalidPatternError: Pattern cannot be compiled
+        """
+        compile_pattern(pattern, regex, ignore_case)
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        if glob:
+            paths = [
+                p for p in paths
+                if fnmatch.fnmatch(p, glob) or fnmatch.fnmatch(p.rsplit("/", 1)[-1], glob)
+            ]
+
+        batches = [paths[i:i + self.batch_files] for i in range(0, len(paths), self.batch_files)]
+        pool = await self._get_pool()
+
+        matches = 0
+        files_matched = 0
+        searched = 0
+        skipped = 0
+        truncated = False
+        pending: set = set()
+        next_batch = 0
+
+        def submit():
+            nonlocal next_batch
+            while next_batch < len(batches) and len(pending) < self.max_workers * 2:
+                future = pool.submit(
+                    search_batch, root, batches[next_batch], pattern, regex,
+                    ignore_case, max_per_file, self.max_file_size
+                )
+                pending.add(asyncio.wrap_future(future, loop=loop))
+                next_batch += 1
+
+        try:
+            submit()
+            while pending and not truncated:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    result = future.result()
+                    searched += result["searched"]
+                    skipped += result["skipped"]
+                    for file_result in result["files"]:
+                        if truncated:
+                            break
+                        files_matched += 1
+                        for hit in file_result["hits"]:
+                            if matches >= max_results:
+                                truncated = True
+                                break
+                            matches += 1
+                            yield {"type": "match", "path": file_result["path"], **hit}
+                        if file_result["truncated"]:
+                            yield {"type": "file_truncated", "path": file_result["path"], "max_per_file": max_per_file}
+                if not truncated:
+                    submit()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.searches += 1
+        self.total_ms += elapsed_ms
+
+        yield {
+            "type": "summary",
+            "matches": matches,
+            "files_matched": files_matched,
+            "files_searched": searched,
+            "files_skipped": skipped,
+            "truncated": truncated,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get search statistics."""
+        return {
+            "max_workers": self.max_workers,
+            "pool": type(self._pool).__name__ if self._pool else None,
+            "searches": self.searches,
+            "avg_ms": round(self.total_ms / self.searches, 1) if self.searches else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global content search service
+content_search = ContentSearchService(
+    max_workers=settings.grep_max_workers or (os.cpu_count() or 2),
+    use_processes=settings.grep_use_processes,
+    max_file_size=settings.grep_max_file_size_mb * 1024 * 1024,
+)
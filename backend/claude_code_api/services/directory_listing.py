@@ -0,0 +1,239 @@
+"""
+Directory Listing Engine
+
+Lists directories with os.scandir instead of Path.glob + stat():
+- File type comes from the DirEntry cache (no syscall on most filesystems)
+- stat() only runs for entries that are returned, unless sorting needs it
+- Pages are selected with a heap, so a page of 200 from a 50k-entry
+  directory never sorts or materializes the full listing
+- Opaque cursors carry the sort key of the last item, so the next page
+  continues correctly even if entries were added or removed in between
+"""
+
+import base64
+import fnmatch
+import hashlib
+import heapq
+import json
+import os
+import stat as stat_module
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+SORT_FIELDS = ("name", "type", "size", "modified")
+SORT_ORDERS = ("asc", "desc")
+
+
+class InvalidCursorError(Exception):
+    """Cursor is malformed or belongs to a different listing."""
+    pass
+
+
+class _Entry:
+    """Lightweight listing entry built from an os.DirEntry."""
+
+    __slots__ = ("name", "path", "is_dir", "_dir_entry", "_stat")
+
+    def __init__(self, dir_entry: os.DirEntry, is_dir: bool):
+        self.name = dir_entry.name
+        self.path = dir_entry.path
+        self.is_dir = is_dir
+        self._dir_entry = dir_entry
+        self._stat: Optional[os.stat_result] = None
+
+    def stat(self) -> os.stat_result:
+        if self._stat is None:
+            self._stat = self._dir_entry.stat()
+        return self._stat
+
+
+def _listing_id(path: str, pattern: str, include_hidden: bool) -> str:
+    """Short fingerprint so a cursor cannot be replayed against another listing."""
+    raw = f"{path}\0{pattern}\0{int(include_hidden)}".encode()
+    return hashlib.blake2b(raw, digest_size=4).hexdigest()
+
+
+def encode_cursor(sort: str, order: str, key: Tuple, listing_id: str) -> str:
+    """Encode continuation state as an opaque URL-safe token."""
+    raw = json.dumps({"s": sort, "o": order, "k": list(key), "l": listing_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str, listing_id: str) -> Tuple:
+    """
+    Decode a cursor and check it matches the current listing.
+
+    Raises:
+        InvalidCursorError: If cursor cannot be used for this listing
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = tuple(data["k"])
+    except Exception:
+        raise InvalidCursorError("Malformed cursor")
+
+    if data.get("s") != sort or data.get("o") != order:
+        raise InvalidCursorError("Cursor was issued for a different sort order")
+    if data.get("l") != listing_id:
+        raise InvalidCursorError("Cursor was issued for a different listing")
+
+    return key
+
+
+def _iter_entries(
+    root: str,
+    pattern: str,
+    include_hidden: bool
+) -> Iterator[_Entry]:
+    """
+    Yield entries matching a glob pattern.
+
+    Patterns match file names only; '**' in the pattern means recursive
+    (as with Path.rglob). Hidden directories are not descended into
+    unless include_hidden is set.
+    """
+    recursive = "**" in pattern
+    name_pattern = pattern.replace("**/", "") if recursive else pattern
+    match_all = name_pattern in ("*", "")
+
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    if not include_hidden and name.startswith("."):
+                        continue
+
+                    try:
+                        is_dir = dir_entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if recursive and is_dir and not dir_entry.is_symlink():
+                        stack.append(dir_entry.path)
+
+                    if match_all or fnmatch.fnmatch(name, name_pattern):
+                        yield _Entry(dir_entry, is_dir)
+        except (PermissionError, FileNotFoundError, NotADirectoryError) as e:
+            if current == root:
+                raise
+            logger.debug("Skipping unreadable directory", path=current, error=str(e))
+
+
+def _sort_key(entry: _Entry, sort: str) -> Tuple:
+    """Build a total-order sort key (path breaks ties)."""
+    if sort == "name":
+        return (entry.name.lower(), entry.path)
+    if sort == "type":
+        return (0 if entry.is_dir else 1, entry.name.lower(), entry.path)
+    if sort == "size":
+        return (entry.stat().st_size, entry.path)
+    return (entry.stat().st_mtime, entry.path)
+
+
+def entry_to_dict(entry: _Entry, with_stat: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Serialize an entry in the FileInfoModel shape.
+
+    Returns None if the entry vanished or cannot be stat'ed.
+    """
+    item: Dict[str, Any] = {
+        "name": entry.name,
+        "path": entry.path,
+        "type": "directory" if entry.is_dir else "file",
+    }
+    if with_stat:
+        try:
+            st = entry.stat()
+        except OSError as e:
+            logger.warning(f"Failed to stat {entry.path}: {e}")
+            return None
+        item["size"] = st.st_size
+        item["modified"] = datetime.fromtimestamp(st.st_mtime).isoformat()
+        item["permissions"] = oct(stat_module.S_IMODE(st.st_mode))[-3:]
+    return item
+
+
+def list_directory(
+    path: str,
+    pattern: str = "*",
+    include_hidden: bool = False,
+    sort: str = "name",
+    order: str = "asc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    with_stat: bool = True,
+) -> Dict[str, Any]:
+    """
+    List one page of a directory.
+
+    Args:
+        path: Directory path (already validated by the caller)
+        pattern: Glob pattern (e.g., '*.py', '**/*.ts')
+        include_hidden: Include hidden files (starting with .)
+        sort: One of SORT_FIELDS
+        order: 'asc' or 'desc'
+        limit: Page size (None = everything)
+        cursor: Continuation token from a previous page
+        with_stat: Include size/modified/permissions
+
+    Returns:
+        Dict with 'items' (plain dicts), 'next_cursor' and 'has_more'
+
+    Raises:
+        InvalidCursorError: Bad cursor
+        ValueError: Unknown sort field or order, or a pattern with '/'
+            other than a leading '**/' (patterns match file names only)
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {sort}")
+    if order not in SORT_ORDERS:
+        raise ValueError(f"Unknown sort order: {order}")
+    if "/" in pattern.replace("**/", ""):
+        raise ValueError("Pattern is matched against file names and cannot contain '/' (use '**/' to recurse)")
+
+    listing_id = _listing_id(path, pattern, include_hidden)
+    after = decode_cursor(cursor, sort, order, listing_id) if cursor else None
+    descending = order == "desc"
+
+    def keyed() -> Iterator[Tuple[Tuple, _Entry]]:
+        for entry in _iter_entries(path, pattern, include_hidden):
+            try:
+                key = _sort_key(entry, sort)
+            except OSError:
+                # Broken symlink or entry removed mid-scan
+                continue
+            if after is not None and (key <= after if not descending else key >= after):
+                continue
+            yield key, entry
+
+    if limit is None:
+        selected = sorted(keyed(), key=lambda pair: pair[0], reverse=descending)
+        has_more = False
+    else:
+        select = heapq.nlargest if descending else heapq.nsmallest
+        selected = select(limit + 1, keyed(), key=lambda pair: pair[0])
+        has_more = len(selected) > limit
+        selected = selected[:limit]
+
+    items: List[Dict[str, Any]] = []
+    for _, entry in selected:
+        item = entry_to_dict(entry, with_stat)
+        if item is not None:
+            items.append(item)
+
+    next_cursor = None
+    if has_more and selected:
+        next_cursor = encode_cursor(sort, order, selected[-1][0], listing_id)
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
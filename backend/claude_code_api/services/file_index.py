@@ -0,0 +1,715 @@
+"""
+Project File Index
+
+In-memory filename index per project root:
+- Built once with a gitignore-aware scandir walk
+- Kept fresh from file watcher events (small overlay, periodic compaction)
+- Prefix, substring and fuzzy (fzf-style) matching with ranked results
+- Snapshotted to disk so a restart serves queries before the rescan ends
+
+Lowercased paths are kept in one newline-joined string, so substring
+and fuzzy candidate scans run inside str.find / re rather than a Python
+loop over every path.
+"""
+
+import asyncio
+import bisect
+import fnmatch
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import re
+import stat as stat_module
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.file_watcher import file_watcher, DELETED
+from claude_code_api.utils.gitignore import GitignoreFilter, walk_files
+
+logger = structlog.get_logger()
+
+SEARCH_MODES = ("prefix", "substring", "fuzzy")
+SNAPSHOT_VERSION = 1
+
+# Overlay size that triggers folding incremental changes into the base
+COMPACT_THRESHOLD = 2000
+
+# Upper bound on file-name candidates scored per query
+MAX_CANDIDATES = 1000
+
+# Time budget for the directory-level / fuzzy fill-up stages
+FILL_BUDGET_MS = 6.0
+
+# Blob scans check the budget every this many characters
+SCAN_CHUNK = 1 << 18
+
+_BOUNDARY_CHARS = "/_-. "
+
+
+def fuzzy_score(query: str, path: str) -> Optional[float]:
+    """
+    Score a fuzzy match of query (lowercase) against a path, fzf v1 style.
+
+    Finds the shortest window ending at the first complete forward match,
+    then rewards word-boundary and consecutive hits and matches that fall
+    inside the file name.
+
+    Returns:
+        Score in (0, 1], or None if query is not a subsequence
+    """
+    lower = path.lower()
+    qlen = len(query)
+
+    # Forward pass: earliest end of a complete match
+    qi = 0
+    end = -1
+    for i, ch in enumerate(lower):
+        if ch == query[qi]:
+            qi += 1
+            if qi == qlen:
+                end = i
+                break
+    if end < 0:
+        return None
+
+    # Backward pass: tightest start for that end
+    qi = qlen - 1
+    start = end
+    for i in range(end, -1, -1):
+        if lower[i] == query[qi]:
+            qi -= 1
+            if qi < 0:
+                start = i
+                break
+
+    name_start = lower.rfind("/") + 1
+    score = 0
+    prev = -2
+    qi = 0
+    for i in range(start, end + 1):
+        if qi < qlen and lower[i] == query[qi]:
+            score += 16
+            if i == 0 or path[i - 1] in _BOUNDARY_CHARS or (path[i].isupper() and path[i - 1].islower()):
+                score += 8
+            if prev == i - 1:
+                score += 4
+            if i >= name_start:
+                score += 2
+            prev = i
+            qi += 1
+        else:
+            score -= 1
+
+    best = qlen * 30
+    return max(0.01, min(1.0, score / best))
+
+
+def _subsequence_regex(query: str) -> "re.Pattern":
+    """
+    Regex matching lines that contain query as a subsequence.
+
+    Each gap excludes the next query character (a[^\\nb]*b[^\\nc]*c), so
+    the first occurrence is the only candidate and the match never
+    backtracks; a lazy `.*?` gap is exponential on near misses.
+    """
+    parts = [re.escape(query[0])]
+    for c in query[1:]:
+        parts.append(f"[^\n{re.escape(c)}]*{re.escape(c)}")
+    return re.compile("".join(parts))
+
+
+def _substring_score(query: str, path_lower: str) -> float:
+    """Rank a substring hit: file name matches beat directory matches."""
+    name = path_lower[path_lower.rfind("/") + 1:]
+    if name == query:
+        score = 1.0
+    elif name.startswith(query):
+        score = 0.9
+    elif query in name:
+        score = 0.8
+    else:
+        score = 0.6
+    # Prefer shallow, short paths among equals
+    return score - min(0.05, len(path_lower) / 4000)
+
+
+class ProjectFileIndex:
+    """Filename index for a single project root."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.ignore = GitignoreFilter(root)
+        self._lock = threading.RLock()
+
+        # Base (immutable between compactions)
+        self._paths: List[str] = []
+        self._base_set: Set[str] = set()
+        self._blob = "\n"
+        self._offsets = array("L")
+        self._name_blob = "\n"
+        self._name_offsets = array("L")
+        self._dirs: List[str] = []
+        self._dir_blob = "\n"
+        self._dir_offsets = array("L")
+        self._names: List[str] = []
+        self._name_ids = array("L")
+
+        # Incremental overlay
+        self._added: Dict[str, None] = {}
+        self._removed: Set[str] = set()
+
+        self.built_at: Optional[datetime] = None
+        self.build_ms = 0.0
+        self.updated_at: Optional[datetime] = None
+        self.loaded_from_snapshot = False
+        self.queries = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._base_set) - len(self._removed) + len(self._added)
+
+    # Building
+
+    def build(self):
+        """Walk the project and replace the index contents."""
+        start = time.perf_counter()
+        self.ignore.invalidate()
+        paths = [rel for rel, _ in walk_files(self.root, self.ignore)]
+        with self._lock:
+            self._set_base(paths)
+            self.built_at = datetime.utcnow()
+            self.build_ms = (time.perf_counter() - start) * 1000
+            self.loaded_from_snapshot = False
+
+        logger.info(
+            "File index built",
+            root=self.root,
+            files=len(paths),
+            build_ms=round(self.build_ms, 1)
+        )
+
+    @staticmethod
+    def _join(lines: List[str]) -> Tuple[str, array]:
+        """Join lines into a newline-framed blob plus line start offsets."""
+        offsets = array("L")
+        pos = 1
+        for line in lines:
+            offsets.append(pos)
+            pos += len(line) + 1
+        return "\n" + "\n".join(lines) + "\n" if lines else "\n", offsets
+
+    def _set_base(self, paths: Iterable[str]):
+        # Case-insensitive order so lowercase prefixes are contiguous
+        paths = sorted(paths, key=str.lower)
+        lowered = [p.lower() for p in paths]
+        basenames = [p[p.rfind("/") + 1:] for p in lowered]
+
+        names = sorted((n, i) for i, n in enumerate(basenames))
+
+        dirs: Set[str] = set()
+        for p in paths:
+            d = p.rpartition("/")[0]
+            while d and d not in dirs:
+                dirs.add(d)
+                d = d.rpartition("/")[0]
+        self._dirs = sorted(dirs)
+        self._dir_blob, self._dir_offsets = self._join([d.lower() for d in self._dirs])
+
+        self._paths = paths
+        self._base_set = set(paths)
+        self._blob, self._offsets = self._join(lowered)
+        self._name_blob, self._name_offsets = self._join(basenames)
+        self._names = [n for n, _ in names]
+        self._name_ids = array("L", (i for _, i in names))
+        self._added = {}
+        self._removed = set()
+
+    def _compact(self):
+        live = [p for p in self._paths if p not in self._removed]
+        live.extend(self._added)
+        self._set_base(live)
+
+    # Incremental updates
+
+    def add(self, rel_path: str):
+        """Add (or re-add) a file."""
+        with self._lock:
+            if rel_path in self._base_set:
+                self._removed.discard(rel_path)
+            else:
+                self._added[rel_path] = None
+            self._touch()
+
+    def remove(self, rel_path: str):
+        """Remove a file, or everything under it if it was a directory."""
+        with self._lock:
+            if rel_path in self._base_set:
+                self._removed.add(rel_path)
+            self._added.pop(rel_path, None)
+
+            prefix = rel_path + "/"
+            for i in self._with_prefix(prefix):
+                self._removed.add(self._paths[i])
+            for p in [p for p in self._added if p.startswith(prefix)]:
+                del self._added[p]
+            self._touch()
+
+    def _touch(self):
+        self.updated_at = datetime.utcnow()
+        if len(self._added) + len(self._removed) > COMPACT_THRESHOLD:
+            self._compact()
+
+    def apply_changes(self, changes: List[Tuple[str, str]]) -> bool:
+        """
+        Apply watcher events (change, absolute_path).
+
+        Returns:
+            True if a .gitignore changed and the index needs a full rebuild
+        """
+        needs_rebuild = False
+        for change, abs_path in changes:
+            rel = os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+            if rel.startswith(".."):
+                continue
+            if os.path.basename(rel) == ".gitignore":
+                needs_rebuild = True
+            if change == DELETED:
+                self.remove(rel)
+                continue
+            try:
+                is_dir = os.path.isdir(abs_path)
+                if self.ignore.is_ignored(rel, is_dir):
+                    continue
+                if is_dir:
+                    # A directory moved in: index its files
+                    sub_root = os.path.join(self.root, rel)
+                    for sub_rel, _ in walk_files(sub_root, None):
+                        full_rel = f"{rel}/{sub_rel}"
+                        if not self.ignore.is_ignored(full_rel):
+                            self.add(full_rel)
+                elif os.path.isfile(abs_path):
+                    self.add(rel)
+            except OSError:
+                continue
+        return needs_rebuild
+
+    def all_paths(self) -> List[str]:
+        """Snapshot of every indexed path (relative to root)."""
+        with self._lock:
+            paths = [p for p in self._paths if p not in self._removed] if self._removed else list(self._paths)
+            paths.extend(self._added)
+            return paths
+
+    # Querying
+
+    def search(
+        self,
+        query: str,
+        mode: str = "fuzzy",
+        limit: int = 50,
+        pattern: str = "*",
+    ) -> List[Tuple[str, float]]:
+        """
+        Search file paths.
+
+        File-name matches are collected first; directory-level matches
+        (which rank lower) are only scanned to fill up a short result list.
+
+        Args:
+            query: Search text (case-insensitive)
+            mode: 'prefix', 'substring' or 'fuzzy'
+            limit: Maximum results
+            pattern: Glob filter applied to the file name
+
+        Returns:
+            (relative_path, score) tuples, best first
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        q = query.lower().replace("\n", "")
+        if not q:
+            return []
+
+        if pattern and pattern != "*":
+            accept = lambda path: fnmatch.fnmatch(path[path.rfind("/") + 1:], pattern)
+        else:
+            accept = None
+        fill_cap = max(limit * 4, 200)
+        deadline = time.perf_counter() + FILL_BUDGET_MS / 1000
+
+        with self._lock:
+            self.queries += 1
+            hits: Dict[str, float] = {}
+
+            def collect(lines: Iterable[int], score_fn, cap: int):
+                for line in lines:
+                    path = self._paths[line]
+                    if path in hits or path in self._removed:
+                        continue
+                    if accept is not None and not accept(path):
+                        continue
+                    score = score_fn(path)
+                    if score is not None:
+                        hits[path] = score
+                        if len(hits) >= cap:
+                            return
+
+            def substring(path: str) -> float:
+                return _substring_score(q, path.lower())
+
+            def fuzzy(path: str) -> Optional[float]:
+                score = fuzzy_score(q, path)
+                # Fuzzy hits always rank below substring hits
+                return None if score is None else score * 0.5
+
+            # 1. File-name prefix matches (highest ranked, via bisect)
+            if "/" not in q:
+                collect(self._name_prefix_lines(q), substring, MAX_CANDIDATES)
+
+            if mode == "prefix":
+                if "/" in q:
+                    collect(self._with_prefix(q, case_sensitive=False), substring, fill_cap)
+            elif "/" in q:
+                # Query spans directories: scan full paths
+                collect(self._scan(self._blob, self._offsets, q, deadline), substring, fill_cap)
+            else:
+                # 2. File-name substring matches
+                collect(self._scan(self._name_blob, self._name_offsets, q), substring, MAX_CANDIDATES)
+                # 3. Files under directories whose path contains the query
+                if len(hits) < limit:
+                    dir_lines = self._scan(self._dir_blob, self._dir_offsets, q, deadline)
+                    collect(self._files_under(dir_lines, deadline), substring, len(hits) + fill_cap)
+
+            # 4. Fuzzy: file names first, then whole paths, within the budget
+            if mode == "fuzzy" and len(hits) < limit:
+                regex = _subsequence_regex(q)
+                lines = self._scan(self._name_blob, self._name_offsets, regex, deadline)
+                collect(lines, fuzzy, len(hits) + MAX_CANDIDATES)
+                if len(hits) < limit:
+                    lines = self._scan(self._blob, self._offsets, regex, deadline)
+                    collect(lines, fuzzy, len(hits) + fill_cap)
+
+            # Overlay of files added since the last compaction
+            for path in self._added:
+                if path in hits or (accept is not None and not accept(path)):
+                    continue
+                lower = path.lower()
+                name = lower[lower.rfind("/") + 1:]
+                if mode == "prefix":
+                    matched = lower.startswith(q) if "/" in q else name.startswith(q)
+                    score = substring(path) if matched else None
+                else:
+                    score = substring(path) if q in lower else None
+                    if score is None and mode == "fuzzy":
+                        score = fuzzy(path)
+                if score is not None:
+                    hits[path] = score
+
+        return heapq.nsmallest(limit, hits.items(), key=lambda h: (-h[1], len(h[0]), h[0]))
+
+    @staticmethod
+    def _scan(
+        blob: str,
+        offsets: array,
+        needle,
+        deadline: Optional[float] = None,
+    ) -> Iterable[int]:
+        """
+        Yield indexes of lines in blob containing needle (str or regex).
+
+        Each line is reported once. The blob is scanned in line-aligned
+        chunks so a deadline can stop a scan that finds nothing.
+        """
+        is_regex = not isinstance(needle, str)
+        count = len(offsets)
+        size = len(blob)
+        pos = 0
+        while pos < size:
+            end = blob.find("\n", min(size - 1, pos + SCAN_CHUNK))
+            end = size if end == -1 else end + 1
+            while True:
+                if is_regex:
+                    m = needle.search(blob, pos, end)
+                    found = m.start() if m else -1
+                else:
+                    found = blob.find(needle, pos, end)
+                if found == -1:
+                    break
+                line = bisect.bisect_right(offsets, found) - 1
+                if 0 <= line < count:
+                    yield line
+                if line + 1 >= count:
+                    return
+                pos = offsets[line + 1]
+            pos = end
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+
+    def _files_under(self, dir_lines: Iterable[int], deadline: float) -> Iterable[int]:
+        """Yield path indexes of files below each directory line."""
+        for dir_line in dir_lines:
+            yield from self._with_prefix(self._dirs[dir_line] + "/")
+            if time.perf_counter() > deadline:
+                return
+
+    def _with_prefix(self, prefix: str, case_sensitive: bool = True) -> Iterable[int]:
+        """Yield indexes of base paths starting with prefix."""
+        paths = self._paths
+        low = prefix.lower()
+        i = bisect.bisect_left(paths, low, key=str.lower)
+        while i < len(paths):
+            path = paths[i]
+            if not path.lower().startswith(low):
+                return
+            if not case_sensitive or path.startswith(prefix):
+                yield i
+            i += 1
+
+    def _name_prefix_lines(self, q: str) -> Iterable[int]:
+        i = bisect.bisect_left(self._names, q)
+        while i < len(self._names) and self._names[i].startswith(q):
+            yield self._name_ids[i]
+            i += 1
+
+    # Persistence
+
+    def save(self, snapshot_path: Path):
+        """Write a gzip snapshot (header line + one path per line)."""
+        with self._lock:
+            if self._added or self._removed:
+                self._compact()
+            paths = list(self._paths)
+            header = {
+                "version": SNAPSHOT_VERSION,
+                "root": self.root,
+                "built_at": self.built_at.isoformat() if self.built_at else None,
+                "count": len(paths),
+            }
+
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(json.dumps(header) + "\n")
+            f.write("\n".join(paths))
+        os.replace(tmp_path, snapshot_path)
+
+    @classmethod
+    def load(cls, root: str, snapshot_path: Path) -> Optional["ProjectFileIndex"]:
+        """Load a snapshot written by save(); None if missing or stale format."""
+        try:
+            with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != SNAPSHOT_VERSION or header.get("root") != root:
+                    return None
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        index = cls(root)
+        index._set_base(body.split("\n") if body else [])
+        index.built_at = datetime.fromisoformat(header["built_at"]) if header.get("built_at") else None
+        index.loaded_from_snapshot = True
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        with self._lock:
+            return {
+                "root": self.root,
+                "files": len(self),
+                "pending_changes": len(self._added) + len(self._removed),
+                "blob_bytes": len(self._blob),
+                "built_at": self.built_at.isoformat() if self.built_at else None,
+                "build_ms": round(self.build_ms, 1),
+                "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+                "from_snapshot": self.loaded_from_snapshot,
+                "queries": self.queries,
+            }
+
+
+class FileIndexManager:
+    """Keeps file indexes for recently used projects."""
+
+    def __init__(self, index_dir: str, max_projects: int, rescan_seconds: int, persist: bool = True):
+        self.index_dir = Path(index_dir) / "files"
+        self.max_projects = max_projects
+        self.rescan_seconds = rescan_seconds
+        self.persist = persist
+        self._indexes: "OrderedDict[str, ProjectFileIndex]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._watch_ids: Dict[str, str] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    def _snapshot_path(self, root: str) -> Path:
+        digest = hashlib.blake2b(root.encode(), digest_size=10).hexdigest()
+        return self.index_dir / f"{digest}.idx.gz"
+
+    async def get_index(self, root: str) -> ProjectFileIndex:
+        """Get (building or loading if needed) the index for a project root."""
+        root = os.path.realpath(root)
+
+        index = self._indexes.get(root)
+        if index is not None:
+            self._indexes.move_to_end(root)
+            if not file_watcher.available and self._is_stale(index):
+                self._schedule(self._refresh(root, index))
+            return index
+
+        pending = self._pending.get(root)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[root] = future
+        try:
+            index = await self._open(root)
+            future.set_result(index)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a failed build with no other waiters does not warn
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(root, None)
+
+        return index
+
+    async def _open(self, root: str) -> ProjectFileIndex:
+        snapshot_path = self._snapshot_path(root)
+        index = None
+        if self.persist:
+            index = await blocking_executor.run("file", ProjectFileIndex.load, root, snapshot_path)
+
+        if index is not None:
+            # Serve the snapshot now, reconcile with the disk in the background
+            self._schedule(self._refresh(root, index))
+        else:
+            index = ProjectFileIndex(root)
+            await blocking_executor.run("discovery", index.build)
+            if self.persist:
+                self._schedule(blocking_executor.run("file", index.save, snapshot_path))
+
+        self._indexes[root] = index
+        self._watch(root, index)
+        await self._evict()
+        return index
+
+    def _is_stale(self, index: ProjectFileIndex) -> bool:
+        if index.built_at is None:
+            return True
+        return (datetime.utcnow() - index.built_at).total_seconds() > self.rescan_seconds
+
+    async def _refresh(self, root: str, index: ProjectFileIndex):
+        try:
+            await blocking_executor.run("discovery", index.build)
+            if self.persist:
+                await blocking_executor.run("file", index.save, self._snapshot_path(root))
+        except Exception as e:
+            logger.warning("File index refresh failed", root=root, error=str(e))
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def _watch(self, root: str, index: ProjectFileIndex):
+        if root in self._watch_ids:
+            return
+
+        async def on_change(changes: List[Tuple[str, str]]):
+            if await blocking_executor.run("file", index.apply_changes, changes):
+                await self._refresh(root, index)
+
+        self._watch_ids[root] = file_watcher.start_watch(root, on_change=on_change)
+
+    async def _evict(self):
+        while len(self._indexes) > self.max_projects:
+            root, index = self._indexes.popitem(last=False)
+            watch_id = self._watch_ids.pop(root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            if self.persist:
+                await blocking_executor.run("file", index.save, self._snapshot_path(root))
+            logger.info("File index evicted", root=root)
+
+    async def search(
+        self,
+        root: str,
+        query: str,
+        mode: str = "fuzzy",
+        limit: int = 50,
+        pattern: str = "*",
+    ) -> List[Tuple[str, float]]:
+        """Search a project's index, building it on first use."""
+        index = await self.get_index(root)
+        return await blocking_executor.run("file", index.search, query, mode=mode, limit=limit, pattern=pattern)
+
+    async def rebuild(self, root: str) -> ProjectFileIndex:
+        """Force a full rescan of a project."""
+        index = await self.get_index(root)
+        await self._refresh(index.root, index)
+        return index
+
+    async def shutdown(self):
+        """Persist indexes and stop watchers."""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        for root, index in list(self._indexes.items()):
+            watch_id = self._watch_ids.pop(root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            if self.persist and index.built_at is not None:
+                try:
+                    await blocking_executor.run("file", index.save, self._snapshot_path(root))
+                except Exception as e:
+                    logger.warning("Failed to persist file index", root=root, error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics for all loaded indexes."""
+        return {
+            "projects": len(self._indexes),
+            "max_projects": self.max_projects,
+            "watching": file_watcher.available,
+            "indexes": [index.get_stats() for index in self._indexes.values()],
+        }
+
+
+def describe_matches(root: str, matches: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    """Stat search hits into FileInfoModel-shaped dicts (plus score)."""
+    items = []
+    for rel, score in matches:
+        path = os.path.join(root, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        items.append({
+            "name": rel.rsplit("/", 1)[-1],
+            "path": path,
+            "size": st.st_size,
+            "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+            "type": "file",
+            "permissions": oct(stat_module.S_IMODE(st.st_mode))[-3:],
+            "score": round(score, 4),
+        })
+    return items
+
+
+# Global file index manager
+file_index_manager = FileIndexManager(
+    index_dir=settings.index_dir,
+    max_projects=settings.file_index_max_projects,
+    rescan_seconds=settings.file_index_rescan_seconds,
+    persist=settings.file_index_persist,
+)
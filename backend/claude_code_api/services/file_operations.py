@@ -19,6 +19,9 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 import structlog
 
+from claude_code_api.services.directory_listing import list_directory, InvalidCursorError
+from claude_code_api.services.file_streaming import line_index_cache, iter_bytes
+
 logger = structlog.get_logger()
 
 
@@ -109,6 +112,65 @@ class FileOperationsService:
             f"Path '{path}' is not in allowed paths: {[str(p) for p in self.allowed_paths]}"
         )
 
+    def validate_directory(self, path: str) -> Path:
+        """
+        Resolve and validate a directory path.
+
+        Raises:
+            FileNotFoundError: Directory doesn't exist
+            PermissionDeniedError: Path not allowed
+            InvalidPathError: Not a directory
+        """
+        # Check existence BEFORE permission to give better error messages
+        try:
+            path_obj = Path(path).resolve()
+        except Exception as e:
+            raise InvalidPathError(f"Invalid path: {e}")
+
+        if not path_obj.exists():
+            raise FileNotFoundError(f"Directory not found: {path}")
+
+        # Now validate path is allowed
+        validated_path = self._validate_path(path)
+
+        if not validated_path.is_dir():
+            raise InvalidPathError(f"Not a directory: {path}")
+
+        return validated_path
+
+    def validate_file(self, path: str) -> Path:
+        """
+        Resolve and validate a regular file path.
+
+        Raises:
+            FileNotFoundError: File doesn't exist
+            PermissionDeniedError: Path not allowed
+            InvalidPathError: Path is a directory
+        """
+        # SECURITY: Validate permission FIRST before checking existence
+        validated_path = self._validate_path(path)
+
+        if not validated_path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+
+        if validated_path.is_dir():
+            raise InvalidPathError(f"Cannot read directory as file: {path}")
+
+        return validated_path
+
+    def validate_write_path(self, path: str) -> Path:
+        """
+        Resolve and validate a path to be written.
+
+        Raises:
+            PermissionDeniedError: Path not allowed
+            InvalidPathError: Path is a directory
+        """
+        validated_path = self._validate_path(path)
+        if validated_path.is_dir():
+            raise InvalidPathError(f"Cannot write to directory: {path}")
+        return validated_path
+
     def list_files(
         self,
         path: str,
@@ -130,59 +192,77 @@ class FileOperationsService:
             FileNotFoundError: Directory doesn't exist
             PermissionDeniedError: Path not allowed
         """
-        # Check existence BEFORE permission to give better error messages
-        try:
-            path_obj = Path(path).resolve()
-        except Exception as e:
-            raise InvalidPathError(f"Invalid path: {e}")
-
-        if not path_obj.exists():
-            raise FileNotFoundError(f"Directory not found: {path}")
-
-        # Now validate path is allowed
-        validated_path = self._validate_path(path)
+        page = self.list_directory(path, pattern=pattern, include_hidden=include_hidden)
+
+        return [
+            FileInfo(
+                name=item["name"],
+                path=item["path"],
+                size=item["size"],
+                modified=datetime.fromisoformat(item["modified"]),
+                file_type=item["type"],
+                permissions=item["permissions"],
+            )
+            for item in page["items"]
+        ]
+
+    def list_directory(
+        self,
+        path: str,
+        pattern: str = "*",
+        include_hidden: bool = False,
+        sort: str = "name",
+        order: str = "asc",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        with_stat: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        List one page of a directory as plain dicts (scandir-based).
 
-        if not validated_path.is_dir():
-            raise InvalidPathError(f"Not a directory: {path}")
+        Args:
+            path: Directory path
+            pattern: Glob pattern (e.g., '*.py', '**/*.ts')
+            include_hidden: Include hidden files (starting with .)
+            sort: 'name', 'type', 'size' or 'modified'
+            order: 'asc' or 'desc'
+            limit: Page size (None = everything)
+            cursor: Continuation token from a previous page
+            with_stat: Include size/modified/permissions per entry
 
-        results = []
+        Returns:
+            Dict with 'items', 'next_cursor' and 'has_more'
 
-        # Use glob for pattern matching
-        if "**" in pattern:
-            # Recursive glob
-            matches = validated_path.rglob(pattern.replace("**/", ""))
-        else:
-            # Non-recursive glob
-            matches = validated_path.glob(pattern)
-
-        for item_path in matches:
-            # Skip hidden files if requested
-            if not include_hidden and item_path.name.startswith("."):
-                continue
+        Raises:
+            FileNotFoundError: Directory doesn't exist
+            PermissionDeniedError: Path not allowed
+            InvalidPathError: Not a directory, bad sort or bad cursor
+        """
+        validated_path = self.validate_directory(path)
 
-            try:
-                stat = item_path.stat()
-                file_info = FileInfo(
-                    name=item_path.name,
-                    path=str(item_path),
-                    size=stat.st_size,
-                    modified=datetime.fromtimestamp(stat.st_mtime),
-                    file_type="directory" if item_path.is_dir() else "file",
-                    permissions=oct(stat.st_mode)[-3:],
-                )
-                results.append(file_info)
-            except Exception as e:
-                logger.warning(f"Failed to stat {item_path}: {e}")
-                continue
+        try:
+            page = list_directory(
+                str(validated_path),
+                pattern=pattern,
+                include_hidden=include_hidden,
+                sort=sort,
+                order=order,
+                limit=limit,
+                cursor=cursor,
+                with_stat=with_stat,
+            )
+        except (InvalidCursorError, ValueError) as e:
+            raise InvalidPathError(str(e))
 
         logger.debug(
             "Listed files",
             path=path,
             pattern=pattern,
-            count=len(results)
+            count=len(page["items"]),
+            has_more=page["has_more"]
         )
 
-        return results
+        return page
 
     def read_file(self, path: str, encoding: str = "utf-8") -> str:
         """
@@ -200,14 +280,7 @@ class FileOperationsService:
             PermissionDeniedError: Path not allowed
             InvalidPathError: Path is directory or binary file
         """
-        # SECURITY: Validate permission FIRST before checking existence
-        validated_path = self._validate_path(path)
-
-        if not validated_path.exists():
-            raise FileNotFoundError(f"File not found: {path}")
-
-        if validated_path.is_dir():
-            raise InvalidPathError(f"Cannot read directory as file: {path}")
+        validated_path = self.validate_file(path)
 
         # Check if file is binary
         try:
@@ -220,6 +293,56 @@ class FileOperationsService:
             logger.error(f"Failed to read file {path}: {e}")
             raise
 
+    def read_lines(
+        self,
+        path: str,
+        start_line: int = 1,
+        end_line: Optional[int] = None,
+        encoding: str = "utf-8"
+    ) -> Dict[str, Any]:
+        """
+        Read a range of lines without loading the whole file.
+
+        Line offsets are cached per file (and rebuilt when it changes), so
+        paging through a large file only reads the requested span.
+
+        Args:
+            path: File path
+            start_line: First line, 1-based
+            end_line: Last line, inclusive (default: end of file)
+            encoding: Text encoding (default: utf-8)
+
+        Returns:
+            Dict with content, start_line, end_line and total_lines
+
+        Raises:
+            FileNotFoundError: File doesn't exist
+            PermissionDeniedError: Path not allowed
+            InvalidPathError: Path is directory, binary file or bad range
+        """
+        validated_path = self.validate_file(path)
+        if start_line < 1 or (end_line is not None and end_line < start_line):
+            raise InvalidPathError(f"Invalid line range: {start_line}-{end_line}")
+
+        st = validated_path.stat()
+        start, end, total = line_index_cache.line_range(str(validated_path), st, start_line, end_line)
+        data = b"".join(iter_bytes(str(validated_path), start, end))
+        if b"\0" in data:
+            raise InvalidPathError(f"Cannot read binary file: {path}")
+        try:
+            content = data.decode(encoding)
+        except UnicodeDecodeError:
+            raise InvalidPathError(f"Cannot read binary file: {path}")
+        except LookupError:
+            raise InvalidPathError(f"Unknown encoding: {encoding}")
+
+        return {
+            "content": content,
+            "start_line": start_line,
+            "end_line": min(end_line or total, total),
+            "total_lines": total,
+        }
+
     def write_file(
         self,
         path: str,
@@ -0,0 +1,262 @@
+"""
+File Streaming
+
+Helpers for reading files without loading them whole:
+- HTTP Range parsing (single byte range)
+- Byte-range and text streaming, read chunk by chunk off the event loop
+- Encoding detection from the first block only
+- Line-offset index (cached per path, mtime and size) for line-range reads
+"""
+
+import codecs
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator, Optional, Tuple
+import structlog
+
+from claude_code_api.core.executor import blocking_executor
+
+logger = structlog.get_logger()
+
+# Bytes per read when streaming
+CHUNK_SIZE = 64 * 1024
+
+# Bytes inspected for encoding detection
+DETECT_BYTES = 64 * 1024
+
+# Legacy single-byte encoding assumed when the first block is not UTF-8
+FALLBACK_ENCODING = "cp1252"
+
+# UTF-32 first: its LE BOM starts with the UTF-16 LE BOM
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# Encodings where a newline is not the single byte 0x0A (no line offsets)
+_WIDE_ENCODINGS = {"utf-16-le", "utf-16-be", "utf-32-le", "utf-32-be"}
+
+
+class RangeNotSatisfiableError(Exception):
+    """Requested byte range lies outside the file."""
+
+    def __init__(self, size: int):
+        super().__init__(f"Range not satisfiable (file size {size})")
+        self.size = size
+
+
+class BinaryContentError(Exception):
+    """File content is not text."""
+    pass
+
+
+def make_etag(st: os.stat_result) -> str:
+    """Strong validator from mtime and size."""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=...`` header.
+
+    Returns:
+        (start, end) with end exclusive, or None to serve the whole file
+        (no header, malformed header or multiple ranges)
+
+    Raises:
+        RangeNotSatisfiableError: Range starts beyond the end of the file
+    """
+    if not header:
+        return None
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+        else:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                raise RangeNotSatisfiableError(size)
+            start = max(size - length, 0)
+            end = size
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(size)
+    if end <= start:
+        return None
+    return start, min(end, size)
+
+
+def detect_encoding(block: bytes) -> Tuple[str, int]:
+    """
+    Pick a text encoding from the first block of a file.
+
+    A block shorter than DETECT_BYTES is taken to be the whole file.
+
+    Returns:
+        (encoding, bom_length): content starts after the byte order mark
+
+    Raises:
+        BinaryContentError: Block looks binary (NUL bytes without a UTF-16/32 BOM)
+    """
+    for bom, encoding in _BOMS:
+        if block.startswith(bom):
+            return encoding, len(bom)
+    if b"\0" in block:
+        raise BinaryContentError("File appears to be binary")
+    try:
+        # A full block may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(block, final=len(block) < DETECT_BYTES)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING, 0
+
+
+def supports_line_offsets(encoding: str) -> bool:
+    """Whether newlines are single 0x0A bytes in this encoding."""
+    return codecs.lookup(encoding).name not in _WIDE_ENCODINGS
+
+
+def read_head(path: str, size: int = DETECT_BYTES) -> bytes:
+    """Read the first block of a file."""
+    with open(path, "rb") as f:
+        return f.read(size)
+
+
+def iter_bytes(path: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes [start, end) of a file."""
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        pos = start
+        while pos < end:
+            chunk = os.pread(fd, min(chunk_size, end - pos), pos)
+            if not chunk:
+                break
+            pos += len(chunk)
+            yield chunk
+
+
+def iter_text(
+    path: str,
+    encoding: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """Decode bytes [start, end) incrementally, yielding text chunks."""
+    if end is None:
+        end = os.path.getsize(path)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in iter_bytes(path, start, end, chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def aiter_blocking(iterator: Iterator) -> AsyncIterator:
+    """Drive a blocking iterator from the executor, one item at a time."""
+    done = object()
+    try:
+        while True:
+            item = await blocking_executor.run("file", next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def build_line_offsets(path: str, chunk_size: int = 1 << 20) -> array:
+    """Byte offset of the start of each line."""
+    offsets = array("Q", [0])
+    base = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pos = chunk.find(b"\n")
+            while pos != -1:
+                offsets.append(base + pos + 1)
+                pos = chunk.find(b"\n", pos + 1)
+            base += len(chunk)
+    # A trailing newline does not start another line; an empty file has none
+    if offsets[-1] == base:
+        offsets.pop()
+    return offsets
+
+
+class LineIndexCache:
+    """LRU cache of line-offset indexes keyed by path, mtime and size."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, int, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, st: os.stat_result) -> array:
+        """Line offsets for path, rebuilt when the file changed."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Scan outside the lock; a concurrent miss on the same file builds the same offsets
+        offsets = build_line_offsets(path)
+        with self._lock:
+            self._entries[path] = (st.st_mtime_ns, st.st_size, offsets)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return offsets
+
+    def line_range(
+        self,
+        path: str,
+        st: os.stat_result,
+        start_line: int,
+        end_line: Optional[int],
+    ) -> Tuple[int, int, int]:
+        """
+        Byte span of 1-based inclusive lines [start_line, end_line].
+
+        Returns:
+            (start, end, total_lines) with end exclusive; an empty span
+            when start_line is past the last line
+        """
+        offsets = self.get(path, st)
+        total = len(offsets)
+        if start_line > total:
+            return st.st_size, st.st_size, total
+        start = offsets[start_line - 1]
+        if end_line is None or end_line >= total:
+            end = st.st_size
+        else:
+            end = offsets[end_line]
+        return start, end, total
+
+
+# Global line index cache
+line_index_cache = LineIndexCache()
@@ -1,23 +1,46 @@
-"""File watching service with watchdog library."""
+"""File watching service backed by watchfiles (installed with uvicorn[standard])."""
 
+import asyncio
+import fnmatch
+import os
 import uuid
-from pathlib import Path
-from typing import Dict, List, Optional, Callable
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 import structlog
 
-# Watchdog would be imported here if installed
-# from watchdog.observers import Observer
-# from watchdog.events import FileSystemEventHandler
+try:
+    from watchfiles import awatch, Change
+    WATCHFILES_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    awatch = None
+    Change = None
+    WATCHFILES_AVAILABLE = False
 
 logger = structlog.get_logger()
 
+# Change kinds passed to callbacks
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+
 
 class FileWatcherService:
-    """Manages file system watchers."""
+    """
+    Manages file system watchers.
+
+    Watches on the same directory share one OS-level watcher. Callbacks
+    receive a list of (change, absolute_path) tuples per debounced batch
+    and may be plain functions or coroutines.
+    """
 
     def __init__(self):
         self.watchers: Dict[str, Dict] = {}
+        self._roots: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def available(self) -> bool:
+        """Whether real file system events are available."""
+        return WATCHFILES_AVAILABLE
 
     def start_watch(
         self,
@@ -28,30 +51,101 @@ class FileWatcherService:
         """
         Start watching directory for changes.
 
-        For v2.0: Basic implementation, returns watch ID.
-        Full event streaming would require watchdog library + WebSocket/SSE.
+        Must be called from the event loop when a callback is given.
+        Without watchfiles the watch is registered but never fires.
         """
         watch_id = str(uuid.uuid4())
+        root = os.path.realpath(path)
 
         self.watchers[watch_id] = {
-            "path": path,
+            "path": root,
             "patterns": patterns or ["*"],
             "created_at": datetime.utcnow(),
             "on_change": on_change,
             "event_count": 0,
         }
 
-        logger.info("File watch started", watch_id=watch_id, path=path)
+        state = self._roots.setdefault(root, {"task": None, "stop_event": None, "watch_ids": set()})
+        state["watch_ids"].add(watch_id)
+        if on_change is not None and WATCHFILES_AVAILABLE:
+            self._ensure_root(root)
+
+        logger.info("File watch started", watch_id=watch_id, path=root)
 
         return watch_id
 
+    def _ensure_root(self, root: str):
+        state = self._roots[root]
+        if state["task"] is None or state["task"].done():
+            state["stop_event"] = asyncio.Event()
+            state["task"] = asyncio.create_task(self._watch_root(root, state["stop_event"]))
+
+    async def _watch_root(self, root: str, stop_event: asyncio.Event):
+        kinds = {Change.added: ADDED, Change.modified: MODIFIED, Change.deleted: DELETED}
+        try:
+            async for batch in awatch(root, stop_event=stop_event, ignore_permission_denied=True):
+                changes: List[Tuple[str, str]] = [(kinds[c], p) for c, p in batch]
+                await self._dispatch(root, changes)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("File watcher failed", path=root, error=str(e))
+
+    async def _dispatch(self, root: str, changes: List[Tuple[str, str]]):
+        state = self._roots.get(root)
+        if not state:
+            return
+        for watch_id in list(state["watch_ids"]):
+            info = self.watchers.get(watch_id)
+            if not info or info["on_change"] is None:
+                continue
+            patterns = info["patterns"]
+            if patterns != ["*"]:
+                selected = [
+                    (kind, p) for kind, p in changes
+                    if any(fnmatch.fnmatch(os.path.basename(p), pat) for pat in patterns)
+                ]
+            else:
+                selected = changes
+            if not selected:
+                continue
+            info["event_count"] += len(selected)
+            try:
+                result = info["on_change"](selected)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error("File watch callback failed", watch_id=watch_id, error=str(e))
+
     def stop_watch(self, watch_id: str) -> bool:
         """Stop watching directory."""
-        if watch_id in self.watchers:
-            del self.watchers[watch_id]
-            logger.info("File watch stopped", watch_id=watch_id)
-            return True
-        return False
+        info = self.watchers.pop(watch_id, None)
+        if info is None:
+            return False
+
+        state = self._roots.get(info["path"])
+        if state:
+            state["watch_ids"].discard(watch_id)
+            if not state["watch_ids"]:
+                if state["stop_event"] is not None:
+                    state["stop_event"].set()
+                del self._roots[info["path"]]
+
+        logger.info("File watch stopped", watch_id=watch_id)
+        return True
+
+    async def stop_all(self):
+        """Stop every watch and wait for watcher tasks to exit."""
+        tasks = []
+        for state in self._roots.values():
+            if state["stop_event"] is not None:
+                state["stop_event"].set()
+            if state["task"] is not None:
+                tasks.append(state["task"])
+        self._roots.clear()
+        self.watchers.clear()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def get_watch_info(self, watch_id: str) -> Optional[Dict]:
         """Get information about active watch."""
@@ -68,3 +162,7 @@ class FileWatcherService:
             }
             for wid, info in self.watchers.items()
         ]
+
+
+# Global file watcher
+file_watcher = FileWatcherService()
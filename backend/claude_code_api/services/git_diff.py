@@ -0,0 +1,339 @@
+"""
+Git Diff
+
+Structured, size-bounded diffs for mobile clients.
+
+Instead of one unified diff string, a diff is served in two steps:
+
+1. files(): a stream of per-file records with stats (status, rename
+   source, insertions/deletions, binary and large flags) from a single
+   `git diff --raw --numstat -z`. Nothing of the patch is read.
+2. file_hunks(): the parsed hunks of one file, fetched when the user opens
+   it. Binary files have no hunks, and patches over a size limit are
+   truncated (the rest is never read from git).
+
+Diffs between two commits/trees are immutable once both sides are
+resolved to SHAs, so those results are cached, keyed by
+(sha A, sha B, path). Worktree and index diffs are always recomputed.
+"""
+
+import re
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.services.git_runner import GitProcessError, git_runner
+
+logger = structlog.get_logger()
+
+# Raw diff status letters
+STATUS_NAMES = {
+    "A": "added",
+    "C": "copied",
+    "D": "deleted",
+    "M": "modified",
+    "R": "renamed",
+    "T": "typechange",
+    "U": "unmerged",
+}
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class DiffError(Exception):
+    """Invalid revision or git diff failed."""
+    pass
+
+
+class DiffStatParser:
+    """
+    Incremental parser for `git diff --raw --numstat -z -M` output.
+
+    git prints every raw entry first, then a numstat entry per file in the
+    same order; feed() returns a complete file record as each numstat
+    entry arrives.
+    """
+
+    def __init__(self, large_lines: int):
+        self.large_lines = large_lines
+        self._raw: Deque[Dict[str, Any]] = deque()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._expect: List[str] = []
+        self._numstat: Optional[Tuple[Optional[int], Optional[int]]] = None
+
+    def feed(self, field: bytes) -> Optional[Dict[str, Any]]:
+        if self._expect:
+            return self._path_field(field.decode("utf-8", "surrogateescape"))
+        if not field:
+            return None
+
+        if field[:1] == b":":
+            # :old_mode new_mode old_sha new_sha status, then path(s) as separate fields
+            meta = field[1:].decode().split(" ")
+            letter = meta[4][:1]
+            self._pending = {
+                "type": "file",
+                "path": None,
+                "old_path": None,
+                "status": STATUS_NAMES.get(letter, "unknown"),
+                "old_sha": meta[2],
+                "new_sha": meta[3],
+            }
+            self._expect = ["old_path", "path"] if letter in "RC" else ["path"]
+            return None
+
+        # added \t deleted \t path; for renames the path is empty and two path fields follow
+        added, deleted, path = field.decode("utf-8", "surrogateescape").split("\t", 2)
+        self._numstat = (
+            None if added == "-" else int(added),
+            None if deleted == "-" else int(deleted),
+        )
+        if path:
+            return self._complete()
+        self._expect = ["numstat_old", "numstat_new"]
+        return None
+
+    def _path_field(self, value: str) -> Optional[Dict[str, Any]]:
+        key = self._expect.pop(0)
+        if key in ("path", "old_path"):
+            self._pending[key] = value
+            if not self._expect:
+                self._raw.append(self._pending)
+                self._pending = None
+            return None
+        # Rename paths repeated in numstat; the raw entry already has them
+        if not self._expect:
+            return self._complete()
+        return None
+
+    def _complete(self) -> Optional[Dict[str, Any]]:
+        if not self._raw:
+            return None
+        record = self._raw.popleft()
+        insertions, deletions = self._numstat
+        binary = insertions is None
+        record.update({
+            "insertions": insertions or 0,
+            "deletions": deletions or 0,
+            "binary": binary,
+            "large": not binary and insertions + deletions > self.large_lines,
+        })
+        return record
+
+
+def parse_hunks(lines: List[str]) -> Dict[str, Any]:
+    """Parse one file's unified diff into hunks."""
+    result: Dict[str, Any] = {"binary": False, "hunks": []}
+    hunk: Optional[Dict[str, Any]] = None
+    for line in lines:
+        match = HUNK_RE.match(line)
+        if match:
+            old_start, old_lines, new_start, new_lines = match.groups()
+            hunk = {
+                "header": line,
+                "old_start": int(old_start),
+                "old_lines": int(old_lines) if old_lines is not None else 1,
+                "new_start": int(new_start),
+                "new_lines": int(new_lines) if new_lines is not None else 1,
+                "lines": [],
+            }
+            result["hunks"].append(hunk)
+        elif hunk is not None:
+            hunk["lines"].append(line)
+        elif line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+            result["binary"] = True
+    return result
+
+
+class DiffService:
+    """Per-file diff records and lazily loaded hunks, with an immutable-diff cache."""
+
+    def __init__(self, cache_size: int = 256, max_file_bytes: int = 512 * 1024, large_lines: int = 2000):
+        self.cache_size = cache_size
+        self.max_file_bytes = max_file_bytes
+        self.large_lines = large_lines
+        self._cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def _spec(
+        self, repo_path: str, base: Optional[str], target: Optional[str], staged: bool
+    ) -> Tuple[List[str], Optional[Tuple[str, str]]]:
+        """
+        git diff arguments for a comparison, plus the cache key sides when
+        both are immutable (base and target resolved to SHAs).
+        """
+        for ref in (base, target):
+            if ref is not None and (not ref or ref.startswith("-")):
+                raise DiffError(f"Invalid revision: {ref!r}")
+        if target is not None:
+            if base is None:
+                raise DiffError("target requires base")
+            sides = (await self._resolve(repo_path, base), await self._resolve(repo_path, target))
+            return list(sides), sides
+        args = ["--cached"] if staged else []
+        if base is not None:
+            args.append(await self._resolve(repo_path, base))
+        return args, None
+
+    async def _resolve(self, repo_path: str, ref: str) -> str:
+        try:
+            result = await git_runner.run(
+                repo_path, ["rev-parse", "--verify", "--quiet", f"{ref}^{{tree}}"], check=False
+            )
+        except (FileNotFoundError, NotADirectoryError) as e:
+            raise DiffError(str(e))
+        if result.returncode != 0:
+            raise DiffError(f"Unknown revision: {ref}")
+        return result.stdout.decode().strip()
+
+    def _cache_get(self, key: Tuple) -> Any:
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    def _cache_put(self, key: Tuple, value: Any):
+        self._cache[key] = value
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def files(
+        self,
+        repo_path: str,
+        base: Optional[str] = None,
+        target: Optional[str] = None,
+        staged: bool = False,
+        path: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream changed files with stats, then {"type": "summary"}.
+
+        Args:
+            repo_path: Repository path
+            base: Commit/tree to compare from (default: index, or HEAD with staged)
+            target: Commit/tree to compare to (default: worktree, or index with staged)
+            staged: Index vs base (HEAD by default)
+            path: Limit to a file or directory
+
+        Yields:
+            {"type": "file", "path", "old_path", "status", "insertions",
+            "deletions", "binary", "large", "old_sha", "new_sha"} per file,
+            then {"type": "summary", "files", "insertions", "deletions"}
+
+        Raises:
+            DiffError: Invalid revision or not a repository (before the first record)
+            OperationTimeoutError: Timed out
+        """
+        spec, sides = await self._spec(repo_path, base, target, staged)
+        key = ("files", *sides, path) if sides else None
+        records = self._cache_get(key) if key else None
+
+        if records is None:
+            records = []
+            parser = DiffStatParser(self.large_lines)
+            args = ["diff", "--raw", "--numstat", "-z", "-M", "--no-abbrev", "--no-ext-diff", *spec]
+            if path:
+                args += ["--", path]
+            try:
+                async for field in git_runner.iter_fields(repo_path, args):
+                    record = parser.feed(field)
+                    if record is not None:
+                        records.append(record)
+                        yield record
+            except (FileNotFoundError, NotADirectoryError, GitProcessError) as e:
+                raise DiffError(str(e))
+            if key:
+                self._cache_put(key, records)
+        else:
+            for record in records:
+                yield record
+
+        yield {
+            "type": "summary",
+            "files": len(records),
+            "insertions": sum(r["insertions"] for r in records),
+            "deletions": sum(r["deletions"] for r in records),
+        }
+
+    async def file_hunks(
+        self,
+        repo_path: str,
+        path: str,
+        base: Optional[str] = None,
+        target: Optional[str] = None,
+        staged: bool = False,
+        old_path: Optional[str] = None,
+        context_lines: int = 3,
+    ) -> Dict[str, Any]:
+        """
+        Hunks of one file's diff, truncated past max_file_bytes.
+
+        Args:
+            path: File path (new path for renames)
+            old_path: Previous path of a renamed file
+            context_lines: Lines of context around changes
+            (others as in files())
+
+        Returns:
+            {"path", "binary", "truncated", "hunks": [{"header", "old_start",
+            "old_lines", "new_start", "new_lines", "lines"}]}
+
+        Raises:
+            DiffError: Invalid revision or not a repository
+            OperationTimeoutError: Timed out
+        """
+        spec, sides = await self._spec(repo_path, base, target, staged)
+        key = ("hunks", *sides, path, old_path, context_lines) if sides else None
+        cached = self._cache_get(key) if key else None
+        if cached is not None:
+            return cached
+
+        args = ["diff", "--no-color", "--no-ext-diff", "-M", f"--unified={context_lines}", *spec, "--", path]
+        if old_path:
+            args.append(old_path)
+
+        lines: List[str] = []
+        size = 0
+        truncated = False
+        fields = git_runner.iter_fields(repo_path, args, sep=b"\n")
+        try:
+            async for line in fields:
+                size += len(line) + 1
+                if size > self.max_file_bytes:
+                    truncated = True
+                    break
+                lines.append(line.decode("utf-8", "replace"))
+        except (FileNotFoundError, NotADirectoryError, GitProcessError) as e:
+            raise DiffError(str(e))
+        finally:
+            # Stops git if we quit reading early
+            await fields.aclose()
+
+        result = {"path": path, **parse_hunks(lines), "truncated": truncated}
+        if truncated and result["hunks"]:
+            # The last hunk may be cut mid-way
+            result["hunks"][-1]["partial"] = True
+        if key:
+            self._cache_put(key, result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global diff service
+diff_service = DiffService(
+    cache_size=settings.git_diff_cache_size,
+    max_file_bytes=settings.git_diff_max_file_kb * 1024,
+    large_lines=settings.git_diff_large_lines,
+)
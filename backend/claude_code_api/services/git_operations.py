@@ -6,16 +6,24 @@ Provides git functionality for mobile app:
 - Branch management
 - Remote information
 
-Uses GitPython library for reliable git operations.
+Uses GitPython library for reliable git operations. Repo handles come
+from the shared repo pool instead of being opened per call. Status and
+remote operations (fetch, pull, push) run on the async git runner.
 """
 
 import os
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any
 import structlog
 from git import Repo, InvalidGitRepositoryError, GitCommandError
 
+from claude_code_api.core.config import settings
+from claude_code_api.services.git_runner import GitProcessError, git_runner
+from claude_code_api.services.git_status import StatusError, StatusParser, run_status, status_args
+from claude_code_api.services.repo_pool import RepoPool, repo_pool
+
 logger = structlog.get_logger()
 
 
@@ -32,51 +40,83 @@ class GitOperationError(Exception):
 class GitOperationsService:
     """Git operations service using GitPython."""
 
-    def get_status(self, repo_path: str) -> dict:
+    def __init__(self, pool: Optional[RepoPool] = repo_pool):
         """
-        Get full git status.
-
-        Returns:
-            Dict with modified, untracked, staged, current_branch, has_commits, conflicted
+        Args:
+            pool: Repo handle pool (None opens a fresh Repo per call)
         """
+        self.pool = pool
+
+    @contextmanager
+    def _repo(self, repo_path: str) -> Iterator[Repo]:
+        """Borrow a Repo for one operation, mapping "not a repo" errors."""
         try:
-            repo = Repo(repo_path)
+            if self.pool is not None:
+                with self.pool.repo(repo_path) as repo:
+                    yield repo
+            else:
+                repo = Repo(repo_path)
+                try:
+                    yield repo
+                finally:
+                    repo.close()
         except InvalidGitRepositoryError:
             raise GitNotFoundError(f"Not a git repository: {repo_path}")
 
-        # Get current branch
-        try:
-            current_branch = repo.active_branch.name
-        except TypeError:
-            # Detached HEAD
-            current_branch = "detached HEAD"
-
-        # Get file statuses
-        modified = [item.a_path for item in repo.index.diff(None)]
-        staged = [item.a_path for item in repo.index.diff('HEAD')]
-        untracked = repo.untracked_files
-        conflicted = [item[0] for item in repo.index.unmerged_blobs().items()]
-
-        # Check if repo has commits
-        try:
-            has_commits = bool(repo.head.commit)
-        except ValueError:
-            has_commits = False
-
-        status = {
-            "current_branch": current_branch,
-            "modified": modified,
-            "staged": staged,
-            "untracked": untracked,
-            "conflicted": conflicted,
-            "has_commits": has_commits,
-            "is_detached": current_branch == "detached HEAD",
-        }
+    def get_status(self, repo_path: str) -> dict:
+        """
+        Get full git status in a single `git status --porcelain=v2` pass.
+
+        Returns:
+            Dict with current_branch, is_detached, has_commits, head,
+            upstream, ahead, behind, staged, modified, untracked, conflicted
+            and renamed
+        """
+        with self._repo(repo_path) as repo:
+            work_tree = repo.working_tree_dir
+            if work_tree is None:
+                raise GitOperationError(f"Bare repository has no status: {repo_path}")
+            try:
+                status = run_status(
+                    work_tree,
+                    untracked_cache=settings.git_status_untracked_cache,
+                    fsmonitor=settings.git_status_fsmonitor,
+                )
+            except StatusError as e:
+                raise GitOperationError(str(e))
 
         logger.debug("Git status retrieved", repo=repo_path, status=status)
 
         return status
 
+    async def get_status_async(self, repo_path: str) -> dict:
+        """
+        Same as get_status, but as an asyncio subprocess on the git runner
+        (repo read lock, no executor thread).
+
+        Raises:
+            GitNotFoundError: Not a git repository
+            GitOperationError: git status failed
+            OperationTimeoutError: Timed out
+        """
+        parser = StatusParser()
+        try:
+            async for field in git_runner.iter_fields(
+                repo_path,
+                status_args(settings.git_status_untracked_cache, settings.git_status_fsmonitor),
+            ):
+                parser.feed(field)
+        except (FileNotFoundError, NotADirectoryError):
+            raise GitNotFoundError(f"Not a git repository: {repo_path}")
+        except GitProcessError as e:
+            if "not a git repository" in e.stderr:
+                raise GitNotFoundError(f"Not a git repository: {repo_path}")
+            raise GitOperationError(str(e))
+
+        logger.debug("Git status retrieved", repo=repo_path, status=parser.status)
+
+        return parser.status
+
     def create_commit(
         self,
         repo_path: str,
@@ -96,43 +136,39 @@ class GitOperationsService:
         Returns:
             Commit info: sha, short_sha, message, author, timestamp
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        # Stage files
-        if files:
-            repo.index.add(files)
-        else:
-            # Stage all modified and untracked
-            repo.git.add(A=True)
-
-        # Create commit
-        try:
-            if author:
-                commit = repo.index.commit(
-                    message,
-                    author=f"{author['name']} <{author['email']}>"
-                )
+        with self._repo(repo_path) as repo:
+            # Stage files
+            if files:
+                repo.index.add(files)
             else:
-                commit = repo.index.commit(message)
+                # Stage all modified and untracked
+                repo.git.add(A=True)
+
+            # Create commit
+            try:
+                if author:
+                    commit = repo.index.commit(
+                        message,
+                        author=f"{author['name']} <{author['email']}>"
+                    )
+                else:
+                    commit = repo.index.commit(message)
 
-            commit_info = {
-                "sha": commit.hexsha,
-                "short_sha": commit.hexsha[:7],
-                "message": commit.message,
-                "author": commit.author.name,
-                "email": commit.author.email,
-                "timestamp": datetime.fromtimestamp(commit.committed_date).isoformat(),
-            }
+                commit_info = {
+                    "sha": commit.hexsha,
+                    "short_sha": commit.hexsha[:7],
+                    "message": commit.message,
+                    "author": commit.author.name,
+                    "email": commit.author.email,
+                    "timestamp": datetime.fromtimestamp(commit.committed_date).isoformat(),
+                }
 
-            logger.info("Commit created", repo=repo_path, sha=commit_info["short_sha"])
+                logger.info("Commit created", repo=repo_path, sha=commit_info["short_sha"])
 
-            return commit_info
+                return commit_info
 
-        except GitCommandError as e:
-            raise GitOperationError(f"Failed to create commit: {e}")
+            except GitCommandError as e:
+                raise GitOperationError(f"Failed to create commit: {e}")
 
     def get_log(
         self,
@@ -153,35 +189,31 @@ class GitOperationsService:
         Returns:
             List of commit dicts
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        try:
-            if file_path:
-                commits = list(repo.iter_commits(paths=file_path, max_count=max_count, skip=skip))
-            else:
-                commits = list(repo.iter_commits(max_count=max_count, skip=skip))
-
-            log = []
-            for commit in commits:
-                log.append({
-                    "sha": commit.hexsha,
-                    "short_sha": commit.hexsha[:7],
-                    "message": commit.message.strip(),
-                    "author": commit.author.name,
-                    "email": commit.author.email,
-                    "timestamp": datetime.fromtimestamp(commit.committed_date).isoformat(),
-                    "files_changed": len(commit.stats.files),
-                })
+        with self._repo(repo_path) as repo:
+            try:
+                if file_path:
+                    commits = list(repo.iter_commits(paths=file_path, max_count=max_count, skip=skip))
+                else:
+                    commits = list(repo.iter_commits(max_count=max_count, skip=skip))
+
+                log = []
+                for commit in commits:
+                    log.append({
+                        "sha": commit.hexsha,
+                        "short_sha": commit.hexsha[:7],
+                        "message": commit.message.strip(),
+                        "author": commit.author.name,
+                        "email": commit.author.email,
+                        "timestamp": datetime.fromtimestamp(commit.committed_date).isoformat(),
+                        "files_changed": len(commit.stats.files),
+                    })
 
-            logger.debug("Git log retrieved", repo=repo_path, commits=len(log))
+                logger.debug("Git log retrieved", repo=repo_path, commits=len(log))
 
-            return log
+                return log
 
-        except GitCommandError as e:
-            raise GitOperationError(f"Failed to get log: {e}")
+            except GitCommandError as e:
+                raise GitOperationError(f"Failed to get log: {e}")
 
     def get_diff(
         self,
@@ -202,29 +234,25 @@ class GitOperationsService:
         Returns:
             Diff string in unified format
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        try:
-            if staged:
-                # Staged changes (index vs HEAD)
-                if file_path:
-                    diff = repo.git.diff('--staged', '--unified=' + str(context_lines), file_path)
-                else:
-                    diff = repo.git.diff('--staged', '--unified=' + str(context_lines))
-            else:
-                # Unstaged changes (working tree vs index)
-                if file_path:
-                    diff = repo.git.diff('--unified=' + str(context_lines), file_path)
+        with self._repo(repo_path) as repo:
+            try:
+                if staged:
+                    # Staged changes (index vs HEAD)
+                    if file_path:
+                        diff = repo.git.diff('--staged', '--unified=' + str(context_lines), file_path)
+                    else:
+                        diff = repo.git.diff('--staged', '--unified=' + str(context_lines))
                 else:
-                    diff = repo.git.diff('--unified=' + str(context_lines))
+                    # Unstaged changes (working tree vs index)
+                    if file_path:
+                        diff = repo.git.diff('--unified=' + str(context_lines), file_path)
+                    else:
+                        diff = repo.git.diff('--unified=' + str(context_lines))
 
-            return diff
+                return diff
 
-        except GitCommandError as e:
-            raise GitOperationError(f"Failed to get diff: {e}")
+            except GitCommandError as e:
+                raise GitOperationError(f"Failed to get diff: {e}")
 
     def get_branches(self, repo_path: str, include_remote: bool = False) -> List[dict]:
         """
@@ -237,36 +265,32 @@ class GitOperationsService:
         Returns:
             List of branch dicts
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        branches = []
-
-        # Local branches
-        for branch in repo.heads:
-            branches.append({
-                "name": branch.name,
-                "is_current": branch == repo.active_branch,
-                "last_commit": branch.commit.hexsha[:7],
-                "remote": None,
-            })
+        with self._repo(repo_path) as repo:
+            branches = []
+
+            # Local branches
+            for branch in repo.heads:
+                branches.append({
+                    "name": branch.name,
+                    "is_current": branch == repo.active_branch,
+                    "last_commit": branch.commit.hexsha[:7],
+                    "remote": None,
+                })
 
-        # Remote branches
-        if include_remote:
-            for remote in repo.remotes:
-                for ref in remote.refs:
-                    branches.append({
-                        "name": ref.name,
-                        "is_current": False,
-                        "last_commit": ref.commit.hexsha[:7],
-                        "remote": remote.name,
-                    })
+            # Remote branches
+            if include_remote:
+                for remote in repo.remotes:
+                    for ref in remote.refs:
+                        branches.append({
+                            "name": ref.name,
+                            "is_current": False,
+                            "last_commit": ref.commit.hexsha[:7],
+                            "remote": remote.name,
+                        })
 
-        logger.debug("Branches listed", repo=repo_path, count=len(branches))
+            logger.debug("Branches listed", repo=repo_path, count=len(branches))
 
-        return branches
+            return branches
 
     def create_branch(
         self,
@@ -285,28 +309,24 @@ class GitOperationsService:
         Returns:
             Branch info dict
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        try:
-            if from_branch:
-                new_branch = repo.create_head(branch_name, from_branch)
-            else:
-                new_branch = repo.create_head(branch_name)
+        with self._repo(repo_path) as repo:
+            try:
+                if from_branch:
+                    new_branch = repo.create_head(branch_name, from_branch)
+                else:
+                    new_branch = repo.create_head(branch_name)
 
-            branch_info = {
-                "name": new_branch.name,
-                "commit": new_branch.commit.hexsha[:7],
-            }
+                branch_info = {
+                    "name": new_branch.name,
+                    "commit": new_branch.commit.hexsha[:7],
+                }
 
-            logger.info("Branch created", repo=repo_path, branch=branch_name)
+                logger.info("Branch created", repo=repo_path, branch=branch_name)
 
-            return branch_info
+                return branch_info
 
-        except GitCommandError as e:
-            raise GitOperationError(f"Failed to create branch: {e}")
+            except GitCommandError as e:
+                raise GitOperationError(f"Failed to create branch: {e}")
 
     def checkout_branch(self, repo_path: str, branch_name: str) -> dict:
         """
@@ -319,29 +339,25 @@ class GitOperationsService:
         Returns:
             Branch info after checkout
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
-
-        try:
-            # Check for uncommitted changes
-            if repo.is_dirty():
-                raise GitOperationError("Cannot checkout: working directory has uncommitted changes")
+        with self._repo(repo_path) as repo:
+            try:
+                # Check for uncommitted changes
+                if repo.is_dirty():
+                    raise GitOperationError("Cannot checkout: working directory has uncommitted changes")
 
-            repo.git.checkout(branch_name)
+                repo.git.checkout(branch_name)
 
-            branch_info = {
-                "name": repo.active_branch.name,
-                "commit": repo.active_branch.commit.hexsha[:7],
-            }
+                branch_info = {
+                    "name": repo.active_branch.name,
+                    "commit": repo.active_branch.commit.hexsha[:7],
+                }
 
-            logger.info("Branch checked out", repo=repo_path, branch=branch_name)
+                logger.info("Branch checked out", repo=repo_path, branch=branch_name)
 
-            return branch_info
+                return branch_info
 
-        except GitCommandError as e:
-            raise GitOperationError(f"Failed to checkout branch: {e}")
+            except GitCommandError as e:
+                raise GitOperationError(f"Failed to checkout branch: {e}")
 
     def get_remote_info(self, repo_path: str) -> List[dict]:
         """
@@ -350,20 +366,79 @@ class GitOperationsService:
         Returns:
             List of remote dicts with name, url, fetch_url, push_url
         """
-        try:
-            repo = Repo(repo_path)
-        except InvalidGitRepositoryError:
-            raise GitNotFoundError(f"Not a git repository: {repo_path}")
+        with self._repo(repo_path) as repo:
+            remotes = []
+            for remote in repo.remotes:
+                remotes.append({
+                    "name": remote.name,
+                    "url": list(remote.urls)[0] if remote.urls else None,
+                    "fetch_url": remote.url if hasattr(remote, 'url') else None,
+                    "push_url": remote.url if hasattr(remote, 'url') else None,
+                })
+
+            logger.debug("Remotes listed", repo=repo_path, count=len(remotes))
 
-        remotes = []
-        for remote in repo.remotes:
-            remotes.append({
-                "name": remote.name,
-                "url": list(remote.urls)[0] if remote.urls else None,
-                "fetch_url": remote.url if hasattr(remote, 'url') else None,
-                "push_url": remote.url if hasattr(remote, 'url') else None,
-            })
+            return remotes
 
-        logger.debug("Remotes listed", repo=repo_path, count=len(remotes))
+    async def remote_operation(
+        self,
+        repo_path: str,
+        operation: str,
+        remote: str = "origin",
+        branch: Optional[str] = None,
+        force: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run fetch, pull or push and yield its progress events.
+
+        Pull is fast-forward only and a forced push uses --force-with-lease,
+        so neither can silently discard work. The repo's write lock is held
+        for the whole operation.
+
+        Args:
+            repo_path: Repository path
+            operation: "fetch", "pull" or "push"
+            remote: Remote name
+            branch: Branch (default: remote's default for fetch/pull, current for push)
+            force: Force push (with lease)
+
+        Yields:
+            {"type": "started"} once the repository is validated, then
+            progress events (see GitRunner.iter_progress), ending with a
+            {"type": "result"} event
+
+        Raises:
+            GitNotFoundError: Not a git repository
+            GitOperationError: Invalid remote or branch name
+            OperationTimeoutError: Timed out
+        """
+        for name in (remote, branch):
+            if name is not None and (not name or name.startswith("-")):
+                raise GitOperationError(f"Invalid remote or branch name: {name!r}")
+
+        if operation == "fetch":
+            args = ["fetch", "--progress", "--prune", remote]
+        elif operation == "pull":
+            args = ["pull", "--progress", "--ff-only", remote]
+        elif operation == "push":
+            args = ["push", "--progress", remote]
+            if force:
+                args.insert(1, "--force-with-lease")
+            if branch is None:
+                branch = "HEAD"
+        else:
+            raise GitOperationError(f"Unknown remote operation: {operation}")
+        if branch is not None:
+            args.append(branch)
+
+        try:
+            await git_runner.run(repo_path, ["rev-parse", "--git-dir"], timeout=10)
+        except (FileNotFoundError, NotADirectoryError, GitProcessError):
+            raise GitNotFoundError(f"Not a git repository: {repo_path}")
 
-        return remotes
+        logger.info("Git remote operation", repo=repo_path, operation=operation, remote=remote, branch=branch)
+        yield {"type": "started", "operation": operation, "remote": remote, "branch": branch}
+        async for event in git_runner.iter_progress(
+            repo_path, args, write=True, timeout=settings.git_remote_timeout_seconds
+        ):
+            yield event
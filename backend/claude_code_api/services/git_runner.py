@@ -0,0 +1,362 @@
+"""
+Git Runner
+
+Asyncio-native git subprocesses, for work that should not tie up an
+executor thread (network operations, long-running reads).
+
+- Per-repo reader/writer locks: reads of a repo run in parallel, writes
+  (commit, checkout, pull, push...) wait for them and run alone. Waiting
+  writers block new readers so they are not starved.
+- A global cap on concurrently running git processes.
+- Timeouts that kill the process.
+- Streaming stdout parsing (iter_fields) and progress events for
+  push/pull/fetch parsed from git's --progress output (iter_progress).
+
+Routes that still run GitPython in the blocking executor take the same
+repo lock via locked(), so those writes serialize with async git work.
+"""
+
+import asyncio
+import os
+import re
+import signal
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import OperationTimeoutError
+
+logger = structlog.get_logger()
+
+# Read size for process pipes
+CHUNK_SIZE = 64 * 1024
+
+# "Receiving objects:  45% (450/1000), 1.20 MiB | 2.00 MiB/s", optionally "remote: "-prefixed
+PROGRESS_RE = re.compile(
+    r"^(?:remote: )?(?P<phase>[A-Za-z][A-Za-z ]*):\s+(?P<percent>\d+)% \((?P<current>\d+)/(?P<total>\d+)\)"
+)
+
+
+def _command(args: List[str]) -> str:
+    """The git subcommand in args (skipping leading "-c key=value" pairs)."""
+    i = 0
+    while i < len(args) and args[i] == "-c":
+        i += 2
+    return args[i] if i < len(args) else ""
+
+
+class GitProcessError(Exception):
+    """git exited with a non-zero status."""
+
+    def __init__(self, args: List[str], returncode: int, stderr: str):
+        self.args_list = args
+        self.returncode = returncode
+        self.stderr = stderr
+        super().__init__(f"git {_command(args)} failed ({returncode}): {stderr}")
+
+
+@dataclass
+class GitResult:
+    """Output of a finished git command."""
+    returncode: int
+    stdout: bytes
+    stderr: str
+
+
+def parse_progress(line: str) -> Dict[str, Any]:
+    """Turn one line of git's --progress output into an event."""
+    match = PROGRESS_RE.match(line)
+    if match:
+        return {
+            "type": "progress",
+            "phase": match.group("phase").strip(),
+            "percent": int(match.group("percent")),
+            "current": int(match.group("current")),
+            "total": int(match.group("total")),
+        }
+    return {"type": "message", "text": line}
+
+
+class RepoLock:
+    """Writer-preferring reader/writer lock for one repository."""
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self.users = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            try:
+                await self._cond.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class GitRunner:
+    """Runs git as asyncio subprocesses under repo locks and a global cap."""
+
+    def __init__(self, max_concurrent: int = 8, timeout: float = 60.0, git: str = "git"):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.git = git
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._locks: Dict[str, RepoLock] = {}
+
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def locked(self, repo_path: str, write: bool = False):
+        """Hold a repository's read (shared) or write (exclusive) lock."""
+        key = os.path.realpath(repo_path)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = RepoLock()
+        lock.users += 1
+        try:
+            async with (lock.write() if write else lock.read()):
+                yield
+        finally:
+            lock.users -= 1
+            if lock.users == 0 and self._locks.get(key) is lock:
+                del self._locks[key]
+
+    @staticmethod
+    def _env() -> Dict[str, str]:
+        # Never wait on a credential or passphrase prompt nobody can answer
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0", LC_ALL="C")
+        env.setdefault("GIT_SSH_COMMAND", "ssh -o BatchMode=yes")
+        return env
+
+    @asynccontextmanager
+    async def _process(self, repo_path: str, args: List[str], write: bool, stderr):
+        """Start git under the repo lock and a global slot; kill it if abandoned."""
+        async with self.locked(repo_path, write=write):
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+            self.running += 1
+            proc = None
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    self.git, *args,
+                    cwd=repo_path,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=stderr,
+                    env=self._env(),
+                    start_new_session=True,
+                )
+                yield proc
+            finally:
+                if proc is not None and proc.returncode is None:
+                    # Kill the whole group: hooks, ssh and remote helpers too
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    await proc.wait()
+                self.running -= 1
+                self._semaphore.release()
+
+    def _finish(self, args: List[str], returncode: int, stderr: str, check: bool):
+        if returncode == 0:
+            self.completed += 1
+            return
+        self.failed += 1
+        if check:
+            raise GitProcessError(args, returncode, stderr)
+
+    def _timeout_error(self, args: List[str], timeout: float) -> OperationTimeoutError:
+        self.timed_out += 1
+        logger.warning("git command timed out", command=_command(args), timeout=timeout)
+        return OperationTimeoutError(f"git {_command(args)} timed out after {timeout}s")
+
+    async def run(
+        self,
+        repo_path: str,
+        args: List[str],
+        write: bool = False,
+        timeout: Optional[float] = None,
+        check: bool = True,
+    ) -> GitResult:
+        """
+        Run a git command and collect its output.
+
+        Args:
+            repo_path: Working directory
+            args: Arguments after "git"
+            write: Take the repo's write lock instead of a read lock
+            timeout: Seconds before the process is killed (default: runner timeout)
+            check: Raise GitProcessError on a non-zero exit
+
+        Raises:
+            GitProcessError: git failed (with check)
+            OperationTimeoutError: Timed out
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        async with self._process(repo_path, args, write, asyncio.subprocess.PIPE) as proc:
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                raise self._timeout_error(args, timeout)
+        result = GitResult(proc.returncode, stdout, stderr.decode("utf-8", "replace").strip())
+        self._finish(args, result.returncode, result.stderr, check)
+        return result
+
+    async def iter_fields(
+        self,
+        repo_path: str,
+        args: List[str],
+        sep: bytes = b"\0",
+        write: bool = False,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield sep-terminated fields of a command's stdout as they arrive.
+
+        Raises:
+            GitProcessError: git failed (after its output was consumed)
+            OperationTimeoutError: Timed out
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = loop.time() + timeout
+
+        # stderr goes to a file so an unread pipe can't stall git
+        with tempfile.TemporaryFile() as stderr:
+            async with self._process(repo_path, args, write, stderr) as proc:
+                tail = b""
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(proc.stdout.read(CHUNK_SIZE), deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        raise self._timeout_error(args, timeout)
+                    if not chunk:
+                        break
+                    parts = (tail + chunk).split(sep)
+                    tail = parts.pop()
+                    for part in parts:
+                        yield part
+                if tail:
+                    yield tail
+                try:
+                    returncode = await asyncio.wait_for(proc.wait(), max(deadline - loop.time(), 0.1))
+                except asyncio.TimeoutError:
+                    raise self._timeout_error(args, timeout)
+            stderr.seek(0)
+            self._finish(args, returncode, stderr.read().decode("utf-8", "replace").strip(), check=True)
+
+    async def iter_progress(
+        self,
+        repo_path: str,
+        args: List[str],
+        write: bool = True,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a network command (push/pull/fetch with --progress) and yield events.
+
+        Yields {"type": "progress", "phase", "percent", "current", "total"}
+        for progress updates, {"type": "message", "text"} for other output,
+        and finally {"type": "result", "success", "returncode", "output"}.
+
+        Raises:
+            OperationTimeoutError: Timed out (the process is killed)
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = loop.time() + timeout
+
+        async with self._process(repo_path, args, write, asyncio.subprocess.PIPE) as proc:
+            # stdout is small for these commands; drain it alongside stderr
+            stdout_task = asyncio.ensure_future(proc.stdout.read())
+            last: Optional[Dict[str, Any]] = None
+            messages: List[str] = []
+            tail = ""
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(proc.stderr.read(4096), deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        raise self._timeout_error(args, timeout)
+                    if not chunk:
+                        break
+                    # Progress lines are rewritten in place with \r
+                    lines = re.split(r"[\r\n]", tail + chunk.decode("utf-8", "replace"))
+                    tail = lines.pop()
+                    for line in lines:
+                        if not line.strip():
+                            continue
+                        event = parse_progress(line)
+                        if event == last:
+                            continue
+                        last = event
+                        if event["type"] == "message":
+                            messages.append(line)
+                        yield event
+                if tail.strip():
+                    messages.append(tail)
+                    yield parse_progress(tail)
+
+                try:
+                    stdout = await asyncio.wait_for(stdout_task, max(deadline - loop.time(), 0.1))
+                    returncode = await asyncio.wait_for(proc.wait(), max(deadline - loop.time(), 0.1))
+                except asyncio.TimeoutError:
+                    raise self._timeout_error(args, timeout)
+            finally:
+                stdout_task.cancel()
+
+        self._finish(args, returncode, "\n".join(messages[-5:]), check=False)
+        output = stdout.decode("utf-8", "replace").strip() or "\n".join(messages[-5:])
+        yield {"type": "result", "success": returncode == 0, "returncode": returncode, "output": output}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": self.waiting,
+            "locked_repos": len(self._locks),
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+        }
+
+
+# Global git runner
+git_runner = GitRunner(
+    max_concurrent=settings.git_max_concurrent,
+    timeout=settings.executor_git_timeout_seconds,
+)
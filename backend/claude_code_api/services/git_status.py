@@ -0,0 +1,193 @@
+"""
+Git Status
+
+Single-pass git status: one `git status --porcelain=v2 -z --branch`
+subprocess, parsed as its output streams in.
+
+The old status made four separate passes (index vs worktree, index vs
+HEAD, untracked files, unmerged blobs), each its own subprocess or index
+read. Porcelain v2 reports branch, upstream, ahead/behind, staged and
+unstaged changes, renames, conflicts and untracked files in one run.
+
+Optionally git's untracked cache and fsmonitor are enabled for the run
+(via `-c`), which lets git skip most of the directory walk on big repos.
+StatusParser takes one field at a time, so the async git runner feeds it
+straight from the subprocess pipe as well.
+"""
+
+import os
+import subprocess
+import tempfile
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+from git import Git
+
+# Read size for the status pipe
+CHUNK_SIZE = 64 * 1024
+
+
+class StatusError(Exception):
+    """git status failed."""
+    pass
+
+
+def iter_fields(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Split a -z stream into its NUL-terminated fields as data arrives."""
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parts = (tail + chunk).split(b"\0")
+        tail = parts.pop()
+        yield from parts
+    if tail:
+        yield tail
+
+
+class StatusParser:
+    """
+    Incremental parser for `git status --porcelain=v2 -z --branch` output.
+
+    Feed it NUL-separated fields in order; the result accumulates in
+    `status`: current_branch, is_detached, has_commits, head, upstream,
+    ahead, behind, staged, modified, untracked, conflicted and renamed
+    ([{"from", "to"}]). Paths are relative to the repository root.
+    """
+
+    def __init__(self):
+        self.status: Dict[str, Any] = {
+            "current_branch": None,
+            "is_detached": False,
+            "has_commits": True,
+            "head": None,
+            "upstream": None,
+            "ahead": 0,
+            "behind": 0,
+            "staged": [],
+            "modified": [],
+            "untracked": [],
+            "conflicted": [],
+            "renamed": [],
+        }
+        # A rename record is followed by its original path as a separate field
+        self._rename: Optional[Dict[str, str]] = None
+
+    def feed(self, field: bytes):
+        status = self.status
+        if self._rename is not None:
+            self._rename["from"] = os.fsdecode(field)
+            self._rename = None
+            return
+        if not field:
+            return
+        kind = field[:1]
+
+        if kind == b"#":
+            # "# branch.<key> <value>"
+            key, _, value = field[2:].decode("utf-8", "surrogateescape").partition(" ")
+            if key == "branch.oid":
+                if value == "(initial)":
+                    status["has_commits"] = False
+                else:
+                    status["head"] = value
+            elif key == "branch.head":
+                if value == "(detached)":
+                    status["current_branch"] = "detached HEAD"
+                    status["is_detached"] = True
+                else:
+                    status["current_branch"] = value
+            elif key == "branch.upstream":
+                status["upstream"] = value
+            elif key == "branch.ab":
+                ahead, _, behind = value.partition(" ")
+                status["ahead"] = int(ahead)
+                status["behind"] = -int(behind)
+
+        elif kind == b"1":
+            # 1 XY sub mH mI mW hH hI path
+            parts = field.split(b" ", 8)
+            self._add_change(parts[1], os.fsdecode(parts[8]))
+
+        elif kind == b"2":
+            # 2 XY sub mH mI mW hH hI Xscore path, then origPath as its own field
+            parts = field.split(b" ", 9)
+            path = os.fsdecode(parts[9])
+            self._rename = {"from": "", "to": path}
+            status["renamed"].append(self._rename)
+            self._add_change(parts[1], path)
+
+        elif kind == b"u":
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            status["conflicted"].append(os.fsdecode(field.split(b" ", 10)[10]))
+
+        elif kind == b"?":
+            status["untracked"].append(os.fsdecode(field[2:]))
+
+    def _add_change(self, xy: bytes, path: str):
+        if xy[:1] != b".":
+            self.status["staged"].append(path)
+        if xy[1:2] != b".":
+            self.status["modified"].append(path)
+
+
+def parse_porcelain_v2(fields: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    Parse `git status --porcelain=v2 -z --branch` output.
+
+    Args:
+        fields: NUL-separated fields (see iter_fields)
+
+    Returns:
+        Parsed status (see StatusParser)
+    """
+    parser = StatusParser()
+    for field in fields:
+        parser.feed(field)
+    return parser.status
+
+
+def status_args(untracked_cache: bool = False, fsmonitor: bool = False) -> List[str]:
+    """git arguments for a single-pass status."""
+    args = []
+    if untracked_cache:
+        args += ["-c", "core.untrackedCache=true"]
+    if fsmonitor:
+        args += ["-c", "core.fsmonitor=true"]
+    return args + ["status", "--porcelain=v2", "-z", "--branch", "--untracked-files=all"]
+
+
+def run_status(
+    work_tree: str,
+    untracked_cache: bool = False,
+    fsmonitor: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run git status once and parse it while it streams.
+
+    Args:
+        work_tree: Repository working tree
+        untracked_cache: Let git use (and create) the untracked cache
+        fsmonitor: Let git use its builtin filesystem monitor, where supported
+
+    Returns:
+        Parsed status (see parse_porcelain_v2)
+
+    Raises:
+        StatusError: git exited with an error
+    """
+    args = [Git.GIT_PYTHON_GIT_EXECUTABLE or "git"] + status_args(untracked_cache, fsmonitor)
+
+    # stderr goes to a file: per-file warnings could fill a pipe we aren't reading
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(args, cwd=work_tree, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            status = parse_porcelain_v2(iter_fields(proc.stdout))
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", "replace").strip()
+            raise StatusError(f"git status failed ({returncode}): {message}")
+    return status
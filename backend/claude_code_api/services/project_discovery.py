@@ -0,0 +1,255 @@
+"""
+Project Discovery
+
+Finds Claude Code projects (directories with CLAUDE.md, .git or .claude/)
+under a scan root:
+- Directories are listed with os.scandir, many at a time on the blocking
+  executor, and projects are yielded as soon as their directory is read
+- Every directory's mtime, markers and subdirectories are remembered (and
+  persisted under index_dir/discovery), so a rescan only lists directories
+  whose mtime changed; unchanged ones cost a single stat
+- A scan younger than the cache TTL is replayed without touching the disk
+
+Adding or removing a marker or a subdirectory changes the parent's mtime,
+which is what makes the per-directory cache safe.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor, OperationTimeoutError
+
+logger = structlog.get_logger()
+
+CACHE_VERSION = 1
+
+MARKERS = {"CLAUDE.md": "has_claudemd", ".git": "has_git", ".claude": "has_claude_dir"}
+
+# Skip these directories for performance
+SKIP_DIRS = {
+    'node_modules', '.git', 'venv', '.venv', '__pycache__',
+    'dist', 'build', '.next', 'target', 'vendor'
+}
+
+
+def scan_dir(path: str, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Read one directory (blocking).
+
+    Returns the cached entry untouched if the directory's mtime has not
+    changed, a fresh {"mtime_ns", "markers", "children"} entry otherwise,
+    or None if it is gone or unreadable.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if cached is not None and cached["mtime_ns"] == mtime_ns:
+        return cached
+
+    markers = {}
+    children = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name in MARKERS:
+                    markers[MARKERS[entry.name]] = True
+                if entry.name not in SKIP_DIRS:
+                    try:
+                        # Symlinks are not followed (cycles, scans leaving the root)
+                        if entry.is_dir(follow_symlinks=False):
+                            children.append(entry.name)
+                    except OSError:
+                        pass
+    except (PermissionError, NotADirectoryError, FileNotFoundError):
+        return None
+    return {"mtime_ns": mtime_ns, "markers": markers, "children": sorted(children)}
+
+
+def _project(path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    markers = entry["markers"]
+    return {
+        "name": os.path.basename(path) or path,
+        "path": path,
+        "has_claudemd": markers.get("has_claudemd", False),
+        "has_git": markers.get("has_git", False),
+        "session_count": 0,
+    }
+
+
+class ProjectDiscovery:
+    """Parallel, incremental project scans with a per-root directory cache."""
+
+    def __init__(self, cache_dir: str, parallelism: int = 8, cache_ttl: float = 30.0, persist: bool = True):
+        self.cache_dir = Path(cache_dir) / "discovery"
+        self.parallelism = parallelism
+        self.cache_ttl = cache_ttl
+        self.persist = persist
+        # root -> {"dirs": {path: entry}, "scanned_at": wall time, "max_depth": int}
+        self._roots: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self.scans = 0
+        self.replays = 0
+        self.dirs_listed = 0
+        self.dirs_unchanged = 0
+
+    def _cache_path(self, root: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(root.encode()).hexdigest()[:16] + ".json")
+
+    def _load(self, root: str) -> Dict[str, Any]:
+        """Persisted directory cache for a root (blocking)."""
+        try:
+            with open(self._cache_path(root), encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION and data.get("root") == root:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"dirs": {}, "scanned_at": 0.0, "max_depth": -1}
+
+    def _save(self, root: str, state: Dict[str, Any]):
+        path = self._cache_path(root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "root": root, **state}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    async def discover(
+        self, scan_path: str, max_depth: int = 3, refresh: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield projects under scan_path as they are found.
+
+        Args:
+            scan_path: Root path to scan
+            max_depth: Maximum directory depth below the root
+            refresh: Rescan even if the last scan is younger than the cache TTL
+
+        Yields:
+            {"name", "path", "has_claudemd", "has_git", "session_count": 0}
+
+        Raises:
+            OperationTimeoutError: Scan took longer than the discovery timeout
+        """
+        root = os.path.realpath(scan_path)
+        lock = self._locks.setdefault(root, asyncio.Lock())
+        async with lock:
+            state = self._roots.get(root)
+            if state is None:
+                state = await blocking_executor.run("file", self._load, root) if self.persist else None
+                state = state or {"dirs": {}, "scanned_at": 0.0, "max_depth": -1}
+                self._roots[root] = state
+
+            fresh = time.time() - state["scanned_at"] < self.cache_ttl
+            if not refresh and fresh and state["max_depth"] >= max_depth:
+                self.replays += 1
+                for path, depth, entry in self._walk_cached(root, state["dirs"], max_depth):
+                    if entry["markers"]:
+                        yield _project(path, entry)
+                return
+
+            async for project in self._scan(root, state, max_depth):
+                yield project
+
+    def _walk_cached(self, root: str, dirs: Dict[str, Any], max_depth: int):
+        stack = [(root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            entry = dirs.get(path)
+            if entry is None:
+                continue
+            yield path, depth, entry
+            if depth < max_depth:
+                stack.extend((os.path.join(path, name), depth + 1) for name in reversed(entry["children"]))
+
+    async def _scan(self, root: str, state: Dict[str, Any], max_depth: int) -> AsyncIterator[Dict[str, Any]]:
+        self.scans += 1
+        started = time.monotonic()
+        deadline = started + settings.executor_discovery_timeout_seconds
+        old_dirs: Dict[str, Any] = state["dirs"]
+        new_dirs: Dict[str, Any] = {}
+        queue: List[Tuple[str, int]] = [(root, 0)]
+        running: Dict[asyncio.Future, Tuple[str, int]] = {}
+        found = 0
+
+        try:
+            while queue or running:
+                while queue and len(running) < self.parallelism:
+                    path, depth = queue.pop()
+                    task = asyncio.ensure_future(blocking_executor.run("file", scan_dir, path, old_dirs.get(path)))
+                    running[task] = (path, depth)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise OperationTimeoutError(
+                        f"Project discovery of {root} timed out after {settings.executor_discovery_timeout_seconds}s"
+                    )
+                done, _ = await asyncio.wait(running, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    path, depth = running.pop(task)
+                    try:
+                        entry = task.result()
+                    except Exception as e:
+                        logger.warning("Error scanning directory", path=path, error=str(e))
+                        continue
+                    if entry is None:
+                        continue
+                    if entry is old_dirs.get(path):
+                        self.dirs_unchanged += 1
+                    else:
+                        self.dirs_listed += 1
+                    new_dirs[path] = entry
+                    if entry["markers"]:
+                        found += 1
+                        yield _project(path, entry)
+                    if depth < max_depth:
+                        queue.extend((os.path.join(path, name), depth + 1) for name in entry["children"])
+        finally:
+            for task in running:
+                task.cancel()
+
+        # Entries below max_depth from earlier, deeper scans still save listings later
+        if state["max_depth"] > max_depth:
+            for path, entry in old_dirs.items():
+                new_dirs.setdefault(path, entry)
+        state.update(dirs=new_dirs, scanned_at=time.time(), max_depth=max_depth)
+        if self.persist:
+            try:
+                await blocking_executor.run("file", self._save, root, state)
+            except Exception as e:
+                logger.warning("Failed to persist discovery cache", root=root, error=str(e))
+
+        logger.info(
+            "Project discovery completed",
+            scan_path=root,
+            projects_found=found,
+            directories=len(new_dirs),
+            duration_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "roots": len(self._roots),
+            "scans": self.scans,
+            "replays": self.replays,
+            "dirs_listed": self.dirs_listed,
+            "dirs_unchanged": self.dirs_unchanged,
+        }
+
+
+# Global project discovery
+project_discovery = ProjectDiscovery(
+    cache_dir=settings.index_dir,
+    parallelism=settings.discovery_parallelism,
+    cache_ttl=settings.discovery_cache_seconds,
+    persist=settings.discovery_persist,
+)
@@ -0,0 +1,365 @@
+"""Token- and cost-weighted usage quotas per API key."""
+
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.models.claude import get_model_info
+from claude_code_api.utils.parser import estimate_tokens
+
+logger = structlog.get_logger()
+
+TOKEN_WINDOW_SECONDS = 60
+
+
+class QuotaExceededError(Exception):
+    """Request would exceed the caller's token or cost budget."""
+
+    def __init__(self, message: str, dimension: str, retry_after: int, headers: Dict[str, str]):
+        super().__init__(message)
+        self.dimension = dimension
+        self.retry_after = retry_after
+        self.headers = headers
+
+
+class QuotaBudget:
+    """Budget limits for a single client (0 = unlimited)."""
+
+    def __init__(self, tokens_per_minute: int, usd_per_day: float):
+        self.tokens_per_minute = tokens_per_minute
+        self.usd_per_day = usd_per_day
+
+    def to_dict(self) -> Dict:
+        return {
+            "tokens_per_minute": self.tokens_per_minute,
+            "usd_per_day": self.usd_per_day,
+        }
+
+
+class QuotaReservation:
+    """Estimated charge held against a budget until the request settles."""
+
+    def __init__(self, client_id: str, tokens: int, cost: float):
+        self.reservation_id = str(uuid.uuid4())
+        self.client_id = client_id
+        self.tokens = tokens
+        self.cost = cost
+        self.created_at = time.time()
+        self.settled = False
+
+
+class ClientUsage:
+    """Rolling usage state for a single client."""
+
+    def __init__(self):
+        self.token_events: Deque[Tuple[float, int]] = deque()
+        self.window_tokens = 0
+        self.pending_tokens = 0
+        self.day = datetime.utcnow().date()
+        self.day_cost = 0.0
+        self.pending_cost = 0.0
+        self.total_tokens = 0
+        self.total_cost = 0.0
+        self.rejections = 0
+
+    def expire(self, now: float):
+        """Drop token charges older than the window and roll the cost day."""
+        cutoff = now - TOKEN_WINDOW_SECONDS
+        while self.token_events and self.token_events[0][0] < cutoff:
+            _, tokens = self.token_events.popleft()
+            self.window_tokens -= tokens
+
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.day_cost = 0.0
+
+
+class QuotaManager:
+    """
+    Per-client token/minute and USD/day budgets.
+
+    Requests are admitted against an estimate (reserve), then charged with the
+    real usage reported by Claude's final ``result`` event (settle). Pending
+    reservations count against the budget so concurrent requests cannot
+    overshoot it together. A reservation nobody settles (a request that
+    died before its cleanup ran) is charged its estimate once it is older
+    than quota_reservation_ttl_seconds.
+    """
+
+    def __init__(self, tokens_per_minute: int, usd_per_day: float):
+        self.default_budget = QuotaBudget(tokens_per_minute, usd_per_day)
+        self.budgets: Dict[str, QuotaBudget] = {}
+        self.usage: Dict[str, ClientUsage] = {}
+        self.reservations: Dict[str, QuotaReservation] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.quota_enabled
+
+    def get_budget(self, client_id: str) -> QuotaBudget:
+        """Get budget for client (override or default)."""
+        return self.budgets.get(client_id, self.default_budget)
+
+    def set_budget(
+        self,
+        client_id: str,
+        tokens_per_minute: Optional[int] = None,
+        usd_per_day: Optional[float] = None
+    ) -> QuotaBudget:
+        """Override budget for a specific client."""
+        current = self.get_budget(client_id)
+        budget = QuotaBudget(
+            tokens_per_minute if tokens_per_minute is not None else current.tokens_per_minute,
+            usd_per_day if usd_per_day is not None else current.usd_per_day,
+        )
+        self.budgets[client_id] = budget
+
+        logger.info("Quota budget set", client_id=client_id, **budget.to_dict())
+
+        return budget
+
+    def _get_usage(self, client_id: str, now: float) -> ClientUsage:
+        if client_id not in self.usage:
+            self.usage[client_id] = ClientUsage()
+
+        usage = self.usage[client_id]
+        usage.expire(now)
+        return usage
+
+    def estimate(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[int, float]:
+        """
+        Estimate tokens and cost for a request before it runs.
+
+        Returns: (tokens, cost_usd)
+        """
+        input_tokens = estimate_tokens(prompt) + (estimate_tokens(system_prompt) if system_prompt else 0)
+        output_tokens = max_tokens or settings.quota_estimated_output_tokens
+
+        return input_tokens + output_tokens, estimate_cost(model, input_tokens, output_tokens)
+
+    def reserve(self, client_id: str, tokens: int, cost: float) -> QuotaReservation:
+        """
+        Admit request against budget and hold its estimated charge.
+
+        Raises:
+            QuotaExceededError: If the estimate does not fit the remaining budget
+        """
+        now = time.time()
+        self._sweep(now)
+        budget = self.get_budget(client_id)
+        usage = self._get_usage(client_id, now)
+
+        if budget.tokens_per_minute:
+            # A single request larger than the whole budget still runs once the window is empty
+            used = usage.window_tokens + usage.pending_tokens
+            if used > 0 and used + tokens > budget.tokens_per_minute:
+                usage.rejections += 1
+                raise self._exceeded(client_id, "tokens", self._token_reset(usage, now))
+
+        if budget.usd_per_day:
+            if usage.day_cost + usage.pending_cost + cost > budget.usd_per_day:
+                usage.rejections += 1
+                raise self._exceeded(client_id, "cost", _seconds_until_midnight())
+
+        reservation = QuotaReservation(client_id, tokens, cost)
+        usage.pending_tokens += tokens
+        usage.pending_cost += cost
+        self.reservations[reservation.reservation_id] = reservation
+
+        logger.debug(
+            "Quota reserved",
+            client_id=client_id,
+            tokens=tokens,
+            cost=cost
+        )
+
+        return reservation
+
+    def settle(self, reservation: QuotaReservation, tokens: int, cost: float):
+        """Replace a reservation's estimate with the actual charge."""
+        if reservation.settled:
+            return
+
+        now = time.time()
+        usage = self._get_usage(reservation.client_id, now)
+
+        self._release_pending(reservation, usage)
+
+        if tokens > 0:
+            usage.token_events.append((now, tokens))
+            usage.window_tokens += tokens
+        usage.day_cost += cost
+        usage.total_tokens += tokens
+        usage.total_cost += cost
+
+        logger.debug(
+            "Quota settled",
+            client_id=reservation.client_id,
+            estimated_tokens=reservation.tokens,
+            actual_tokens=tokens,
+            estimated_cost=reservation.cost,
+            actual_cost=cost
+        )
+
+    def settle_estimate(self, reservation: QuotaReservation):
+        """Charge the estimate when no usage was reported (e.g. aborted stream)."""
+        self.settle(reservation, reservation.tokens, reservation.cost)
+
+    def release(self, reservation: QuotaReservation):
+        """Drop a reservation without charging (request never ran)."""
+        if reservation.settled:
+            return
+
+        usage = self._get_usage(reservation.client_id, time.time())
+        self._release_pending(reservation, usage)
+
+    def _release_pending(self, reservation: QuotaReservation, usage: ClientUsage):
+        reservation.settled = True
+        usage.pending_tokens = max(0, usage.pending_tokens - reservation.tokens)
+        usage.pending_cost = max(0.0, usage.pending_cost - reservation.cost)
+        self.reservations.pop(reservation.reservation_id, None)
+
+    def _sweep(self, now: float):
+        """Settle reservations abandoned past the TTL at their estimate."""
+        cutoff = now - settings.quota_reservation_ttl_seconds
+        expired = [r for r in self.reservations.values() if r.created_at < cutoff]
+        for reservation in expired:
+            logger.warning(
+                "Quota reservation expired",
+                client_id=reservation.client_id,
+                age_seconds=int(now - reservation.created_at)
+            )
+            self.settle_estimate(reservation)
+
+    def _token_reset(self, usage: ClientUsage, now: float) -> int:
+        """Seconds until the oldest token charge leaves the window."""
+        if not usage.token_events:
+            return 1
+        return max(1, int(usage.token_events[0][0] + TOKEN_WINDOW_SECONDS - now) + 1)
+
+    def _exceeded(self, client_id: str, dimension: str, retry_after: int) -> QuotaExceededError:
+        logger.warning(
+            "Quota exceeded",
+            client_id=client_id,
+            dimension=dimension,
+            retry_after=retry_after
+        )
+
+        headers = self.get_headers(client_id)
+        headers["Retry-After"] = str(retry_after)
+
+        label = "Token rate" if dimension == "tokens" else "Daily cost"
+        return QuotaExceededError(
+            f"{label} quota exceeded. Please try again later.",
+            dimension=dimension,
+            retry_after=retry_after,
+            headers=headers,
+        )
+
+    def get_status(self, client_id: str) -> Dict:
+        """Get budget, usage and remaining quota for client."""
+        now = time.time()
+        budget = self.get_budget(client_id)
+        usage = self._get_usage(client_id, now)
+
+        tokens_used = usage.window_tokens + usage.pending_tokens
+        cost_used = usage.day_cost + usage.pending_cost
+
+        return {
+            "client_id": client_id,
+            "budget": budget.to_dict(),
+            "tokens": {
+                "used": tokens_used,
+                "pending": usage.pending_tokens,
+                "remaining": max(0, budget.tokens_per_minute - tokens_used) if budget.tokens_per_minute else None,
+                "reset_seconds": self._token_reset(usage, now),
+            },
+            "cost": {
+                "used": round(cost_used, 6),
+                "pending": round(usage.pending_cost, 6),
+                "remaining": round(max(0.0, budget.usd_per_day - cost_used), 6) if budget.usd_per_day else None,
+                "reset_seconds": _seconds_until_midnight(),
+            },
+            "total_tokens": usage.total_tokens,
+            "total_cost": round(usage.total_cost, 6),
+            "rejections": usage.rejections,
+        }
+
+    def get_headers(self, client_id: str) -> Dict[str, str]:
+        """Build X-Quota-* response headers for client."""
+        status = self.get_status(client_id)
+        headers = {}
+
+        if status["budget"]["tokens_per_minute"]:
+            headers["X-Quota-Tokens-Limit"] = str(status["budget"]["tokens_per_minute"])
+            headers["X-Quota-Tokens-Remaining"] = str(status["tokens"]["remaining"])
+            headers["X-Quota-Tokens-Reset"] = str(status["tokens"]["reset_seconds"])
+
+        if status["budget"]["usd_per_day"]:
+            headers["X-Quota-Cost-Limit"] = f"{status['budget']['usd_per_day']:.4f}"
+            headers["X-Quota-Cost-Remaining"] = f"{status['cost']['remaining']:.4f}"
+            headers["X-Quota-Cost-Reset"] = str(status["cost"]["reset_seconds"])
+
+        return headers
+
+    def reset(self, client_id: str):
+        """Reset usage for client (keeps budget override)."""
+        if client_id in self.usage:
+            del self.usage[client_id]
+
+    def get_stats(self) -> Dict:
+        """Get quota statistics."""
+        now = time.time()
+        self._sweep(now)
+        clients = {}
+        for client_id in list(self.usage.keys()):
+            usage = self._get_usage(client_id, now)
+            clients[client_id] = {
+                "window_tokens": usage.window_tokens,
+                "pending_tokens": usage.pending_tokens,
+                "day_cost": round(usage.day_cost, 6),
+                "rejections": usage.rejections,
+            }
+
+        return {
+            "enabled": self.enabled,
+            "default_budget": self.default_budget.to_dict(),
+            "overrides": {cid: b.to_dict() for cid, b in self.budgets.items()},
+            "open_reservations": len(self.reservations),
+            "clients": clients,
+        }
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimate USD cost from the model catalog."""
+    model_info = get_model_info(model)
+    # Catalog prices are quoted per million tokens (Opus: $15 in / $75 out)
+    return (
+        input_tokens * model_info.input_cost_per_1k
+        + output_tokens * model_info.output_cost_per_1k
+    ) / 1_000_000
+
+
+def _seconds_until_midnight() -> int:
+    """Seconds until the daily cost budget resets (UTC midnight)."""
+    now = datetime.utcnow()
+    midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+# Global quota manager
+quota_manager = QuotaManager(
+    tokens_per_minute=settings.quota_tokens_per_minute,
+    usd_per_day=settings.quota_usd_per_day,
+)
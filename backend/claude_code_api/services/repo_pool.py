@@ -0,0 +1,184 @@
+"""
+Repo Pool
+
+Persistent GitPython Repo handles, keyed by resolved repository path.
+
+Opening a Repo rediscovers the git dir and every handle lazily spawns its
+own `git cat-file --batch` helpers, so constructing one per call costs a
+few process starts. The pool keeps handles open instead:
+
+- LRU eviction closes the least recently used handle (and its cat-file
+  processes); a handle still in use is closed when its last user leaves.
+- A handle is reopened when .git/HEAD or .git/index changes on disk, so
+  branch switches and index rewrites by other git clients are picked up.
+- Repo objects are not thread-safe, and executor threads share them, so
+  each handle has its own lock and is used by one thread at a time. This
+  also serializes checkout against concurrent reads of the same repo.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+import structlog
+from git import Repo
+
+from claude_code_api.core.config import settings
+
+logger = structlog.get_logger()
+
+# (mtime_ns, size) of HEAD and index; None when the file does not exist
+Signature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+def _stat_signature(git_dir: str) -> Signature:
+    signature = []
+    for name in ("HEAD", "index"):
+        try:
+            st = os.stat(os.path.join(git_dir, name))
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class _PoolEntry:
+    """One pooled handle; repo and signature are guarded by lock."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.repo: Optional[Repo] = None
+        self.signature: Signature = ()
+        self.users = 0
+        self.evicted = False
+
+    def close(self):
+        if self.repo is not None:
+            self.repo.close()
+            self.repo = None
+
+
+class RepoPool:
+    """LRU pool of open Repo handles."""
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @contextmanager
+    def repo(self, repo_path: str) -> Iterator[Repo]:
+        """
+        Borrow the handle for a repository.
+
+        The handle is locked for the duration of the block, so keep blocks
+        short and never hold a Repo beyond them.
+
+        Raises:
+            InvalidGitRepositoryError: Not a git repository
+            NoSuchPathError: Path does not exist
+        """
+        entry = self._acquire(os.path.realpath(repo_path))
+        try:
+            with entry.lock:
+                self._refresh(entry)
+                try:
+                    yield entry.repo
+                finally:
+                    # Our own writes (commit, checkout, index refresh) don't
+                    # invalidate the handle; only changes made elsewhere do
+                    if entry.repo is not None:
+                        entry.signature = _stat_signature(entry.repo.git_dir)
+        finally:
+            self._release(entry)
+
+    def _acquire(self, key: str) -> _PoolEntry:
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(key)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_size:
+                    _, old = self._entries.popitem(last=False)
+                    old.evicted = True
+                    self.evictions += 1
+                    if old.users == 0:
+                        evicted.append(old)
+            else:
+                self._entries.move_to_end(key)
+            entry.users += 1
+
+        for old in evicted:
+            with old.lock:
+                old.close()
+        return entry
+
+    def _release(self, entry: _PoolEntry):
+        with self._lock:
+            entry.users -= 1
+            if entry.repo is None and self._entries.get(entry.path) is entry:
+                # Failed to open; don't keep an empty slot
+                del self._entries[entry.path]
+            close_now = entry.evicted and entry.users == 0
+
+        if close_now:
+            with entry.lock:
+                entry.close()
+
+    def _refresh(self, entry: _PoolEntry):
+        """Open the handle, or reopen it if HEAD/index changed. Holds entry.lock."""
+        if entry.repo is not None:
+            signature = _stat_signature(entry.repo.git_dir)
+            if signature == entry.signature:
+                self.hits += 1
+                return
+            entry.close()
+            self.invalidations += 1
+        else:
+            self.misses += 1
+
+        entry.repo = Repo(entry.path)
+        entry.signature = _stat_signature(entry.repo.git_dir)
+
+    def invalidate(self, repo_path: str):
+        """Close the handle for a repository (reopened on next use)."""
+        with self._lock:
+            entry = self._entries.get(os.path.realpath(repo_path))
+        if entry is not None:
+            with entry.lock:
+                entry.close()
+
+    def close_all(self):
+        """Close every handle (shutdown)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.evicted = True
+            with entry.lock:
+                entry.close()
+        logger.info("Repo pool closed", repos=len(entries))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_repos = sum(1 for entry in self._entries.values() if entry.repo is not None)
+        return {
+            "open": open_repos,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+# Global repo pool
+repo_pool = RepoPool(max_size=settings.git_repo_pool_size)
@@ -0,0 +1,574 @@
+"""
+Unified Search Index
+
+One in-process inverted index over sessions, skills and agents, ranked
+with BM25F:
+- Documents have title, description and body fields with their own
+  boosts and length normalization
+- The last query token is also matched as a prefix (type-ahead), and
+  tokens with no exact or prefix hit fall back to terms one typo away
+  (symmetric-delete lookup)
+- Sources register a loader per content type; a type that is older than
+  its refresh interval is reloaded in a background task while queries
+  are answered from the index as it is. Only a type that has never been
+  loaded makes a query wait. Incremental sources only fetch what changed
+  since the last load
+- Postings are snapshotted to disk as-is, together with each source's
+  load time and watermark, a few seconds after the index changes. Startup
+  is one json.loads, and types restored from the snapshot are served
+  without reloading first
+
+Query cost depends on the posting lists of the query terms, not on the
+size of the corpus. Files and commits have their own per-project indexes
+(file index, trigram index, git commit-graph) and are not held here.
+"""
+
+import asyncio
+import bisect
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+
+logger = structlog.get_logger()
+
+SNAPSHOT_VERSION = 1
+
+# BM25F: fields in posting order, with per-field boost and length normalization
+FIELDS = ("title", "description", "body")
+FIELD_BOOSTS = (3.0, 1.5, 1.0)
+FIELD_B = (0.5, 0.75, 0.75)
+K1 = 1.2
+
+# Weights of expanded query terms relative to an exact hit
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.5
+MAX_PREFIX_TERMS = 32
+
+# Typo lookup only for tokens at least this long
+MIN_TYPO_LENGTH = 4
+
+# Raw BM25 score that maps to 0.5 on the 0..1 scale other search legs use
+SCORE_HALF = 5.0
+
+# Delay before a changed index is written to its snapshot (coalesces bursts)
+SAVE_DELAY_SECONDS = 5.0
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens; camelCase, snake_case and kebab-case are split."""
+    if not text:
+        return []
+    return [t[:40] for t in _TOKEN_RE.findall(_CAMEL_RE.sub(r"\1 \2", text).lower())]
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Levenshtein distance <= 1, counting an adjacent swap as one edit."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (
+            i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+        )
+    return a[i + 1:] == b[i:] if la > lb else a[i:] == b[i + 1:]
+
+
+def normalize_score(raw: float) -> float:
+    """Map an unbounded BM25 score into (0, 1)."""
+    return raw / (raw + SCORE_HALF)
+
+
+class SearchIndex:
+    """
+    BM25F inverted index.
+
+    Documents are dicts with "id" (unique across types), "type", the text
+    fields in FIELDS, and anything else (path, metadata...), which is
+    stored and returned with hits.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        # term -> {doc id -> [tf per field]}
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        self._total_len = [0] * len(FIELDS)
+
+        # Derived lookups, rebuilt lazily after the term set changes
+        self._sorted_terms: Optional[List[str]] = None
+        self._delete_map: Optional[Dict[str, Set[str]]] = None
+
+        self.loaded_from_snapshot = False
+        # Per-source state saved with the snapshot (see SearchIndexService)
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # Updates
+
+    def upsert(self, doc: Dict[str, Any]) -> bool:
+        """Add or replace a document; False if it was already indexed unchanged."""
+        fields = [tokenize(doc.get(name)) for name in FIELDS]
+        stored = {k: v for k, v in doc.items() if k not in ("terms", "lengths")}
+        with self._lock:
+            old = self._docs.get(doc["id"])
+            if old is not None:
+                if {k: v for k, v in old.items() if k not in ("terms", "lengths")} == stored:
+                    return False
+                self._remove(doc["id"])
+
+            counts: Dict[str, List[int]] = {}
+            for f, tokens in enumerate(fields):
+                for token in tokens:
+                    tf = counts.get(token)
+                    if tf is None:
+                        tf = counts[token] = [0] * len(FIELDS)
+                    tf[f] += 1
+            new_terms = False
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = {}
+                    new_terms = True
+                posting[doc["id"]] = tf
+
+            lengths = [len(tokens) for tokens in fields]
+            for f, length in enumerate(lengths):
+                self._total_len[f] += length
+            self._docs[doc["id"]] = {**stored, "terms": list(counts), "lengths": lengths}
+            if new_terms:
+                self._sorted_terms = None
+                self._delete_map = None
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        dropped = False
+        for term in doc["terms"]:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+                dropped = True
+        for f, length in enumerate(doc["lengths"]):
+            self._total_len[f] -= length
+        if dropped:
+            self._sorted_terms = None
+            self._delete_map = None
+        return True
+
+    def replace_type(self, doc_type: str, docs: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Make the documents of one type exactly docs (unchanged ones are kept as-is)."""
+        with self._lock:
+            keep = set()
+            changed = 0
+            for doc in docs:
+                keep.add(doc["id"])
+                changed += self.upsert(doc)
+            stale = [doc_id for doc_id, doc in self._docs.items() if doc["type"] == doc_type and doc_id not in keep]
+            for doc_id in stale:
+                self._remove(doc_id)
+            return {"updated": changed, "removed": len(stale)}
+
+    # Querying
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Index terms a query token stands for, with weights."""
+        terms = []
+        if token in self._postings:
+            terms.append((token, 1.0))
+        if prefix:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            i = bisect.bisect_right(self._sorted_terms, token)
+            while i < len(self._sorted_terms) and len(terms) < MAX_PREFIX_TERMS:
+                term = self._sorted_terms[i]
+                if not term.startswith(token):
+                    break
+                terms.append((term, PREFIX_WEIGHT))
+                i += 1
+        if terms or len(token) < MIN_TYPO_LENGTH:
+            return terms
+
+        if self._delete_map is None:
+            delete_map: Dict[str, Set[str]] = defaultdict(set)
+            for term in self._postings:
+                if len(term) >= MIN_TYPO_LENGTH - 1:
+                    for variant in _deletes(term):
+                        delete_map[variant].add(term)
+            self._delete_map = dict(delete_map)
+
+        candidates = set(self._delete_map.get(token, ()))
+        for variant in _deletes(token):
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._delete_map.get(variant, ()))
+        return [(term, TYPO_WEIGHT) for term in candidates if _within_one_edit(token, term)]
+
+    def search(
+        self, query: str, types: Optional[Iterable[str]] = None, limit: int = 20
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Free text; the last word also matches as a prefix
+            types: Only these document types (default: all)
+            limit: Maximum hits
+
+        Returns:
+            (document, score in (0, 1)) pairs, best first
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        wanted = set(types) if types is not None else None
+
+        with self._lock:
+            self.queries += 1
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_len = [max(total / n_docs, 1.0) for total in self._total_len]
+
+            scores: Dict[str, float] = defaultdict(float)
+            for position, token in enumerate(dict.fromkeys(tokens)):
+                # Per query token, a document counts its best-matching expansion once
+                best: Dict[str, float] = {}
+                for term, weight in self._expand(token, prefix=position == len(tokens) - 1):
+                    posting = self._postings[term]
+                    idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for doc_id, tf in posting.items():
+                        doc = self._docs[doc_id]
+                        if wanted is not None and doc["type"] not in wanted:
+                            continue
+                        lengths = doc["lengths"]
+                        w = 0.0
+                        for f in range(len(FIELDS)):
+                            if tf[f]:
+                                norm = 1 - FIELD_B[f] + FIELD_B[f] * lengths[f] / avg_len[f]
+                                w += FIELD_BOOSTS[f] * tf[f] / norm
+                        score = weight * idf * w * (K1 + 1) / (w + K1)
+                        if score > best.get(doc_id, 0.0):
+                            best[doc_id] = score
+                for doc_id, score in best.items():
+                    scores[doc_id] += score
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [
+                ({k: v for k, v in self._docs[doc_id].items() if k not in ("terms", "lengths")},
+                 normalize_score(score))
+                for doc_id, score in top
+            ]
+
+    # Persistence
+
+    def save(self, snapshot_path: Path, sources: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Write a gzip snapshot (header line + documents and postings)."""
+        with self._lock:
+            header = {
+                "version": SNAPSHOT_VERSION,
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "sources": sources or {},
+            }
+            body = json.dumps(
+                {"docs": self._docs, "postings": self._postings, "total_len": self._total_len},
+                separators=(",", ":"), default=str,
+            )
+
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(json.dumps(header) + "\n")
+            f.write(body)
+        os.replace(tmp_path, snapshot_path)
+
+    @classmethod
+    def load(cls, snapshot_path: Path) -> Optional["SearchIndex"]:
+        """Load a snapshot written by save(); None if missing or stale format."""
+        try:
+            with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != SNAPSHOT_VERSION:
+                    return None
+                body = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        index._docs = body["docs"]
+        index._postings = body["postings"]
+        index._total_len = body["total_len"]
+        index.sources = header.get("sources") or {}
+        index.loaded_from_snapshot = True
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            types: Dict[str, int] = defaultdict(int)
+            for doc in self._docs.values():
+                types[doc["type"]] += 1
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "types": dict(types),
+                "from_snapshot": self.loaded_from_snapshot,
+                "queries": self.queries,
+            }
+
+
+# Loader for one content type: all documents, or (incremental) those
+# changed after `since`
+Loader = Callable[[Optional[datetime]], Awaitable[List[Dict[str, Any]]]]
+
+
+class _Source:
+    def __init__(self, doc_type: str, loader: Loader, refresh_seconds: float, incremental: bool):
+        self.doc_type = doc_type
+        self.loader = loader
+        self.refresh_seconds = refresh_seconds
+        self.incremental = incremental
+        self.loaded_at: Optional[float] = None  # monotonic
+        self.watermark: Optional[datetime] = None  # wall clock, for incremental loads
+        self.lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.refresh_seconds
+
+    def to_snapshot(self) -> Optional[Dict[str, Any]]:
+        if self.loaded_at is None:
+            return None
+        return {
+            "refreshed_at": time.time() - (time.monotonic() - self.loaded_at),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        self.loaded_at = time.monotonic() - max(0.0, time.time() - state["refreshed_at"])
+        self.watermark = datetime.fromisoformat(state["watermark"]) if state.get("watermark") else None
+
+
+class SearchIndexService:
+    """The shared index, its sources and its snapshot."""
+
+    def __init__(self, index_dir: str, refresh_seconds: float, persist: bool = True):
+        self.snapshot_path = Path(index_dir) / "search" / "unified.json.gz"
+        self.refresh_seconds = refresh_seconds
+        self.persist = persist
+        self.index = SearchIndex()
+        self._sources: Dict[str, _Source] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+    def register_source(
+        self, doc_type: str, loader: Loader, refresh_seconds: Optional[float] = None, incremental: bool = False
+    ):
+        """
+        Register the loader for a document type.
+
+        Args:
+            doc_type: Document type the loader produces
+            loader: Async callable taking `since` (None = everything)
+            refresh_seconds: Reload interval (default: search_index_refresh_seconds)
+            incremental: Loader honours `since`, so reloads only add/update
+                documents; call invalidate() after deletions
+        """
+        self._sources[doc_type] = _Source(
+            doc_type, loader, self.refresh_seconds if refresh_seconds is None else refresh_seconds, incremental
+        )
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            if self.persist:
+                index = await blocking_executor.run("index", SearchIndex.load, self.snapshot_path)
+                if index is not None:
+                    self.index = index
+                    for doc_type, state in index.sources.items():
+                        source = self._sources.get(doc_type)
+                        if source is not None and source.loaded_at is None:
+                            source.restore(state)
+                    logger.info("Search index loaded", documents=len(index))
+            self._loaded = True
+
+    async def refresh(self, doc_type: str, force: bool = False):
+        """Reload a type from its source if older than its refresh interval."""
+        source = self._sources.get(doc_type)
+        if source is None:
+            return
+        await self._ensure_loaded()
+        async with source.lock:
+            now = time.monotonic()
+            if not force and source.loaded_at is not None and now - source.loaded_at < source.refresh_seconds:
+                return
+            since = source.watermark if source.incremental and not force else None
+            started = datetime.utcnow()
+            docs = await source.loader(since)
+            if since is None:
+                result = await blocking_executor.run("index", self.index.replace_type, doc_type, docs)
+                changed = result["updated"] + result["removed"]
+            else:
+                changed = await blocking_executor.run("index", self._upsert_all, docs)
+            source.loaded_at = now
+            source.watermark = started
+            if changed:
+                self._mark_dirty()
+                logger.debug("Search index refreshed", type=doc_type, changed=changed)
+
+    def _refresh_in_background(self, doc_type: str):
+        """Start a refresh of a stale type unless one is already running."""
+        task = self._refresh_tasks.get(doc_type)
+        if task is not None and not task.done():
+            return
+
+        async def run():
+            try:
+                await self.refresh(doc_type)
+            except Exception as e:
+                logger.warning("Search index refresh failed", type=doc_type, error=str(e))
+
+        self._refresh_tasks[doc_type] = asyncio.create_task(run())
+
+    def _mark_dirty(self):
+        """Note a change and schedule a snapshot write."""
+        self._dirty = True
+        if not self.persist or (self._save_task is not None and not self._save_task.done()):
+            return
+
+        async def save_later():
+            await asyncio.sleep(SAVE_DELAY_SECONDS)
+            await self.save()
+
+        self._save_task = asyncio.create_task(save_later())
+
+    async def save(self):
+        """Write the snapshot now if the index changed."""
+        if not self.persist or not self._dirty:
+            return
+        # Taken before the postings, so a watermark never claims more than was written
+        sources = {}
+        for name, source in self._sources.items():
+            state = source.to_snapshot()
+            if state is not None:
+                sources[name] = state
+        self._dirty = False
+        try:
+            await blocking_executor.run("index", self.index.save, self.snapshot_path, sources)
+        except Exception as e:
+            self._dirty = True
+            logger.warning("Failed to persist search index", error=str(e))
+
+    def _upsert_all(self, docs: List[Dict[str, Any]]) -> int:
+        return sum(self.index.upsert(doc) for doc in docs)
+
+    def invalidate(self, doc_type: str):
+        """Force a full reload of a type on next use (e.g. after deletions)."""
+        source = self._sources.get(doc_type)
+        if source is not None:
+            source.loaded_at = None
+            source.watermark = None
+
+    async def upsert(self, doc: Dict[str, Any]):
+        """Index one changed document now."""
+        await self._ensure_loaded()
+        if await blocking_executor.run("index", self.index.upsert, doc):
+            self._mark_dirty()
+
+    async def remove(self, doc_id: str):
+        await self._ensure_loaded()
+        if await blocking_executor.run("index", self.index.remove, doc_id):
+            self._mark_dirty()
+
+    async def search(
+        self, query: str, types: Iterable[str], limit: int = 20
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Query the index.
+
+        A type that was never loaded is loaded first; stale types are
+        refreshed in the background and this query sees the current index.
+        """
+        types = list(types)
+        await self._ensure_loaded()
+        for doc_type in types:
+            source = self._sources.get(doc_type)
+            if source is None or not source.is_stale():
+                continue
+            if source.loaded_at is None:
+                await self.refresh(doc_type)
+            else:
+                self._refresh_in_background(doc_type)
+        return await blocking_executor.run("index", self.index.search, query, types, limit)
+
+    async def shutdown(self):
+        """Stop background refreshes and persist the index if it changed."""
+        tasks = [task for task in self._refresh_tasks.values() if not task.done()]
+        if self._save_task is not None and not self._save_task.done():
+            tasks.append(self._save_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.index.get_stats(),
+            "sources": {
+                name: {
+                    "incremental": source.incremental,
+                    "refresh_seconds": source.refresh_seconds,
+                    "age_seconds": round(time.monotonic() - source.loaded_at, 1) if source.loaded_at else None,
+                }
+                for name, source in self._sources.items()
+            },
+        }
+
+
+# Global unified search index
+search_index = SearchIndexService(
+    index_dir=settings.index_dir,
+    refresh_seconds=settings.search_index_refresh_seconds,
+    persist=settings.search_index_persist,
+)
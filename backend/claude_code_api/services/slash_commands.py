@@ -7,12 +7,14 @@ Handles built-in slash commands:
 - /status: Show session status
 - /files: Quick file browser
 - /git: Show git status
+- /skills, /agents: List (or filter) the skills and agents catalog
 """
 
 from typing import Dict, Any, Optional
 from datetime import datetime
 import structlog
 
+from claude_code_api.services.catalog import agent_catalog, skill_catalog
 from claude_code_api.services.file_operations import FileOperationsService
 from claude_code_api.services.git_operations import GitOperationsService
 
@@ -33,6 +35,8 @@ class SlashCommandService:
             "status": self._status_command,
             "files": self._files_command,
             "git": self._git_command,
+            "skills": self._skills_command,
+            "agents": self._agents_command,
         }
 
     def is_slash_command(self, message: str) -> bool:
@@ -147,6 +151,16 @@ class SlashCommandService:
                     "description": "Show git status",
                     "usage": "/git [status|log|branches]",
                 },
+                {
+                    "name": "skills",
+                    "description": "List skills, optionally filtered by name or description",
+                    "usage": "/skills [filter]",
+                },
+                {
+                    "name": "agents",
+                    "description": "List agents, optionally filtered by name or description",
+                    "usage": "/agents [filter]",
+                },
             ],
             "message": "Available slash commands. Type / to see autocomplete menu.",
         }
@@ -240,3 +254,22 @@ class SlashCommandService:
                 "error": str(e),
                 "subcommand": subcommand,
             }
+
+    async def _skills_command(self, args: list[str], session_id: str, project_path: Optional[str]) -> Dict[str, Any]:
+        """List skills from the catalog."""
+        return await self._catalog_command(skill_catalog, "skills", args)
+
+    async def _agents_command(self, args: list[str], session_id: str, project_path: Optional[str]) -> Dict[str, Any]:
+        """List agents from the catalog."""
+        return await self._catalog_command(agent_catalog, "agents", args)
+
+    async def _catalog_command(self, catalog, label: str, args: list[str]) -> Dict[str, Any]:
+        entries, _ = await catalog.entries()
+        needle = " ".join(args).lower()
+        if needle:
+            entries = [e for e in entries if needle in e["name"].lower() or needle in e["description"].lower()]
+        return {
+            label: [{"name": e["name"], "description": e["description"]} for e in entries],
+            "total": len(entries),
+            "message": f"{len(entries)} {label}" + (f" matching '{needle}'" if needle else ""),
+        }
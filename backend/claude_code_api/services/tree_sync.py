@@ -0,0 +1,309 @@
+"""
+Tree Sync
+
+Project tree snapshots and deltas for mobile clients.
+
+Each directory is stored as a node: its sorted children as
+(name, type, size, mtime_ns, child_hash) and keyed by a hash of that
+listing, so a directory's hash changes exactly when something beneath it
+changes (a Merkle tree). A snapshot's version token is its root hash.
+
+Nodes are persisted per project in SQLite and shared between versions,
+so keeping the last few versions costs little. A delta walks the old and
+new trees together and skips every subtree whose hash is unchanged.
+
+A watched project is rescanned only after the watcher reports a change,
+so edits show up once the watcher delivers its batch (usually within
+50 ms, up to its 1.6 s debounce under constant churn). Without a watcher
+every snapshot walks the tree.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.services.file_watcher import file_watcher
+from claude_code_api.utils.gitignore import ALWAYS_IGNORED, GitignoreFilter
+
+logger = structlog.get_logger()
+
+# Node child: (name, type "f"/"d", size, mtime_ns, hash of child dir or None)
+Child = Tuple[str, str, int, int, Optional[str]]
+
+# Versions kept per project (older tokens get a full snapshot)
+MAX_VERSIONS = 20
+
+
+def _node_hash(data: str) -> str:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _entry(path: str, child: Child) -> List[Any]:
+    """Client-facing entry: [path, size, mtime, type]."""
+    _, kind, size, mtime_ns, _ = child
+    return [path, size, round(mtime_ns / 1e9, 3), kind]
+
+
+class ProjectTree:
+    """Merkle tree store for one project root."""
+
+    def __init__(self, root: str, db_path: Path, max_versions: int = MAX_VERSIONS):
+        self.root = root
+        self.db_path = db_path
+        self.max_versions = max_versions
+        self.ignore = GitignoreFilter(root)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # With a watch, a clean tree reuses the last version without a walk;
+        # an unwatched tree is walked on every snapshot
+        self.watched = False
+        self.dirty = True
+        self.current: Optional[str] = None
+        self.scans = 0
+        self.last_scan_ms = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS nodes (hash TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS versions (token TEXT PRIMARY KEY, created_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # Building
+
+    def snapshot(self) -> str:
+        """Scan the project (unless the watcher saw no change) and return the version token."""
+        if self.watched and not self.dirty and self.current is not None:
+            return self.current
+        self.dirty = False
+        start = time.perf_counter()
+        new_nodes: Dict[str, str] = {}
+        token = self._scan_dir("", new_nodes)
+
+        with self._lock:
+            conn = self._conn()
+            conn.executemany("INSERT OR IGNORE INTO nodes VALUES (?, ?)", new_nodes.items())
+            conn.execute("INSERT OR REPLACE INTO versions VALUES (?, ?)", (token, time.time()))
+            self._prune(conn)
+            conn.commit()
+
+        self.current = token
+        self.scans += 1
+        self.last_scan_ms = (time.perf_counter() - start) * 1000
+        return token
+
+    def _scan_dir(self, dir_rel: str, new_nodes: Dict[str, str]) -> str:
+        children: List[Child] = []
+        try:
+            it = os.scandir(os.path.join(self.root, dir_rel) if dir_rel else self.root)
+        except OSError:
+            it = None
+        if it is not None:
+            with it:
+                for entry in it:
+                    name = entry.name
+                    if name in ALWAYS_IGNORED:
+                        continue
+                    rel = f"{dir_rel}/{name}" if dir_rel else name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if not is_dir and not entry.is_file():
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if self.ignore.match(rel, is_dir):
+                        continue
+                    if is_dir:
+                        children.append((name, "d", 0, st.st_mtime_ns, self._scan_dir(rel, new_nodes)))
+                    else:
+                        children.append((name, "f", st.st_size, st.st_mtime_ns, None))
+        children.sort()
+        data = json.dumps(children, separators=(",", ":"))
+        digest = _node_hash(data)
+        new_nodes[digest] = data
+        return digest
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Drop old versions and, now and then, nodes no version reaches."""
+        tokens = [row[0] for row in conn.execute("SELECT token FROM versions ORDER BY created_at DESC")]
+        if len(tokens) <= self.max_versions * 2:
+            return
+        keep = tokens[:self.max_versions]
+        conn.executemany("DELETE FROM versions WHERE token = ?", [(t,) for t in tokens[self.max_versions:]])
+
+        reachable = set()
+        stack = list(keep)
+        while stack:
+            digest = stack.pop()
+            if digest in reachable:
+                continue
+            reachable.add(digest)
+            for child in self._children(conn, digest):
+                if child[4]:
+                    stack.append(child[4])
+        stale = [(h,) for (h,) in conn.execute("SELECT hash FROM nodes") if h not in reachable]
+        conn.executemany("DELETE FROM nodes WHERE hash = ?", stale)
+
+    # Reading
+
+    def _children(self, conn: sqlite3.Connection, digest: str) -> List[Child]:
+        row = conn.execute("SELECT data FROM nodes WHERE hash = ?", (digest,)).fetchone()
+        return [tuple(c) for c in json.loads(row[0])] if row else []
+
+    def has_version(self, token: str) -> bool:
+        with self._lock:
+            return self._conn().execute(
+                "SELECT 1 FROM versions WHERE token = ?", (token,)
+            ).fetchone() is not None
+
+    def entries(self, token: str) -> List[List[Any]]:
+        """Every entry of a version, parents before children."""
+        with self._lock:
+            conn = self._conn()
+            result: List[List[Any]] = []
+            self._expand(conn, token, "", result)
+            return result
+
+    def _expand(self, conn: sqlite3.Connection, digest: str, prefix: str, out: List[List[Any]]):
+        for child in self._children(conn, digest):
+            path = prefix + child[0]
+            out.append(_entry(path, child))
+            if child[1] == "d":
+                self._expand(conn, child[4], path + "/", out)
+
+    def delta(self, old: str, new: str) -> Dict[str, List]:
+        """
+        Entries added, removed or changed between two versions.
+
+        A removed directory implies removal of everything beneath it.
+        """
+        result: Dict[str, List] = {"added": [], "removed": [], "changed": []}
+        with self._lock:
+            self._diff(self._conn(), old, new, "", result)
+        return result
+
+    def _diff(self, conn: sqlite3.Connection, old: str, new: str, prefix: str, result: Dict[str, List]):
+        if old == new:
+            return
+        before = {c[0]: c for c in self._children(conn, old)}
+        after = {c[0]: c for c in self._children(conn, new)}
+
+        for name, child in after.items():
+            path = prefix + name
+            previous = before.get(name)
+            if previous is None or previous[1] != child[1]:
+                if previous is not None:
+                    result["removed"].append(path)
+                result["added"].append(_entry(path, child))
+                if child[1] == "d":
+                    self._expand(conn, child[4], path + "/", result["added"])
+                continue
+            if previous[2:4] != child[2:4]:
+                result["changed"].append(_entry(path, child))
+            if child[1] == "d":
+                self._diff(conn, previous[4], child[4], path + "/", result)
+
+        for name in before:
+            if name not in after:
+                result["removed"].append(prefix + name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._conn()
+            nodes = conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+            versions = conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+        return {
+            "root": self.root,
+            "version": self.current,
+            "nodes": nodes,
+            "versions": versions,
+            "scans": self.scans,
+            "last_scan_ms": round(self.last_scan_ms, 1),
+        }
+
+
+class TreeSyncService:
+    """Serves tree snapshots and deltas, one ProjectTree per root."""
+
+    def __init__(self, index_dir: str, max_projects: int = 8):
+        self.index_dir = Path(index_dir) / "tree"
+        self.max_projects = max_projects
+        self._trees: "OrderedDict[str, ProjectTree]" = OrderedDict()
+        self._watch_ids: Dict[str, str] = {}
+
+    def get_tree(self, root: str) -> ProjectTree:
+        """Get (or open) the tree for a root. Call from the event loop."""
+        root = os.path.realpath(root)
+        tree = self._trees.get(root)
+        if tree is not None:
+            self._trees.move_to_end(root)
+            return tree
+
+        digest = hashlib.blake2b(root.encode(), digest_size=10).hexdigest()
+        tree = ProjectTree(root, self.index_dir / f"{digest}.db")
+        self._trees[root] = tree
+        if file_watcher.available:
+            def on_change(changes, tree=tree):
+                tree.dirty = True
+                if any(path.endswith("/.gitignore") for _, path in changes):
+                    tree.ignore.invalidate()
+            self._watch_ids[root] = file_watcher.start_watch(root, on_change=on_change)
+            tree.watched = True
+
+        while len(self._trees) > self.max_projects:
+            old_root, old_tree = self._trees.popitem(last=False)
+            watch_id = self._watch_ids.pop(old_root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            old_tree.close()
+        return tree
+
+    @staticmethod
+    def sync(tree: ProjectTree, since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Snapshot or delta for a tree (blocking; run in the executor).
+
+        Returns:
+            {"version", "full": True, "entries"} when since is missing or
+            unknown, otherwise {"version", "since", "full": False, "added",
+            "removed", "changed"}
+        """
+        token = tree.snapshot()
+        if since and tree.has_version(since):
+            return {"version": token, "since": since, "full": False, **tree.delta(since, token)}
+        return {"version": token, "full": True, "entries": tree.entries(token)}
+
+    def shutdown(self):
+        """Stop watches and close databases."""
+        for root, tree in self._trees.items():
+            watch_id = self._watch_ids.pop(root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            tree.close()
+        self._trees.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"projects": [tree.get_stats() for tree in self._trees.values()]}
+
+
+# Global tree sync service
+tree_sync = TreeSyncService(index_dir=settings.index_dir, max_projects=settings.file_index_max_projects)
@@ -0,0 +1,670 @@
+"""
+Trigram Index
+
+On-disk trigram index per project root, used to narrow content searches
+to candidate files before they are verified by the grep engine.
+
+Layout (one directory per root under INDEX_DIR/trigram/):
+- meta.json      root, build time, counts
+- docs.json      indexed files: [path, mtime_ns, size] per doc id
+- lexicon.bin    sorted uint32 triples (trigram, offset, count)
+- postings.bin   uint32 doc ids, sorted per trigram
+
+Both .bin files are memory-mapped; a lookup is a binary search in the
+lexicon plus a slice of the postings. Trigrams are taken from lowercased
+bytes so one index serves case-sensitive and case-insensitive queries.
+
+Files changed after the build are tracked in an in-memory overlay
+(tombstoned doc ids + trigram sets of new contents) until the next
+rebuild folds them in. Changes recorded after a rebuild took its file
+list are carried over onto the new segment. Watcher events that arrive
+before the first build finishes are queued and replayed; without a
+watcher, content searches recheck files by stat first.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import structlog
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+from claude_code_api.services.file_watcher import file_watcher, DELETED
+from claude_code_api.utils.gitignore import GitignoreFilter
+
+logger = structlog.get_logger()
+
+INDEX_VERSION = 1
+
+# Files larger than this are not indexed and are always candidates
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+# Rebuild once this many files changed since the last build
+OVERLAY_REBUILD_THRESHOLD = 500
+
+_NEWLINE = ord("\n")
+
+
+def file_trigrams(data: bytes) -> Set[int]:
+    """Distinct lowercase trigrams of a byte string, packed as 24-bit ints."""
+    data = data.lower()
+    return {
+        (a << 16) | (b << 8) | c
+        for a, b, c in set(zip(data, data[1:], data[2:]))
+        if a != _NEWLINE and b != _NEWLINE and c != _NEWLINE
+    }
+
+
+def query_trigrams(pattern: str, regex: bool = False, ignore_case: bool = False) -> Set[int]:
+    """
+    Trigrams every matching file must contain.
+
+    Trigrams are lowercased ASCII-wise, so with ignore_case only ASCII
+    literals can be used (other letters may differ in byte form).
+    """
+    keys: Set[int] = set()
+    for literal in required_literals(pattern, regex):
+        if ignore_case and not literal.isascii():
+            continue
+        keys |= file_trigrams(literal.encode("utf-8"))
+    return keys
+
+
+def required_literals(pattern: str, regex: bool) -> List[str]:
+    """
+    Literal substrings every match must contain.
+
+    For regexes this walks the parsed pattern and keeps runs of literal
+    characters that are not optional; alternations and classes end a run.
+    An empty list means the query cannot be narrowed.
+    """
+    if not regex:
+        return [pattern]
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    runs: List[str] = []
+    _collect_literals(parsed, runs)
+    return runs
+
+
+def _collect_literals(parsed, runs: List[str]):
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            _collect_literals(av[-1], runs)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            _collect_literals(av[2], runs)
+    flush()
+
+
+class _Lexicon:
+    """Sequence view of trigram keys in the mapped lexicon (for bisect)."""
+
+    def __init__(self, words: memoryview):
+        self.words = words
+
+    def __len__(self) -> int:
+        return len(self.words) // 3
+
+    def __getitem__(self, i: int) -> int:
+        return self.words[i * 3]
+
+
+class TrigramIndex:
+    """Trigram index for one project root."""
+
+    def __init__(self, root: str, directory: Path):
+        self.root = root
+        self.directory = directory
+        self.ignore = GitignoreFilter(root)
+        self._lock = threading.RLock()
+
+        self.docs: List[Tuple[str, int, int]] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._large: Set[int] = set()
+        self._lexicon_map: Optional[mmap.mmap] = None
+        self._postings_map: Optional[mmap.mmap] = None
+        self._lexicon: Optional[_Lexicon] = None
+        self._postings: Optional[memoryview] = None
+
+        # Overlay (trigrams None = too large to index, always a candidate)
+        self._tombstones: Set[int] = set()
+        self._overlay: Dict[str, Optional[Set[int]]] = {}
+        # Every overlay change: path -> (sequence, (mtime_ns, size) or None if deleted)
+        self._changed: Dict[str, Tuple[int, Optional[Tuple[int, int]]]] = {}
+        self._seq = 0
+
+        self.built_at: Optional[datetime] = None
+        self.build_ms = 0.0
+        self.queries = 0
+        self.total_query_ms = 0.0
+        self.last_query_ms = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._lexicon is not None
+
+    # Building
+
+    def change_mark(self) -> int:
+        """Position in the change sequence; take it before listing files for build()."""
+        return self._seq
+
+    def build(self, paths: List[str], since: Optional[int] = None):
+        """
+        Index the given files (relative to root) and write a new segment.
+
+        Args:
+            paths: Files to index
+            since: change_mark() taken before paths was listed; overlay
+                changes after it are kept on top of the new segment
+        """
+        since = self._seq if since is None else since
+        start = time.perf_counter()
+        postings: Dict[int, array] = {}
+        docs: List[Tuple[str, int, int]] = []
+
+        for rel in paths:
+            entry = self._read_for_index(rel)
+            if entry is None:
+                continue
+            st, trigrams = entry
+            doc_id = len(docs)
+            docs.append((rel, st.st_mtime_ns, st.st_size))
+            for key in trigrams or ():
+                plist = postings.get(key)
+                if plist is None:
+                    plist = postings[key] = array("I")
+                plist.append(doc_id)
+
+        tmp_dir = self.directory.with_name(self.directory.name + f".tmp{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        lexicon = array("I")
+        offset = 0
+        with open(tmp_dir / "postings.bin", "wb") as f:
+            for key in sorted(postings):
+                plist = postings[key]
+                lexicon.extend((key, offset, len(plist)))
+                plist.tofile(f)
+                offset += len(plist)
+        with open(tmp_dir / "lexicon.bin", "wb") as f:
+            lexicon.tofile(f)
+        with open(tmp_dir / "docs.json", "w") as f:
+            json.dump(docs, f, separators=(",", ":"))
+
+        build_ms = (time.perf_counter() - start) * 1000
+        built_at = datetime.utcnow()
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "root": self.root,
+                "built_at": built_at.isoformat(),
+                "build_ms": build_ms,
+                "docs": len(docs),
+                "trigrams": len(postings),
+                "postings": offset,
+            }, f)
+
+        with self._lock:
+            self._close_maps()
+            old_dir = self.directory.with_name(self.directory.name + ".old")
+            shutil.rmtree(old_dir, ignore_errors=True)
+            if self.directory.exists():
+                os.replace(self.directory, old_dir)
+            os.replace(tmp_dir, self.directory)
+            shutil.rmtree(old_dir, ignore_errors=True)
+            self._open_segment()
+            self._rebase(since)
+            self.build_ms = build_ms
+            self.built_at = built_at
+
+        logger.info(
+            "Trigram index built",
+            root=self.root,
+            files=len(docs),
+            trigrams=len(postings),
+            build_ms=round(build_ms, 1)
+        )
+
+    def _read_for_index(self, rel: str) -> Optional[Tuple[os.stat_result, Optional[Set[int]]]]:
+        """
+        Stat and read one file.
+
+        Returns:
+            (stat, trigrams), where trigrams is None for files too large to
+            index and empty for binary files; None if the file is unreadable
+        """
+        path = os.path.join(self.root, rel)
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                if st.st_size > MAX_INDEXED_FILE_SIZE:
+                    return st, None
+                data = f.read()
+        except OSError:
+            return None
+        if b"\0" in data[:8192]:
+            return st, set()
+        return st, file_trigrams(data)
+
+    def load(self) -> bool:
+        """Open an existing segment; False if missing or from another version."""
+        try:
+            with open(self.directory / "meta.json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("version") != INDEX_VERSION or meta.get("root") != self.root:
+            return False
+        try:
+            with self._lock:
+                self._open_segment()
+                self._rebase(self._seq)
+        except (OSError, ValueError):
+            return False
+        self.build_ms = meta.get("build_ms", 0.0)
+        self.built_at = datetime.fromisoformat(meta["built_at"])
+        return True
+
+    def _open_segment(self):
+        with open(self.directory / "docs.json") as f:
+            docs = [tuple(d) for d in json.load(f)]
+
+        maps = []
+        views = []
+        for name in ("lexicon.bin", "postings.bin"):
+            with open(self.directory / name, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    maps.append(None)
+                    views.append(memoryview(b"").cast("I"))
+                    continue
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                maps.append(m)
+                views.append(memoryview(m).cast("I"))
+
+        self._lexicon_map, self._postings_map = maps
+        self._lexicon = _Lexicon(views[0])
+        self._postings = views[1]
+        self.docs = docs
+        self._doc_ids = {d[0]: i for i, d in enumerate(docs)}
+        self._large = {i for i, d in enumerate(docs) if d[2] > MAX_INDEXED_FILE_SIZE}
+
+    def _rebase(self, since: int):
+        """Keep overlay changes made after `since` on top of the segment just opened."""
+        self._changed = {rel: change for rel, change in self._changed.items() if change[0] > since}
+        self._overlay = {rel: self._overlay[rel] for rel in self._changed if rel in self._overlay}
+        self._tombstones = {self._doc_ids[rel] for rel in self._changed if rel in self._doc_ids}
+
+    def _close_maps(self):
+        if self._lexicon is not None:
+            self._lexicon.words.release()
+        if self._postings is not None:
+            self._postings.release()
+        for m in (self._lexicon_map, self._postings_map):
+            if m is not None:
+                m.close()
+        self._lexicon = self._postings = None
+        self._lexicon_map = self._postings_map = None
+
+    def close(self):
+        """Release mapped files."""
+        with self._lock:
+            self._close_maps()
+
+    # Incremental updates
+
+    def stale_paths(self, paths: List[str]) -> List[str]:
+        """Paths that are new or changed (mtime/size) since they were last indexed."""
+        stale = []
+        for rel in paths:
+            try:
+                st = os.stat(os.path.join(self.root, rel))
+            except OSError:
+                continue
+            change = self._changed.get(rel)
+            if change is not None:
+                known = change[1]
+            else:
+                doc_id = self._doc_ids.get(rel)
+                known = self.docs[doc_id][1:] if doc_id is not None else None
+            if known != (st.st_mtime_ns, st.st_size):
+                stale.append(rel)
+        return stale
+
+    def update(self, rel: str, deleted: bool = False):
+        """Re-index one file into the overlay (or drop it)."""
+        entry = None if deleted else self._read_for_index(rel)
+        with self._lock:
+            doc_id = self._doc_ids.get(rel)
+            if doc_id is not None:
+                self._tombstones.add(doc_id)
+            self._overlay.pop(rel, None)
+            if entry is not None:
+                self._overlay[rel] = entry[1]
+            self._seq += 1
+            self._changed[rel] = (self._seq, (entry[0].st_mtime_ns, entry[0].st_size) if entry else None)
+
+    def recheck(self, paths: List[str]) -> int:
+        """
+        Stat-based refresh for roots without a file watcher.
+
+        Args:
+            paths: Every file currently in the project
+
+        Returns:
+            Number of files re-indexed or dropped
+        """
+        stale = self.stale_paths(paths)
+        for rel in stale:
+            self.update(rel)
+        live = set(paths)
+        with self._lock:
+            gone = [
+                rel for rel in [d[0] for d in self.docs] + list(self._overlay)
+                if rel not in live and (rel not in self._changed or self._changed[rel][1] is not None)
+            ]
+        for rel in gone:
+            self.update(rel, deleted=True)
+        return len(stale) + len(gone)
+
+    def apply_changes(self, changes: List[Tuple[str, str]]) -> bool:
+        """
+        Apply watcher events (change, absolute_path).
+
+        Returns:
+            True when the overlay is large enough to warrant a rebuild
+        """
+        for change, abs_path in changes:
+            rel = os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+            if rel.startswith(".."):
+                continue
+            if os.path.isfile(abs_path):
+                # Also for a late-replayed delete of a file that was re-created
+                if not self.ignore.is_ignored(rel):
+                    self.update(rel)
+            elif change == DELETED:
+                self.update(rel, deleted=True)
+        return len(self._overlay) + len(self._tombstones) > OVERLAY_REBUILD_THRESHOLD
+
+    # Querying
+
+    def _posting(self, key: int) -> Optional[memoryview]:
+        lexicon = self._lexicon
+        i = bisect.bisect_left(lexicon, key)
+        if i >= len(lexicon) or lexicon[i] != key:
+            return None
+        offset = lexicon.words[i * 3 + 1]
+        count = lexicon.words[i * 3 + 2]
+        return self._postings[offset:offset + count]
+
+    def candidates(
+        self,
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+    ) -> Optional[List[str]]:
+        """
+        Files that may contain a match.
+
+        Returns:
+            Candidate relative paths, or None if the pattern has no
+            trigram to narrow on (caller must scan every file)
+        """
+        start = time.perf_counter()
+        keys = query_trigrams(pattern, regex, ignore_case)
+        if not keys:
+            return None
+
+        with self._lock:
+            if self._lexicon is None:
+                return None
+
+            lists = []
+            for key in keys:
+                plist = self._posting(key)
+                if plist is None:
+                    lists = []
+                    break
+                lists.append(plist)
+
+            ids: Set[int] = set()
+            if lists:
+                lists.sort(key=len)
+                ids = set(lists[0])
+                for plist in lists[1:]:
+                    if not ids:
+                        break
+                    ids.intersection_update(plist)
+            ids |= self._large
+            ids -= self._tombstones
+            result = [self.docs[i][0] for i in sorted(ids)]
+
+            for rel, trigrams in self._overlay.items():
+                if trigrams is None or keys <= trigrams:
+                    result.append(rel)
+            del lists  # Drop views into the maps before a rebuild can close them
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.queries += 1
+        self.total_query_ms += elapsed_ms
+        self.last_query_ms = elapsed_ms
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        size = 0
+        for name in ("lexicon.bin", "postings.bin", "docs.json", "meta.json"):
+            try:
+                size += (self.directory / name).stat().st_size
+            except OSError:
+                pass
+        return {
+            "root": self.root,
+            "ready": self.ready,
+            "files": len(self.docs),
+            "trigrams": len(self._lexicon) if self._lexicon is not None else 0,
+            "size_bytes": size,
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "build_ms": round(self.build_ms, 1),
+            "overlay_files": len(self._overlay),
+            "tombstones": len(self._tombstones),
+            "queries": self.queries,
+            "last_query_ms": round(self.last_query_ms, 3),
+            "avg_query_ms": round(self.total_query_ms / self.queries, 3) if self.queries else 0.0,
+        }
+
+
+class TrigramIndexManager:
+    """Builds and caches trigram indexes for recently searched projects."""
+
+    def __init__(self, index_dir: str, max_projects: int):
+        self.index_dir = Path(index_dir) / "trigram"
+        self.max_projects = max_projects
+        self._indexes: "OrderedDict[str, TrigramIndex]" = OrderedDict()
+        self._builds: Dict[str, asyncio.Task] = {}
+        self._watch_ids: Dict[str, str] = {}
+        # Watcher events received before an index is ready, replayed after its build
+        self._queued: Dict[str, List[Tuple[str, str]]] = {}
+        self._rebuild_after: Set[str] = set()
+
+    def _directory(self, root: str) -> Path:
+        return self.index_dir / hashlib.blake2b(root.encode(), digest_size=10).hexdigest()
+
+    def get(self, root: str) -> Optional[TrigramIndex]:
+        """Return a ready index for root, scheduling a build if there is none."""
+        root = os.path.realpath(root)
+        index = self._indexes.get(root)
+        if index is not None:
+            self._indexes.move_to_end(root)
+            if index.ready:
+                return index
+        if root not in self._builds:
+            self._start_build(root)
+        return None
+
+    async def wait(self, root: str) -> TrigramIndex:
+        """Return the index for root, waiting for an initial build."""
+        root = os.path.realpath(root)
+        index = self.get(root)
+        if index is not None:
+            return index
+        await asyncio.shield(self._builds[root])
+        return self._indexes[root]
+
+    def _start_build(self, root: str, force: bool = False):
+        task = asyncio.create_task(self._build(root, force))
+        self._builds[root] = task
+        task.add_done_callback(lambda _: self._build_done(root))
+
+    def _build_done(self, root: str):
+        self._builds.pop(root, None)
+        if root in self._rebuild_after:
+            self._rebuild_after.discard(root)
+            if root in self._indexes:
+                self._start_build(root, force=True)
+
+    async def _build(self, root: str, force: bool = False):
+        # Deferred import: file_index owns the gitignore-aware file list
+        from claude_code_api.services.file_index import file_index_manager
+
+        index = self._indexes.get(root)
+        if index is None:
+            index = TrigramIndex(root, self._directory(root))
+            self._indexes[root] = index
+            self._watch(root, index)
+            await self._evict()
+
+        try:
+            file_index = await file_index_manager.get_index(root)
+            mark = index.change_mark()
+            paths = await blocking_executor.run("file", file_index.all_paths)
+
+            if not force and not index.ready and await blocking_executor.run("file", index.load):
+                # Warm start: fold in whatever changed while we were down
+                await blocking_executor.run("index", index.recheck, paths)
+            else:
+                await blocking_executor.run("index", index.build, paths, mark)
+        except Exception as e:
+            # The next build lists files afresh, which covers queued events
+            self._queued.pop(root, None)
+            logger.error("Trigram index build failed", root=root, error=str(e))
+            return
+
+        queued = self._queued.pop(root, None)
+        if queued and await blocking_executor.run("file", index.apply_changes, queued):
+            self._rebuild_after.add(root)
+
+    def _watch(self, root: str, index: TrigramIndex):
+        async def on_change(changes: List[Tuple[str, str]]):
+            if not index.ready:
+                self._queued.setdefault(root, []).extend(changes)
+                return
+            if await blocking_executor.run("file", index.apply_changes, changes):
+                if root not in self._builds:
+                    self._start_build(root, force=True)
+
+        self._watch_ids[root] = file_watcher.start_watch(root, on_change=on_change)
+
+    async def _evict(self):
+        while len(self._indexes) > self.max_projects:
+            root, index = self._indexes.popitem(last=False)
+            watch_id = self._watch_ids.pop(root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            self._queued.pop(root, None)
+            index.close()
+
+    async def candidates(
+        self,
+        file_index,
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+        paths: Optional[List[str]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Files in a project that may contain a match.
+
+        Without a file watcher the index is first rechecked by stat against
+        the project's file list (paths, or the file index's).
+
+        Returns:
+            Candidate relative paths, or None if the index is not ready or
+            cannot narrow the pattern (caller must scan every file)
+        """
+        index = self.get(file_index.root)
+        if index is None:
+            return None
+        if not file_watcher.available:
+            if paths is None:
+                paths = await blocking_executor.run("file", file_index.all_paths)
+            await blocking_executor.run("index", index.recheck, paths)
+        return await blocking_executor.run("file", index.candidates, pattern, regex, ignore_case)
+
+    async def rebuild(self, root: str) -> TrigramIndex:
+        """Force a full rebuild and wait for it."""
+        root = os.path.realpath(root)
+        build = self._builds.get(root)
+        if build is not None:
+            await asyncio.shield(build)
+        self._start_build(root, force=True)
+        await asyncio.shield(self._builds[root])
+        return self._indexes[root]
+
+    async def shutdown(self):
+        """Cancel builds, stop watchers and release mapped files."""
+        for task in list(self._builds.values()):
+            task.cancel()
+        for root, index in list(self._indexes.items()):
+            watch_id = self._watch_ids.pop(root, None)
+            if watch_id:
+                file_watcher.stop_watch(watch_id)
+            index.close()
+
+    def get_stats(self, root: Optional[str] = None) -> Dict[str, Any]:
+        """Get statistics for one root or all loaded indexes."""
+        if root is not None:
+            index = self._indexes.get(os.path.realpath(root))
+            return index.get_stats() if index else {"root": root, "ready": False}
+        return {
+            "projects": len(self._indexes),
+            "building": sorted(self._builds),
+            "indexes": [index.get_stats() for index in self._indexes.values()],
+        }
+
+
+# Global trigram index manager
+trigram_index_manager = TrigramIndexManager(
+    index_dir=settings.index_dir,
+    max_projects=settings.trigram_index_max_projects,
+)
@@ -0,0 +1,379 @@
+"""
+Upload Service
+
+Chunked, resumable uploads:
+- initiate: register destination, optional total size and SHA-256
+- append: stream a chunk at the current offset into a temp file next to
+  the destination, hashing as it goes
+- complete: verify size/hash, fsync and atomically rename into place
+
+Session state lives in a JSON sidecar so uploads survive a restart; the
+temp file's length is the authoritative offset, so a dropped connection
+resumes from whatever bytes actually reached disk.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple
+import structlog
+
+from claude_code_api.core.config import settings
+from claude_code_api.core.executor import blocking_executor
+
+logger = structlog.get_logger()
+
+# Bytes buffered from the request before each disk write
+WRITE_BUFFER = 1024 * 1024
+
+# Chunk size suggested to clients
+RECOMMENDED_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class UploadNotFoundError(Exception):
+    """Upload session does not exist (or expired)."""
+    pass
+
+
+class UploadConflictError(Exception):
+    """Destination exists and overwrite was not requested."""
+    pass
+
+
+class UploadOffsetError(Exception):
+    """Chunk offset does not match the bytes received so far."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Upload offset mismatch; resume at {expected}")
+        self.expected = expected
+
+
+class UploadIntegrityError(Exception):
+    """Received data does not match the declared size or hash."""
+    pass
+
+
+class UploadSession:
+    """State of one chunked upload."""
+
+    def __init__(
+        self,
+        upload_id: str,
+        destination: str,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        overwrite: bool = False,
+        created_at: Optional[float] = None,
+    ):
+        self.upload_id = upload_id
+        self.destination = destination
+        self.size = size
+        self.sha256 = sha256.lower() if sha256 else None
+        self.overwrite = overwrite
+        self.created_at = created_at or time.time()
+        self.offset = 0
+
+        # Runtime only: rebuilt from the temp file after a restart
+        self.hasher: Optional[Any] = None
+        self.lock = asyncio.Lock()
+
+    @property
+    def part_path(self) -> Path:
+        dest = Path(self.destination)
+        return dest.parent / f".{dest.name}.{self.upload_id}.part"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.upload_id,
+            "destination": self.destination,
+            "size": self.size,
+            "sha256": self.sha256,
+            "overwrite": self.overwrite,
+            "created_at": self.created_at,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """Client-facing status."""
+        return {
+            "upload_id": self.upload_id,
+            "destination": self.destination,
+            "offset": self.offset,
+            "size": self.size,
+            "chunk_size": RECOMMENDED_CHUNK_SIZE,
+        }
+
+
+def _replace_into(part: Path, destination: Path, overwrite: bool):
+    """Atomically move a finished temp file to its destination."""
+    if not overwrite and destination.exists():
+        raise UploadConflictError(f"File already exists: {destination}")
+    os.replace(part, destination)
+
+
+def store_stream(source: BinaryIO, destination: Path, overwrite: bool = False) -> Dict[str, Any]:
+    """
+    Copy a file object to destination via a temp file and atomic rename.
+
+    Returns:
+        Dict with size and sha256 of the stored content
+
+    Raises:
+        UploadConflictError: Destination exists and overwrite is False
+    """
+    if not overwrite and destination.exists():
+        raise UploadConflictError(f"File already exists: {destination}")
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part = destination.parent / f".{destination.name}.{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(part, "wb") as f:
+            while True:
+                chunk = source.read(WRITE_BUFFER)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace_into(part, destination, overwrite)
+    finally:
+        if part.exists():
+            part.unlink()
+    return {"size": size, "sha256": hasher.hexdigest()}
+
+
+class UploadService:
+    """Manages resumable upload sessions."""
+
+    def __init__(self, state_dir: str, expiry_hours: int = 24):
+        self.state_dir = Path(state_dir)
+        self.expiry_seconds = expiry_hours * 3600
+        self._sessions: Dict[str, UploadSession] = {}
+        # get() runs on executor threads; one session object (and lock) per upload
+        self._sessions_lock = threading.Lock()
+        self.completed = 0
+        self.bytes_received = 0
+
+    def _state_path(self, upload_id: str) -> Path:
+        return self.state_dir / f"{upload_id}.json"
+
+    def _save(self, session: UploadSession):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path(session.upload_id).with_suffix(".tmp")
+        tmp.write_text(json.dumps(session.to_dict()))
+        os.replace(tmp, self._state_path(session.upload_id))
+
+    def create(
+        self,
+        destination: Path,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        overwrite: bool = False,
+    ) -> UploadSession:
+        """
+        Start an upload to an already validated destination.
+
+        Raises:
+            UploadConflictError: Destination exists and overwrite is False
+        """
+        if not overwrite and destination.exists():
+            raise UploadConflictError(f"File already exists: {destination}")
+
+        self.cleanup_expired()
+        session = UploadSession(uuid.uuid4().hex, str(destination), size, sha256, overwrite)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        session.part_path.touch()
+        session.hasher = hashlib.sha256()
+        self._save(session)
+        self._sessions[session.upload_id] = session
+
+        logger.info("Upload started", upload_id=session.upload_id, destination=str(destination), size=size)
+        return session
+
+    def get(self, upload_id: str) -> UploadSession:
+        """
+        Get a session, reloading it from its sidecar after a restart.
+
+        Raises:
+            UploadNotFoundError: Unknown or expired upload
+        """
+        session = self._sessions.get(upload_id)
+        if session is not None:
+            return session
+        if not upload_id.isalnum():
+            raise UploadNotFoundError(f"Upload not found: {upload_id}")
+        with self._sessions_lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                try:
+                    data = json.loads(self._state_path(upload_id).read_text())
+                except (OSError, ValueError):
+                    raise UploadNotFoundError(f"Upload not found: {upload_id}")
+                session = UploadSession(**data)
+                try:
+                    session.offset = session.part_path.stat().st_size
+                except OSError:
+                    self._forget(upload_id)
+                    raise UploadNotFoundError(f"Upload data missing: {upload_id}")
+                self._sessions[upload_id] = session
+        return session
+
+    def _rehash(self, session: UploadSession):
+        hasher = hashlib.sha256()
+        with open(session.part_path, "rb") as f:
+            while True:
+                chunk = f.read(WRITE_BUFFER)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+        session.hasher = hasher
+
+    def _write(self, f: BinaryIO, session: UploadSession, data: bytes):
+        # Unbuffered: the file length always matches session.offset
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+        session.hasher.update(data)
+        session.offset += len(data)
+
+    async def append(
+        self,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+    ) -> UploadSession:
+        """
+        Append streamed bytes at offset.
+
+        Bytes that reach disk before a disconnect are kept; the client
+        resumes from the session's offset.
+
+        Raises:
+            UploadNotFoundError: Unknown upload
+            UploadOffsetError: offset is not the current end of the upload
+            UploadIntegrityError: Data runs past the declared size
+        """
+        session = await blocking_executor.run("file", self.get, upload_id)
+        async with session.lock:
+            if offset != session.offset:
+                raise UploadOffsetError(session.offset)
+            if session.hasher is None:
+                await blocking_executor.run("file", self._rehash, session)
+
+            f = await blocking_executor.run("file", open, session.part_path, "ab", 0)
+            buffer = bytearray()
+            try:
+                async for chunk in chunks:
+                    buffer += chunk
+                    if session.size is not None and session.offset + len(buffer) > session.size:
+                        raise UploadIntegrityError(
+                            f"Upload exceeds declared size of {session.size} bytes"
+                        )
+                    if len(buffer) >= WRITE_BUFFER:
+                        await blocking_executor.run("file", self._write, f, session, bytes(buffer))
+                        self.bytes_received += len(buffer)
+                        buffer.clear()
+            finally:
+                if buffer and (session.size is None or session.offset + len(buffer) <= session.size):
+                    await blocking_executor.run("file", self._write, f, session, bytes(buffer))
+                    self.bytes_received += len(buffer)
+                await blocking_executor.run("file", f.close)
+
+        return session
+
+    async def complete(self, upload_id: str) -> Tuple[Path, str]:
+        """
+        Verify and move the upload into place.
+
+        Returns:
+            (destination, sha256 of the content)
+
+        Raises:
+            UploadNotFoundError: Unknown upload
+            UploadIntegrityError: Size or SHA-256 mismatch (the upload is kept
+                when it is merely short, discarded when the hash is wrong)
+            UploadConflictError: Destination appeared and overwrite is False
+        """
+        session = await blocking_executor.run("file", self.get, upload_id)
+        async with session.lock:
+            if session.size is not None and session.offset != session.size:
+                raise UploadIntegrityError(
+                    f"Upload incomplete: {session.offset} of {session.size} bytes received"
+                )
+            if session.hasher is None:
+                await blocking_executor.run("file", self._rehash, session)
+            digest = session.hasher.hexdigest()
+            if session.sha256 and digest != session.sha256:
+                await blocking_executor.run("file", self.abort, upload_id)
+                raise UploadIntegrityError(f"SHA-256 mismatch: expected {session.sha256}, got {digest}")
+
+            await blocking_executor.run("file", self._commit, session)
+
+        self.completed += 1
+        logger.info("Upload completed", upload_id=upload_id, destination=session.destination, size=session.offset)
+        return Path(session.destination), digest
+
+    def _commit(self, session: UploadSession):
+        with open(session.part_path, "rb+") as f:
+            os.fsync(f.fileno())
+        _replace_into(session.part_path, Path(session.destination), session.overwrite)
+        self._forget(session.upload_id)
+
+    def _forget(self, upload_id: str):
+        self._sessions.pop(upload_id, None)
+        self._state_path(upload_id).unlink(missing_ok=True)
+
+    def abort(self, upload_id: str):
+        """
+        Cancel an upload and delete its data.
+
+        Raises:
+            UploadNotFoundError: Unknown upload
+        """
+        session = self.get(upload_id)
+        session.part_path.unlink(missing_ok=True)
+        self._forget(upload_id)
+        logger.info("Upload aborted", upload_id=upload_id)
+
+    def cleanup_expired(self) -> int:
+        """Remove sessions older than the expiry window."""
+        if not self.state_dir.exists():
+            return 0
+        cutoff = time.time() - self.expiry_seconds
+        removed = 0
+        for state_file in self.state_dir.glob("*.json"):
+            try:
+                data = json.loads(state_file.read_text())
+            except (OSError, ValueError):
+                continue
+            if data.get("created_at", 0) >= cutoff:
+                continue
+            session = UploadSession(**data)
+            session.part_path.unlink(missing_ok=True)
+            self._forget(session.upload_id)
+            removed += 1
+        if removed:
+            logger.info("Expired uploads removed", removed=removed)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get upload statistics."""
+        return {
+            "active": len(self._sessions),
+            "completed": self.completed,
+            "bytes_received": self.bytes_received,
+        }
+
+
+# Global upload service
+upload_service = UploadService(
+    state_dir=settings.upload_state_dir,
+    expiry_hours=settings.upload_expiry_hours,
+)
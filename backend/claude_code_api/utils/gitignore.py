@@ -0,0 +1,253 @@
+"""Gitignore matching and gitignore-aware directory walking."""
+
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Never indexed or searched, regardless of .gitignore
+ALWAYS_IGNORED = {".git", ".hg", ".svn"}
+
+
+class _Rule:
+    """One compiled .gitignore line."""
+
+    __slots__ = ("source", "regex", "negate", "dir_only", "base")
+
+    def __init__(self, source: str, negate: bool, dir_only: bool, base: str):
+        self.source = source
+        self.regex = re.compile(source, re.DOTALL)
+        self.negate = negate
+        self.dir_only = dir_only
+        self.base = base
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) to a regex body."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(text: str, base: str = "") -> List[_Rule]:
+    """
+    Compile .gitignore content.
+
+    Args:
+        text: File content
+        base: Directory of the .gitignore relative to the root ('' for root)
+
+    Returns:
+        Rules in file order
+    """
+    rules = []
+    for raw in text.splitlines():
+        line = raw.rstrip("\r")
+        # Trailing spaces are ignored unless escaped
+        while line.endswith(" ") and not line.endswith("\\ "):
+            line = line[:-1]
+        if not line or line.startswith("#"):
+            continue
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        # A slash anywhere but the end anchors the pattern to its directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        body = _translate_glob(line)
+        if not anchored:
+            body = "(?:.*/)?" + body
+        rules.append(_Rule(body + r"\Z", negate, dir_only, base))
+    return rules
+
+
+def _merge_rules(rules: List[_Rule]) -> List[_Rule]:
+    """
+    Merge runs of rules with the same flags into one alternation regex.
+
+    Only adjacent rules are merged, so negation order is preserved and
+    "last match wins" still holds when evaluating in reverse.
+    """
+    merged: List[_Rule] = []
+    run: List[_Rule] = []
+
+    def flush():
+        if len(run) == 1:
+            merged.append(run[0])
+        elif run:
+            source = "|".join(f"(?:{r.source})" for r in run)
+            merged.append(_Rule(source, run[0].negate, run[0].dir_only, run[0].base))
+        run.clear()
+
+    for rule in rules:
+        if run and (rule.negate, rule.dir_only, rule.base) != (run[0].negate, run[0].dir_only, run[0].base):
+            flush()
+        run.append(rule)
+    flush()
+    return merged
+
+
+class GitignoreFilter:
+    """
+    Decides whether project-relative paths are ignored.
+
+    .gitignore files are loaded lazily per directory and cached; call
+    invalidate() when one changes on disk.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._rules: Dict[str, List[_Rule]] = {}
+        self._effective: Dict[str, List[_Rule]] = {}
+
+    def _load_rules(self, dir_rel: str) -> List[_Rule]:
+        rules = self._rules.get(dir_rel)
+        if rules is not None:
+            return rules
+
+        rules = []
+        sources = [os.path.join(self.root, dir_rel, ".gitignore")]
+        if dir_rel == "":
+            sources.insert(0, os.path.join(self.root, ".git", "info", "exclude"))
+        for source in sources:
+            try:
+                with open(source, "r", encoding="utf-8", errors="replace") as f:
+                    rules.extend(parse_gitignore(f.read(), dir_rel))
+            except OSError:
+                continue
+
+        self._rules[dir_rel] = rules
+        return rules
+
+    def invalidate(self, dir_rel: Optional[str] = None):
+        """Drop cached rules for one directory (or all)."""
+        if dir_rel is None:
+            self._rules.clear()
+        else:
+            self._rules.pop(dir_rel, None)
+        self._effective.clear()
+
+    def _rules_for(self, dir_rel: str) -> List[_Rule]:
+        """Merged rules that apply to entries of a directory (root first)."""
+        rules = self._effective.get(dir_rel)
+        if rules is None:
+            parent = dir_rel.rsplit("/", 1)[0] if "/" in dir_rel else ""
+            inherited = self._rules_for(parent) if dir_rel else []
+            rules = _merge_rules(inherited + self._load_rules(dir_rel))
+            self._effective[dir_rel] = rules
+        return rules
+
+    def match(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check a path against the rules of its own ancestors.
+
+        Does not check whether a parent directory is itself ignored; the
+        walker prunes those, use is_ignored() for standalone paths.
+        """
+        name = rel_path.rsplit("/", 1)[-1]
+        if name in ALWAYS_IGNORED:
+            return True
+
+        dir_rel = rel_path.rsplit("/", 1)[0] if "/" in rel_path else ""
+
+        # Last matching rule wins
+        for rule in reversed(self._rules_for(dir_rel)):
+            if rule.dir_only and not is_dir:
+                continue
+            target = rel_path[len(rule.base) + 1:] if rule.base else rel_path
+            if rule.regex.match(target):
+                return not rule.negate
+        return False
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check a path, including whether any parent directory is ignored."""
+        parts = rel_path.split("/")
+        for i in range(1, len(parts)):
+            if self.match("/".join(parts[:i]), True):
+                return True
+        return self.match(rel_path, is_dir)
+
+
+def walk_files(
+    root: str,
+    ignore: Optional[GitignoreFilter] = None,
+    include_hidden: bool = True,
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Yield (relative_path, DirEntry) for every regular file under root.
+
+    Ignored directories are pruned without being read. Symlinked
+    directories are not followed.
+
+    Args:
+        root: Absolute directory path
+        ignore: Gitignore filter (None = no filtering beyond ALWAYS_IGNORED)
+        include_hidden: Include dot files and dot directories
+    """
+    stack = [""]
+    while stack:
+        dir_rel = stack.pop()
+        try:
+            it = os.scandir(os.path.join(root, dir_rel) if dir_rel else root)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if name in ALWAYS_IGNORED:
+                    continue
+                if not include_hidden and name.startswith("."):
+                    continue
+                rel = f"{dir_rel}/{name}" if dir_rel else name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    is_file = not is_dir and entry.is_file()
+                except OSError:
+                    continue
+                if not (is_dir or is_file):
+                    continue
+                if ignore is not None and ignore.match(rel, is_dir):
+                    continue
+                if is_dir:
+                    stack.append(rel)
+                else:
+                    yield rel, entry
@@ -1,70 +1,406 @@
-"""Metrics collection utilities."""
+"""
+Metrics collection utilities.
 
+- Counters, gauges and timings can carry labels (endpoint, status, model,
+  ...); every label combination is its own series
+- Timings go into log-linear (HDR style) histograms: 64 linear buckets per
+  power of two, so memory is bounded by the value range and percentiles
+  are within ~1% of the recorded values
+- Each histogram keeps lifetime counts plus a sliding window made of
+  rotating time slots, so recent tail latency is not diluted by history
+- Recording takes a short per-series lock and is safe from worker threads
+- Everything can be rendered in the OpenMetrics text format for
+  Prometheus; gauges that mirror service state (queue depths, ...) are
+  filled by collectors that run at scrape time, so the hot path pays
+  nothing for them
+"""
+
+import math
+import re
+import threading
 import time
-from typing import Dict, List
-from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import structlog
 
+from claude_code_api.core.config import settings
+
 logger = structlog.get_logger()
 
+LabelKey = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelKey]
+
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p999", 0.999))
+
+# Histogram buckets (ms) in the OpenMetrics exposition
+EXPOSITION_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _metric_name(metric: str) -> str:
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", metric)
+    return name if not name[:1].isdigit() else "_" + name
+
+
+def _label_text(labels: LabelKey, extra: str = "") -> str:
+    pairs = [
+        f'{re.sub(r"[^a-zA-Z0-9_]", "_", k)}="'
+        + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def series_name(metric: str, labels: LabelKey) -> str:
+    """`metric{k="v",...}`, or just the metric without labels."""
+    if not labels:
+        return metric
+    return metric + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class _Counts:
+    """Sparse bucket counts plus exact count, sum, min and max."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, index: int, value: float):
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "_Counts"):
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class Histogram:
+    """Fixed-memory latency histogram with a sliding window."""
+
+    SUB_BUCKETS = 64  # per power of two; a power of two itself
+    SUB_BITS = 6
+
+    def __init__(
+        self,
+        unit: float = 0.001,
+        max_value: float = 3_600_000.0,
+        window_seconds: float = 60.0,
+        window_slots: int = 6,
+    ):
+        """
+        Args:
+            unit: Smallest distinguishable value (0.001 ms = 1 µs)
+            max_value: Larger values are counted in the top bucket
+            window_seconds: Span of the sliding window
+            window_slots: Window granularity (older slots are reused)
+        """
+        self.unit = unit
+        self.max_index = self._index(max_value / unit)
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / window_slots
+        self._lifetime = _Counts()
+        self._slots: List[Tuple[int, _Counts]] = [(-1, _Counts()) for _ in range(window_slots)]
+        self._lock = threading.Lock()
+
+    def _index(self, units: float) -> int:
+        if units < self.SUB_BUCKETS:
+            return max(0, int(units))
+        mantissa, exponent = math.frexp(units)  # units = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        sub = int((mantissa * 2 - 1) * self.SUB_BUCKETS)
+        return self.SUB_BUCKETS * (exponent - self.SUB_BITS) + sub
+
+    def bucket_bounds(self, index: int) -> Tuple[float, float]:
+        """Lower and upper value of a bucket."""
+        if index < self.SUB_BUCKETS:
+            return index * self.unit, (index + 1) * self.unit
+        exponent = index // self.SUB_BUCKETS + self.SUB_BITS - 1
+        sub = index % self.SUB_BUCKETS
+        width = 2.0 ** exponent / self.SUB_BUCKETS
+        low = 2.0 ** exponent + sub * width
+        return low * self.unit, (low + width) * self.unit
+
+    def record(self, value: float):
+        """Record one value (same unit as max_value, e.g. ms)."""
+        index = min(self._index(value / self.unit), self.max_index)
+        epoch = int(time.monotonic() // self.slot_seconds)
+        slot = epoch % len(self._slots)
+        with self._lock:
+            self._lifetime.add(index, value)
+            slot_epoch, counts = self._slots[slot]
+            if slot_epoch != epoch:
+                counts = _Counts()
+                self._slots[slot] = (epoch, counts)
+            counts.add(index, value)
+
+    def _window(self) -> _Counts:
+        oldest = int(time.monotonic() // self.slot_seconds) - len(self._slots) + 1
+        merged = _Counts()
+        for epoch, counts in self._slots:
+            if epoch >= oldest:
+                merged.merge(counts)
+        return merged
+
+    def counts(self, window: bool = False) -> _Counts:
+        """A copy of the lifetime (or sliding window) counts."""
+        with self._lock:
+            if window:
+                return self._window()
+            copy = _Counts()
+            copy.merge(self._lifetime)
+            return copy
+
+    def _percentile(self, counts: _Counts, indexes: List[int], q: float) -> float:
+        rank = max(1, math.ceil(q * counts.count))
+        seen = 0
+        for index in indexes:
+            seen += counts.buckets[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min(max((low + high) / 2, counts.min), counts.max)
+        return counts.max
+
+    def snapshot(self, window: bool = False) -> Dict[str, float]:
+        """count, sum, min, max, avg and p50/p90/p99/p999."""
+        counts = self.counts(window)
+        if not counts.count:
+            return {"count": 0, "sum": 0.0, "min": 0, "max": 0, "avg": 0,
+                    **{name: 0 for name, _ in PERCENTILES}}
+        indexes = sorted(counts.buckets)
+        return {
+            "count": counts.count,
+            "sum": round(counts.total, 3),
+            "min": round(counts.min, 3),
+            "max": round(counts.max, 3),
+            "avg": round(counts.total / counts.count, 3),
+            **{name: round(self._percentile(counts, indexes, q), 3) for name, q in PERCENTILES},
+        }
+
+    def cumulative(self, bounds: Tuple[float, ...]) -> Tuple[List[int], _Counts]:
+        """Lifetime count of values at or below each bound (a bucket counts
+        toward the first bound its upper edge does not exceed)."""
+        counts = self.counts()
+        cumulative = [0] * len(bounds)
+        for index, n in counts.buckets.items():
+            high = self.bucket_bounds(index)[1]
+            for i, bound in enumerate(bounds):
+                if high <= bound:
+                    cumulative[i] += n
+                    break
+        for i in range(1, len(cumulative)):
+            cumulative[i] += cumulative[i - 1]
+        return cumulative, counts
+
+    def percentile(self, q: float, window: bool = False) -> float:
+        counts = self.counts(window)
+        if not counts.count:
+            return 0.0
+        return self._percentile(counts, sorted(counts.buckets), q)
+
 
 class MetricsCollector:
     """Collect application metrics."""
 
-    def __init__(self):
-        self.counters: Dict[str, int] = defaultdict(int)
-        self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = defaultdict(list)
+    def __init__(self, window_seconds: float = 60.0, window_slots: int = 6):
+        self.window_seconds = window_seconds
+        self.window_slots = window_slots
+        self.counters: Dict[SeriesKey, float] = {}
+        self.gauges: Dict[SeriesKey, float] = {}
+        self.histograms: Dict[SeriesKey, Histogram] = {}
         self.timers: Dict[str, float] = {}
+        self._collectors: List[Callable[["MetricsCollector"], None]] = []
+        self._lock = threading.Lock()
+
+    def register_collector(self, collect: Callable[["MetricsCollector"], None]):
+        """Run `collect(self)` before metrics are read, e.g. to set gauges from service stats."""
+        self._collectors.append(collect)
+
+    def collect(self):
+        for collect in self._collectors:
+            try:
+                collect(self)
+            except Exception as e:
+                logger.warning("Metrics collector failed", collector=getattr(collect, "__name__", ""), error=str(e))
 
-    def increment(self, metric: str, value: int = 1):
+    def increment(self, metric: str, value: int = 1, **labels):
         """Increment counter."""
-        self.counters[metric] += value
+        key = (metric, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
 
-    def set_gauge(self, metric: str, value: float):
+    def set_counter(self, metric: str, value: float, **labels):
+        """Set a counter to a total kept elsewhere (from collectors)."""
+        self.counters[(metric, _labels(labels))] = value
+
+    def set_gauge(self, metric: str, value: float, **labels):
         """Set gauge value."""
-        self.gauges[metric] = value
+        self.gauges[(metric, _labels(labels))] = value
+
+    def histogram(self, metric: str, **labels) -> Histogram:
+        """The histogram of one series (created on first use)."""
+        key = (metric, _labels(labels))
+        hist = self.histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.get(key)
+                if hist is None:
+                    hist = Histogram(window_seconds=self.window_seconds, window_slots=self.window_slots)
+                    self.histograms[key] = hist
+        return hist
 
-    def record_time(self, metric: str, duration_ms: float):
+    def record_time(self, metric: str, duration_ms: float, **labels):
         """Record timing."""
-        self.histograms[metric].append(duration_ms)
+        self.histogram(metric, **labels).record(duration_ms)
+
+    @contextmanager
+    def timed(self, metric: str, **labels) -> Iterator[None]:
+        """Record the duration of a block in ms."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(metric, (time.perf_counter() - started) * 1000, **labels)
 
     def start_timer(self, metric: str):
         """Start timer for metric."""
-        self.timers[metric] = time.time()
+        self.timers[metric] = time.perf_counter()
 
-    def stop_timer(self, metric: str):
+    def stop_timer(self, metric: str, **labels):
         """Stop timer and record duration."""
         if metric in self.timers:
-            duration = (time.time() - self.timers[metric]) * 1000
-            self.record_time(metric, duration)
-            del self.timers[metric]
+            duration = (time.perf_counter() - self.timers.pop(metric)) * 1000
+            self.record_time(metric, duration, **labels)
             return duration
         return 0
 
-    def get_stats(self) -> Dict:
-        """Get all metrics."""
+    def get_stats(self, metric: Optional[str] = None) -> Dict:
+        """
+        Get all metrics (or the series of one metric).
+
+        Histograms report lifetime figures plus the same figures over the
+        sliding window under "window".
+        """
+        def wanted(key: SeriesKey) -> bool:
+            return metric is None or key[0] == metric
+
+        self.collect()
+        with self._lock:
+            counters = {series_name(*k): v for k, v in self.counters.items() if wanted(k)}
+            gauges = {series_name(*k): v for k, v in self.gauges.items() if wanted(k)}
+            histograms = [(k, h) for k, h in self.histograms.items() if wanted(k)]
         return {
-            "counters": dict(self.counters),
-            "gauges": dict(self.gauges),
+            "counters": counters,
+            "gauges": gauges,
             "histograms": {
-                metric: {
-                    "count": len(values),
-                    "min": min(values) if values else 0,
-                    "max": max(values) if values else 0,
-                    "avg": sum(values) / len(values) if values else 0,
-                }
-                for metric, values in self.histograms.items()
-            }
+                series_name(*key): {**hist.snapshot(), "window": hist.snapshot(window=True)}
+                for key, hist in histograms
+            },
+            "window_seconds": self.window_seconds,
         }
 
+    def render_openmetrics(self) -> str:
+        """
+        All series in the OpenMetrics text format.
+
+        Counters get a `_total` suffix, histograms are exposed with
+        EXPOSITION_BUCKETS (lifetime) and as a `<name>_window` summary with
+        quantiles over the sliding window.
+        """
+        self.collect()
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+
+        lines: List[str] = []
+
+        def family(kind: str, items):
+            previous = None
+            for (metric, labels), value in items:
+                name = _metric_name(metric)
+                if kind == "counter" and name.endswith("_total"):
+                    name = name[:-len("_total")]
+                if name != previous:
+                    lines.append(f"# TYPE {name} {kind}")
+                    previous = name
+                if kind == "counter":
+                    lines.append(f"{name}_total{_label_text(labels)} {_number(value)}")
+                else:
+                    lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+
+        family("counter", counters)
+        family("gauge", gauges)
+
+        previous = None
+        for (metric, labels), hist in histograms:
+            name = _metric_name(metric)
+            if name != previous:
+                lines.append(f"# TYPE {name} histogram")
+                previous = name
+            cumulative, counts = hist.cumulative(EXPOSITION_BUCKETS)
+            for bound, count in zip(EXPOSITION_BUCKETS, cumulative):
+                le = _label_text(labels, 'le="%s"' % _number(bound))
+                lines.append(f"{name}_bucket{le} {count}")
+            le = _label_text(labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{le} {counts.count}")
+            lines.append(f"{name}_count{_label_text(labels)} {counts.count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {_number(round(counts.total, 3))}")
+
+        previous = None
+        for (metric, labels), hist in histograms:
+            name = _metric_name(metric) + "_window"
+            if name != previous:
+                lines.append(f"# TYPE {name} summary")
+                previous = name
+            window = hist.counts(window=True)
+            indexes = sorted(window.buckets)
+            for _, q in PERCENTILES:
+                value = hist._percentile(window, indexes, q) if window.count else 0
+                quantile = _label_text(labels, 'quantile="%s"' % q)
+                lines.append(f"{name}{quantile} {_number(round(value, 3))}")
+            lines.append(f"{name}_count{_label_text(labels)} {window.count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {_number(round(window.total, 3))}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
     def reset(self):
         """Reset all metrics."""
-        self.counters.clear()
-        self.gauges.clear()
-        self.histograms.clear()
-        self.timers.clear()
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.timers.clear()
 
 
 # Global metrics collector
-metrics = MetricsCollector()
+metrics = MetricsCollector(
+    window_seconds=settings.metrics_window_seconds,
+    window_slots=settings.metrics_window_slots,
+)
@@ -374,6 +374,35 @@ def estimate_tokens(text: str) -> int:
     return max(1, len(text) // 4)
 
 
+def extract_result_usage(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract token usage and cost from Claude's final ``result`` event.
+
+    Returns None if the message carries no usage data.
+    """
+    if not isinstance(message, dict) or message.get("type") != "result":
+        return None
+
+    usage = message.get("usage") or {}
+    cost = message.get("total_cost_usd", message.get("cost_usd"))
+    if not usage and cost is None:
+        return None
+
+    input_tokens = (
+        usage.get("input_tokens", 0)
+        + usage.get("cache_creation_input_tokens", 0)
+        + usage.get("cache_read_input_tokens", 0)
+    )
+    output_tokens = usage.get("output_tokens", 0)
+
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "cost_usd": float(cost) if cost is not None else None,
+    }
+
+
 def format_timestamp(timestamp: Optional[str]) -> str:
     """Format timestamp for display."""
     if not timestamp:
@@ -4,7 +4,7 @@ import json
 import asyncio
 import uuid
 from datetime import datetime
-from typing import AsyncGenerator, Dict, Any, Optional
+from typing import AsyncGenerator, Dict, Any, Optional, Callable, Awaitable
 import structlog
 
 from claude_code_api.models.claude import ClaudeMessage
@@ -54,9 +54,15 @@ class SSEFormatter:
 class OpenAIStreamConverter:
     """Converts Claude Code output to OpenAI-compatible streaming format."""
     
-    def __init__(self, model: str, session_id: str):
+    def __init__(
+        self,
+        model: str,
+        session_id: str,
+        on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ):
         self.model = model
         self.session_id = session_id
+        self.on_result = on_result
         self.completion_id = f"chatcmpl-{uuid.uuid4().hex[:29]}"
         self.created = int(datetime.utcnow().timestamp())
         self.chunk_index = 0
@@ -195,6 +201,8 @@ class OpenAIStreamConverter:
 
                         # Stop on result type
                         if claude_message.get("type") == "result":
+                            if self.on_result:
+                                await self.on_result(claude_message)
                             break
                         
                 except Exception as e:
@@ -257,10 +265,11 @@ class StreamingManager:
         self,
         session_id: str,
         model: str,
-        claude_process: ClaudeProcess
+        claude_process: ClaudeProcess,
+        on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
     ) -> AsyncGenerator[str, None]:
         """Create new streaming connection."""
-        converter = OpenAIStreamConverter(model, session_id)
+        converter = OpenAIStreamConverter(model, session_id, on_result=on_result)
         self.active_streams[session_id] = converter
         
         try:
@@ -386,10 +395,16 @@ streaming_manager = StreamingManager()
 async def create_sse_response(
     session_id: str,
     model: str,
-    claude_process: ClaudeProcess
+    claude_process: ClaudeProcess,
+    on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
 ) -> AsyncGenerator[str, None]:
-    """Create SSE response for Claude Code output."""
-    async for chunk in streaming_manager.create_stream(session_id, model, claude_process):
+    """
+    Create SSE response for Claude Code output.
+
+    ``on_result`` is awaited with Claude's final ``result`` event so callers
+    can record the real token usage and cost.
+    """
+    async for chunk in streaming_manager.create_stream(session_id, model, claude_process, on_result):
         yield chunk
 
 
@@ -0,0 +1,86 @@
+"""Tests for the concurrent batch DAG engine."""
+
+import asyncio
+import time
+
+import pytest
+
+from claude_code_api.services.batch_engine import BatchEngine, BatchNode, BatchValidationError, validate_dag
+
+
+def _nodes(*specs):
+    return [BatchNode(id=id_, index=i, operation=op, params={}, depends_on=list(deps)) for i, (id_, op, deps) in enumerate(specs)]
+
+
+async def _execute(node):
+    await asyncio.sleep({"slow": 0.2, "fast": 0.01}.get(node.operation, 0))
+    if node.operation == "fail":
+        raise RuntimeError("boom")
+    return node.id
+
+
+def test_validation():
+    order = validate_dag(_nodes(("c", "fast", ["b"]), ("b", "fast", ["a"]), ("a", "fast", [])))
+    assert [n.id for n in order] == ["a", "b", "c"]
+    with pytest.raises(BatchValidationError, match="cycle"):
+        validate_dag(_nodes(("a", "fast", ["b"]), ("b", "fast", ["a"])))
+    with pytest.raises(BatchValidationError, match="unknown"):
+        validate_dag(_nodes(("a", "fast", ["x"])))
+    with pytest.raises(BatchValidationError, match="Duplicate"):
+        validate_dag(_nodes(("a", "fast", []), ("a", "fast", [])))
+
+
+@pytest.mark.asyncio
+async def test_independent_run_concurrently_and_deps_wait():
+    engine = BatchEngine(max_concurrent=8)
+    nodes = validate_dag(_nodes(
+        ("s1", "slow", []), ("s2", "slow", []), ("s3", "slow", []),
+        ("after", "fast", ["s1", "s2"]), ("bad", "fail", []), ("child", "fast", ["bad"]),
+    ))
+    started = asyncio.get_running_loop().time()
+    records = [r async for r in engine.run(nodes, _execute)]
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 0.5  # three slow operations overlapped
+    order = [r["id"] for r in records]
+    assert order.index("after") > order.index("s1") and order.index("after") > order.index("s2")
+    by_id = {r["id"]: r for r in records}
+    assert by_id["after"]["status"] == "ok" and by_id["after"]["data"] == "after"
+    assert by_id["bad"]["status"] == "failed" and by_id["bad"]["error"] == "boom"
+    assert by_id["child"]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_cancels_running_and_skips_rest():
+    engine = BatchEngine(max_concurrent=2)
+    nodes = validate_dag(_nodes(("slow", "slow", []), ("bad", "fail", []), ("later", "fast", [])))
+    records = {r["id"]: r["status"] async for r in engine.run(nodes, _execute, fail_fast=True)}
+    assert records == {"bad": "failed", "slow": "cancelled", "later": "skipped"}
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_lets_started_writes_finish(tmp_path):
+    target = tmp_path / "out.txt"
+
+    def slow_write():
+        time.sleep(0.2)
+        target.write_text("written")
+        return "written"
+
+    async def execute(node):
+        if node.operation == "write":
+            return await asyncio.to_thread(slow_write)
+        return await _execute(node)
+
+    engine = BatchEngine(max_concurrent=3)
+    nodes = validate_dag(_nodes(("write", "write", []), ("read", "slow", []), ("bad", "fail", [])))
+    records = {
+        r["id"]: r async for r in engine.run(
+            nodes, execute, fail_fast=True, cancellable=lambda node: node.operation != "write",
+        )
+    }
+
+    assert records["bad"]["status"] == "failed"
+    assert records["read"]["status"] == "cancelled"
+    assert records["write"]["status"] == "ok" and records["write"]["data"] == "written"
+    assert target.read_text() == "written"
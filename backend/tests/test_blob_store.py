@@ -0,0 +1,98 @@
+"""Tests for the content-addressed blob store."""
+
+import os
+
+import pytest
+
+from claude_code_api.services.backup_service import BackupService
+from claude_code_api.services.blob_store import BlobNotFoundError, BlobStore, file_digest
+
+
+def test_ingest_dedups_and_gc_frees(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), link_mode="hardlink")
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.png").write_bytes(b"image" * 1000)
+    (project / "b.png").write_bytes(b"image" * 1000)
+    digest = file_digest(str(project / "a.png"))
+
+    assert store.ingest(project / "a.png") is False
+    assert store.ingest(project / "b.png") is True
+    assert store.missing([digest, "0" * 64]) == ["0" * 64]
+    assert store.refcount(digest) == 2
+    assert os.stat(project / "b.png").st_ino == os.stat(store.path_for(digest)).st_ino
+
+    assert store.link_into(digest, project / "copy" / "c.png") == "hardlink"
+    assert (project / "copy" / "c.png").read_bytes() == b"image" * 1000
+
+    # Still referenced by c.png after the others are removed or rewritten
+    (project / "a.png").unlink()
+    (project / "b.tmp").write_bytes(b"edited")
+    os.replace(project / "b.tmp", project / "b.png")  # Save-by-rename breaks the link
+    assert store.gc(grace_seconds=0)["dropped_refs"] == 2
+    assert store.has(digest)
+
+    (project / "copy" / "c.png").unlink()
+    result = store.gc(grace_seconds=0)
+    assert result["removed"] == 1 and not store.has(digest)
+
+
+def test_chunked_backups_share_unchanged_chunks(tmp_path):
+    db = tmp_path / "app.db"
+    db.write_bytes(os.urandom(3 * 1024 * 1024))
+    store = BlobStore(str(tmp_path / "blobs"), link_mode="copy")
+    backups = BackupService(str(db), backup_dir=str(tmp_path / "backups"), blob_store=store)
+
+    first = backups.create_backup(dedup=True)
+    original = db.read_bytes()
+    with open(db, "r+b") as f:
+        f.write(b"changed")
+    os.rename(first, first.replace("claude_api_", "claude_api_0"))  # Distinct name within the same second
+    backups.create_backup(dedup=True)
+
+    assert store.get_stats()["blobs"] == 4  # Three chunks plus one changed first chunk
+    assert store.dedup_hits == 2
+
+    backups.restore_backup(os.path.basename(first.replace("claude_api_", "claude_api_0")))
+    assert db.read_bytes() == original
+
+
+def test_auto_mode_without_reflink_leaves_uploads_as_written(tmp_path, monkeypatch):
+    monkeypatch.setattr("claude_code_api.services.blob_store._reflink", lambda src, dst: False)
+    store = BlobStore(str(tmp_path / "blobs"))
+    a = tmp_path / "a" / "f.txt"
+    b = tmp_path / "b" / "f.txt"
+    for path in (a, b):
+        path.parent.mkdir()
+        path.write_bytes(b"same")
+    inode = os.stat(b).st_ino
+
+    # New content is not copied into the store
+    assert store.ingest(a) is False
+    assert store.get_stats()["blobs"] == 0
+
+    # Known content is referenced, but the file is not rewritten
+    digest = store.put_bytes(b"same")
+    assert store.ingest(b) is True
+    assert os.stat(b).st_ino == inode
+    assert store.refcount(digest) == 1
+    assert store.links == {"reflink": 0, "hardlink": 0, "copy": 0}
+
+    a.write_bytes(b"EDITED")  # In place, like write_text
+    assert b.read_bytes() == b"same"
+    assert store.read(digest) == b"same"
+
+
+def test_hardlink_mode_discards_blob_modified_in_place(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"), link_mode="hardlink")
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.txt").write_bytes(b"original")
+    digest = file_digest(str(project / "a.txt"))
+    store.ingest(project / "a.txt")
+
+    (project / "a.txt").write_bytes(b"EDITED")  # Also rewrites the blob
+    with pytest.raises(BlobNotFoundError):
+        store.link_into(digest, project / "b.txt")
+    assert store.missing([digest]) == [digest]
+    assert not (project / "b.txt").exists()
@@ -0,0 +1,49 @@
+"""Tests for the skills/agents catalog."""
+
+import os
+
+import pytest
+
+from claude_code_api.services.catalog import Catalog, parse_front_matter
+
+
+def test_parse_front_matter():
+    meta, body = parse_front_matter("---\nname: pdf\ndescription: \"Export: PDF\"\ntags: [a, b]\n---\n\n# Body\n")
+    assert meta == {"name": "pdf", "description": "Export: PDF", "tags": ["a", "b"]}
+    assert body.strip() == "# Body"
+
+    # Not valid YAML: falls back to key: value lines
+    meta, _ = parse_front_matter("---\ndescription: Export: PDF files\nbroken: [\n---\nbody")
+    assert meta["description"] == "Export: PDF files"
+
+    assert parse_front_matter("# No front matter\n---\n") == ({}, "# No front matter\n---\n")
+
+
+def _write(directory, name, description):
+    (directory / name).mkdir(exist_ok=True)
+    (directory / name / "SKILL.md").write_text(f"---\nname: {name}\ndescription: {description}\n---\nBody of {name}\n")
+
+
+@pytest.mark.asyncio
+async def test_revalidation_rereads_only_changed_entries(tmp_path):
+    _write(tmp_path, "alpha", "First")
+    _write(tmp_path, "beta", "Second")
+    catalog = Catalog("skill", tmp_path, "SKILL.md", revalidate_seconds=0, watch=False)
+
+    entries, etag = await catalog.entries()
+    assert [(e["name"], e["description"], e["body"]) for e in entries] == [
+        ("alpha", "First", "Body of alpha"), ("beta", "Second", "Body of beta"),
+    ]
+    assert catalog.reads == 2
+
+    # Nothing changed: same entries, same ETag, no reads
+    again, same_etag = await catalog.entries()
+    assert same_etag == etag and again[0] is entries[0] and catalog.reads == 2
+
+    _write(tmp_path, "beta", "Second, edited")
+    os.utime(tmp_path / "beta" / "SKILL.md", ns=(1, 1))
+    (tmp_path / "alpha" / "SKILL.md").unlink()
+    entries, new_etag = await catalog.entries()
+    assert [(e["name"], e["description"]) for e in entries] == [("beta", "Second, edited")]
+    assert new_etag != etag and catalog.reads == 3
+    assert (await catalog.get("beta"))["metadata"]["name"] == "beta"
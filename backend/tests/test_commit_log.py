@@ -0,0 +1,82 @@
+"""Tests for the paginated, cached commit log."""
+
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from claude_code_api.services.commit_log import CommitLogError, CommitLogService, InvalidCursorError
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True,
+        env={**os.environ, "GIT_AUTHOR_NAME": "Dev", "GIT_AUTHOR_EMAIL": "dev@example.com",
+             "GIT_COMMITTER_NAME": "Dev", "GIT_COMMITTER_EMAIL": "dev@example.com"},
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q")
+    for i in range(7):
+        name = "docs.md" if i % 3 == 0 else "main.py"
+        (path / name).write_text(f"{i}\n")
+        _git(path, "add", name)
+        _git(path, "commit", "-q", "-m", f"Change {i}" + (" [Fix] crash" if i in (2, 5) else ""))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_stay_stable(repo):
+    log = CommitLogService(commit_graph=False)
+    first = await log.page(str(repo), limit=3)
+    assert [c["message"] for c in first["commits"]] == ["Change 6", "Change 5 [Fix] crash", "Change 4"]
+    assert first["commits"][0]["files_changed"] == 1 and first["commits"][0]["insertions"] == 1
+
+    # A new commit does not shift the following pages
+    (repo / "new.txt").write_text("x\n")
+    _git(repo, "add", "new.txt")
+    _git(repo, "commit", "-q", "-m", "Change 7")
+
+    second = await log.page(str(repo), cursor=first["next_cursor"], limit=3)
+    third = await log.page(str(repo), cursor=second["next_cursor"], limit=3)
+    assert [c["message"] for c in second["commits"]] == ["Change 3", "Change 2 [Fix] crash", "Change 1"]
+    assert [c["message"] for c in third["commits"]] == ["Change 0"] and third["next_cursor"] is None
+
+    again = await log.page(str(repo), cursor=first["next_cursor"], limit=3)
+    assert again == second and log.get_stats()["hits"] == 3
+
+    with pytest.raises(InvalidCursorError):
+        await log.page(str(repo), cursor="HEAD:0")
+
+
+@pytest.mark.asyncio
+async def test_filters_run_in_git(repo, tmp_path):
+    log = CommitLogService(commit_graph=False)
+    assert [c["message"] for c in await log.search(str(repo), "[fix]")] == [
+        "Change 5 [Fix] crash", "Change 2 [Fix] crash",
+    ]
+    docs = await log.page(str(repo), path="docs.md")
+    assert [c["message"] for c in docs["commits"]] == ["Change 6", "Change 3", "Change 0"]
+    assert (await log.page(str(repo), author="nobody"))["commits"] == []
+
+    empty = tmp_path / "empty"
+    _git(tmp_path, "init", "-q", str(empty))
+    assert await log.page(str(empty)) == {"commits": [], "next_cursor": None}
+    with pytest.raises(CommitLogError):
+        await log.page(str(tmp_path))
+    with pytest.raises(CommitLogError):
+        await log.page(str(repo), ref="no-such-branch")
+
+
+@pytest.mark.asyncio
+async def test_commit_graph_written(repo):
+    log = CommitLogService(commit_graph=True)
+    await log.page(str(repo), limit=1)
+    await asyncio.gather(*log._tasks)
+    assert log.get_stats()["graph_writes"] == 1
+    assert (repo / ".git" / "objects" / "info" / "commit-graphs").is_dir()
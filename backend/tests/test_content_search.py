@@ -0,0 +1,69 @@
+"""Tests for parallel content search."""
+
+import asyncio
+
+import pytest
+
+from claude_code_api.services.content_search import (
+    ContentSearchService,
+    InvalidPatternError,
+    compile_pattern,
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.py").write_text("import os\n\ndef hello():\n    return 'Hello'\nhello()\n")
+    (tmp_path / "b.txt").write_text("hello\n" * 10)
+    (tmp_path / "image.bin").write_bytes(b"hello\0\0\0")
+    return tmp_path
+
+
+async def _collect(service, root, paths, pattern, **kwargs):
+    return [record async for record in service.grep(str(root), paths, pattern, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_grep_literal_regex_and_caps(tree):
+    service = ContentSearchService(max_workers=2, use_processes=False)
+    paths = ["a.py", "b.txt", "image.bin"]
+    try:
+        records = await _collect(service, tree, paths, "hello", ignore_case=True, max_per_file=3)
+        matches = [r for r in records if r["type"] == "match"]
+        summary = records[-1]
+
+        assert {(m["path"], m["line"]) for m in matches if m["path"] == "a.py"} == {
+            ("a.py", 3), ("a.py", 4), ("a.py", 5)
+        }
+        assert sum(1 for m in matches if m["path"] == "b.txt") == 3
+        assert {"type": "file_truncated", "path": "b.txt", "max_per_file": 3} in records
+        assert summary["type"] == "summary"
+        assert summary["files_skipped"] == 1  # Binary file
+
+        records = await _collect(service, tree, paths, r"def \w+\(", regex=True, glob="*.py")
+        assert [(r["line"], r["column"], r["text"]) for r in records if r["type"] == "match"] == [
+            (3, 1, "def hello():")
+        ]
+
+        records = await _collect(service, tree, paths, "hello", max_results=2)
+        assert records[-1]["matches"] == 2
+        assert records[-1]["truncated"] is True
+    finally:
+        service.shutdown()
+
+
+def test_invalid_pattern():
+    with pytest.raises(InvalidPatternError):
+        compile_pattern("(", regex=True)
+    with pytest.raises(InvalidPatternError):
+        compile_pattern("")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_searches_share_one_pool():
+    service = ContentSearchService(max_workers=1, use_processes=True)
+    try:
+        pools = await asyncio.gather(*(service._get_pool() for _ in range(5)))
+        assert all(pool is pools[0] for pool in pools)
+    finally:
+        service.shutdown()
@@ -0,0 +1,79 @@
+"""Tests for the scandir-based directory listing engine."""
+
+import os
+
+import pytest
+
+from claude_code_api.services.directory_listing import (
+    InvalidCursorError,
+    list_directory,
+)
+
+
+@pytest.fixture
+def listing_dir(tmp_path):
+    for i in range(25):
+        (tmp_path / f"file{i:02d}.txt").write_text("x" * i)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "nested.py").write_text("print()")
+    (tmp_path / ".hidden").write_text("")
+    return tmp_path
+
+
+def _collect(path, **kwargs):
+    names, cursor = [], None
+    while True:
+        page = list_directory(str(path), cursor=cursor, **kwargs)
+        names.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return names
+
+
+def test_pages_cover_listing_once_in_order(listing_dir):
+    full = list_directory(str(listing_dir))
+    expected = [item["name"] for item in full["items"]]
+
+    assert ".hidden" not in expected
+    assert expected == sorted(expected, key=str.lower)
+    assert _collect(listing_dir, limit=7) == expected
+
+
+def test_sort_by_size_desc_and_type(listing_dir):
+    names = _collect(listing_dir, sort="size", order="desc", limit=4, pattern="*.txt")
+    assert names[0] == "file24.txt"
+    assert names[-1] == "file00.txt"
+
+    page = list_directory(str(listing_dir), sort="type", limit=1)
+    assert page["items"][0] == {
+        "name": "sub",
+        "path": os.path.join(str(listing_dir), "sub"),
+        "type": "directory",
+        "size": page["items"][0]["size"],
+        "modified": page["items"][0]["modified"],
+        "permissions": page["items"][0]["permissions"],
+    }
+
+
+def test_lazy_stat_and_recursive_pattern(listing_dir):
+    page = list_directory(str(listing_dir), pattern="**/*.py", with_stat=False)
+    assert page["items"] == [{
+        "name": "nested.py",
+        "path": os.path.join(str(listing_dir), "sub", "nested.py"),
+        "type": "file",
+    }]
+
+    # Patterns match names only, so a directory part would silently match nothing
+    with pytest.raises(ValueError):
+        list_directory(str(listing_dir), pattern="sub/*.py")
+
+
+def test_cursor_is_bound_to_listing(listing_dir):
+    page = list_directory(str(listing_dir), limit=2)
+
+    with pytest.raises(InvalidCursorError):
+        list_directory(str(listing_dir), limit=2, cursor=page["next_cursor"], order="desc")
+    with pytest.raises(InvalidCursorError):
+        list_directory(str(listing_dir), limit=2, cursor=page["next_cursor"], pattern="*.py")
+    with pytest.raises(InvalidCursorError):
+        list_directory(str(listing_dir), cursor="not-a-cursor")
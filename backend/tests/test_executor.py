@@ -0,0 +1,81 @@
+"""Tests for the blocking I/O executor and loop lag monitor."""
+
+import asyncio
+import time
+
+import pytest
+
+from claude_code_api.core.executor import BlockingExecutor, OperationTimeoutError
+from claude_code_api.core.loop_monitor import BlockingCallSampler, EventLoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_off_loop_and_times_out():
+    executor = BlockingExecutor(max_workers=2, timeouts={"file": 0.05})
+    try:
+        assert await executor.run("file", sum, [1, 2, 3]) == 6
+
+        with pytest.raises(OperationTimeoutError):
+            await executor.run("file", time.sleep, 0.5)
+
+        stats = executor.get_stats()
+        assert stats["completed"] == 1
+        assert stats["timed_out"] == 1
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_detects_stall():
+    monitor = EventLoopLagMonitor(interval_seconds=0.01, stall_threshold_ms=50)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)  # Block the loop on purpose
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert stats["stalls"] >= 1
+    assert stats["max_ms"] >= 50
+
+
+def _blocking_helper():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_blocking_sampler_finds_call_site():
+    sampler = BlockingCallSampler(threshold_ms=30, sample_interval_ms=5)
+    monitor = EventLoopLagMonitor(interval_seconds=0.01, stall_threshold_ms=50, sampler=sampler)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    _blocking_helper()  # Block the loop on purpose
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert stats["samples"] >= 5 and stats["max_ms"] >= 150
+    report = sampler.report()
+    assert report["total_samples"] >= 10
+    top = report["sites"][0]
+    assert "test_executor.py" in top["site"] and "_blocking_helper" in top["site"]
+    assert top["episodes"] == 1
+    assert any("_blocking_helper" in frame for frame in top["stacks"][0]["frames"])
+
+
+@pytest.mark.asyncio
+async def test_queued_call_that_times_out_leaves_queue_depth():
+    executor = BlockingExecutor(max_workers=1, timeouts={"file": 5})
+    try:
+        busy = asyncio.ensure_future(executor.run("file", time.sleep, 0.2))
+        await asyncio.sleep(0.02)
+        with pytest.raises(OperationTimeoutError):
+            await executor.run("file", sum, [1], timeout=0.05)  # Still queued behind the sleep
+        await busy
+        await asyncio.sleep(0)
+
+        stats = executor.get_stats()
+        assert stats["pending"] == 0 and stats["running"] == 0
+        assert stats["completed"] == 1
+    finally:
+        executor.shutdown()
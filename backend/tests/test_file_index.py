@@ -0,0 +1,121 @@
+"""Tests for gitignore matching and the project file index."""
+
+import os
+import time
+
+import pytest
+
+from claude_code_api.services.file_index import ProjectFileIndex, fuzzy_score
+from claude_code_api.services.file_watcher import ADDED, DELETED
+from claude_code_api.utils.gitignore import GitignoreFilter, walk_files
+
+
+def _write(root, rel, content=""):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = str(tmp_path)
+    _write(root, ".gitignore", "*.log\nbuild/\n/top.txt\n!keep.log\ndocs/**/*.tmp\n")
+    for rel in [
+        "src/components/UserProfile.tsx",
+        "src/components/user_list.tsx",
+        "src/utils/format.ts",
+        "src/.gitignore",
+        "src/generated.py",
+        "README.md",
+        "debug.log",
+        "keep.log",
+        "top.txt",
+        "nested/top.txt",
+        "build/out.js",
+        "docs/a/b/c.tmp",
+        ".git/HEAD",
+    ]:
+        _write(root, rel, "*.py\n" if rel == "src/.gitignore" else "")
+    return root
+
+
+def test_walk_respects_gitignore(project):
+    files = sorted(rel for rel, _ in walk_files(project, GitignoreFilter(project)))
+    assert files == [
+        ".gitignore",
+        "README.md",
+        "keep.log",
+        "nested/top.txt",
+        "src/.gitignore",
+        "src/components/UserProfile.tsx",
+        "src/components/user_list.tsx",
+        "src/utils/format.ts",
+    ]
+
+    ignore = GitignoreFilter(project)
+    assert ignore.is_ignored("build/new.js")
+    assert ignore.is_ignored("src/other.py")
+    assert not ignore.is_ignored("other.py")
+
+
+def test_search_modes_rank_results(project):
+    index = ProjectFileIndex(project)
+    index.build()
+
+    prefix = [p for p, _ in index.search("user", mode="prefix")]
+    assert set(prefix) == {"src/components/UserProfile.tsx", "src/components/user_list.tsx"}
+
+    assert [p for p, _ in index.search("src/utils", mode="prefix")] == ["src/utils/format.ts"]
+
+    substring = index.search("profile", mode="substring")
+    assert [p for p, _ in substring] == ["src/components/UserProfile.tsx"]
+
+    fuzzy = [p for p, _ in index.search("uprof", mode="fuzzy")]
+    assert fuzzy[0] == "src/components/UserProfile.tsx"
+
+    assert index.search("tsx", mode="substring", pattern="user_*") == [
+        ("src/components/user_list.tsx", pytest.approx(0.8, abs=0.05))
+    ]
+
+
+def test_incremental_changes_and_snapshot(project, tmp_path_factory):
+    index = ProjectFileIndex(project)
+    index.build()
+
+    added = _write(project, "src/new_widget.ts")
+    ignored = _write(project, "build/skip.js")
+    assert not index.apply_changes([(ADDED, added), (ADDED, ignored)])
+    assert [p for p, _ in index.search("widget")] == ["src/new_widget.ts"]
+    assert not index.search("skip")
+
+    assert not index.apply_changes([(DELETED, os.path.join(project, "src/components"))])
+    assert not index.search("profile")
+    assert len(index) == 7
+
+    snapshot = tmp_path_factory.mktemp("snap") / "index.gz"
+    index.save(snapshot)
+    assert ProjectFileIndex.load("/some/other/root", snapshot) is None
+
+    loaded = ProjectFileIndex.load(project, snapshot)
+    assert loaded is not None and loaded.loaded_from_snapshot
+    assert [p for p, _ in loaded.search("widget")] == ["src/new_widget.ts"]
+
+
+def test_fuzzy_score_prefers_boundaries():
+    assert fuzzy_score("xyz", "src/abc.py") is None
+    assert fuzzy_score("up", "src/UserProfile.tsx") > fuzzy_score("up", "src/setup.py")
+
+
+def test_fuzzy_near_miss_does_not_backtrack(tmp_path):
+    root = str(tmp_path)
+    near_miss = "docs/" + "a" * 40 + ".txt"  # Every character of the query but the last
+    _write(root, near_miss)
+    index = ProjectFileIndex(root)
+    index.build()
+
+    start = time.perf_counter()
+    assert index.search("aaaaaaaaz", mode="fuzzy") == []
+    assert [p for p, _ in index.search("daaat", mode="fuzzy")] == [near_miss]
+    assert time.perf_counter() - start < 0.5
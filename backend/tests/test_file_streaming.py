@@ -0,0 +1,77 @@
+"""Tests for range and line-range file reads."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from claude_code_api.services.file_streaming import (
+    DETECT_BYTES,
+    BinaryContentError,
+    LineIndexCache,
+    RangeNotSatisfiableError,
+    detect_encoding,
+    iter_text,
+    parse_range,
+)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 10)
+    assert parse_range("bytes=90-", 100) == (90, 100)
+    assert parse_range("bytes=-10", 100) == (90, 100)
+    assert parse_range("bytes=50-500", 100) == (50, 100)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=100-", 100)
+
+
+def test_detect_encoding():
+    assert detect_encoding("héllo".encode("utf-8")) == ("utf-8", 0)
+    block = ("x" * (DETECT_BYTES - 1) + "é").encode("utf-8")[:DETECT_BYTES]
+    assert detect_encoding(block) == ("utf-8", 0)  # Full block cut mid-character
+    assert detect_encoding("hi".encode("utf-16")) == ("utf-16-le", 2)
+    assert detect_encoding("café".encode("cp1252")) == ("cp1252", 0)
+    with pytest.raises(BinaryContentError):
+        detect_encoding(b"\x7fELF\0\0")
+
+
+def test_line_ranges(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    cache = LineIndexCache(max_entries=2)
+
+    start, end, total = cache.line_range(str(path), os.stat(path), 10, 12)
+    assert total == 100
+    assert "".join(iter_text(str(path), "utf-8", start, end, chunk_size=4)) == "line 10\nline 11\nline 12\n"
+
+    start, end, _ = cache.line_range(str(path), os.stat(path), 100, None)
+    assert "".join(iter_text(str(path), "utf-8", start, end)) == "line 100\n"
+    assert cache.hits == 1
+
+    # Rewriting the file invalidates the cached offsets
+    path.write_text("only\nthree\nlines")
+    start, end, total = cache.line_range(str(path), os.stat(path), 3, 5)
+    assert total == 3
+    assert "".join(iter_text(str(path), "utf-8", start, end)) == "lines"
+
+
+def test_line_index_cache_concurrent_access(tmp_path):
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"f{i}.txt"
+        path.write_text("a\nb\n" * (i + 1))
+        paths.append((str(path), os.stat(path)))
+    cache = LineIndexCache(max_entries=3)
+
+    def worker(seed):
+        for n in range(300):
+            path, st = paths[(seed + n) % len(paths)]
+            assert len(cache.get(path, st)) == 2 * (int(path[-5]) + 1)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(8)))
+    assert cache.hits + cache.misses == 8 * 300
+    assert len(cache._entries) <= 3
@@ -0,0 +1,76 @@
+"""Tests for structured, size-bounded git diffs."""
+
+import os
+import subprocess
+
+import pytest
+
+from claude_code_api.services.git_diff import DiffError, DiffService
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=Dev", "-c", "user.email=dev@example.com", *args],
+        check=True, capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q")
+    (path / "app.py").write_text("".join(f"line {i}\n" for i in range(100)))
+    (path / "old name.txt").write_text("".join(f"stable {i}\n" for i in range(20)))
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", "first")
+
+    (path / "app.py").write_text("".join(f"line {i}\n" if i % 10 else f"changed {i}\n" for i in range(100)))
+    _git(path, "mv", "old name.txt", "new name.txt")
+    (path / "image.png").write_bytes(b"\x89PNG\0" + os.urandom(64))
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", "second")
+    return path
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_file_records_and_cache(repo):
+    service = DiffService(large_lines=15)
+    records = await _collect(service.files(str(repo), base="HEAD~1", target="HEAD"))
+    files = {r["path"]: r for r in records if r["type"] == "file"}
+
+    assert files["app.py"]["status"] == "modified"
+    assert (files["app.py"]["insertions"], files["app.py"]["deletions"]) == (10, 10)
+    assert files["app.py"]["large"] is True
+    assert files["new name.txt"]["status"] == "renamed"
+    assert files["new name.txt"]["old_path"] == "old name.txt"
+    assert files["image.png"]["binary"] is True and files["image.png"]["status"] == "added"
+    assert records[-1] == {"type": "summary", "files": 3, "insertions": 10, "deletions": 10}
+
+    # Commit-to-commit diffs are immutable and served from the cache
+    again = await _collect(service.files(str(repo), base="HEAD~1", target="HEAD"))
+    assert again == records and service.get_stats()["hits"] == 1
+
+    with pytest.raises(DiffError):
+        await _collect(service.files(str(repo), base="nope", target="HEAD"))
+
+
+@pytest.mark.asyncio
+async def test_hunks_lazy_binary_and_truncated(repo):
+    service = DiffService(max_file_bytes=400)
+    hunks = await service.file_hunks(str(repo), "app.py", base="HEAD~1", target="HEAD", context_lines=0)
+    assert hunks["truncated"] is True and hunks["hunks"][-1].get("partial") is True
+    assert hunks["hunks"][0]["header"].startswith("@@ -1 +1 @@")
+    assert hunks["hunks"][0]["lines"] == ["-line 0", "+changed 0"]
+
+    binary = await service.file_hunks(str(repo), "image.png", base="HEAD~1", target="HEAD")
+    assert binary["binary"] is True and binary["hunks"] == []
+
+    # Working tree changes are never cached
+    (repo / "app.py").write_text("rewritten\n")
+    worktree = await _collect(service.files(str(repo)))
+    assert worktree[0]["path"] == "app.py" and worktree[0]["deletions"] == 100
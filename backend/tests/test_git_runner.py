@@ -0,0 +1,81 @@
+"""Tests for the async git runner and remote operations."""
+
+import asyncio
+import subprocess
+
+import pytest
+
+from claude_code_api.core.executor import OperationTimeoutError
+from claude_code_api.services.git_operations import GitNotFoundError, GitOperationsService
+from claude_code_api.services.git_runner import GitRunner, parse_progress
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=Dev", "-c", "user.email=dev@example.com", *args],
+        check=True, capture_output=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_share_writes_exclude(tmp_path):
+    runner = GitRunner(max_concurrent=4)
+    events = []
+
+    async def hold(name, write):
+        async with runner.locked(str(tmp_path), write=write):
+            events.append(f"{name}+")
+            await asyncio.sleep(0.05)
+            events.append(f"{name}-")
+
+    await asyncio.gather(hold("r1", False), hold("r2", False), hold("w", True), hold("r3", False))
+    # Both first readers overlap; the writer runs alone; r3 waits behind the writer
+    assert events[:2] == ["r1+", "r2+"]
+    assert events[4:6] == ["w+", "w-"] and events[6:] == ["r3+", "r3-"]
+    assert runner.get_stats()["locked_repos"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_process(tmp_path):
+    runner = GitRunner()
+    with pytest.raises(OperationTimeoutError):
+        await runner.run(str(tmp_path), ["-c", "alias.wait=!sleep 5", "wait"], timeout=0.2)
+    assert runner.get_stats()["timed_out"] == 1 and runner.get_stats()["running"] == 0
+
+
+def test_parse_progress():
+    assert parse_progress("remote: Counting objects:  50% (5/10)") == {
+        "type": "progress", "phase": "Counting objects", "percent": 50, "current": 5, "total": 10,
+    }
+    assert parse_progress("To /tmp/remote.git") == {"type": "message", "text": "To /tmp/remote.git"}
+
+
+@pytest.mark.asyncio
+async def test_push_and_pull_stream_events(tmp_path):
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", str(remote))
+    work = tmp_path / "work"
+    _git(tmp_path, "clone", "-q", str(remote), str(work))
+    (work / "a.txt").write_text("a\n")
+    _git(work, "add", "a.txt")
+    _git(work, "commit", "-q", "-m", "first")
+
+    service = GitOperationsService()
+    events = [e async for e in service.remote_operation(str(work), "push", branch="HEAD:refs/heads/main")]
+    assert events[0]["type"] == "started"
+    assert events[-1]["type"] == "result" and events[-1]["success"] is True
+
+    other = tmp_path / "other"
+    _git(tmp_path, "clone", "-q", "-b", "main", str(remote), str(other))
+    (work / "b.txt").write_text("b\n")
+    _git(work, "add", "b.txt")
+    _git(work, "commit", "-q", "-m", "second")
+    _git(work, "push", "-q", "origin", "HEAD:refs/heads/main")
+
+    events = [e async for e in service.remote_operation(str(other), "pull")]
+    assert events[-1]["success"] is True and (other / "b.txt").exists()
+
+    with pytest.raises(GitNotFoundError):
+        [e async for e in service.remote_operation(str(tmp_path), "fetch")]
+    with pytest.raises(GitNotFoundError):
+        await service.get_status_async(str(tmp_path))
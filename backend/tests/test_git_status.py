@@ -0,0 +1,59 @@
+"""Tests for single-pass porcelain v2 git status."""
+
+import io
+import subprocess
+
+from claude_code_api.services.git_operations import GitOperationsService
+from claude_code_api.services.git_status import iter_fields, parse_porcelain_v2
+from claude_code_api.services.repo_pool import RepoPool
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+def test_parse_streams_across_chunks():
+    output = (
+        b"# branch.oid 1234567890abcdef1234567890abcdef12345678\0"
+        b"# branch.head main\0"
+        b"# branch.upstream origin/main\0"
+        b"# branch.ab +2 -1\0"
+        b"1 .M N... 100644 100644 100644 aaaa aaaa src/with space.py\0"
+        b"1 A. N... 000000 100644 100644 0000 bbbb new.py\0"
+        b"2 R. N... 100644 100644 100644 cccc cccc R100 docs/new name.md\0docs/old.md\0"
+        b"u UU N... 100644 100644 100644 100644 d1 d2 d3 conflict.txt\0"
+        b"? notes.txt\0"
+    )
+    # A tiny chunk size splits fields (and the rename pair) across reads
+    status = parse_porcelain_v2(iter_fields(io.BytesIO(output), chunk_size=7))
+
+    assert status["current_branch"] == "main" and status["upstream"] == "origin/main"
+    assert (status["ahead"], status["behind"]) == (2, 1)
+    assert status["modified"] == ["src/with space.py"]
+    assert status["staged"] == ["new.py", "docs/new name.md"]
+    assert status["renamed"] == [{"from": "docs/old.md", "to": "docs/new name.md"}]
+    assert status["conflicted"] == ["conflict.txt"]
+    assert status["untracked"] == ["notes.txt"]
+
+
+def test_status_of_repository(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    service = GitOperationsService(pool=RepoPool())
+    _git(repo, "init", "-q", "-b", "main")
+    (repo / "a.txt").write_text("a\n")
+    assert service.get_status(str(repo))["has_commits"] is False
+
+    _git(repo, "add", "a.txt")
+    _git(repo, "-c", "user.name=Dev", "-c", "user.email=dev@example.com", "commit", "-q", "-m", "initial")
+    _git(repo, "checkout", "-q", "--detach")
+    _git(repo, "mv", "a.txt", "b.txt")
+    (repo / "b.txt").write_text("a\nb\n")
+    (repo / "dir").mkdir()
+    (repo / "dir" / "c.txt").write_text("c\n")
+
+    status = service.get_status(str(repo))
+    assert status["is_detached"] and status["current_branch"] == "detached HEAD"
+    assert status["renamed"] == [{"from": "a.txt", "to": "b.txt"}]
+    assert status["staged"] == ["b.txt"] and status["modified"] == ["b.txt"]
+    assert status["untracked"] == ["dir/c.txt"]
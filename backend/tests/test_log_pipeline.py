@@ -0,0 +1,94 @@
+"""Tests for the sampled, asynchronous logging pipeline."""
+
+import json
+import logging
+import threading
+
+import structlog
+
+from claude_code_api.core.log_pipeline import LogPipeline, lazy
+
+
+class _Capture(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.lines = []
+        self.threads = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.lines.append(json.loads(record.getMessage()))
+        self.threads.append(threading.current_thread().name)
+
+
+def _logger(pipeline, name, handler):
+    stdlib = logging.getLogger(name)
+    stdlib.handlers[:] = [handler]
+    stdlib.setLevel(logging.DEBUG)
+    stdlib.propagate = False
+    return structlog.wrap_logger(
+        stdlib, processors=pipeline.processors(), wrapper_class=structlog.stdlib.BoundLogger
+    )
+
+
+def test_writer_thread_renders_lazy_fields_and_samples():
+    pipeline = LogPipeline(sample_rates={"noisy": 0.0, "half": 0.5})
+    handler = _Capture()
+    log = _logger(pipeline, "test.pipeline.writer", handler)
+    rendered_on = []
+
+    def expensive():
+        rendered_on.append(threading.current_thread().name)
+        return "x" * 3
+
+    pipeline.start()
+    try:
+        log.info("hello", detail=lazy(expensive), raw=b"bytes")
+        for _ in range(200):
+            log.info("noisy")
+            log.info("half")
+        log.warning("noisy", kept=True)
+    finally:
+        pipeline.stop()
+
+    events = [line["event"] for line in handler.lines]
+    assert handler.lines[0]["detail"] == "xxx" and handler.lines[0]["raw"] == "bytes"
+    assert handler.lines[0]["timestamp"].endswith("Z") and handler.lines[0]["level"] == "info"
+    assert rendered_on == ["log-writer"] and set(handler.threads) == {"log-writer"}
+    assert events.count("noisy") == 1 and handler.lines[-1]["kept"] is True
+    assert 50 < events.count("half") < 150
+    assert all(line["sample_rate"] == 0.5 for line in handler.lines if line["event"] == "half")
+    stats = pipeline.get_stats()
+    assert stats["sampled_out"]["noisy"] == 200
+    assert stats["written"] == len(handler.lines) and stats["dropped"] == 0
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+    pipeline = LogPipeline(queue_size=2)
+    handler = _Capture(gate)
+    log = _logger(pipeline, "test.pipeline.full", handler)
+
+    pipeline.start()
+    try:
+        for i in range(20):
+            log.info("event", i=i)
+        assert pipeline.get_stats()["dropped"] >= 15
+    finally:
+        gate.set()
+        pipeline.stop()
+    assert len(handler.lines) + pipeline.dropped == 20
+
+
+def test_renders_synchronously_without_writer():
+    pipeline = LogPipeline()
+    handler = _Capture()
+    log = _logger(pipeline, "test.pipeline.sync", handler)
+    log.error("boom", detail=lazy(str, 42))
+    assert handler.lines == [{
+        "event": "boom", "detail": "42", "logger": "test.pipeline.sync", "level": "error",
+        "timestamp": handler.lines[0]["timestamp"],
+    }]
+    assert handler.threads == [threading.current_thread().name]
@@ -0,0 +1,96 @@
+"""Tests for labelled metrics and log-linear latency histograms."""
+
+import random
+import threading
+
+from claude_code_api.utils.metrics import Histogram, MetricsCollector
+
+
+def test_histogram_percentiles_within_one_percent():
+    hist = Histogram()
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(3, 1.2) for _ in range(20000))
+    for value in values:
+        hist.record(value)
+
+    snapshot = hist.snapshot()
+    assert snapshot["count"] == len(values)
+    assert snapshot["min"] == round(values[0], 3) and snapshot["max"] == round(values[-1], 3)
+    for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999)):
+        exact = values[int(q * len(values)) - 1]
+        assert abs(snapshot[name] - exact) / exact < 0.01, name
+
+    # Memory is bounded by the value range, not the sample count
+    assert len(hist.counts().buckets) < 1500
+
+
+def test_histogram_bucket_bounds_are_contiguous():
+    hist = Histogram()
+    for index in range(1, 1000):
+        assert hist.bucket_bounds(index)[0] == hist.bucket_bounds(index - 1)[1]
+    for value in (0.0005, 0.07, 1.0, 12.5, 999.9, 123456.0):
+        low, high = hist.bucket_bounds(hist._index(value / hist.unit))
+        assert low <= value < high
+
+
+def test_window_forgets_old_slots(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("claude_code_api.utils.metrics.time.monotonic", lambda: now[0])
+    hist = Histogram(window_seconds=60, window_slots=6)
+    hist.record(500.0)
+    now[0] += 30
+    hist.record(5.0)
+    assert hist.snapshot(window=True)["count"] == 2
+
+    now[0] += 45  # first sample is now 75s old
+    window = hist.snapshot(window=True)
+    assert window["count"] == 1 and window["max"] == 5.0
+    assert hist.snapshot()["count"] == 2
+
+
+def test_labelled_series_and_threaded_recording():
+    collector = MetricsCollector()
+
+    def work():
+        for _ in range(1000):
+            collector.increment("requests", endpoint="/v1/chat", status=200)
+            collector.record_time("latency_ms", 12.0, endpoint="/v1/chat")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    collector.increment("requests", endpoint="/v1/chat", status=500)
+
+    stats = collector.get_stats()
+    assert stats["counters"]['requests{endpoint="/v1/chat",status="200"}'] == 4000
+    assert stats["counters"]['requests{endpoint="/v1/chat",status="500"}'] == 1
+    latency = stats["histograms"]['latency_ms{endpoint="/v1/chat"}']
+    assert latency["count"] == 4000 and latency["p99"] == 12.0
+    assert latency["window"]["count"] == 4000
+    assert set(collector.get_stats("requests")["histograms"]) == set()
+
+
+def test_openmetrics_exposition():
+    collector = MetricsCollector()
+    collector.register_collector(lambda c: c.set_gauge("queue_depth", 3, queue="file"))
+    collector.increment("http_requests", method="GET", route="/v1/files/{path}", status=200)
+    for value in (0.4, 3.0, 3.0, 40.0, 7000.0):
+        collector.record_time("http_request_duration_ms", value, route='/a"b')
+
+    lines = collector.render_openmetrics().splitlines()
+    assert lines[-1] == "# EOF"
+    assert "# TYPE http_requests counter" in lines
+    assert 'http_requests_total{method="GET",route="/v1/files/{path}",status="200"} 1' in lines
+    assert 'queue_depth{queue="file"} 3' in lines
+    assert "# TYPE http_request_duration_ms histogram" in lines
+    label = 'route="/a\\"b"'
+    assert f'http_request_duration_ms_bucket{{{label},le="1"}} 1' in lines
+    assert f'http_request_duration_ms_bucket{{{label},le="5"}} 3' in lines
+    assert f'http_request_duration_ms_bucket{{{label},le="10000"}} 5' in lines
+    assert f'http_request_duration_ms_bucket{{{label},le="+Inf"}} 5' in lines
+    assert f"http_request_duration_ms_count{{{label}}} 5" in lines
+    assert "# TYPE http_request_duration_ms_window summary" in lines
+    p50 = next(line for line in lines if line.startswith(f'http_request_duration_ms_window{{{label},quantile="0.5"}}'))
+    assert abs(float(p50.split()[-1]) - 3.0) < 0.03
@@ -0,0 +1,74 @@
+"""Tests for the sampling profiler."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from claude_code_api.core.profiler import ProfilerBusyError, SamplingProfiler, request_id_var
+
+
+def _busy(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(500))
+
+
+@pytest.mark.asyncio
+async def test_profile_finds_busy_thread_and_renders_collapsed():
+    profiler = SamplingProfiler(default_hz=200)
+    worker = threading.Thread(target=_busy, args=(0.4,), name="busy-worker")
+    worker.start()
+    profile = await profiler.profile(0.3)
+    worker.join()
+
+    top = profile.top(limit=5)
+    assert top["samples"] > 10
+    assert top["functions"][0]["function"].startswith("_busy ")
+    assert top["threads"]["busy-worker"] >= top["functions"][0]["self"]
+
+    lines = profile.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all(";_busy (" in line for line in busy)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == top["samples"]
+
+
+@pytest.mark.asyncio
+async def test_trace_samples_only_the_traced_request():
+    profiler = SamplingProfiler(default_hz=200)
+
+    async def handle(request_id):
+        request_id_var.set(request_id)
+        trace = profiler.begin_request(request_id)
+        await asyncio.sleep(0.02)
+        _busy(0.15)
+        await asyncio.sleep(0)
+        if trace is not None:
+            profiler.end_request(trace)
+
+    tracing = asyncio.ensure_future(profiler.trace("req-1", timeout=5))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProfilerBusyError):
+        await profiler.profile(0.1)
+
+    other = threading.Thread(target=_busy, args=(0.3,))
+    other.start()
+    await asyncio.create_task(handle("req-2"))
+    await asyncio.create_task(handle("req-1"))
+    profile, completed = await tracing
+    other.join()
+
+    assert completed
+    top = profile.top()
+    assert top["samples"] > 5
+    assert list(top["threads"]) == [threading.current_thread().name]
+    assert top["functions"][0]["function"].startswith("_busy ")
+
+
+@pytest.mark.asyncio
+async def test_trace_times_out_without_request():
+    profiler = SamplingProfiler()
+    profile, completed = await profiler.trace("never", timeout=0.05)
+    assert not completed and profile.top()["samples"] == 0
+    assert not profiler.get_stats()["busy"]
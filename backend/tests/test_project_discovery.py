@@ -0,0 +1,63 @@
+"""Tests for parallel, incremental host project discovery."""
+
+import os
+
+import pytest
+
+from claude_code_api.services.project_discovery import ProjectDiscovery
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "code"
+    (root / "alpha" / ".git").mkdir(parents=True)
+    (root / "group" / "beta").mkdir(parents=True)
+    (root / "group" / "beta" / "CLAUDE.md").write_text("# beta\n")
+    (root / "group" / "gamma" / ".claude").mkdir(parents=True)
+    (root / "alpha" / "node_modules" / "dep" / ".git").mkdir(parents=True)
+    (root / "plain" / "deeper" / "deepest" / "four" / ".git").mkdir(parents=True)
+    return root
+
+
+async def _paths(discovery, root, **kwargs):
+    return sorted([os.path.relpath(p["path"], root) async for p in discovery.discover(str(root), **kwargs)])
+
+
+@pytest.mark.asyncio
+async def test_finds_projects_and_skips_heavy_dirs(tree, tmp_path):
+    discovery = ProjectDiscovery(str(tmp_path / "cache"), parallelism=4)
+    assert await _paths(discovery, tree, max_depth=3) == ["alpha", "group/beta", "group/gamma"]
+    assert await _paths(discovery, tree, max_depth=4, refresh=True) == [
+        "alpha", "group/beta", "group/gamma", "plain/deeper/deepest/four",
+    ]
+
+    project = [p async for p in discovery.discover(str(tree / "group"), max_depth=1)]
+    beta = next(p for p in project if p["name"] == "beta")
+    assert beta["has_claudemd"] is True and beta["has_git"] is False
+
+
+@pytest.mark.asyncio
+async def test_rescan_only_lists_changed_dirs(tree, tmp_path):
+    discovery = ProjectDiscovery(str(tmp_path / "cache"), cache_ttl=0)
+    await _paths(discovery, tree, max_depth=3)
+    listed = discovery.dirs_listed
+
+    (tree / "group" / "delta").mkdir()
+    (tree / "group" / "delta" / "CLAUDE.md").write_text("")
+    assert "group/delta" in await _paths(discovery, tree, max_depth=3)
+    # Only group/ (new child) and group/delta/ itself were listed again
+    assert discovery.dirs_listed - listed == 2
+
+    # The directory cache survives a restart
+    restarted = ProjectDiscovery(str(tmp_path / "cache"), cache_ttl=0)
+    assert "group/delta" in await _paths(restarted, tree, max_depth=3)
+    assert restarted.dirs_listed == 0 and restarted.dirs_unchanged > 0
+
+
+@pytest.mark.asyncio
+async def test_recent_scan_is_replayed(tree, tmp_path):
+    discovery = ProjectDiscovery(str(tmp_path / "cache"), cache_ttl=3600, persist=False)
+    first = await _paths(discovery, tree, max_depth=3)
+    (tree / "new" / ".git").mkdir(parents=True)
+    assert await _paths(discovery, tree, max_depth=3) == first and discovery.replays == 1
+    assert "new" in await _paths(discovery, tree, max_depth=3, refresh=True)
@@ -0,0 +1,101 @@
+"""Tests for token- and cost-weighted quotas."""
+
+import pytest
+
+from claude_code_api.services.quota_service import (
+    QuotaManager,
+    QuotaExceededError,
+    estimate_cost,
+)
+from claude_code_api.utils.parser import extract_result_usage
+
+
+class TestQuotaManager:
+    """Test reservation, settlement and budget enforcement."""
+
+    def test_reserve_and_settle_charges_actual_usage(self):
+        manager = QuotaManager(tokens_per_minute=1000, usd_per_day=1.0)
+
+        reservation = manager.reserve("client", tokens=600, cost=0.10)
+        assert manager.get_status("client")["tokens"]["pending"] == 600
+
+        manager.settle(reservation, tokens=200, cost=0.02)
+        status = manager.get_status("client")
+        assert status["tokens"]["pending"] == 0
+        assert status["tokens"]["used"] == 200
+        assert status["cost"]["used"] == pytest.approx(0.02)
+
+        # Settling twice must not double-charge
+        manager.settle(reservation, tokens=200, cost=0.02)
+        assert manager.get_status("client")["tokens"]["used"] == 200
+
+    def test_pending_reservations_block_overshoot(self):
+        manager = QuotaManager(tokens_per_minute=1000, usd_per_day=0)
+
+        manager.reserve("client", tokens=700, cost=0)
+        with pytest.raises(QuotaExceededError) as exc_info:
+            manager.reserve("client", tokens=400, cost=0)
+
+        assert exc_info.value.dimension == "tokens"
+        assert "X-Quota-Tokens-Remaining" in exc_info.value.headers
+        assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+    def test_cost_budget_and_release(self):
+        manager = QuotaManager(tokens_per_minute=0, usd_per_day=0.05)
+
+        reservation = manager.reserve("client", tokens=10, cost=0.04)
+        with pytest.raises(QuotaExceededError) as exc_info:
+            manager.reserve("client", tokens=10, cost=0.04)
+        assert exc_info.value.dimension == "cost"
+
+        manager.release(reservation)
+        manager.reserve("client", tokens=10, cost=0.04)
+
+    def test_budgets_are_per_client(self):
+        manager = QuotaManager(tokens_per_minute=100, usd_per_day=0)
+        manager.set_budget("heavy", tokens_per_minute=10000)
+
+        manager.settle(manager.reserve("light", 90, 0), 90, 0)
+        manager.reserve("heavy", 5000, 0)
+
+        with pytest.raises(QuotaExceededError):
+            manager.reserve("light", 50, 0)
+
+        headers = manager.get_headers("heavy")
+        assert headers["X-Quota-Tokens-Limit"] == "10000"
+        assert "X-Quota-Cost-Limit" not in headers
+
+    def test_abandoned_reservation_expires(self):
+        manager = QuotaManager(tokens_per_minute=0, usd_per_day=0.05)
+
+        abandoned = manager.reserve("client", tokens=10, cost=0.04)
+        abandoned.created_at -= 7200  # Past the default one hour TTL
+        manager.reserve("client", tokens=10, cost=0.004)
+
+        assert abandoned.settled and abandoned.reservation_id not in manager.reservations
+        assert manager.get_status("client")["cost"]["pending"] == pytest.approx(0.004)
+        assert manager.get_stats()["open_reservations"] == 1
+
+
+def test_extract_result_usage():
+    usage = extract_result_usage({
+        "type": "result",
+        "total_cost_usd": 0.0123,
+        "usage": {
+            "input_tokens": 10,
+            "cache_read_input_tokens": 100,
+            "output_tokens": 40,
+        },
+    })
+    assert usage == {
+        "input_tokens": 110,
+        "output_tokens": 40,
+        "total_tokens": 150,
+        "cost_usd": 0.0123,
+    }
+    assert extract_result_usage({"type": "assistant"}) is None
+
+
+def test_estimate_cost_uses_per_million_prices():
+    cost = estimate_cost("claude-3-5-haiku-20241022", 1_000_000, 0)
+    assert cost == pytest.approx(0.25)
@@ -0,0 +1,74 @@
+"""Tests for the pooled GitPython Repo handles."""
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from claude_code_api.services.git_operations import GitNotFoundError, GitOperationsService
+from claude_code_api.services.repo_pool import RepoPool
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.email", "dev@example.com")
+    _git(path, "config", "user.name", "Dev")
+    (path / "a.txt").write_text("a\n")
+    _git(path, "add", "a.txt")
+    _git(path, "commit", "-q", "-m", "initial")
+    _git(path, "branch", "feature")
+    return path
+
+
+def test_reuse_and_invalidate_on_head_change(repo):
+    pool = RepoPool()
+    service = GitOperationsService(pool=pool)
+
+    assert service.get_status(str(repo))["current_branch"] == "main"
+    with pool.repo(str(repo / ".")) as first:
+        pass
+    assert pool.get_stats()["misses"] == 1 and pool.get_stats()["hits"] == 1
+
+    _git(repo, "checkout", "-q", "feature")  # Another git client switches branch
+    with pool.repo(str(repo)) as second:
+        assert second is not first
+        assert second.active_branch.name == "feature"
+    assert pool.get_stats()["invalidations"] == 1
+
+    with pytest.raises(GitNotFoundError):
+        service.get_status(str(repo.parent))
+    assert pool.get_stats()["open"] == 1
+
+
+def test_lru_eviction_closes_idle_handles(tmp_path, repo):
+    other = tmp_path / "other"
+    _git(tmp_path, "clone", "-q", str(repo), str(other))
+    pool = RepoPool(max_size=1)
+
+    with pool.repo(str(repo)) as first:
+        first.git.cat_file("-t", "HEAD")
+        # Evicted while in use: stays open until released
+        with pool.repo(str(other)):
+            assert pool._entries.get(str(repo)) is None
+            assert first.git.cat_file("-t", "HEAD") == "commit"
+    assert pool.get_stats()["evictions"] == 1 and pool.get_stats()["open"] == 1
+
+
+def test_concurrent_checkout_and_status(repo):
+    service = GitOperationsService(pool=RepoPool())
+
+    def work(i):
+        if i % 10 == 0:
+            return service.checkout_branch(str(repo), "feature" if i % 20 else "main")["name"]
+        return service.get_status(str(repo))["current_branch"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(work, range(100)))
+    assert set(results) <= {"main", "feature"}
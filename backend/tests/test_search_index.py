@@ -0,0 +1,123 @@
+"""Tests for the unified BM25 search index."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from claude_code_api.services.search_index import SearchIndex, SearchIndexService, tokenize
+
+
+def _doc(kind, name, description="", body=""):
+    return {"id": f"{kind}:{name}", "type": kind, "title": name, "description": description, "body": body}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.upsert(_doc("skill", "pdf-export", "Export conversations to PDF files"))
+    index.upsert(_doc("skill", "git-helper", "Write commit messages", body="pdf pdf pdf mentioned in passing"))
+    index.upsert(_doc("agent", "code-reviewer", "Reviews pull requests for bugs"))
+    index.upsert(_doc("session", "Refactor the PdfRenderer", "mobile-app"))
+    return index
+
+
+def _ids(hits):
+    return [doc["id"] for doc, _ in hits]
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("PdfRenderer snake_case kebab-case v2") == ["pdf", "renderer", "snake", "case", "kebab", "case", "v2"]
+
+
+def test_bm25_ranks_title_hits_first(index):
+    hits = index.search("pdf", types=["skill"])
+    assert _ids(hits) == ["skill:pdf-export", "skill:git-helper"]
+    assert 0 < hits[1][1] < hits[0][1] < 1
+    assert _ids(index.search("pdf", types=["session"])) == ["session:Refactor the PdfRenderer"]
+
+
+def test_prefix_and_typo_lookup(index):
+    # The last token matches as a prefix (type-ahead)
+    assert _ids(index.search("code rev")) == ["agent:code-reviewer"]
+    # One typo away
+    assert _ids(index.search("reveiws")) == ["agent:code-reviewer"]
+    assert _ids(index.search("comit")) == ["skill:git-helper"]
+    assert index.search("zzzzzz") == []
+
+
+def test_incremental_updates(index):
+    assert index.upsert(_doc("skill", "pdf-export", "Export conversations to PDF files")) is False
+    index.upsert(_doc("skill", "pdf-export", "Print slides"))
+    assert _ids(index.search("conversations")) == []
+    assert _ids(index.search("slides")) == ["skill:pdf-export"]
+
+    index.remove("agent:code-reviewer")
+    assert index.search("reviewer") == []
+    result = index.replace_type("skill", [_doc("skill", "pdf-export", "Print slides")])
+    assert result == {"updated": 0, "removed": 1}
+    assert index.get_stats()["types"] == {"skill": 1, "session": 1}
+
+
+def test_snapshot_round_trip(index, tmp_path):
+    path = tmp_path / "search" / "unified.json.gz"
+    index.save(path)
+    loaded = SearchIndex.load(path)
+    assert loaded.loaded_from_snapshot
+    assert loaded.search("code rev") == index.search("code rev")
+    loaded.remove("skill:pdf-export")
+    assert _ids(loaded.search("pdf")) == ["session:Refactor the PdfRenderer", "skill:git-helper"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_source_and_persistence(tmp_path):
+    rows = {"a": "Fix login crash"}
+    calls = []
+
+    async def load(since):
+        calls.append(since)
+        return [_doc("session", key, title) for key, title in rows.items()]
+
+    service = SearchIndexService(str(tmp_path), refresh_seconds=0)
+    service.register_source("session", load, incremental=True)
+    assert _ids(await service.search("login", ["session"])) == ["session:a"]
+
+    rows["b"] = "Login screen layout"
+    # Stale: answered from the index while the reload runs in the background
+    assert _ids(await service.search("login", ["session"])) == ["session:a"]
+    await service.refresh("session")
+    assert _ids(await service.search("login", ["session"])) == ["session:a", "session:b"]
+    assert calls[0] is None and isinstance(calls[1], datetime)
+
+    await service.shutdown()
+    restored = SearchIndexService(str(tmp_path), refresh_seconds=3600)
+    restored.register_source("session", load, incremental=True)
+    calls.clear()
+    assert len(_ids(await restored.search("login", ["session"]))) == 2
+    assert restored.get_stats()["from_snapshot"] is True
+    assert calls == []  # Fresh in the snapshot: no reload
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_served_before_reload(tmp_path):
+    release = asyncio.Event()
+    calls = []
+
+    async def load(since):
+        calls.append(since)
+        if len(calls) > 1:
+            await release.wait()
+        return [_doc("session", "a", "Fix login crash")]
+
+    service = SearchIndexService(str(tmp_path), refresh_seconds=3600)
+    service.register_source("session", load, incremental=True)
+    await service.search("login", ["session"])
+    await service.shutdown()
+
+    restored = SearchIndexService(str(tmp_path), refresh_seconds=0)
+    restored.register_source("session", load, incremental=True)
+    assert _ids(await asyncio.wait_for(restored.search("login", ["session"]), 1)) == ["session:a"]
+    await asyncio.sleep(0)
+    assert len(calls) == 2 and isinstance(calls[1], datetime)  # Watermark restored from the snapshot
+    release.set()
+    await restored.shutdown()
@@ -0,0 +1,86 @@
+"""Tests for concurrent unified search legs under a deadline."""
+
+import asyncio
+import gc
+
+import pytest
+
+from claude_code_api.api import search as search_api
+from claude_code_api.api.search import SearchResult, _run_legs
+
+
+def _results(kind, n):
+    return [SearchResult(type=kind, title=f"{kind} {i}", description="") for i in range(n)]
+
+
+async def _leg(kind, n, delay):
+    await asyncio.sleep(delay)
+    return _results(kind, n)
+
+
+async def _failing():
+    raise RuntimeError("boom")
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+@pytest.mark.asyncio
+async def test_slow_leg_times_out_others_return():
+    slow = asyncio.ensure_future(_leg("commit", 3, 5))
+    legs = {
+        "session": asyncio.ensure_future(_leg("session", 2, 0.01)),
+        "file": asyncio.ensure_future(_leg("file", 1, 0)),
+        "commit": slow,
+        "content": asyncio.ensure_future(_failing()),
+    }
+    events = await _collect(_run_legs(legs, deadline_ms=200, max_results=50))
+    statuses = {name: status for name, _, status in events}
+
+    # Categories arrive as they finish, the timed-out one last
+    assert [name for name, _, _ in events][-1] == "commit"
+    assert statuses["file"].count == 1 and statuses["session"].count == 2
+    assert statuses["commit"].timed_out and statuses["commit"].ms < 1000
+    assert statuses["content"].error == "boom"
+    await asyncio.sleep(0)
+    assert slow.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_max_results_cancels_remaining_legs():
+    slow = asyncio.ensure_future(_leg("commit", 3, 5))
+    legs = {"file": asyncio.ensure_future(_leg("file", 10, 0)), "commit": slow}
+    events = await _collect(_run_legs(legs, deadline_ms=5000, max_results=10))
+    statuses = {name: status for name, _, status in events}
+    assert statuses["commit"].cancelled and not statuses["commit"].timed_out
+    await asyncio.sleep(0)
+    assert slow.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_started_legs_can_fill_max_results(monkeypatch):
+    async def indexed(kind, query, limit):
+        return _results(kind, limit)
+
+    async def slow(*args):
+        await asyncio.sleep(5)
+        return []
+
+    monkeypatch.setattr(search_api, "_search_indexed", indexed)
+    monkeypatch.setattr(search_api, "_search_files", slow)
+    monkeypatch.setattr(search_api, "_search_content", slow)
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+
+    legs = search_api._start_legs("query", {"session", "file", "content"}, 8, "/nonexistent/project")
+    events = await _collect(_run_legs(legs, deadline_ms=5000, max_results=8))
+    statuses = {name: status for name, _, status in events}
+    assert statuses["session"].count == 8
+    assert statuses["file"].cancelled and statuses["content"].cancelled
+
+    # The shared project-root check fails with nobody left to await it
+    await asyncio.sleep(0.2)
+    del legs, events
+    gc.collect()
+    assert errors == []
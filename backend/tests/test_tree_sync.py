@@ -0,0 +1,62 @@
+"""Tests for tree snapshots and deltas."""
+
+import os
+
+from claude_code_api.services.tree_sync import ProjectTree, TreeSyncService
+
+
+def test_snapshot_and_delta(tmp_path):
+    root = tmp_path / "project"
+    (root / "src" / "lib").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "main.py").write_text("print(1)\n")
+    (root / "src" / "lib" / "util.py").write_text("x = 1\n")
+    (root / "docs" / "guide.md").write_text("# Guide\n")
+    (root / "build").mkdir()
+    (root / "build" / "out.bin").write_bytes(b"\0")
+    (root / ".gitignore").write_text("build/\n")
+
+    tree = ProjectTree(str(root), tmp_path / "tree.db")
+    first = TreeSyncService.sync(tree)
+    assert first["full"] is True
+    paths = [entry[0] for entry in first["entries"]]
+    assert "src/lib/util.py" in paths and "build" not in paths
+    assert paths.index("src") < paths.index("src/main.py")
+
+    (root / "src" / "main.py").write_text("print(2)\n# longer\n")
+    (root / "src" / "new.py").write_text("")
+    for path in (root / "docs").iterdir():
+        path.unlink()
+    (root / "docs").rmdir()
+    tree.dirty = True
+    delta = TreeSyncService.sync(tree, since=first["version"])
+
+    assert delta["full"] is False and delta["since"] == first["version"]
+    assert [e[0] for e in delta["added"]] == ["src/new.py"]
+    assert delta["removed"] == ["docs"]
+    assert "src/main.py" in [e[0] for e in delta["changed"]]
+    assert "src/lib/util.py" not in [e[0] for e in delta["changed"]]
+
+    # Unchanged tree: same version, empty delta; unknown token: full snapshot
+    again = TreeSyncService.sync(tree, since=delta["version"])
+    assert again["version"] == delta["version"] and again["added"] == again["changed"] == []
+    assert TreeSyncService.sync(tree, since="unknown")["full"] is True
+    tree.close()
+    assert os.path.exists(tmp_path / "tree.db")
+
+
+def test_unwatched_tree_rescans_every_sync(tmp_path, monkeypatch):
+    monkeypatch.setattr("claude_code_api.services.file_watcher.WATCHFILES_AVAILABLE", False)
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "a.txt").write_text("a")
+
+    service = TreeSyncService(str(tmp_path / "index"))
+    tree = service.get_tree(str(root))
+    assert not tree.watched
+    first = TreeSyncService.sync(tree)
+
+    (root / "b.txt").write_text("b")  # No watcher event marks the tree dirty
+    delta = TreeSyncService.sync(tree, since=first["version"])
+    assert [e[0] for e in delta["added"]] == ["b.txt"]
+    service.shutdown()
@@ -0,0 +1,143 @@
+"""Tests for the on-disk trigram index."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from claude_code_api.services import file_index as file_index_module
+from claude_code_api.services import trigram_index
+from claude_code_api.services.file_watcher import ADDED, DELETED, MODIFIED
+from claude_code_api.services.trigram_index import (
+    TrigramIndex,
+    TrigramIndexManager,
+    query_trigrams,
+    required_literals,
+)
+
+
+def test_required_literals():
+    assert required_literals("foo.bar", regex=False) == ["foo.bar"]
+    assert required_literals(r"def (\w+)_handler\(", regex=True) == ["def ", "_handler("]
+    assert required_literals(r"(abc)+x?yz", regex=True) == ["abc", "yz"]
+    assert required_literals("a|b", regex=True) == []
+    assert query_trigrams("ab", regex=False) == set()
+
+
+def test_candidates_persist_and_overlay(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("def load_config():\n    pass\n")
+    (root / "b.py").write_text("def save_config():\n    pass\n")
+    (root / "c.bin").write_bytes(b"load_config\0")
+
+    index = TrigramIndex(str(root), tmp_path / "idx")
+    index.build(["a.py", "b.py", "c.bin"])
+    assert index.candidates("load_config") == ["a.py"]
+    assert index.candidates("LOAD_CONFIG", ignore_case=True) == ["a.py"]
+    assert sorted(index.candidates(r"def \w+_config", regex=True)) == ["a.py", "b.py"]
+    assert index.candidates("missing_symbol") == []
+    assert index.candidates(".*", regex=True) is None
+    index.close()
+
+    reopened = TrigramIndex(str(root), tmp_path / "idx")
+    assert reopened.load()
+    assert reopened.candidates("save_config") == ["b.py"]
+
+    (root / "b.py").write_text("def load_config():\n    return 1\n")
+    (root / "d.py").write_text("load_config()\n")
+    assert sorted(reopened.stale_paths(["a.py", "b.py", "d.py"])) == ["b.py", "d.py"]
+    (root / "a.py").unlink()  # A delete event for a file that exists again counts as a change
+    reopened.apply_changes([
+        (MODIFIED, str(root / "b.py")),
+        (ADDED, str(root / "d.py")),
+        (DELETED, str(root / "a.py")),
+    ])
+    assert sorted(reopened.candidates("load_config")) == ["b.py", "d.py"]
+    assert reopened.candidates("save_config") == []
+
+    stats = reopened.get_stats()
+    assert stats["files"] == 3 and stats["overlay_files"] == 2 and stats["size_bytes"] > 0
+    reopened.close()
+
+
+def test_rebuild_keeps_changes_made_after_file_list(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("def load_config():\n    pass\n")
+    index = TrigramIndex(str(root), tmp_path / "idx")
+    index.build(["a.py"])
+
+    mark = index.change_mark()
+    paths = ["a.py"]  # Listed before the change below
+    (root / "b.py").write_text("load_config()\n")
+    index.apply_changes([(ADDED, str(root / "b.py"))])
+    index.build(paths, since=mark)
+    assert sorted(index.candidates("load_config")) == ["a.py", "b.py"]
+
+    index.build(["a.py", "b.py"])
+    assert index.get_stats()["overlay_files"] == 0
+    index.close()
+
+
+class _FakeWatcher:
+    def __init__(self, available):
+        self.available = available
+        self.callbacks = []
+
+    def start_watch(self, root, on_change=None):
+        self.callbacks.append(on_change)
+        return "watch"
+
+    def stop_watch(self, watch_id):
+        pass
+
+
+class _FakeFileIndex:
+    def __init__(self, root, paths):
+        self.root = root
+        self.paths = paths
+
+    def all_paths(self):
+        return list(self.paths)
+
+
+@pytest.mark.asyncio
+async def test_manager_replays_events_from_initial_build(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("load_config()\n")
+    file_index = _FakeFileIndex(str(root), ["a.py"])
+    watcher = _FakeWatcher(available=True)
+    monkeypatch.setattr(trigram_index, "file_watcher", watcher)
+    monkeypatch.setattr(file_index_module, "file_index_manager", SimpleNamespace(get_index=AsyncMock(return_value=file_index)))
+    manager = TrigramIndexManager(str(tmp_path / "idx"), max_projects=2)
+
+    assert manager.get(str(root)) is None
+    await asyncio.sleep(0)  # Build task registers its watch, index not ready yet
+    (root / "b.py").write_text("load_config()\n")
+    await watcher.callbacks[0]([(ADDED, str(root / "b.py"))])
+
+    await manager.wait(str(root))
+    assert sorted(await manager.candidates(file_index, "load_config")) == ["a.py", "b.py"]
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_manager_rechecks_by_stat_without_watcher(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("load_config()\n")
+    (root / "b.py").write_text("save_config()\n")
+    file_index = _FakeFileIndex(str(root), ["a.py", "b.py"])
+    monkeypatch.setattr(trigram_index, "file_watcher", _FakeWatcher(available=False))
+    monkeypatch.setattr(file_index_module, "file_index_manager", SimpleNamespace(get_index=AsyncMock(return_value=file_index)))
+    manager = TrigramIndexManager(str(tmp_path / "idx"), max_projects=2)
+    await manager.wait(str(root))
+
+    (root / "b.py").write_text("load_config()\n")
+    (root / "a.py").unlink()
+    file_index.paths = ["b.py"]
+    assert await manager.candidates(file_index, "load_config") == ["b.py"]
+    await manager.shutdown()
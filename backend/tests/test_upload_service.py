@@ -0,0 +1,86 @@
+"""Tests for resumable chunked uploads."""
+
+import hashlib
+import threading
+import time
+
+import pytest
+
+from claude_code_api.services.upload_service import (
+    UploadConflictError,
+    UploadIntegrityError,
+    UploadOffsetError,
+    UploadService,
+    UploadSession,
+)
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_resume_after_restart_and_complete(tmp_path):
+    data = b"0123456789" * 1000
+    dest = tmp_path / "out" / "file.bin"
+    service = UploadService(state_dir=str(tmp_path / "state"))
+    session = service.create(dest, size=len(data), sha256=hashlib.sha256(data).hexdigest())
+
+    await service.append(session.upload_id, 0, _chunks(data[:3000], data[3000:4000]))
+    with pytest.raises(UploadOffsetError) as exc:
+        await service.append(session.upload_id, 0, _chunks(b"x"))
+    assert exc.value.expected == 4000
+    with pytest.raises(UploadIntegrityError):
+        await service.complete(session.upload_id)
+
+    # A new service instance picks the session up from its sidecar
+    restarted = UploadService(state_dir=str(tmp_path / "state"))
+    assert restarted.get(session.upload_id).offset == 4000
+    await restarted.append(session.upload_id, 4000, _chunks(data[4000:]))
+    assert await restarted.complete(session.upload_id) == (dest, hashlib.sha256(data).hexdigest())
+
+    assert dest.read_bytes() == data
+    assert [p.name for p in dest.parent.iterdir()] == ["file.bin"]
+    assert list((tmp_path / "state").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_hash_mismatch_and_conflict(tmp_path):
+    service = UploadService(state_dir=str(tmp_path / "state"))
+    dest = tmp_path / "file.txt"
+    session = service.create(dest, sha256="0" * 64)
+    await service.append(session.upload_id, 0, _chunks(b"abc"))
+    with pytest.raises(UploadIntegrityError):
+        await service.complete(session.upload_id)
+    assert not dest.exists()
+
+    dest.write_text("existing")
+    with pytest.raises(UploadConflictError):
+        service.create(dest)
+
+
+def test_concurrent_reloads_share_one_session(tmp_path, monkeypatch):
+    session = UploadService(state_dir=str(tmp_path / "state")).create(tmp_path / "file.bin")
+
+    class SlowSession(UploadSession):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.01)  # Widen the window between lookup and insert
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr("claude_code_api.services.upload_service.UploadSession", SlowSession)
+    restarted = UploadService(state_dir=str(tmp_path / "state"))
+    barrier = threading.Barrier(8)
+    results = []
+
+    def load():
+        barrier.wait()
+        results.append(restarted.get(session.upload_id))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all(r is results[0] for r in results)